@@ -79,7 +79,7 @@ try:
     from src.storage.database import db
     from src.utils.config import config
     from src.utils.export_manager import export_manager
-    from src.agents.qa_agent import QuestionAnsweringAgent
+    from src.agents.qa_service import get_qa_service
     from src.utils.logging import setup_logging, logger
     RESEARCH_AVAILABLE = True
 except ImportError as e:
@@ -1256,12 +1256,13 @@ if 'research_crew' not in st.session_state and RESEARCH_AVAILABLE:
     try:
         with st.spinner("🚀 Initializing AI Research System..."):
             st.session_state.research_crew = ResearchCrew()
-            st.session_state.qa_agent = QuestionAnsweringAgent()
+            # Process-wide QA service, shared by every browser session
+            st.session_state.qa_service = get_qa_service()
         st.success("✅ AI Research System Ready!", icon="🤖")
     except Exception as e:
         st.error(f"❌ Failed to initialize research crew: {e}")
         st.session_state.research_crew = None
-        st.session_state.qa_agent = None
+        st.session_state.qa_service = None
 
 if 'research_results' not in st.session_state:
     st.session_state.research_results = None
@@ -2124,7 +2125,7 @@ def main():
                     st.rerun()
         
         # Process Q&A with enhanced UI
-        if ask_button and st.session_state.qa_agent:
+        if ask_button and st.session_state.get('qa_service'):
             # Validate inputs professionally
             if ERROR_HANDLING:
                 validation_passed = validate_inputs(question=question)
@@ -2138,139 +2139,150 @@ def main():
             answer_container = st.container()
             
             with answer_container:
-                # Loading state
-                with st.spinner("🔍 Searching academic literature and generating AI answer..."):
-                    start_time = time.time()
+                # Stream the answer into the page as it is generated
+                start_time = time.time()
+                
+                try:
+                    header_placeholder = st.empty()
+                    answer_placeholder = st.empty()
+                    stream_state = {}
                     
-                    try:
-                        answer_result = st.session_state.qa_agent.answer_question(
-                            question=question,
+                    def answer_tokens():
+                        """Yield answer text as it streams, keeping the final result aside"""
+                        for event in st.session_state.qa_service.stream(
+                            question,
                             research_topic=qa_topic_filter if qa_topic_filter else None,
                             paper_limit=qa_paper_limit
-                        )
+                        ):
+                            if event.get('type') == 'token':
+                                yield event['text']
+                            elif event.get('type') == 'result':
+                                stream_state['result'] = event['result']
+                    
+                    # Main answer, rendered progressively as the LLM generates it
+                    with answer_placeholder.container():
+                        st.markdown("### 📝 Answer")
+                        streamed_answer = st.write_stream(answer_tokens())
+                    
+                    answer_result = stream_state.get('result') or {
+                        'answer': streamed_answer if isinstance(streamed_answer, str) else '',
+                        'confidence': 0.0
+                    }
+                    
+                    processing_time = time.time() - start_time
+                    
+                    if answer_result.get('confidence', 0) >= min_confidence:
+                        # Success - Display comprehensive answer
+                        header_placeholder.markdown(f"""
+                        <div class="modern-card" style="background: linear-gradient(135deg, var(--success-50) 0%, var(--primary-50) 100%); border: 2px solid var(--success-200);">
+                            <h3 style="color: var(--success-700); margin-bottom: var(--spacing-lg);">
+                                ✅ AI Research Answer
+                            </h3>
+                        </div>
+                        """, unsafe_allow_html=True)
                         
-                        processing_time = time.time() - start_time
+                        # Answer metadata in modern cards
+                        col1, col2, col3, col4 = st.columns(4)
                         
-                        if answer_result.get('confidence', 0) >= min_confidence:
-                            # Success - Display comprehensive answer
-                            st.markdown(f"""
-                            <div class="modern-card" style="background: linear-gradient(135deg, var(--success-50) 0%, var(--primary-50) 100%); border: 2px solid var(--success-200);">
-                                <h3 style="color: var(--success-700); margin-bottom: var(--spacing-lg);">
-                                    ✅ AI Research Answer
-                                </h3>
-                            </div>
-                            """, unsafe_allow_html=True)
-                            
-                            # Main answer
-                            st.markdown("### 📝 Answer")
-                            st.markdown(f"""
-                            <div style="background: white; padding: var(--spacing-lg); border-radius: var(--radius-lg); 
-                                        border-left: 4px solid var(--primary-500); margin: var(--spacing-md) 0;">
-                                {answer_result['answer']}
-                            </div>
-                            """, unsafe_allow_html=True)
-                            
-                            # Answer metadata in modern cards
-                            col1, col2, col3, col4 = st.columns(4)
-                            
-                            confidence_score = answer_result.get('confidence', 0.0)
-                            confidence_color = "success" if confidence_score > 0.7 else "warning" if confidence_score > 0.4 else "error"
-                            
-                            with col1:
-                                st.markdown(create_metric_card(
-                                    "Confidence Score", 
-                                    f"{confidence_score:.2f}", 
-                                    "🎯", 
-                                    color=confidence_color
-                                ), unsafe_allow_html=True)
-                            
-                            with col2:
-                                st.markdown(create_metric_card(
-                                    "Papers Analyzed", 
-                                    answer_result.get('paper_count', 0), 
-                                    "📚"
-                                ), unsafe_allow_html=True)
-                            
-                            with col3:
-                                st.markdown(create_metric_card(
-                                    "Top Sources", 
-                                    answer_result.get('top_papers_used', 0), 
-                                    "⭐"
-                                ), unsafe_allow_html=True)
-                            
-                            with col4:
-                                st.markdown(create_metric_card(
-                                    "Response Time", 
-                                    f"{processing_time:.1f}s", 
-                                    "⚡"
-                                ), unsafe_allow_html=True)
-                            
-                            # Sources with enhanced display
-                            if 'sources' in answer_result and answer_result['sources']:
-                                st.markdown("### 📚 Academic Sources")
-                                
-                                for i, source in enumerate(answer_result['sources'][:10], 1):
-                                    st.markdown(f"""
-                                    <div style="background: var(--gray-50); padding: var(--spacing-md); 
-                                                border-radius: var(--radius-md); margin: var(--spacing-sm) 0;
-                                                border-left: 3px solid var(--primary-500);">
-                                        <strong>{i}.</strong> {source}
-                                    </div>
-                                    """, unsafe_allow_html=True)
-                            
-                            # Related questions suggestion
-                            st.markdown("### 💡 Follow-up Questions")
-                            follow_up_questions = [
-                                "Can you provide more specific examples?",
-                                "What are the limitations of these approaches?",
-                                "How has this field evolved recently?",
-                                "What are the future research directions?"
-                            ]
-                            
-                            cols = st.columns(2)
-                            for i, fq in enumerate(follow_up_questions):
-                                with cols[i % 2]:
-                                    if st.button(f"❓ {fq}", key=f"followup_{i}", use_container_width=True):
-                                        st.session_state.qa_question = f"{question} {fq}"
-                                        st.rerun()
+                        confidence_score = answer_result.get('confidence', 0.0)
+                        confidence_color = "success" if confidence_score > 0.7 else "warning" if confidence_score > 0.4 else "error"
                         
-                        else:
-                            # Low confidence warning
-                            st.markdown(f"""
-                            <div class="modern-card" style="background: linear-gradient(135deg, var(--warning-50) 0%, var(--error-50) 100%); border: 2px solid var(--warning-300);">
-                                <h3 style="color: var(--warning-700);">⚠️ Insufficient Confidence</h3>
-                                <p style="color: var(--gray-700);">
-                                    The AI couldn't find sufficient information to provide a confident answer (confidence: {answer_result.get('confidence', 0.0):.2f}).
-                                </p>
-                            </div>
-                            """, unsafe_allow_html=True)
+                        with col1:
+                            st.markdown(create_metric_card(
+                                "Confidence Score", 
+                                f"{confidence_score:.2f}", 
+                                "🎯", 
+                                color=confidence_color
+                            ), unsafe_allow_html=True)
+                        
+                        with col2:
+                            st.markdown(create_metric_card(
+                                "Papers Analyzed", 
+                                answer_result.get('paper_count', 0), 
+                                "📚"
+                            ), unsafe_allow_html=True)
+                        
+                        with col3:
+                            st.markdown(create_metric_card(
+                                "Top Sources", 
+                                answer_result.get('top_papers_used', 0), 
+                                "⭐"
+                            ), unsafe_allow_html=True)
+                        
+                        with col4:
+                            st.markdown(create_metric_card(
+                                "Response Time", 
+                                f"{processing_time:.1f}s", 
+                                "⚡"
+                            ), unsafe_allow_html=True)
+                        
+                        # Sources with enhanced display
+                        if 'sources' in answer_result and answer_result['sources']:
+                            st.markdown("### 📚 Academic Sources")
                             
-                            # Suggestions for improvement
-                            with st.expander("💡 Suggestions to Improve Results"):
-                                st.markdown("""
-                                - **Make your question more specific** and focused
-                                - **Try different keywords** or terminology
-                                - **Add topic filters** to narrow the search scope
-                                - **Increase the number of papers** to consider
-                                - **Lower the confidence threshold** if needed
-                                - **Run a research workflow first** to build up the knowledge base
-                                """)
+                            for i, source in enumerate(answer_result['sources'][:10], 1):
+                                st.markdown(f"""
+                                <div style="background: var(--gray-50); padding: var(--spacing-md); 
+                                            border-radius: var(--radius-md); margin: var(--spacing-sm) 0;
+                                            border-left: 3px solid var(--primary-500);">
+                                    <strong>{i}.</strong> {source}
+                                </div>
+                                """, unsafe_allow_html=True)
+                        
+                        # Related questions suggestion
+                        st.markdown("### 💡 Follow-up Questions")
+                        follow_up_questions = [
+                            "Can you provide more specific examples?",
+                            "What are the limitations of these approaches?",
+                            "How has this field evolved recently?",
+                            "What are the future research directions?"
+                        ]
+                        
+                        cols = st.columns(2)
+                        for i, fq in enumerate(follow_up_questions):
+                            with cols[i % 2]:
+                                if st.button(f"❓ {fq}", key=f"followup_{i}", use_container_width=True):
+                                    st.session_state.qa_question = f"{question} {fq}"
+                                    st.rerun()
                     
-                    except Exception as e:
-                        st.error(f"❌ Error processing your question: {str(e)}", icon="🚨")
-                        logger.error(f"Q&A error: {e}", exc_info=True)
+                    else:
+                        # Low confidence warning replaces the streamed answer
+                        answer_placeholder.empty()
+                        st.markdown(f"""
+                        <div class="modern-card" style="background: linear-gradient(135deg, var(--warning-50) 0%, var(--error-50) 100%); border: 2px solid var(--warning-300);">
+                            <h3 style="color: var(--warning-700);">⚠️ Insufficient Confidence</h3>
+                            <p style="color: var(--gray-700);">
+                                The AI couldn't find sufficient information to provide a confident answer (confidence: {answer_result.get('confidence', 0.0):.2f}).
+                            </p>
+                        </div>
+                        """, unsafe_allow_html=True)
                         
-                        # Error troubleshooting
-                        with st.expander("🔧 Troubleshooting"):
-                            st.markdown(f"""
-                            **Error Details**: `{str(e)}`
-                            
-                            **Common Solutions**:
-                            - Check your internet connection
-                            - Verify API keys are configured
-                            - Try a simpler question
-                            - Restart the application
+                        # Suggestions for improvement
+                        with st.expander("💡 Suggestions to Improve Results"):
+                            st.markdown("""
+                            - **Make your question more specific** and focused
+                            - **Try different keywords** or terminology
+                            - **Add topic filters** to narrow the search scope
+                            - **Increase the number of papers** to consider
+                            - **Lower the confidence threshold** if needed
+                            - **Run a research workflow first** to build up the knowledge base
                             """)
+                
+                except Exception as e:
+                    st.error(f"❌ Error processing your question: {str(e)}", icon="🚨")
+                    logger.error(f"Q&A error: {e}", exc_info=True)
+                    
+                    # Error troubleshooting
+                    with st.expander("🔧 Troubleshooting"):
+                        st.markdown(f"""
+                        **Error Details**: `{str(e)}`
+                        
+                        **Common Solutions**:
+                        - Check your internet connection
+                        - Verify API keys are configured
+                        - Try a simpler question
+                        - Restart the application
+                        """)
         
         # Q&A History (if implemented)
         if hasattr(st.session_state, 'qa_history') and st.session_state.qa_history:
@@ -5,24 +5,18 @@ from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeEl
 from rich.table import Table
 from rich.prompt import Prompt, Confirm
 from rich.text import Text
+from rich.live import Live
 from datetime import datetime, timedelta
 from pathlib import Path
 import sys
 import time
 import asyncio
 
+# Heavy modules (crew, agents, models, exporters) are imported inside the
+# commands that use them so cheap commands like --help and stats start fast
 try:
-    from src.crew.research_crew import UltraFastResearchCrew as ResearchCrew
-    from src.storage.database import db
     from src.utils.config import config
     from src.utils.logging import setup_logging, logger
-    from src.utils.export_manager import export_manager
-    from src.utils.health_monitor import health_monitor
-    from src.utils.error_handler import error_handler
-    from src.utils.resource_manager import resource_manager
-    # Enhanced performance optimization imports
-    from src.utils.performance_optimizer import optimizer
-    from src.utils.adaptive_config import get_performance_config, get_adaptive_config
 except ImportError as e:
     print(f"❌ Import Error: {e}")
     print("Make sure you're running from the project root directory and all dependencies are installed.")
@@ -47,6 +41,9 @@ def display_banner():
 def display_config_info():
     """Display current configuration including performance optimizations"""
     try:
+        from src.utils.performance_optimizer import optimizer
+        from src.utils.adaptive_config import get_performance_config
+
         env = config.environment
         llm_config = config.llm_config
         
@@ -103,6 +100,8 @@ def display_config_info():
 def display_performance_summary():
     """Display current performance statistics and system status"""
     try:
+        from src.utils.performance_optimizer import optimizer
+
         console.print("[cyan]📊 Performance Summary[/cyan]")
         
         # Get performance summary
@@ -145,6 +144,24 @@ def display_performance_summary():
             for operation, metrics in list(perf_summary['recent_metrics'].items())[:5]:
                 console.print(f"  • {operation}: {metrics['execution_time']:.2f}s, {metrics['memory_usage']:.1f}MB")
         
+        # LLM backend routing metrics
+        if config.get('llm.router.enabled', False):
+            from src.llm.llm_router import get_llm_router
+            router = get_llm_router()
+            llm_table = Table(title="LLM Backends", show_header=True)
+            for column in ("Backend", "Requests", "Errors", "429s", "p50", "p95", "Headroom", "Hedges won", "Est. cost"):
+                llm_table.add_column(column, style="cyan" if column == "Backend" else "green")
+            for name, m in router.get_metrics().items():
+                llm_table.add_row(
+                    name, str(m['requests']), str(m['errors']), str(m['rate_limited']),
+                    f"{m['latency_p50']:.2f}s" if m['latency_p50'] is not None else "-",
+                    f"{m['latency_p95']:.2f}s" if m['latency_p95'] is not None else "-",
+                    f"{m['quota_headroom']:.0%}", f"{m['hedges_won']}/{m['hedges_launched']}",
+                    f"${m['estimated_cost']:.4f}"
+                )
+            console.print(llm_table)
+            console.print(f"[dim]Metrics exported to {router.export_metrics()}[/dim]")
+        
         # Recommendations
         if perf_summary.get('recommendations'):
             console.print("\n[yellow]Performance Recommendations:[/yellow]")
@@ -156,6 +173,36 @@ def display_performance_summary():
         console.print(f"[red]Error displaying performance summary: {e}[/red]")
         logger.error(f"Performance summary error: {e}", exc_info=True)
 
+def stream_answer_to_console(crew, question, topic, limit, final_panel, use_enhanced=None):
+    """Render a streamed answer progressively and return the final QA result
+
+    ``final_panel`` builds the panel shown once the answer is complete, so the
+    streamed text is replaced in place rather than printed a second time.
+    """
+    chunks = []
+    result = None
+    
+    with Live(Panel("[dim]🔍 Analyzing papers...[/dim]", title="🎯 Answer", border_style="cyan"),
+              console=console, refresh_per_second=12) as live:
+        for event in crew.stream_research_question(
+            question=question,
+            research_topic=topic,
+            paper_limit=limit,
+            use_enhanced=use_enhanced
+        ):
+            if event.get('type') == 'token':
+                chunks.append(event['text'])
+                live.update(Panel(''.join(chunks), title="🎯 Answer (streaming...)", border_style="cyan"))
+            elif event.get('type') == 'result':
+                result = event['result']
+        
+        if result is None:
+            result = {'answer': ''.join(chunks), 'confidence': 0.0, 'error': 'No result received'}
+        if not result.get('error'):
+            live.update(final_panel(result))
+    
+    return result
+
 @click.group()
 @click.option('--verbose', '-v', is_flag=True, help='Enable verbose logging')
 @click.pass_context
@@ -358,6 +405,10 @@ def test_apis():
 def performance():
     """Display performance statistics and run optimization tests"""
     try:
+        from src.storage.database import db
+        from src.utils.performance_optimizer import optimizer
+        from src.utils.adaptive_config import get_performance_config, get_adaptive_config
+
         console.print("[cyan]⚡ Performance Analysis[/cyan]")
         
         # Display system information
@@ -428,6 +479,8 @@ def performance():
 def stats():
     """Display database statistics"""
     try:
+        from src.storage.database import db
+
         with console.status("Fetching database statistics..."):
             stats = db.get_stats()
         
@@ -469,6 +522,10 @@ def stats():
 def research(topic, aspects, max_papers, paper_type, recent_only, output_dir, save_results, export_formats, optimized):
     """Conduct comprehensive research on a topic"""
     
+    from src.crew.research_crew import UltraFastResearchCrew as ResearchCrew
+    from src.utils.resource_manager import resource_manager
+    from src.utils.performance_optimizer import optimizer
+    
     # Performance setup
     start_time = time.perf_counter()
     if optimized:
@@ -747,11 +804,22 @@ def display_research_results(results):
 @click.option('--sort-by', '-s', default='relevance', 
               type=click.Choice(['relevance', 'date', 'citations']),
               help='Sort results by')
-def search_papers(query, limit, sort_by):
+@click.option('--by', 'field', default='text',
+              type=click.Choice(['text', 'author', 'keyword', 'venue']),
+              help='Match the query against titles and abstracts, or exactly against an author, keyword or venue')
+def search_papers(query, limit, sort_by, field):
     """Search papers in the database"""
     try:
+        from src.storage.database import db
+
+        # Exact lookups use the author, keyword and venue indexes and are ordered by citations
+        lookups = {'author': db.search_by_author, 'keyword': db.papers_with_keyword, 'venue': db.papers_in_venue}
         with console.status(f"Searching for '{query}'..."):
-            papers = db.search_papers(query, limit, sort_by)
+            if field == 'text':
+                papers = db.search_papers(query, limit, sort_by)
+            else:
+                papers = lookups[field](query, limit)
+                sort_by = 'citations'
         
         if not papers:
             console.print(f"[yellow]No papers found for query: '{query}'[/yellow]")
@@ -795,6 +863,8 @@ def search_papers(query, limit, sort_by):
 def list_themes(min_frequency, limit):
     """List research themes in the database"""
     try:
+        from src.storage.database import db
+
         with console.status("Fetching research themes..."):
             themes = db.get_themes(min_frequency=min_frequency, limit=limit)
         
@@ -832,6 +902,7 @@ def backup_db(backup_path):
     """Backup the research database"""
     try:
         import shutil
+        from src.storage.database import db
         
         if not backup_path:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -864,6 +935,8 @@ def backup_db(backup_path):
 def clear_db():
     """Clear all data from the database (use with caution!)"""
     try:
+        from src.storage.database import db
+
         with console.status("Clearing database..."):
             # Drop and recreate tables
             db.db.executescript("""
@@ -883,10 +956,50 @@ def clear_db():
         console.print(f"[red]Error clearing database: {e}[/red]")
         logger.error(f"Clear database error: {e}", exc_info=True)
 
+@cli.command()
+@click.argument('paths', nargs=-1, type=click.Path(exists=True))
+def warm_pdf_cache(paths):
+    """Extract PDFs ahead of time so later runs read them from the cache"""
+    try:
+        from src.storage.database import db
+        from src.tools.pdf_processor import PDFProcessor
+        
+        processor = PDFProcessor()
+        roots = [Path(path) for path in paths] or [processor.papers_dir]
+        pdf_files = sorted({str(pdf) for root in roots
+                            for pdf in ([root] if root.is_file() else root.rglob('*.pdf'))})
+        if not pdf_files:
+            console.print("[yellow]No PDF files found[/yellow]")
+            return
+        
+        # PDFs of stored papers also get their text, pages and tables in the content store
+        paper_ids = db.get_paper_ids_by_pdf_path(pdf_files)
+        
+        def store(pdf_path, extraction):
+            if pdf_path in paper_ids:
+                db.save_pdf_content(paper_ids[pdf_path], extraction)
+        
+        with console.status(f"Extracting {len(pdf_files)} PDFs..."):
+            counts = processor.prefetch(pdf_files, on_extracted=store)
+        
+        console.print(f"[green]✅ {counts['extracted']} extracted, {counts['cached']} already cached[/green]")
+        if paper_ids:
+            console.print(f"[blue]💾 Stored content for {len(paper_ids)} papers[/blue]")
+        if counts['failed']:
+            console.print(f"[yellow]⚠️ {counts['failed']} PDFs could not be extracted[/yellow]")
+        
+    except Exception as e:
+        console.print(f"[red]PDF cache warm-up error: {e}[/red]")
+        logger.error(f"PDF cache warm-up error: {e}", exc_info=True)
+
 @cli.command()
 def health():
     """Check system and project health"""
     try:
+        from src.utils.health_monitor import health_monitor
+        from src.utils.error_handler import error_handler
+        from src.utils.resource_manager import resource_manager
+
         console.print("[cyan]🔍 Running health check...[/cyan]")
         
         with console.status("Checking system health..."):
@@ -954,7 +1067,9 @@ def health():
 def export(result_dir, export_formats):
     """Export existing research results to different formats"""
     import json
-    from pathlib import Path
+    from src.crew.research_crew import UltraFastResearchCrew as ResearchCrew
+    from src.storage.database import db
+    from src.utils.export_manager import export_manager
     
     result_path = Path(result_dir)
     
@@ -1048,6 +1163,10 @@ def export(result_dir, export_formats):
 def interactive(optimized):
     """Start interactive research session"""
     
+    from src.crew.research_crew import UltraFastResearchCrew as ResearchCrew
+    from src.storage.database import db
+    from src.utils.performance_optimizer import optimizer
+
     if optimized:
         console.print("[bold green]🚀 Optimized Interactive Research Session Started[/bold green]")
         console.print("[green]⚡ Performance optimization enabled[/green]")
@@ -1242,9 +1361,13 @@ def interactive(optimized):
 @click.option('--enhanced', '-e', is_flag=True, help='Use Enhanced QA Agent (if available)')
 @click.option('--standard', is_flag=True, help='Force use of Standard QA Agent')
 @click.option('--optimized', '-o', is_flag=True, help='Use performance-optimized processing')
-def ask(question, topic, limit, save_result, enhanced, standard, optimized):
+@click.option('--stream/--no-stream', default=True, help='Show the answer as it is generated')
+def ask(question, topic, limit, save_result, enhanced, standard, optimized, stream):
     """Ask a research question and get an answer based on papers in the database"""
     
+    from src.crew.research_crew import UltraFastResearchCrew as ResearchCrew
+    from src.utils.performance_optimizer import optimizer
+
     if not question.strip():
         console.print("[red]❌ Error: Question cannot be empty[/red]")
         return
@@ -1302,10 +1425,29 @@ def ask(question, topic, limit, save_result, enhanced, standard, optimized):
             if enhanced:
                 console.print("[dim]💡 To enable Enhanced QA, run: install_enhanced_qa_deps.bat[/dim]")
         
+        def confidence_color_for(value):
+            if value >= 0.7:
+                return "green"
+            if value >= 0.4:
+                return "yellow"
+            return "red"
+        
+        def answer_panel(answer_result):
+            value = answer_result.get('confidence', 0.0)
+            color = confidence_color_for(value)
+            return Panel(
+                answer_result.get('answer', 'No answer available'),
+                title=f"🎯 Answer (Confidence: [{color}]{value:.2f}[/{color}], Papers: {answer_result.get('paper_count', 0)})",
+                border_style="green" if value >= 0.5 else "yellow"
+            )
+        
         # Answer the question with progress indication and performance tracking
         start_time = time.perf_counter()
         
-        if optimized:
+        if stream:
+            with optimizer.measure_performance('qa_processing'):
+                result = stream_answer_to_console(crew, question, topic, limit, answer_panel, use_enhanced)
+        elif optimized:
             with optimizer.measure_performance('qa_processing'):
                 with console.status("� Analyzing papers with optimization..."):
                     result = crew.answer_research_question(
@@ -1330,24 +1472,12 @@ def ask(question, topic, limit, save_result, enhanced, standard, optimized):
             console.print(f"[red]❌ Error: {result['error']}[/red]")
             return
         
-        # Answer panel
-        answer_text = result.get('answer', 'No answer available')
         confidence = result.get('confidence', 0.0)
         paper_count = result.get('paper_count', 0)
         
-        # Color based on confidence
-        if confidence >= 0.7:
-            confidence_color = "green"
-        elif confidence >= 0.4:
-            confidence_color = "yellow"
-        else:
-            confidence_color = "red"
-        
-        console.print(Panel(
-            answer_text,
-            title=f"🎯 Answer (Confidence: [{confidence_color}]{confidence:.2f}[/{confidence_color}], Papers: {paper_count})",
-            border_style="green" if confidence >= 0.5 else "yellow"
-        ))
+        # Answer panel (already rendered in place when streaming)
+        if not stream:
+            console.print(answer_panel(result))
         
         # Show sources
         sources = result.get('sources', [])
@@ -1452,6 +1582,9 @@ def qa_session(topic, save_session):
     """Start an interactive question-answering session"""
     
     try:
+        from src.crew.research_crew import UltraFastResearchCrew as ResearchCrew
+        from src.storage.database import db
+
         console.print(Panel(
             f"[bold]🤖 Interactive Q&A Session[/bold]\n\n"
             f"[blue]Initial Topic:[/blue] {topic or 'None (general session)'}\n"
@@ -1505,37 +1638,35 @@ def qa_session(topic, save_session):
                     continue
                 
                 # Answer the question
-                console.print(f"[cyan]🤖 Thinking...[/cyan]")
-                
                 start_time = time.time()
-                result = crew.answer_research_question(
-                    question=question,
-                    research_topic=topic,
-                    paper_limit=12  # Good balance for interactive use
+                
+                def session_answer_panel(answer_result):
+                    value = answer_result.get('confidence', 0.0)
+                    if value >= 0.7:
+                        border_color, confidence_emoji = "green", "🎯"
+                    elif value >= 0.4:
+                        border_color, confidence_emoji = "yellow", "🤔"
+                    else:
+                        border_color, confidence_emoji = "red", "❓"
+                    return Panel(
+                        answer_result.get('answer', 'No answer available'),
+                        title=f"{confidence_emoji} Answer (Confidence: {value:.2f}, Papers: {answer_result.get('paper_count', 0)}, Time: {time.time() - start_time:.1f}s)",
+                        border_style=border_color
+                    )
+                
+                result = stream_answer_to_console(
+                    crew, question, topic,
+                    12,  # Good balance for interactive use
+                    session_answer_panel
                 )
                 answer_time = time.time() - start_time
                 
-                # Display the answer
                 answer = result.get('answer', 'No answer available')
                 confidence = result.get('confidence', 0.0)
                 paper_count_used = result.get('paper_count', 0)
                 
-                # Format answer display
-                if confidence >= 0.7:
-                    border_color = "green"
-                    confidence_emoji = "🎯"
-                elif confidence >= 0.4:
-                    border_color = "yellow"
-                    confidence_emoji = "🤔"
-                else:
-                    border_color = "red" 
-                    confidence_emoji = "❓"
-                
-                console.print(Panel(
-                    answer,
-                    title=f"{confidence_emoji} Answer (Confidence: {confidence:.2f}, Papers: {paper_count_used}, Time: {answer_time:.1f}s)",
-                    border_style=border_color
-                ))
+                if result.get('error'):
+                    console.print(f"[red]❌ Error: {result['error']}[/red]")
                 
                 # Show key sources
                 sources = result.get('sources', [])
@@ -1629,6 +1760,8 @@ def qa_config(enable, status, metrics, clear_cache):
     """Configure and manage QA agents"""
     
     try:
+        from src.crew.research_crew import UltraFastResearchCrew as ResearchCrew
+        
         # Initialize research crew
         crew = ResearchCrew()
         
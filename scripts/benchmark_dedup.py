@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark MinHash/LSH near-duplicate detection against the sliding-window check
+on a synthetic corpus with injected near-duplicates
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.tools.near_duplicates import NearDuplicateIndex
+
+VOCABULARY = [f"term{i}" for i in range(5000)]
+
+
+def synthetic_corpus(unique: int, duplicates: int, seed: int = 11):
+    """Return [(key, original_key, title, abstract)] with edited copies shuffled in"""
+    rng = random.Random(seed)
+    papers = []
+    for i in range(unique):
+        title = ' '.join(rng.choices(VOCABULARY, k=8)).capitalize()
+        abstract = ' '.join(rng.choices(VOCABULARY, k=120))
+        papers.append((f"p{i}", f"p{i}", title, abstract))
+
+    for j in range(duplicates):
+        _, original, title, abstract = rng.choice(papers[:unique])
+        words = abstract.split()
+        # Re-fetched copies differ by casing, punctuation and a few edited words
+        for _ in range(3):
+            words[rng.randrange(len(words))] = rng.choice(VOCABULARY)
+        papers.append((f"d{j}", original, title.upper() + '.', ' '.join(words)))
+
+    rng.shuffle(papers)
+    return papers
+
+
+def window_dedup(papers, window: int = 10, threshold: float = 0.9):
+    """The previous abstract check: Jaccard against the last few abstracts only"""
+    recent, flagged = [], set()
+    for key, _, title, abstract in papers:
+        words = set(re.findall(r'\w+', abstract.lower()))
+        if any(len(words & other) / len(words | other) > threshold for other in recent[-window:]):
+            flagged.add(key)
+            continue
+        recent.append(words)
+    return flagged
+
+
+def lsh_dedup(papers, **knobs):
+    """Near-duplicate index over abstracts only, so both methods compete on the same signal"""
+    index, flagged = NearDuplicateIndex(**knobs), set()
+    for key, _, title, abstract in papers:
+        if index.find('', abstract):
+            flagged.add(key)
+            continue
+        index.add(key, abstract=abstract)
+    return flagged
+
+
+def score(papers, flagged):
+    first_seen, truth = set(), set()
+    for key, original, _, _ in papers:
+        if original in first_seen:
+            truth.add(key)
+        first_seen.add(original)
+    true_positives = len(flagged & truth)
+    precision = true_positives / len(flagged) if flagged else 1.0
+    recall = true_positives / len(truth) if truth else 1.0
+    return precision, recall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--unique', type=int, default=5000)
+    parser.add_argument('--duplicates', type=int, default=500)
+    parser.add_argument('--threshold', type=float, default=0.9)
+    parser.add_argument('--num-perm', type=int, default=128)
+    parser.add_argument('--false-negative-weight', type=float, default=0.8)
+    args = parser.parse_args()
+
+    papers = synthetic_corpus(args.unique, args.duplicates)
+    knobs = dict(abstract_threshold=args.threshold, num_perm=args.num_perm,
+                 false_negative_weight=args.false_negative_weight,
+                 false_positive_weight=1.0 - args.false_negative_weight)
+
+    print(f"{'method':<10} {'seconds':>8} {'precision':>10} {'recall':>8}")
+    for name, run in (('window', lambda: window_dedup(papers, threshold=args.threshold)),
+                      ('minhash', lambda: lsh_dedup(papers, **knobs))):
+        start = time.perf_counter()
+        flagged = run()
+        elapsed = time.perf_counter() - start
+        precision, recall = score(papers, flagged)
+        print(f"{name:<10} {elapsed:>8.2f} {precision:>10.3f} {recall:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
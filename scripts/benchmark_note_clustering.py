@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark vectorized note clustering against the greedy keyword-overlap paths
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.agents.theme_synthesizer_agent import ThemeSynthesizerAgent
+from src.storage.models import ResearchNote
+from src.tools.note_clustering import NoteClusteringEngine
+
+TOPICS = {
+    'federated': 'federated clients aggregation privacy communication heterogeneity',
+    'graphs': 'graph neural message passing node embeddings molecules',
+    'vision': 'convolutional images segmentation detection augmentation pixels',
+    'language': 'transformer tokens language pretraining translation attention',
+    'robotics': 'robot manipulation grasping reinforcement control policies',
+    'medical': 'clinical patients diagnosis imaging hospital records',
+}
+FILLER = 'models training evaluation benchmark performance dataset experiments baseline'.split()
+
+
+def synthetic_notes(count: int, seed: int = 7):
+    """Generate notes drawn from a handful of topical vocabularies"""
+    rng = random.Random(seed)
+    names = list(TOPICS)
+    notes = []
+    for i in range(count):
+        topic = names[i % len(names)]
+        words = rng.choices(TOPICS[topic].split(), k=10) + rng.choices(FILLER, k=5)
+        rng.shuffle(words)
+        notes.append(ResearchNote(id=f'note-{i}', paper_id=f'paper-{i % 97}',
+                                  content=' '.join(words), note_type='key_finding'))
+    return notes
+
+
+def legacy_greedy(agent, notes, similarity_threshold=0.2):
+    """The original greedy pass, re-extracting keywords on every comparison"""
+    clusters = {}
+    for note in notes:
+        best_cluster, max_similarity = None, 0
+        for name, members in clusters.items():
+            similarities = [agent.calculate_text_similarity(note.content, other.content)
+                            for other in members[:5]]
+            avg_similarity = sum(similarities) / len(similarities)
+            if avg_similarity > max_similarity and avg_similarity > similarity_threshold:
+                best_cluster, max_similarity = name, avg_similarity
+        if best_cluster:
+            clusters[best_cluster].append(note)
+        else:
+            clusters[f"cluster-{len(clusters)}"] = [note]
+    return clusters
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    clusters = len(fn(*args))
+    return time.perf_counter() - start, clusters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[200, 1000, 3000])
+    parser.add_argument('--skip-greedy-above', type=int, default=3000)
+    args = parser.parse_args()
+
+    with patch('src.agents.theme_synthesizer_agent.LLMFactory.create_llm'), \
+         patch('src.agents.theme_synthesizer_agent.Agent'):
+        agent = ThemeSynthesizerAgent()
+
+    engine = NoteClusteringEngine()
+    print(f"{'notes':>6} {'legacy s':>10} {'greedy s':>10} {'vector s':>10}   clusters (legacy/greedy/vector)")
+    for size in args.sizes:
+        notes = synthetic_notes(size)
+        legacy, greedy = (float('nan'), '-'), (float('nan'), '-')
+        if size <= args.skip_greedy_above:
+            legacy = timed(legacy_greedy, agent, notes)
+            greedy = timed(agent._cluster_notes_greedy, notes)
+        vector = timed(engine.cluster, notes)
+        print(f"{size:>6} {legacy[0]:>10.2f} {greedy[0]:>10.2f} {vector[0]:>10.2f}   "
+              f"{legacy[1]}/{greedy[1]}/{vector[1]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark columnar paper ranking against per-paper scoring
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.agents.literature_survey_agent import LiteratureSurveyAgent
+from src.storage.models import Paper
+
+VOCABULARY = [f"term{i}" for i in range(2000)] + 'method results accuracy model evaluation'.split()
+VENUES = [None, 'NeurIPS', 'arXiv', 'IEEE Transactions on Computers', 'Workshop on Things']
+CRITERIA = {'relevance_score': 0.5, 'citation_count': 0.2, 'publication_year': 0.15,
+            'venue_quality': 0.10, 'abstract_quality': 0.05}
+
+
+def synthetic_papers(count: int, seed: int = 5):
+    rng = random.Random(seed)
+    return [
+        Paper(id=f"p{i}", title=' '.join(rng.choices(VOCABULARY, k=8)), authors=['A. Author'],
+              abstract=' '.join(rng.choices(VOCABULARY, k=150)), url='',
+              published_date=datetime(rng.randint(1995, 2025), 1, 1),
+              venue=rng.choice(VENUES), citations=rng.randint(0, 3000))
+        for i in range(count)
+    ]
+
+
+def per_paper_ranking(agent, papers, topic):
+    totals = agent._score_papers_individually(papers, topic, CRITERIA)
+    return [p for _, p in sorted(zip(totals, papers), key=lambda x: x[0], reverse=True)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--top-k', type=int, default=100)
+    parser.add_argument('--topic', default='term1 term2 term3 model')
+    args = parser.parse_args()
+
+    with patch('src.agents.literature_survey_agent.LLMFactory.create_llm'), \
+         patch('src.agents.literature_survey_agent.Agent'):
+        agent = LiteratureSurveyAgent()
+
+    print(f"{'papers':>8} {'per-paper s':>12} {'columnar s':>11} {'top-k s':>9} {'same order':>11}")
+    for size in args.sizes:
+        papers = synthetic_papers(size)
+        timings, rankings = [], []
+        for run in (lambda: per_paper_ranking(agent, papers, args.topic),
+                    lambda: agent.intelligent_paper_ranking(papers, args.topic, CRITERIA),
+                    lambda: agent.intelligent_paper_ranking(papers, args.topic, CRITERIA, top_k=args.top_k)):
+            start = time.perf_counter()
+            rankings.append(run())
+            timings.append(time.perf_counter() - start)
+        same = rankings[0] == rankings[1] and rankings[2] == rankings[0][:args.top_k]
+        print(f"{size:>8} {timings[0]:>12.2f} {timings[1]:>11.2f} {timings[2]:>9.2f} {str(same):>11}")
+
+
+if __name__ == '__main__':
+    main()
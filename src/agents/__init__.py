@@ -6,6 +6,7 @@ This package contains all AI agent implementations for the Academic Research Ass
 
 from .literature_survey_agent import LiteratureSurveyAgent
 from .qa_agent import QuestionAnsweringAgent
+from .qa_service import QAService, QAServiceBusy, get_qa_service
 from .note_taking_agent import NoteTakingAgent
 from .theme_synthesizer_agent import ThemeSynthesizerAgent
 from .draft_writer_agent import DraftWriterAgent
@@ -14,6 +15,9 @@ from .citation_generator_agent import CitationGeneratorAgent
 __all__ = [
     "LiteratureSurveyAgent",
     "QuestionAnsweringAgent", 
+    "QAService",
+    "QAServiceBusy",
+    "get_qa_service",
     "NoteTakingAgent",
     "ThemeSynthesizerAgent",
     "DraftWriterAgent",
@@ -1,13 +1,20 @@
 from crewai import Agent
 from typing import List, Dict, Any, Optional
+import json
+import re
 from ..storage.models import Paper, Citation
 from ..storage.database import db
 from ..tools.citation_formatter import CitationFormatter
+from ..tools.citation_matcher import CitationMatcher, CitationMatch
 from ..tools.Cross_Ref_tool import CrossRefTool
 from ..llm.llm_factory import LLMFactory
 from ..utils.app_logging import logger
+from ..utils.config import config
 
 class CitationGeneratorAgent:
+    # Citations listed in one LLM matching prompt, to keep it short
+    MAX_LLM_CANDIDATES = 40
+    
     def __init__(self):
         self.llm = LLMFactory.create_llm()
         self.citation_formatter = CitationFormatter()
@@ -63,7 +70,7 @@ class CitationGeneratorAgent:
                 
                 # Try to get enhanced citation data from CrossRef if we have a DOI
                 enhanced_paper = paper
-                if hasattr(paper, 'doi') and paper.doi:
+                if hasattr(paper, 'doi') and paper.doi and self._needs_crossref_enrichment(paper):
                     # Validate DOI format before making API call
                     if self.citation_formatter._validate_doi(paper.doi):
                         try:
@@ -100,6 +107,17 @@ class CitationGeneratorAgent:
         
         return citations
     
+    def _needs_crossref_enrichment(self, paper: Paper) -> bool:
+        """Whether a CrossRef lookup could add anything to this paper
+        
+        Papers already merged with a CrossRef record at ingest, or that already
+        carry every field a citation uses, are skipped.
+        """
+        provenance = getattr(paper, 'provenance', None) or db.get_paper_provenance(paper.id)
+        if any(str(entry.get('source', '')).lower() == 'crossref' for entry in provenance):
+            return False
+        return not (paper.authors and paper.published_date and paper.venue and paper.title)
+    
     def merge_paper_data(self, original: Paper, crossref: Paper) -> Paper:
         """Merge paper data, preferring more complete information"""
         # Start with original paper
@@ -148,33 +166,100 @@ class CitationGeneratorAgent:
         
         return "\n\n".join(bibliography_entries)
     
-    def insert_inline_citations(self, text: str, citations: List[Citation]) -> str:
-        """Insert inline citations into text where [Citation] placeholders exist"""
-        system_prompt = """You are an expert at inserting inline citations into academic text. 
-        Replace [Citation] placeholders with appropriate citations in APA format."""
+    def build_citation_matcher(self, citations: List[Citation],
+                               papers: Optional[List[Paper]] = None) -> CitationMatcher:
+        """Index citations once so several sections can be cited without rebuilding"""
+        paper_map = {paper.id: paper for paper in (papers or []) if paper is not None}
+        for citation in citations:
+            if citation.paper_id not in paper_map:
+                try:
+                    paper = db.get_paper(citation.paper_id)
+                    if paper:
+                        paper_map[paper.id] = paper
+                except Exception as e:
+                    logger.warning(f"Could not load paper for citation {citation.citation_key}: {e}")
+        return CitationMatcher(citations, paper_map)
+    
+    def insert_inline_citations(self, text: str, citations: List[Citation],
+                                papers: Optional[List[Paper]] = None,
+                                matcher: Optional[CitationMatcher] = None) -> str:
+        """Insert inline citations into text where [Citation] placeholders exist
+        
+        Placeholders are matched locally against citation titles and abstracts; the
+        LLM is consulted only for placeholders whose best match is below
+        ``citations.min_match_confidence``.
+        """
+        if not text or not citations:
+            return text
+        
+        try:
+            matcher = matcher or self.build_citation_matcher(citations, papers)
+            matches = matcher.find_placeholders(text)
+            if not matches:
+                return text
+            
+            threshold = config.get('citations.min_match_confidence', 0.08)
+            chosen = [match.best for match in matches]
+            uncertain = [i for i, match in enumerate(matches) if match.confidence < threshold]
+            
+            if uncertain:
+                resolved = self._resolve_uncertain_citations(
+                    [matches[i] for i in uncertain], matcher.citations
+                )
+                for i, citation in zip(uncertain, resolved):
+                    chosen[i] = citation
+            
+            references = [matcher.inline_reference(c) if c is not None else None for c in chosen]
+            logger.info(f"Inserted {sum(r is not None for r in references)}/{len(matches)} citations "
+                        f"({len(uncertain)} low-confidence)")
+            return matcher.replace(text, matches, references)
+            
+        except Exception as e:
+            logger.error(f"Error inserting inline citations: {e}")
+            return text
+    
+    def _resolve_uncertain_citations(self, matches: List[CitationMatch],
+                                     citations: List[Citation]) -> List[Optional[Citation]]:
+        """Ask the LLM to pick citations for low-confidence placeholders in one short call
+        
+        Only the placeholder sentences and citation keys are sent, and only a JSON list
+        of keys comes back. A ``null`` key leaves the placeholder uncited; unknown keys
+        and any failure fall back to the local best match. At most
+        ``MAX_LLM_CANDIDATES`` citations are offered: each placeholder's local
+        candidates first, then the remaining citations in order.
+        """
+        fallback = [match.best for match in matches]
+        ranked = {id(c): c for match in matches for c, _ in match.candidates}
+        offered = (list(ranked.values()) + [c for c in citations if id(c) not in ranked])[:self.MAX_LLM_CANDIDATES]
+        by_key = {citation.citation_key: citation for citation in offered}
         
-        citations_list = "\n".join([f"- {cite.citation_key}: {cite.apa_format}" 
-                                   for cite in citations])
+        citations_list = "\n".join([f"- {c.citation_key}: {c.apa_format[:160]}" for c in offered])
+        sentences = "\n".join([f"{i+1}. {match.sentence[:300]}" for i, match in enumerate(matches)])
         
         prompt = f"""
-        Text with [Citation] placeholders:
-        {text}
-        
         Available Citations:
         {citations_list}
         
-        Replace each [Citation] placeholder with the most appropriate citation key 
-        in APA format (Author, Year). Consider the context to choose the best citation.
+        Sentences needing a citation:
+        {sentences}
         
-        Return the text with proper inline citations.
+        For each numbered sentence choose the single most appropriate citation key.
+        Respond with only a JSON array of {len(matches)} citation keys in sentence order,
+        using null where no citation fits.
         """
         
         try:
-            cited_text = self.llm.generate(prompt, system_prompt)
-            return cited_text.strip()
+            response = self.llm.generate(prompt, "You match academic sentences to citation keys. Output JSON only.")
+            keys = json.loads(re.search(r'\[.*\]', response, re.DOTALL).group(0))
+            if not isinstance(keys, list):
+                return fallback
+            return [
+                None if key is None else by_key[key] if isinstance(key, str) and key in by_key else fallback[i]
+                for i, key in enumerate(keys[:len(matches)])
+            ] + fallback[len(keys):]
         except Exception as e:
-            logger.error(f"Error inserting inline citations: {e}")
-            return text
+            logger.warning(f"LLM citation matching failed, using local matches: {e}")
+            return fallback
     
     def validate_citations(self, citations: List[Citation]) -> Dict[str, List[str]]:
         """Validate citation formats and identify issues with enhanced quality assessment"""
@@ -1,12 +1,15 @@
 from crewai import Agent
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Optional, Set, Tuple, Callable
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from ..storage.models import Paper, ResearchNote, ResearchTheme
 from ..storage.database import db
 from ..llm.llm_factory import LLMFactory
 from ..utils.app_logging import logger
+from ..utils.config import config
 import re
 import json
+import time
 
 class DraftWriterAgent:
     def __init__(self):
@@ -464,76 +467,62 @@ class DraftWriterAgent:
             # Create domain-aware outline
             outline = self.create_outline(research_topic, themes, "survey", domain)
             
-            # Initialize sections with comprehensive error handling
-            sections = {}
-            generation_log = []
-            
-            # Abstract
-            try:
-                sections['abstract'] = self.write_abstract(research_topic, themes, gaps, domain)
-                if not self.validate_content_safety(sections['abstract'], domain):
-                    sections['abstract'] = self.get_domain_fallback_content("abstract", domain)
-                generation_log.append("abstract: success")
-            except Exception as e:
-                logger.error(f"Error writing abstract: {e}")
-                sections['abstract'] = self.get_domain_fallback_content("abstract", domain)
-                generation_log.append(f"abstract: fallback ({str(e)[:50]})")
-            
-            # Introduction
-            try:
-                sections['introduction'] = self.write_introduction(research_topic, papers, domain)
-                if not self.validate_content_safety(sections['introduction'], domain):
-                    sections['introduction'] = self.get_domain_fallback_content("introduction", domain)
-                generation_log.append("introduction: success")
-            except Exception as e:
-                logger.error(f"Error writing introduction: {e}")
-                sections['introduction'] = self.get_domain_fallback_content("introduction", domain)
-                generation_log.append(f"introduction: fallback ({str(e)[:50]})")
+            selected_themes = themes[:5]
             
-            # Theme sections with domain awareness
-            for i, theme in enumerate(themes[:5]):
+            def write_checked(name, kind, writer):
+                """Write one section, falling back to domain content on failure or safety rejection"""
                 try:
-                    theme_papers = [p for p in papers if hasattr(p, 'id') and p.id in theme.papers]
-                    theme_notes = [n for n in notes if hasattr(n, 'paper_id') and n.paper_id in theme.papers]
-                    
-                    section_content = self.write_theme_section(theme, theme_papers, theme_notes, domain)
-                    if not self.validate_content_safety(section_content, domain):
-                        section_content = self.get_domain_fallback_content("theme", domain)
-                    
-                    sections[f'theme_{i+1}'] = {
-                        'title': theme.title,
-                        'content': section_content
-                    }
-                    generation_log.append(f"theme_{i+1}: success")
+                    content = writer()
+                    if not self.validate_content_safety(content, domain):
+                        content = self.get_domain_fallback_content(kind, domain)
+                    return content, "success"
                 except Exception as e:
-                    logger.error(f"Error writing theme section {i+1}: {e}")
-                    sections[f'theme_{i+1}'] = {
-                        'title': theme.title,
-                        'content': self.get_domain_fallback_content("theme", domain)
-                    }
-                    generation_log.append(f"theme_{i+1}: fallback ({str(e)[:50]})")
+                    logger.error(f"Error writing {name}: {e}")
+                    return self.get_domain_fallback_content(kind, domain), f"fallback ({str(e)[:50]})"
             
-            # Discussion
-            try:
-                sections['discussion'] = self.write_discussion(themes, gaps, domain)
-                if not self.validate_content_safety(sections['discussion'], domain):
-                    sections['discussion'] = self.get_domain_fallback_content("discussion", domain)
-                generation_log.append("discussion: success")
-            except Exception as e:
-                logger.error(f"Error writing discussion: {e}")
-                sections['discussion'] = self.get_domain_fallback_content("discussion", domain)
-                generation_log.append(f"discussion: fallback ({str(e)[:50]})")
+            def theme_task(theme):
+                theme_papers = [p for p in papers if hasattr(p, 'id') and p.id in theme.papers]
+                theme_notes = [n for n in notes if hasattr(n, 'paper_id') and n.paper_id in theme.papers]
+                return lambda done: write_checked(
+                    f"theme section '{theme.title}'", "theme",
+                    lambda: self.write_theme_section(theme, theme_papers, theme_notes, domain)
+                )
+            
+            # Section dependency graph: name -> (dependencies, task)
+            tasks = {
+                'abstract': ((), lambda done: write_checked(
+                    "abstract", "abstract",
+                    lambda: self.write_abstract(research_topic, themes, gaps, domain))),
+                'introduction': ((), lambda done: write_checked(
+                    "introduction", "introduction",
+                    lambda: self.write_introduction(research_topic, papers, domain))),
+                'discussion': ((), lambda done: write_checked(
+                    "discussion", "discussion",
+                    lambda: self.write_discussion(themes, gaps, domain))),
+                'conclusion': ((), lambda done: write_checked(
+                    "conclusion", "conclusion",
+                    lambda: self.write_conclusion(research_topic, themes, gaps, domain))),
+            }
+            for i, theme in enumerate(selected_themes):
+                tasks[f'theme_{i+1}'] = ((), theme_task(theme))
             
-            # Conclusion
-            try:
-                sections['conclusion'] = self.write_conclusion(research_topic, themes, gaps, domain)
-                if not self.validate_content_safety(sections['conclusion'], domain):
-                    sections['conclusion'] = self.get_domain_fallback_content("conclusion", domain)
-                generation_log.append("conclusion: success")
-            except Exception as e:
-                logger.error(f"Error writing conclusion: {e}")
-                sections['conclusion'] = self.get_domain_fallback_content("conclusion", domain)
-                generation_log.append(f"conclusion: fallback ({str(e)[:50]})")
+            max_workers = max(1, int(config.get('research.draft_concurrency', 4)))
+            dag_start = time.perf_counter()
+            results, timings = self._run_section_dag(tasks, max_workers)
+            wall_time = time.perf_counter() - dag_start
+            
+            sections = {}
+            generation_log = []
+            for name in ['abstract', 'introduction'] + [f'theme_{i+1}' for i in range(len(selected_themes))] + ['discussion', 'conclusion']:
+                content, status = results[name]
+                if name.startswith('theme_'):
+                    content = {
+                        'title': selected_themes[int(name.split('_')[1]) - 1].title,
+                        'content': content
+                    }
+                sections[name] = content
+                generation_log.append(f"{name}: {status} ({timings[name]:.2f}s)")
+            generation_log.append(f"total: {wall_time:.2f}s wall, {sum(timings.values()):.2f}s sequential")
             
             # Compile final draft with comprehensive metadata
             draft = {
@@ -583,6 +572,40 @@ class DraftWriterAgent:
                 }
             }
     
+    def _run_section_dag(self, tasks: Dict[str, Tuple[Tuple[str, ...], Callable]],
+                         max_workers: int) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """Run section tasks as soon as their dependencies finish, with bounded concurrency
+
+        Each task receives the results completed so far. Returns the results and the
+        wall time of each task. LLM rate limiting is left to the shared client.
+        """
+        results: Dict[str, Any] = {}
+        timings: Dict[str, float] = {}
+        pending = dict(tasks)
+        running = {}
+        
+        def timed(task, done):
+            start = time.perf_counter()
+            result = task(done)
+            return result, time.perf_counter() - start
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while pending or running:
+                ready = [name for name, (deps, _) in pending.items() if all(d in results for d in deps)]
+                for name in ready:
+                    _, task = pending.pop(name)
+                    running[executor.submit(timed, task, dict(results))] = name
+                
+                if not running:
+                    raise ValueError(f"Unsatisfiable section dependencies: {sorted(pending)}")
+                
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    results[name], timings[name] = future.result()
+        
+        return results, timings
+    
     def write_theme_section(self, theme: ResearchTheme, 
                            related_papers: List[Paper],
                            related_notes: List[ResearchNote],
@@ -10,14 +10,18 @@ import aiohttp
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 import threading
+import numpy as np
 
 from ..tools.arxiv_tool import ArxivTool
 from ..tools.Open_Alex_tool import OpenAlexTool
 from ..tools.Cross_Ref_tool import CrossRefTool
+from ..tools.near_duplicates import NearDuplicateIndex, identifiers_conflict, paper_identifiers
+from ..tools.record_linkage import RecordLinker
 from ..storage.models import Paper
 from ..storage.database import db
 from ..llm.llm_factory import LLMFactory
 from ..utils.app_logging import logger
+from ..utils.config import config as app_config
 from ..utils.performance_optimizer import optimizer, ultra_cache, turbo_batch_processor, smart_parallel_executor, fast_text
 
 
@@ -41,8 +45,14 @@ class OptimizedLiteratureSurveyAgent:
         self._stats = defaultdict(int)
         
         # Enhanced deduplication settings with faster algorithms
-        self.title_similarity_threshold = 0.85
-        self.abstract_similarity_threshold = 0.90
+        self.title_similarity_threshold = app_config.get('research.dedup.title_threshold', 0.85)
+        self.abstract_similarity_threshold = app_config.get('research.dedup.abstract_threshold', 0.90)
+        # LSH precision/recall trade-off and whether to match against stored papers
+        self.dedup_num_perm = app_config.get('research.dedup.num_perm', 128)
+        self.dedup_false_positive_weight = app_config.get('research.dedup.false_positive_weight', 0.2)
+        self.dedup_false_negative_weight = app_config.get('research.dedup.false_negative_weight', 0.8)
+        self.dedup_check_existing = app_config.get('research.dedup.check_existing', True)
+        self.record_linker = RecordLinker() if app_config.get('research.dedup.record_linkage', True) else None
         
         # Optimized search settings based on system capabilities
         system_profile = optimizer.profile
@@ -274,6 +284,10 @@ class OptimizedLiteratureSurveyAgent:
             logger.info("Using SEQUENTIAL search for multiple databases")
             all_papers = self._optimized_sequential_search(limited_queries, max_results_per_query, date_from)
         
+        # Merge records of the same work from different sources before deduplication
+        if self.record_linker is not None:
+            all_papers = self.record_linker.link(all_papers)
+        
         # Enhanced deduplication
         unique_papers = self.enhanced_deduplicate_papers(all_papers)
         
@@ -412,18 +426,32 @@ class OptimizedLiteratureSurveyAgent:
             logger.error(f"{db_name} search failed for '{query}': {e}")
             return []
     
-    def enhanced_deduplicate_papers(self, papers: List[Paper]) -> List[Paper]:
-        """Enhanced deduplication using multiple similarity measures"""
+    def enhanced_deduplicate_papers(self, papers: List[Paper],
+                                    check_existing: Optional[bool] = None) -> List[Paper]:
+        """Enhanced deduplication using multiple similarity measures
+        
+        Exact DOI/arXiv/title-hash checks run first; near-duplicate titles and
+        abstracts anywhere in the batch are then found with MinHash LSH. With
+        ``check_existing``, papers matching a stored paper take over its ID so
+        saving them updates that row instead of inserting a duplicate.
+        """
         if not papers:
             return []
         
         logger.info(f"Starting deduplication of {len(papers)} papers")
         
+        if check_existing is None:
+            check_existing = self.dedup_check_existing
+        
         unique_papers = []
         seen_dois = set()
         seen_arxiv_ids = set()
-        title_hashes = set()
-        similar_abstracts = []
+        title_hashes = {}
+        index = self._create_near_duplicate_index()
+        
+        existing = self._create_near_duplicate_index() if check_existing else None
+        if existing is not None:
+            existing.add_existing_papers(db.db_path)
         
         duplicates_removed = {
             'doi': 0,
@@ -431,11 +459,13 @@ class OptimizedLiteratureSurveyAgent:
             'title': 0,
             'abstract': 0
         }
+        matched_existing = 0
         
         for paper in papers:
             # Check DOI duplicates (highest priority)
-            if paper.doi and paper.doi.strip():
-                doi_clean = paper.doi.strip().lower()
+            doi = getattr(paper, 'doi', None)
+            if doi and doi.strip():
+                doi_clean = doi.strip().lower()
                 if doi_clean in seen_dois:
                     duplicates_removed['doi'] += 1
                     continue
@@ -448,29 +478,52 @@ class OptimizedLiteratureSurveyAgent:
                     continue
                 seen_arxiv_ids.add(paper.arxiv_id)
             
+            # Similar titles with conflicting DOIs or arXiv ids are different works
+            identifiers = paper_identifiers(doi, getattr(paper, 'arxiv_id', None))
+            
             # Check title similarity using hash-based approach
             title_hash = self._create_title_hash(paper.title)
-            if title_hash in title_hashes:
+            if title_hash in title_hashes and not identifiers_conflict(identifiers, title_hashes[title_hash]):
                 duplicates_removed['title'] += 1
                 continue
-            title_hashes.add(title_hash)
+            title_hashes.setdefault(title_hash, identifiers)
+            
+            # Near-duplicate titles anywhere in the batch; abstracts only for papers without DOI
+            abstract = getattr(paper, 'abstract', None) if not doi else None
+            signatures = index.signatures(paper.title, abstract)
+            match = index.find(paper.title, signatures=signatures, identifiers=identifiers)
+            if match:
+                duplicates_removed[match[1]] += 1
+                continue
             
-            # Check abstract similarity (for papers without DOI)
-            if not paper.doi and paper.abstract and len(paper.abstract) > 50:
-                if self._is_similar_abstract(paper.abstract, similar_abstracts):
-                    duplicates_removed['abstract'] += 1
-                    continue
-                similar_abstracts.append(paper.abstract)
+            if existing is not None and len(existing.titles):
+                stored = existing.find(paper.title, signatures=signatures, identifiers=identifiers)
+                if stored and stored[0] != paper.id:
+                    logger.debug(f"'{paper.title[:50]}' matches stored paper {stored[0]} by {stored[1]}")
+                    paper.id = stored[0]
+                    matched_existing += 1
             
+            index.add(paper.id, signatures=signatures, identifiers=identifiers)
             unique_papers.append(paper)
         
         logger.info(f"Deduplication complete: {len(papers)} -> {len(unique_papers)} papers")
         logger.info(f"Duplicates removed - DOI: {duplicates_removed['doi']}, "
                    f"ArXiv: {duplicates_removed['arxiv_id']}, Title: {duplicates_removed['title']}, "
                    f"Abstract: {duplicates_removed['abstract']}")
+        if matched_existing:
+            logger.info(f"Matched {matched_existing} papers to previously stored papers")
         
         return unique_papers
     
+    def _create_near_duplicate_index(self) -> NearDuplicateIndex:
+        return NearDuplicateIndex(
+            title_threshold=self.title_similarity_threshold,
+            abstract_threshold=self.abstract_similarity_threshold,
+            num_perm=self.dedup_num_perm,
+            false_positive_weight=self.dedup_false_positive_weight,
+            false_negative_weight=self.dedup_false_negative_weight
+        )
+    
     def _create_title_hash(self, title: str) -> str:
         """Create normalized hash of title for duplicate detection"""
         if not title:
@@ -488,28 +541,14 @@ class OptimizedLiteratureSurveyAgent:
         return hashlib.md5(normalized.encode()).hexdigest()[:16]
     
     def _is_similar_abstract(self, abstract: str, existing_abstracts: List[str]) -> bool:
-        """Check if abstract is similar to existing ones"""
+        """Check if abstract is similar to any of the given abstracts"""
         if not abstract or len(abstract) < 50:
             return False
         
-        abstract_words = set(abstract.lower().split())
-        
-        # Check only recent abstracts for efficiency
-        for existing in existing_abstracts[-10:]:
-            existing_words = set(existing.lower().split())
-            
-            if len(abstract_words) == 0 or len(existing_words) == 0:
-                continue
-            
-            # Jaccard similarity
-            intersection = len(abstract_words & existing_words)
-            union = len(abstract_words | existing_words)
-            similarity = intersection / union if union > 0 else 0
-            
-            if similarity > self.abstract_similarity_threshold:
-                return True
-        
-        return False
+        index = self._create_near_duplicate_index()
+        for i, existing in enumerate(existing_abstracts):
+            index.add(str(i), abstract=existing)
+        return index.find('', abstract) is not None
     
     def _batch_save_papers(self, papers: List[Paper]) -> None:
         """Save papers to database in batches with error handling"""
@@ -534,8 +573,14 @@ class OptimizedLiteratureSurveyAgent:
     
     def intelligent_paper_ranking(self, papers: List[Paper], 
                                  research_topic: str,
-                                 ranking_criteria: Dict[str, float] = None) -> List[Paper]:
-        """Enhanced paper ranking using multiple criteria"""
+                                 ranking_criteria: Dict[str, float] = None,
+                                 top_k: Optional[int] = None) -> List[Paper]:
+        """Enhanced paper ranking using multiple criteria
+        
+        Scores are computed column-wise for the whole batch (see
+        :meth:`_score_papers_columnar`); ``top_k`` limits the result to the best
+        papers without sorting the rest.
+        """
         if not papers:
             return papers
         
@@ -550,26 +595,131 @@ class OptimizedLiteratureSurveyAgent:
             'abstract_quality': 0.05
         }
         
-        scored_papers = []
+        try:
+            totals = self._score_papers_columnar(papers, research_topic, criteria)
+        except Exception as e:
+            logger.warning(f"Columnar ranking failed, scoring papers individually: {e}")
+            totals = np.array(self._score_papers_individually(papers, research_topic, criteria))
+        
+        order = self._top_k_order(totals, top_k)
+        
+        # Log ranking statistics
+        if len(totals):
+            logger.info(f"Paper ranking completed. Score range: {totals.min():.2f} - {totals.max():.2f}")
         
+        return [papers[i] for i in order]
+    
+    def _score_papers_individually(self, papers: List[Paper], research_topic: str,
+                                   criteria: Dict[str, float]) -> List[float]:
+        """Reference per-paper scoring, one :meth:`_calculate_paper_scores` call each"""
+        totals = []
         for paper in papers:
             try:
                 scores = self._calculate_paper_scores(paper, research_topic)
-                total_score = sum(scores.get(key, 0) * weight for key, weight in criteria.items())
-                scored_papers.append((paper, total_score))
+                totals.append(sum(scores.get(key, 0) * weight for key, weight in criteria.items()))
             except Exception as e:
                 logger.debug(f"Error scoring paper '{paper.title[:50]}...': {e}")
-                scored_papers.append((paper, 5.0))  # Default score
-        
-        # Sort by total score
-        scored_papers.sort(key=lambda x: x[1], reverse=True)
-        
-        # Log ranking statistics
-        scores = [score for _, score in scored_papers]
-        if scores:
-            logger.info(f"Paper ranking completed. Score range: {min(scores):.2f} - {max(scores):.2f}")
+                totals.append(5.0)  # Default score
+        return totals
+    
+    def _score_papers_columnar(self, papers: List[Paper], research_topic: str,
+                               criteria: Dict[str, float]) -> np.ndarray:
+        """Score a batch with NumPy columns, matching :meth:`_calculate_paper_scores` exactly"""
+        n = len(papers)
+        citations = np.zeros(n)
+        years = np.zeros(n)
+        has_year = np.zeros(n, dtype=bool)
+        venue_codes = np.zeros(n, dtype=np.intp)
+        titles, abstracts = [], []
+        invalid = np.zeros(n, dtype=bool)
+        
+        venue_tiers: Dict[Optional[str], int] = {}
+        tier_scores: List[float] = []
+        
+        # One pass to pull raw columns; papers the per-paper scorer would reject get the default
+        for i, paper in enumerate(papers):
+            try:
+                citations[i] = paper.citations or 0
+                if paper.published_date:
+                    years[i] = paper.published_date.year
+                    has_year[i] = True
+                venue = paper.venue
+                if venue not in venue_tiers:
+                    venue_tiers[venue] = len(tier_scores)
+                    tier_scores.append(self._calculate_venue_score(venue))
+                venue_codes[i] = venue_tiers[venue]
+                titles.append(paper.title.lower() if paper.title else '')
+                abstracts.append(paper.abstract or '')
+            except Exception:
+                invalid[i] = True
+                titles.append('')
+                abstracts.append('')
+        
+        lowered = [abstract.lower() for abstract in abstracts]
+        columns = {}
+        if 'relevance_score' in criteria:
+            columns['relevance_score'] = self._relevance_column(titles, lowered, research_topic)
+        if 'citation_count' in criteria:
+            columns['citation_count'] = np.where(citations != 0, np.minimum(citations / 1000 * 10, 10), 0.0)
+        if 'publication_year' in criteria:
+            year_diff = datetime.now().year - years
+            columns['publication_year'] = np.where(has_year, np.maximum(0, 10 - year_diff * 0.3), 5.0)
+        if 'venue_quality' in criteria:
+            columns['venue_quality'] = np.asarray(tier_scores, dtype=float)[venue_codes]
+        if 'abstract_quality' in criteria:
+            columns['abstract_quality'] = self._abstract_quality_column(abstracts, lowered)
+        
+        # Accumulate in criteria order so totals equal the per-paper sums bit for bit
+        totals = np.zeros(n)
+        for key, weight in criteria.items():
+            if key in columns:
+                totals = totals + columns[key] * weight
+        totals[invalid] = 5.0
+        return totals
+    
+    def _relevance_column(self, titles: List[str], abstracts: List[str], research_topic: str) -> np.ndarray:
+        """Topic-word overlap of lowercased titles and abstracts, as in :meth:`_calculate_relevance_score`"""
+        topic_words = set(research_topic.lower().split())
+        if not topic_words:
+            return np.zeros(len(titles))
+        
+        def overlap(texts: List[str]) -> np.ndarray:
+            # Set intersection runs in C; skip splitting texts that contain no topic word at all
+            counts = np.fromiter(
+                (len(topic_words.intersection(text.split()))
+                 if any(word in text for word in topic_words) else 0 for text in texts),
+                dtype=float, count=len(texts)
+            )
+            return counts / len(topic_words)
         
-        return [paper for paper, _ in scored_papers]
+        return np.minimum((overlap(titles) * 0.7 + overlap(abstracts) * 0.3) * 10, 10)
+    
+    def _abstract_quality_column(self, abstracts: List[str], lowered: List[str]) -> np.ndarray:
+        """Vectorized :meth:`_calculate_abstract_quality`"""
+        n = len(abstracts)
+        lengths = np.fromiter((len(a) for a in abstracts), dtype=float, count=n)
+        stripped = np.fromiter((len(a.strip()) for a in abstracts), dtype=float, count=n)
+        methods = np.fromiter((any(k in a for k in self._METHOD_KEYWORDS) for a in lowered), dtype=bool, count=n)
+        results = np.fromiter((any(k in a for k in self._RESULT_KEYWORDS) for a in lowered), dtype=bool, count=n)
+        
+        quality = np.minimum(np.minimum(lengths / 200, 1) * 4 + np.where(methods, 3, 0) + np.where(results, 3, 0), 10)
+        return np.where(stripped < 50, 2.0, quality)
+    
+    @staticmethod
+    def _top_k_order(totals: np.ndarray, top_k: Optional[int] = None) -> np.ndarray:
+        """Indices by descending score, ties in input order, optionally only the best ``top_k``"""
+        n = len(totals)
+        if top_k is None or top_k >= n:
+            return np.argsort(-totals, kind='stable')
+        if top_k <= 0:
+            return np.array([], dtype=np.intp)
+        
+        # Everything strictly above the k-th score, then ties at it in input order
+        kth = np.partition(-totals, top_k - 1)[top_k - 1]
+        above = np.flatnonzero(-totals < kth)
+        ties = np.flatnonzero(-totals == kth)[:top_k - len(above)]
+        selected = np.concatenate([above, ties])
+        return selected[np.argsort(-totals[selected], kind='stable')]
     
     def _calculate_paper_scores(self, paper: Paper, research_topic: str) -> Dict[str, float]:
         """Calculate various scoring metrics for a paper"""
@@ -640,6 +790,9 @@ class OptimizedLiteratureSurveyAgent:
         
         return 5.0
     
+    _METHOD_KEYWORDS = ('method', 'approach', 'algorithm', 'technique', 'framework', 'model')
+    _RESULT_KEYWORDS = ('results', 'performance', 'accuracy', 'improvement', 'evaluation', 'experiment')
+    
     def _calculate_abstract_quality(self, abstract: Optional[str]) -> float:
         """Calculate abstract quality score"""
         if not abstract or len(abstract.strip()) < 50:
@@ -649,13 +802,11 @@ class OptimizedLiteratureSurveyAgent:
         length_score = min(len(abstract) / 200, 1) * 4
         
         # Method indicators
-        method_keywords = ['method', 'approach', 'algorithm', 'technique', 'framework', 'model']
-        has_methods = any(keyword in abstract.lower() for keyword in method_keywords)
+        has_methods = any(keyword in abstract.lower() for keyword in self._METHOD_KEYWORDS)
         method_score = 3 if has_methods else 0
         
         # Results indicators
-        results_keywords = ['results', 'performance', 'accuracy', 'improvement', 'evaluation', 'experiment']
-        has_results = any(keyword in abstract.lower() for keyword in results_keywords)
+        has_results = any(keyword in abstract.lower() for keyword in self._RESULT_KEYWORDS)
         results_score = 3 if has_results else 0
         
         return min(length_score + method_score + results_score, 10)
@@ -717,7 +868,7 @@ class OptimizedLiteratureSurveyAgent:
             # Phase 4: Apply intelligent ranking
             if enable_ranking and len(papers) > 1:
                 logger.info("Phase 4: Ranking papers by relevance...")
-                papers = self.intelligent_paper_ranking(papers, research_topic)
+                papers = self.intelligent_paper_ranking(papers, research_topic, top_k=max_papers)
             
             # Phase 5: Final filtering
             logger.info("Phase 5: Final filtering...")
@@ -1,5 +1,6 @@
 from crewai import Agent
 from typing import List, Dict, Any, Optional
+from pathlib import Path
 from uuid import uuid4
 from datetime import datetime
 import json
@@ -9,8 +10,12 @@ from ..storage.database import db
 from ..tools.pdf_processor import PDFProcessor
 from ..llm.llm_factory import LLMFactory
 from ..utils.app_logging import logger
+from ..utils.rate_control import is_rate_limited
 
 class NoteTakingAgent:
+    # Part of the cache key for extracted notes; bump when the extraction prompts change
+    PROMPT_VERSION = 'notes-1'
+    
     def __init__(self):
         self.llm = LLMFactory.create_llm()
         self.pdf_processor = PDFProcessor()
@@ -37,9 +42,29 @@ class NoteTakingAgent:
             llm=self.llm.generate
         )
     
-    def extract_notes_from_paper(self, paper: Paper, research_topic: str) -> List[ResearchNote]:
-        """Main method called by ResearchCrew - extract comprehensive notes from a single paper"""
-        return self.process_paper_content(paper, research_topic)
+    def extract_notes_from_paper(self, paper: Paper, research_topic: str,
+                                 report: Optional[Dict[str, Any]] = None,
+                                 content: Optional[tuple] = None) -> List[ResearchNote]:
+        """Main method called by ResearchCrew - extract comprehensive notes from a single paper
+
+        If ``report`` is given, ``report['degraded']`` is set when any part of the
+        extraction fell back to template notes (LLM error, rate limit, empty or
+        unparseable response), so callers can avoid caching them, and
+        ``report['rate_limited']`` when an LLM call was rejected for quota.
+        ``content`` is a result of :meth:`select_content` the caller already has.
+        """
+        return self.process_paper_content(paper, research_topic, report, content)
+    
+    def select_content(self, paper: Paper) -> tuple:
+        """(text, source, quality) of the content notes for ``paper`` are extracted from"""
+        return self._select_best_content(paper)
+    
+    @staticmethod
+    def _mark_degraded(report: Optional[Dict[str, Any]], error: Optional[BaseException] = None):
+        if report is not None:
+            report['degraded'] = True
+            if error is not None and is_rate_limited(error):
+                report['rate_limited'] = True
     
     def _get_cache_key(self, text: str, operation: str, topic: str = "") -> str:
         """Generate cache key for response caching"""
@@ -55,7 +80,8 @@ class NoteTakingAgent:
         
         self._response_cache[key] = response
     
-    def extract_key_sections(self, text: str, paper_title: str = "") -> Dict[str, str]:
+    def extract_key_sections(self, text: str, paper_title: str = "",
+                             report: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
         """Extract key sections from paper text with improved error handling and caching"""
         if not text or len(text.strip()) < self.min_text_length:
             logger.info(f"Text length insufficient for section extraction (length: {len(text.strip()) if text else 0})")
@@ -112,6 +138,7 @@ class NoteTakingAgent:
             
             if not response or response.strip() == "":
                 logger.warning("Empty response from LLM for section extraction")
+                self._mark_degraded(report)
                 return self._create_minimal_sections(text, paper_title)
             
             # Enhanced parsing with better validation
@@ -136,6 +163,7 @@ class NoteTakingAgent:
             
         except Exception as e:
             logger.error(f"Error extracting sections: {e}")
+            self._mark_degraded(report, e)
             return self._create_minimal_sections(text, paper_title)
     
     def _is_valid_section_content(self, content: str, min_length: int) -> bool:
@@ -422,7 +450,7 @@ class NoteTakingAgent:
         return sections
     
     def identify_key_insights(self, text: str, research_topic: str, 
-                            paper_title: str = "") -> List[Dict[str, Any]]:
+                            paper_title: str = "", report: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Identify key insights with enhanced parsing and validation"""
         if not text or len(text.strip()) < self.min_text_length:
             logger.info(f"Using fallback insights for short text (length: {len(text.strip()) if text else 0})")
@@ -481,6 +509,7 @@ class NoteTakingAgent:
             
             if not response or response.strip() == "":
                 logger.warning("Empty response from LLM for insight extraction")
+                self._mark_degraded(report)
                 return self._create_enhanced_fallback_insights(paper_title, research_topic, text)
             
             insights = self._parse_insights_response_enhanced(response)
@@ -488,6 +517,7 @@ class NoteTakingAgent:
             if not insights or len(insights) == 0:
                 logger.warning("No valid insights parsed from LLM response, creating enhanced fallback")
                 logger.debug(f"LLM response was: {response[:200]}...")
+                self._mark_degraded(report)
                 return self._create_enhanced_fallback_insights(paper_title, research_topic, text)
             
             # Cache successful result
@@ -496,6 +526,7 @@ class NoteTakingAgent:
             
         except Exception as e:
             logger.error(f"Error identifying insights: {e}")
+            self._mark_degraded(report, e)
             return self._create_enhanced_fallback_insights(paper_title, research_topic, text)
     
     def _parse_insights_response_enhanced(self, response: str) -> List[Dict[str, Any]]:
@@ -809,17 +840,20 @@ class NoteTakingAgent:
         
         return insights
     
-    def process_paper_content(self, paper: Paper, research_topic: str) -> List[ResearchNote]:
+    def process_paper_content(self, paper: Paper, research_topic: str,
+                              report: Optional[Dict[str, Any]] = None,
+                              content: Optional[tuple] = None) -> List[ResearchNote]:
         """Process paper and extract comprehensive notes with enhanced error handling and progress tracking"""
         logger.info(f"Processing paper: {paper.title[:60]}...")
         
         notes = []
         
         # Enhanced content prioritization and validation
-        content, content_source, content_quality = self._select_best_content(paper)
+        content, content_source, content_quality = content or self._select_best_content(paper)
         
         if not content:
             logger.warning(f"No usable content available for paper: {paper.id}")
+            self._mark_degraded(report)
             return self._create_enhanced_minimal_notes(paper, research_topic)
         
         logger.debug(f"Processing {content_source} content (quality: {content_quality}, length: {len(content)})")
@@ -827,7 +861,7 @@ class NoteTakingAgent:
         try:
             # Extract key sections with progress tracking
             logger.debug("Extracting key sections...")
-            sections = self.extract_key_sections(content, paper.title)
+            sections = self.extract_key_sections(content, paper.title, report)
             
             # Process sections with quality validation
             sections_created = 0
@@ -860,7 +894,7 @@ class NoteTakingAgent:
             
             # Extract insights with enhanced processing
             logger.debug("Identifying key insights...")
-            insights = self.identify_key_insights(content, research_topic, paper.title)
+            insights = self.identify_key_insights(content, research_topic, paper.title, report)
             
             insights_created = 0
             for insight in insights:
@@ -892,15 +926,40 @@ class NoteTakingAgent:
             
         except Exception as e:
             logger.error(f"Error processing paper content for {paper.id}: {e}")
+            self._mark_degraded(report, e)
             return self._create_enhanced_minimal_notes(paper, research_topic, content)
     
+    def _load_full_text(self, paper_id: str) -> Optional[str]:
+        """Full text is kept in the content store and only loaded when needed"""
+        try:
+            return db.get_full_text(paper_id)
+        except Exception as e:
+            logger.debug(f"Could not load full text for {paper_id}: {e}")
+            return None
+    
+    def _read_pdf_text(self, paper: Paper) -> Optional[str]:
+        """Text of a downloaded PDF, reading only the pages that fit the processing budget"""
+        if not paper.pdf_path or not Path(paper.pdf_path).exists():
+            return None
+        try:
+            extraction = self.pdf_processor.extract_text_budgeted(paper.pdf_path, max_chars=self.max_processing_length)
+            logger.debug(f"Read {extraction['pages_read']} PDF pages for {paper.id} ({extraction['stopped']})")
+            if extraction['stopped'] == 'end_of_document' and extraction['text']:
+                # The whole PDF was read: keep its text, pages and tables in the content store
+                db.save_pdf_content(paper.id, extraction)
+            return extraction['text'] or None
+        except Exception as e:
+            logger.debug(f"Could not read PDF for {paper.id}: {e}")
+            return None
+    
     def _select_best_content(self, paper: Paper) -> tuple[str, str, str]:
         """Select the best available content with quality assessment"""
         
         # Priority order: full_text -> abstract -> title enhancement
-        if paper.full_text and len(paper.full_text.strip()) > self.min_text_length:
-            quality = self._assess_content_quality(paper.full_text)
-            return paper.full_text, "full_text", quality
+        full_text = paper.full_text or self._load_full_text(paper.id) or self._read_pdf_text(paper)
+        if full_text and len(full_text.strip()) > self.min_text_length:
+            quality = self._assess_content_quality(full_text)
+            return full_text, "full_text", quality
         
         elif paper.abstract and len(paper.abstract.strip()) > 50:
             quality = self._assess_content_quality(paper.abstract)
@@ -1,11 +1,13 @@
 from crewai import Agent
-from typing import List, Dict, Any, Optional, Tuple, Set
+from typing import List, Dict, Any, Optional, Tuple, Set, Iterator, AsyncIterator
 from datetime import datetime, timedelta
 import json
 import re
 import hashlib
+import threading
 import time
 from collections import defaultdict
+from contextlib import aclosing
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import asyncio
 from functools import lru_cache
@@ -13,21 +15,22 @@ import numpy as np
 
 from ..storage.models import Paper
 from ..storage.database import db, get_async_db_manager
+from ..storage.semantic_cache import SemanticQACache
 from ..llm.llm_factory import LLMFactory
+from ..llm.streaming import aiter_from_sync, iter_from_async
 from ..utils.app_logging import logger
 from ..utils.performance_optimizer import optimizer, ultra_cache, turbo_batch_processor, fast_text
+from ..utils.embedding_service import EmbeddingService, get_embedding_service
 
 # Try to import advanced NLP libraries with fallbacks
-try:
-    from sentence_transformers import SentenceTransformer
-    from sklearn.metrics.pairwise import cosine_similarity
-    HAS_SENTENCE_TRANSFORMERS = True
-except ImportError:
-    HAS_SENTENCE_TRANSFORMERS = False
+# The embedding model itself is loaded by the shared service on first use
+HAS_SENTENCE_TRANSFORMERS = EmbeddingService.is_installed()
+if not HAS_SENTENCE_TRANSFORMERS:
     logger.warning("sentence-transformers not installed. Using basic similarity.")
 
 try:
     from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
     HAS_SKLEARN = True
 except ImportError:
     HAS_SKLEARN = False
@@ -55,6 +58,10 @@ class QuestionAnsweringAgent:
         self.min_relevance_score = self.config.get('min_relevance_score', 0.1)  # Very inclusive threshold
         self.max_parallel_papers = min(8, optimizer.get_optimal_thread_count('io'))  # Adaptive
         self.cache_ttl_hours = self.config.get('cache_ttl_hours', 24)
+        self.max_passages = self.config.get('max_passages', 24)  # Full-text passages across all papers
+        self.passage_embed_batch = self.config.get('passage_embed_batch', 256)
+        self._passage_embedder: Optional[threading.Thread] = None
+        self._passage_embedder_lock = threading.Lock()
         
         # Performance optimization toggles
         self.use_semantic_embeddings = self.config.get('use_semantic_embeddings', HAS_SENTENCE_TRANSFORMERS)
@@ -76,38 +83,17 @@ class QuestionAnsweringAgent:
         self.bm25_index = None
         self.bm25_papers = []
         
-        # Initialize semantic models with optimizations
+        # Shared embedding service; the model loads on the first encode, not here
         self.sentence_model = None
         if self.use_semantic_embeddings and HAS_SENTENCE_TRANSFORMERS:
-            try:
-                import torch
-                # Use smaller, faster model for better performance
-                model_name = self.config.get('semantic_model', 'all-MiniLM-L6-v2')
-                
-                # Load model on CPU first to avoid meta tensor issues
-                self.sentence_model = SentenceTransformer(model_name, device='cpu')
-                
-                # Move to appropriate device after loading
-                if torch.cuda.is_available():
-                    try:
-                        self.sentence_model = self.sentence_model.to('cuda')
-                    except Exception:
-                        # Fallback to CPU if CUDA move fails
-                        self.sentence_model = self.sentence_model.to('cpu')
-                
-                # Enable model optimizations
-                if hasattr(self.sentence_model, 'eval'):
-                    self.sentence_model.eval()  # Set to evaluation mode
-                
-                logger.info(f"Optimized semantic model loaded: {model_name}")
-            except Exception as e:
-                error_msg = str(e).lower()
-                if any(term in error_msg for term in ["dns", "getaddrinfo", "connection", "timeout", "huggingface"]):
-                    logger.warning(f"Network error loading semantic model: {e}")
-                    logger.info("Falling back to TF-IDF vectorization only")
-                else:
-                    logger.warning(f"Failed to load semantic model: {e}")
-                self.use_semantic_embeddings = False
+            self.sentence_model = get_embedding_service(self.config.get('semantic_model'))
+        else:
+            self.use_semantic_embeddings = False
+        
+        # Persistent answer cache keyed on question similarity
+        self.semantic_cache = None
+        if self.enable_caching and self.config.get('enable_semantic_cache', True):
+            self.semantic_cache = self._create_semantic_cache()
         
         # Optimized TF-IDF vectorizer
         self.tfidf_vectorizer = None
@@ -183,75 +169,202 @@ class QuestionAnsweringAgent:
             start_time = time.perf_counter()
             
             try:
-                # Quick cache check
-                if self.enable_caching:
-                    cache_key = self._generate_cache_key_fast(question, research_topic, paper_limit)
-                    cached_result = await self._get_cached_result_async(cache_key)
-                    if cached_result:
-                        self._performance_stats['cache_hits'] += 1
-                        logger.info(f"Cache hit for question: {question[:50]}...")
-                        return cached_result
-                
-                logger.info(f"Processing optimized QA: {question[:100]}...")
-                
-                # Fast question preprocessing
-                processed_question = self._preprocess_question_fast(question)
-                question_type = self._classify_question_fast(processed_question)
-                
-                # Enhanced async paper retrieval
-                with optimizer.measure_performance('paper_retrieval'):
-                    relevant_papers = await self._enhanced_paper_retrieval_async(
-                        processed_question, research_topic, paper_limit or self.max_papers_for_context
-                    )
-                
-                if not relevant_papers:
-                    return self._generate_no_results_response(question)
-                
-                # Parallel relevance scoring with async optimization
-                with optimizer.measure_performance('relevance_scoring'):
-                    ranked_papers = await self._parallel_relevance_scoring_async(
-                        processed_question, relevant_papers, question_type
-                    )
-                
-                # Select top papers with performance consideration
-                top_papers = self._select_top_papers_optimized(ranked_papers)
-                
-                if not top_papers:
-                    return self._generate_low_relevance_response(question)
-                
-                # Extract contexts efficiently
-                with optimizer.measure_performance('context_extraction'):
-                    contexts = await self._extract_contexts_async(
-                        processed_question, top_papers, question_type
-                    )
+                early_result, prepared = await self._prepare_answer_async(
+                    question, research_topic, paper_limit
+                )
+                if early_result is not None:
+                    return early_result
                 
                 # Generate answer with LLM optimization
                 with optimizer.measure_performance('llm_generation'):
                     answer_data = await self._generate_answer_async(
-                        processed_question, contexts, question_type
+                        prepared['processed_question'], prepared['contexts'], prepared['question_type']
                     )
                 
-                # Compile final result
-                final_result = self._compile_optimized_result(
-                    question, answer_data, top_papers, contexts, question_type
-                )
-                
-                # Cache result if enabled
-                if self.enable_caching:
-                    await self._cache_result_async(cache_key, final_result)
-                
-                # Update performance stats
-                processing_time = time.perf_counter() - start_time
-                self._update_performance_stats(processing_time)
-                
-                logger.info(f"Optimized QA completed in {processing_time:.2f}s")
-                
-                return final_result
+                return await self._finalize_answer_async(question, answer_data, prepared, start_time)
                 
             except Exception as e:
                 logger.error(f"Optimized QA error: {e}", exc_info=True)
                 return self._generate_error_response(str(e))
     
+    async def answer_question_stream_async(self, question: str, research_topic: str = None,
+                                         paper_limit: int = None) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the answer as it is generated
+
+        Yields ``{'type': 'token', 'text': ...}`` events while the LLM produces the
+        answer, followed by a single ``{'type': 'result', 'result': ...}`` event holding
+        the same dict :meth:`answer_question_async` would return. The result is only
+        cached once the stream has completed.
+        """
+        self._performance_stats['total_questions'] += 1
+        start_time = time.perf_counter()
+        
+        try:
+            early_result, prepared = await self._prepare_answer_async(
+                question, research_topic, paper_limit
+            )
+        except Exception as e:
+            logger.error(f"Streaming QA error: {e}", exc_info=True)
+            early_result = self._generate_error_response(str(e))
+        
+        if early_result is not None:
+            if early_result.get('answer'):
+                yield {'type': 'token', 'text': early_result['answer']}
+            yield {'type': 'result', 'result': early_result}
+            return
+        
+        contexts = prepared['contexts']
+        chunks: List[str] = []
+        answer_data: Dict[str, Any]
+        
+        try:
+            if not contexts:
+                answer_data = {'answer': 'No relevant papers found for this question.', 'confidence': 0.0}
+                yield {'type': 'token', 'text': answer_data['answer']}
+            else:
+                prompt = self._create_optimized_prompt(
+                    prepared['processed_question'], contexts, prepared['question_type']
+                )
+                with optimizer.measure_performance('llm_generation'):
+                    async for text in self._stream_llm_async(prompt):
+                        chunks.append(text)
+                        yield {'type': 'token', 'text': text}
+                
+                answer_text = ''.join(chunks)
+                answer_data = {
+                    'answer': answer_text,
+                    'confidence': self._estimate_confidence_fast(answer_text, contexts),
+                    'source_count': len(contexts)
+                }
+        except Exception as e:
+            logger.error(f"Streaming answer generation error: {e}")
+            answer_data = {
+                'answer': ''.join(chunks) or 'Error generating answer. Please try again.',
+                'confidence': 0.0,
+                'error': str(e)
+            }
+            # Partial answers are returned but never cached
+            result = self._compile_optimized_result(
+                question, answer_data, prepared['top_papers'], contexts, prepared['question_type']
+            )
+            yield {'type': 'result', 'result': result}
+            return
+        
+        result = await self._finalize_answer_async(question, answer_data, prepared, start_time)
+        yield {'type': 'result', 'result': result}
+    
+    def answer_question_stream(self, question: str, research_topic: str = None,
+                             paper_limit: int = None) -> Iterator[Dict[str, Any]]:
+        """Synchronous wrapper around :meth:`answer_question_stream_async`"""
+        return iter_from_async(
+            lambda: self.answer_question_stream_async(question, research_topic, paper_limit)
+        )
+    
+    async def _prepare_answer_async(self, question: str, research_topic: str = None,
+                                  paper_limit: int = None) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """Run everything up to answer generation
+
+        Returns ``(early_result, prepared)``; ``early_result`` is set when the question
+        can be answered without the LLM (cache hit, no papers, low relevance).
+        """
+        prepared: Dict[str, Any] = {'cache_key': None}
+        
+        # Quick cache check
+        if self.enable_caching:
+            cache_key = self._generate_cache_key_fast(question, research_topic, paper_limit)
+            prepared['cache_key'] = cache_key
+            cached_result = await self._get_cached_result_async(cache_key)
+            if cached_result:
+                self._performance_stats['cache_hits'] += 1
+                logger.info(f"Cache hit for question: {question[:50]}...")
+                return cached_result, prepared
+            
+            semantic_result = await self._get_semantic_cached_result_async(question, research_topic)
+            if semantic_result:
+                self._performance_stats['cache_hits'] += 1
+                await self._cache_result_async(cache_key, semantic_result)
+                return semantic_result, prepared
+        
+        prepared['research_topic'] = research_topic
+        logger.info(f"Processing optimized QA: {question[:100]}...")
+        
+        # Fast question preprocessing
+        processed_question = self._preprocess_question_fast(question)
+        question_type = self._classify_question_fast(processed_question)
+        
+        # Enhanced async paper retrieval
+        with optimizer.measure_performance('paper_retrieval'):
+            relevant_papers = await self._enhanced_paper_retrieval_async(
+                processed_question, research_topic, paper_limit or self.max_papers_for_context
+            )
+        
+        if not relevant_papers:
+            return self._generate_no_results_response(question), prepared
+        
+        # Parallel relevance scoring with async optimization
+        with optimizer.measure_performance('relevance_scoring'):
+            ranked_papers = await self._parallel_relevance_scoring_async(
+                processed_question, relevant_papers, question_type
+            )
+        
+        # Select top papers with performance consideration
+        top_papers = self._select_top_papers_optimized(ranked_papers)
+        
+        if not top_papers:
+            return self._generate_low_relevance_response(question), prepared
+        
+        # Extract contexts efficiently
+        with optimizer.measure_performance('context_extraction'):
+            contexts = await self._extract_contexts_async(
+                processed_question, top_papers, question_type
+            )
+        
+        prepared.update({
+            'processed_question': processed_question,
+            'question_type': question_type,
+            'top_papers': top_papers,
+            'contexts': contexts,
+        })
+        return None, prepared
+    
+    async def _finalize_answer_async(self, question: str, answer_data: Dict[str, Any],
+                                   prepared: Dict[str, Any], start_time: float) -> Dict[str, Any]:
+        """Compile, cache and account a generated answer"""
+        # Compile final result
+        final_result = self._compile_optimized_result(
+            question, answer_data, prepared['top_papers'], prepared['contexts'], prepared['question_type']
+        )
+        
+        # Cache result if enabled
+        if self.enable_caching and prepared.get('cache_key'):
+            await self._cache_result_async(prepared['cache_key'], final_result)
+            await self._store_semantic_result_async(question, final_result, prepared.get('research_topic'))
+        
+        # Update performance stats
+        processing_time = time.perf_counter() - start_time
+        self._update_performance_stats(processing_time)
+        
+        logger.info(f"Optimized QA completed in {processing_time:.2f}s")
+        
+        return final_result
+    
+    async def _stream_llm_async(self, prompt: str) -> AsyncIterator[str]:
+        """Stream LLM output, degrading to a single chunk for non-streaming clients"""
+        # aclosing: an abandoned answer stops the underlying stream instead of waiting for GC
+        if hasattr(self.llm, 'generate_stream_async'):
+            async with aclosing(self.llm.generate_stream_async(prompt)) as chunks:
+                async for text in chunks:
+                    yield text
+        elif hasattr(self.llm, 'generate_stream'):
+            async with aclosing(aiter_from_sync(lambda: self.llm.generate_stream(prompt))) as chunks:
+                async for text in chunks:
+                    yield text
+        elif hasattr(self.llm, 'generate_async'):
+            yield await self.llm.generate_async(prompt)
+        else:
+            loop = asyncio.get_event_loop()
+            yield await loop.run_in_executor(None, lambda: self.llm.generate(prompt))
+    
 
     def _create_fallback_response(self, question: str, paper_contexts: List[str] = None) -> Dict[str, Any]:
         """Create a comprehensive fallback response when LLM fails"""
@@ -635,11 +748,17 @@ While I'm experiencing technical difficulties accessing the full research databa
         contexts = []
         max_context_per_paper = self.max_context_length // len(top_papers)
         
+        # One indexed query fetches the best full-text passages across all top papers
+        passages_by_paper = defaultdict(list)
+        for passage in await self._retrieve_passages_async(question, [paper.id for paper, _ in top_papers]):
+            passages_by_paper[passage['paper_id']].append(passage)
+        
         # Process papers concurrently
         context_tasks = []
         for paper, score in top_papers:
             task = self._extract_paper_context_async(
-                question, paper, score, question_type, max_context_per_paper
+                question, paper, score, question_type, max_context_per_paper,
+                passages_by_paper.get(paper.id)
             )
             context_tasks.append(task)
         
@@ -651,13 +770,47 @@ While I'm experiencing technical difficulties accessing the full research databa
         
         return contexts[:self.max_papers_for_context]
     
+    async def _retrieve_passages_async(self, question: str, paper_ids: List[str]) -> List[Dict[str, Any]]:
+        """Top section-tagged passages for the question from the full-text chunk index"""
+        try:
+            query_vector = None
+            if self.use_semantic_embeddings and self.sentence_model:
+                # Newly indexed passages are embedded off the question path; until then BM25 ranks them
+                self._embed_passages_in_background()
+                query_vector = (await asyncio.to_thread(self.sentence_model.encode, [question]))[0]
+            return await asyncio.to_thread(db.search_passages, question, self.max_passages, paper_ids, query_vector)
+        except Exception as e:
+            logger.warning(f"Passage retrieval failed, using abstracts: {e}")
+            return []
+    
+    def _embed_passages_in_background(self):
+        """Start a background backfill of passage embeddings unless one is already running"""
+        with self._passage_embedder_lock:
+            if self._passage_embedder is not None and self._passage_embedder.is_alive():
+                return
+            self._passage_embedder = threading.Thread(
+                target=self._embed_pending_passages, name='qa-passage-embedder', daemon=True
+            )
+            self._passage_embedder.start()
+    
+    def _embed_pending_passages(self):
+        while db.embed_pending_passages(self.sentence_model.encode, self.passage_embed_batch):
+            pass
+    
     async def _extract_paper_context_async(self, question: str, paper: Paper, 
                                          score: float, question_type: str, 
-                                         max_length: int) -> Dict[str, Any]:
+                                         max_length: int,
+                                         passages: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """Extract context from a single paper asynchronously"""
         try:
-            # Prioritize abstract and title for speed
-            full_text = f"{paper.title or ''} {paper.abstract or ''}"
+            if passages:
+                # Retrieved full-text passages, tagged with the section they came from
+                parts = [paper.title or '']
+                parts.extend(f"[{passage['section']}] {passage['text']}" for passage in passages)
+                full_text = "\n".join(parts)
+            else:
+                # Prioritize abstract and title for speed
+                full_text = f"{paper.title or ''} {paper.abstract or ''}"
             
             # Truncate for performance
             if len(full_text) > max_length:
@@ -668,6 +821,7 @@ While I'm experiencing technical difficulties accessing the full research databa
                 'title': paper.title,
                 'authors': paper.authors,
                 'content': full_text,
+                'sections': [passage['section'] for passage in passages or []],
                 'relevance_score': score,
                 'citations': paper.citations or 0,
                 'venue': paper.venue,
@@ -832,6 +986,51 @@ While I'm experiencing technical difficulties accessing the full research databa
             'timestamp': time.time()
         }
     
+    def _create_semantic_cache(self) -> Optional[SemanticQACache]:
+        """Build the semantic answer cache on the papers database"""
+        try:
+            if self.sentence_model is not None:
+                model_name = self.sentence_model.model_name
+                embed, embedder_name, default_threshold = self.sentence_model.encode, model_name, 0.92
+            else:
+                embed, embedder_name, default_threshold = None, 'hashed', 0.85
+            return SemanticQACache(
+                db.db_path,
+                embed=embed,
+                embedder_name=embedder_name,
+                threshold=self.config.get('semantic_cache_threshold', default_threshold),
+                max_entries=self.config.get('semantic_cache_max_entries', 2000),
+                ttl_hours=self.cache_ttl_hours,
+            )
+        except Exception as e:
+            logger.warning(f"Semantic QA cache unavailable: {e}")
+            return None
+    
+    async def _get_semantic_cached_result_async(self, question: str,
+                                              research_topic: str = None) -> Optional[Dict[str, Any]]:
+        """Look up a previously answered, semantically equivalent question"""
+        if self.semantic_cache is None:
+            return None
+        try:
+            result = await asyncio.to_thread(self.semantic_cache.lookup, question, research_topic)
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed: {e}")
+            return None
+        if result:
+            match = result['metadata']['semantic_cache']
+            logger.info(f"Semantic cache hit ({match['similarity']:.2f}) for question: {question[:50]}...")
+        return result
+    
+    async def _store_semantic_result_async(self, question: str, result: Dict[str, Any],
+                                         research_topic: str = None):
+        """Persist a generated answer; zero-confidence (error) answers are not reused"""
+        if self.semantic_cache is None or not result.get('answer') or result.get('confidence', 0) <= 0:
+            return
+        try:
+            await asyncio.to_thread(self.semantic_cache.store, question, result, research_topic)
+        except Exception as e:
+            logger.warning(f"Semantic cache store failed: {e}")
+    
     def _update_performance_stats(self, processing_time: float):
         """Update performance statistics"""
         self._performance_stats['avg_response_time'] = (
@@ -956,21 +1155,10 @@ While I'm experiencing technical difficulties accessing the full research databa
     def _semantic_paper_search(self, question: str, limit: int) -> List[Paper]:
         """Semantic search using sentence embeddings"""
         try:
-            question_embedding = self.sentence_model.encode([question])
-            all_papers = db.get_all_papers()
-            
-            paper_similarities = []
-            for paper in all_papers:
-                paper_text = f"{paper.title or ''} {paper.abstract or ''}"
-                if not paper_text.strip():
-                    continue
-                
-                try:
-                    paper_embedding = self.sentence_model.encode([paper_text])
-                    similarity = cosine_similarity(question_embedding, paper_embedding)[0][0]
-                    paper_similarities.append((paper, similarity))
-                except Exception:
-                    continue
+            all_papers = [paper for paper in db.get_all_papers()
+                          if f"{paper.title or ''} {paper.abstract or ''}".strip()]
+            similarities = self._semantic_similarities(question, all_papers)
+            paper_similarities = list(zip(all_papers, similarities))
             
             paper_similarities.sort(key=lambda x: x[1], reverse=True)
             return [paper for paper, sim in paper_similarities[:limit] if sim > 0.3]
@@ -985,13 +1173,13 @@ While I'm experiencing technical difficulties accessing the full research databa
         try:
             scored_papers = []
             
-            for paper in papers:
-                score = 0.0
-                
-                # Semantic similarity (if available)
-                if self.use_semantic_embeddings and self.sentence_model:
-                    semantic_score = self._calculate_semantic_similarity(question, paper)
-                    score += semantic_score * 0.4
+            # Semantic similarity (if available), embedded in one batch
+            semantic_scores = [0.0] * len(papers)
+            if self.use_semantic_embeddings and self.sentence_model:
+                semantic_scores = self._semantic_similarities(question, papers)
+            
+            for paper, semantic_score in zip(papers, semantic_scores):
+                score = semantic_score * 0.4
                 
                 # Enhanced text similarity
                 text_score = self._calculate_enhanced_text_similarity(question, paper)
@@ -1023,19 +1211,19 @@ While I'm experiencing technical difficulties accessing the full research databa
     
     def _calculate_semantic_similarity(self, question: str, paper: Paper) -> float:
         """Calculate semantic similarity using embeddings"""
+        return self._semantic_similarities(question, [paper])[0]
+    
+    def _semantic_similarities(self, question: str, papers: List[Paper]) -> List[float]:
+        """Cosine similarity of each paper's title and abstract to the question, from one encode call"""
         try:
-            paper_text = f"{paper.title or ''} {paper.abstract or ''}"
-            if not paper_text.strip():
-                return 0.0
-            
-            question_emb = self.sentence_model.encode([question])
-            paper_emb = self.sentence_model.encode([paper_text])
-            
-            similarity = cosine_similarity(question_emb, paper_emb)[0][0]
-            return max(0.0, similarity)
-            
-        except Exception:
-            return 0.0
+            texts = [f"{paper.title or ''} {paper.abstract or ''}" for paper in papers]
+            embeddings = self.sentence_model.encode([question] + texts)
+            similarities = cosine_similarity(embeddings[:1], embeddings[1:])[0]
+            return [max(0.0, float(similarity)) if text.strip() else 0.0
+                    for text, similarity in zip(texts, similarities)]
+        except Exception as e:
+            logger.debug(f"Semantic similarity unavailable: {e}")
+            return [0.0] * len(papers)
     
     def _calculate_enhanced_text_similarity(self, question: str, paper: Paper) -> float:
         """Enhanced text similarity with improved algorithms"""
@@ -1554,6 +1742,8 @@ While I'm experiencing technical difficulties accessing the full research databa
     def clear_cache(self) -> None:
         """Clear the question cache"""
         self.question_cache.clear()
+        if self.semantic_cache is not None:
+            self.semantic_cache.clear()
         logger.info("Question cache cleared")
     
     def _generate_no_papers_response(self, question: str) -> Dict[str, Any]:
@@ -0,0 +1,462 @@
+"""
+Long-lived question answering service shared by the CLI, dashboard and API.
+
+One QuestionAnsweringAgent (and one simplified fallback agent) serves every
+caller. Questions run as tasks on a private event loop thread, at most
+``max_workers`` at a time. A question asked while an identical one is already
+in flight attaches to that computation instead of starting another; streams do
+the same, with every reader receiving the shared stream's events.
+
+Every request has a deadline. When it passes, the caller gets a timeout answer,
+and once no caller is waiting any more the task is cancelled at its next await.
+A blocking LLM call already running on a worker thread cannot be interrupted,
+so the question keeps its worker slot until every thread job it started has
+returned; abandoned questions therefore never put more than ``max_workers``
+questions' worth of work on the LLM. When ``max_pending`` questions are already
+queued or running, new ones are refused with :class:`QAServiceBusy`.
+
+    qa:
+      service:
+        max_workers: 4
+        max_pending: 16
+        timeout: 60            # per-request deadline, seconds
+        enhanced_timeout: 30   # budget for the full agent before falling back
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .qa_agent import QuestionAnsweringAgent
+from ..utils.app_logging import logger
+from ..utils.config import config
+
+_DONE = object()
+
+# Thread jobs started by the question running in the current task
+_question_jobs: contextvars.ContextVar = contextvars.ContextVar('qa_question_jobs', default=None)
+
+
+class QAServiceBusy(Exception):
+    """Raised when ``max_pending`` questions are already queued or running"""
+
+
+def _failed_response(message: str, error: str) -> Dict[str, Any]:
+    return {
+        'answer': message,
+        'sources': [],
+        'confidence': 0.0,
+        'paper_count': 0,
+        'follow_up_questions': [],
+        'error': error
+    }
+
+
+class _TrackingExecutor(concurrent.futures.ThreadPoolExecutor):
+    """Default executor of the service loop; records each job against the question that submitted it"""
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = super().submit(fn, *args, **kwargs)
+        # run_in_executor() and to_thread() submit from inside the calling task's context
+        jobs = _question_jobs.get()
+        if jobs is not None:
+            jobs.add(future)
+            future.add_done_callback(jobs.discard)
+        return future
+
+
+def _track_jobs() -> set:
+    """Start recording the current task's thread jobs (each task has its own context)"""
+    jobs = set()
+    _question_jobs.set(jobs)
+    return jobs
+
+
+async def _settle(jobs: set):
+    """Wait for thread jobs that a cancelled or timed-out await left running"""
+    if jobs:
+        await asyncio.wait([asyncio.wrap_future(job) for job in list(jobs)])
+
+
+class _Computation:
+    """One in-flight answer, shared by every caller that asked the same question"""
+
+    def __init__(self, key: Tuple):
+        self.key = key
+        self.future: Optional[concurrent.futures.Future] = None
+        self.waiters = 0
+
+
+class _StreamComputation:
+    """One in-flight answer stream; events are fanned out to every attached reader"""
+
+    def __init__(self, key: Tuple):
+        self.key = key
+        self.future: Optional[concurrent.futures.Future] = None
+        # Everything published so far, replayed to readers that attach late
+        self.history: List[Any] = []
+        self.readers: List[queue.Queue] = []
+
+
+class QATicket:
+    """A caller's handle on a (possibly shared) answer"""
+
+    def __init__(self, service: 'QAService', computation: _Computation, deadline: float):
+        self._service = service
+        self._computation = computation
+        self.deadline = deadline
+        self._finished = False
+
+    def result(self) -> Dict[str, Any]:
+        """Wait for the answer until the request's deadline"""
+        try:
+            result = self._computation.future.result(max(0.0, self.deadline - time.monotonic()))
+        except TimeoutError:
+            self._finish(abandon=True)
+            self._service._count('timeouts')
+            return _failed_response("The question could not be answered in time. Please try again.", 'timeout')
+        except concurrent.futures.CancelledError:
+            self._finish(abandon=False)
+            return _failed_response("The question was cancelled.", 'cancelled')
+        except Exception as e:
+            self._finish(abandon=False)
+            logger.error(f"QA service error: {e}")
+            return _failed_response(f"An error occurred while processing your question: {e}", str(e))
+        self._finish(abandon=False)
+        # Coalesced callers share the result; give each its own top-level dict
+        return dict(result)
+
+    def cancel(self):
+        """Stop waiting; the computation is cancelled if no other caller is waiting on it"""
+        self._finish(abandon=True)
+
+    def _finish(self, abandon: bool):
+        if not self._finished:
+            self._finished = True
+            self._service._release(self._computation, abandon)
+
+
+class QAService:
+    """Bounded, coalescing, deadline-aware front end to the QA agents"""
+
+    def __init__(self, agent=None, fallback_agent=None, max_workers: int = 4, max_pending: int = 16,
+                 timeout: float = 60.0, enhanced_timeout: float = 30.0):
+        self._agent = agent
+        self._fallback_agent = fallback_agent
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending = max(1, int(max_pending))
+        self.timeout = timeout
+        self.enhanced_timeout = enhanced_timeout
+        self.stats = {'requests': 0, 'coalesced': 0, 'rejected': 0, 'timeouts': 0,
+                      'cancelled': 0, 'fallbacks': 0, 'completed': 0}
+        self._inflight: Dict[Tuple, _Computation] = {}
+        self._inflight_streams: Dict[Tuple, _StreamComputation] = {}
+        # Re-entrant: a done callback may run synchronously inside submit()
+        self._lock = threading.RLock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._executor: Optional[_TrackingExecutor] = None
+
+    @property
+    def agent(self):
+        with self._lock:
+            if self._agent is None:
+                self._agent = QuestionAnsweringAgent(config.__dict__ if config else None)
+            return self._agent
+
+    @property
+    def fallback_agent(self):
+        with self._lock:
+            if self._fallback_agent is None:
+                from .simplified_qa import SimplifiedQAAgent
+                self._fallback_agent = SimplifiedQAAgent()
+            return self._fallback_agent
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._executor = _TrackingExecutor(thread_name_prefix='qa-service-job')
+                self._loop.set_default_executor(self._executor)
+                self._slots = asyncio.Semaphore(self.max_workers)
+                self._thread = threading.Thread(target=self._loop.run_forever, name='qa-service', daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _check_capacity(self):
+        if len(self._inflight) + len(self._inflight_streams) >= self.max_pending:
+            self.stats['rejected'] += 1
+            raise QAServiceBusy(f"QA service is saturated ({self.max_pending} questions pending)")
+
+    @staticmethod
+    def _key(question: str, research_topic: Optional[str], paper_limit: int, enhanced: bool) -> Tuple:
+        return ' '.join(question.lower().split()), research_topic, paper_limit, enhanced
+
+    def submit(self, question: str, research_topic: str = None, paper_limit: int = 10,
+               timeout: Optional[float] = None, enhanced: bool = True) -> QATicket:
+        """Start (or join) answering a question; raises :class:`QAServiceBusy` when saturated
+
+        With ``enhanced=False`` the simplified agent answers directly.
+        """
+        deadline = time.monotonic() + (timeout or self.timeout)
+        key = self._key(question, research_topic, paper_limit, enhanced)
+        agent = self.agent if enhanced else None  # built here so a slow first load does not stall the loop
+        loop = self._ensure_loop()
+
+        with self._lock:
+            self.stats['requests'] += 1
+            computation = self._inflight.get(key)
+            if computation is not None:
+                # Joins get at most the time left on the original request
+                self.stats['coalesced'] += 1
+            else:
+                self._check_capacity()
+                computation = _Computation(key)
+                self._inflight[key] = computation
+                computation.future = asyncio.run_coroutine_threadsafe(
+                    self._answer(agent, question, research_topic, paper_limit, deadline), loop
+                )
+                computation.future.add_done_callback(lambda _: self._forget(computation))
+            computation.waiters += 1
+        return QATicket(self, computation, deadline)
+
+    def ask(self, question: str, research_topic: str = None, paper_limit: int = 10,
+            timeout: Optional[float] = None, enhanced: bool = True) -> Dict[str, Any]:
+        """Answer a question, blocking until the answer or the deadline"""
+        return self.submit(question, research_topic, paper_limit, timeout, enhanced).result()
+
+    async def _answer(self, agent, question: str, research_topic: Optional[str], paper_limit: int,
+                      deadline: float) -> Dict[str, Any]:
+        async with self._slots:
+            jobs = _track_jobs()
+            try:
+                return await self._answer_in_slot(agent, question, research_topic, paper_limit, deadline)
+            finally:
+                # Cancelling an await does not stop its executor job; keep the slot until it returns
+                await _settle(jobs)
+
+    async def _answer_in_slot(self, agent, question: str, research_topic: Optional[str], paper_limit: int,
+                              deadline: float) -> Dict[str, Any]:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("Deadline passed while queued")
+        if agent is not None:
+            try:
+                result = await asyncio.wait_for(
+                    agent.answer_question_async(question, research_topic, paper_limit),
+                    min(self.enhanced_timeout, remaining)
+                )
+                self._count('completed')
+                return result
+            except Exception as e:
+                logger.warning(f"Enhanced QA failed or timed out: {e!r}")
+
+        result = await self._fallback_answer(question, research_topic, paper_limit, deadline, agent is not None)
+        self._count('completed')
+        return result
+
+    async def _fallback_answer(self, question: str, research_topic: Optional[str], paper_limit: int,
+                               deadline: float, fell_back: bool = True) -> Dict[str, Any]:
+        """Answer with the simplified agent in the time left before ``deadline``"""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("Deadline passed before the fallback could run")
+        if fell_back:
+            logger.info("Falling back to simplified QA agent")
+            self._count('fallbacks')
+        result = await asyncio.wait_for(
+            asyncio.to_thread(lambda: self.fallback_agent.answer_question(
+                question=question, research_topic=research_topic, paper_limit=paper_limit
+            )),
+            remaining
+        )
+        result['qa_agent_used'] = 'simplified_fallback' if fell_back else 'simplified'
+        return result
+
+    def _forget(self, computation: _Computation):
+        with self._lock:
+            if self._inflight.get(computation.key) is computation:
+                del self._inflight[computation.key]
+
+    def _release(self, computation: _Computation, abandon: bool):
+        with self._lock:
+            computation.waiters -= 1
+            if abandon and computation.waiters == 0 and not computation.future.done():
+                # Cancels the task on the loop; it stops at its next await
+                computation.future.cancel()
+                self._forget(computation)
+                self.stats['cancelled'] += 1
+
+    def stream(self, question: str, research_topic: str = None, paper_limit: int = 10,
+               timeout: Optional[float] = None, enhanced: bool = True) -> Iterator[Dict[str, Any]]:
+        """Stream ``token`` events and a final ``result`` event, like ``answer_question_stream``
+
+        A stream of a question that is already streaming attaches to it: the
+        reader is sent the events so far, then the rest as they arrive. If the
+        full agent produces nothing within ``enhanced_timeout`` (or fails before
+        its first event), the simplified agent's answer is streamed instead; once
+        tokens have been sent the stream runs to the deadline. The stream is
+        cancelled at its next await when its last reader closes the iterator, and
+        like questions it keeps its slot until any blocking LLM call it started
+        has returned.
+        """
+        deadline = time.monotonic() + (timeout or self.timeout)
+        key = self._key(question, research_topic, paper_limit, enhanced)
+        agent = self.agent if enhanced else None
+        loop = self._ensure_loop()
+        reader: queue.Queue = queue.Queue()
+        with self._lock:
+            self.stats['requests'] += 1
+            computation = self._inflight_streams.get(key)
+            if computation is not None:
+                self.stats['coalesced'] += 1
+            else:
+                self._check_capacity()
+                computation = _StreamComputation(key)
+                self._inflight_streams[key] = computation
+                computation.future = asyncio.run_coroutine_threadsafe(
+                    self._pump_stream(computation, agent, question, research_topic, paper_limit, deadline), loop
+                )
+            for item in computation.history:
+                reader.put(item)
+            computation.readers.append(reader)
+        return self._drain_stream(computation, reader)
+
+    def _publish(self, computation: _StreamComputation, item: Any):
+        with self._lock:
+            computation.history.append(item)
+            for reader in computation.readers:
+                reader.put(item)
+
+    async def _pump_stream(self, computation: _StreamComputation, agent, question: str,
+                           research_topic: Optional[str], paper_limit: int, deadline: float):
+        jobs = _track_jobs()
+        try:
+            async with self._slots:
+                try:
+                    await self._stream_in_slot(computation, agent, question, research_topic, paper_limit, deadline)
+                    self._count('completed')
+                except BaseException as e:
+                    self._publish(computation, e)
+                    if isinstance(e, asyncio.CancelledError):
+                        raise
+                finally:
+                    # Release the readers first; the slot is held until blocking LLM calls return
+                    self._end_stream(computation)
+                    await _settle(jobs)
+        finally:
+            self._end_stream(computation)
+
+    def _end_stream(self, computation: _StreamComputation):
+        """Tell the readers the stream is over; later streams of the question start afresh"""
+        self._publish(computation, _DONE)
+        with self._lock:
+            if self._inflight_streams.get(computation.key) is computation:
+                del self._inflight_streams[computation.key]
+
+    async def _stream_in_slot(self, computation: _StreamComputation, agent, question: str,
+                              research_topic: Optional[str], paper_limit: int, deadline: float):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("Deadline passed while queued")
+        if agent is not None:
+            events = agent.answer_question_stream_async(question, research_topic, paper_limit)
+            try:
+                first = await asyncio.wait_for(events.__anext__(), min(self.enhanced_timeout, remaining))
+            except StopAsyncIteration:
+                return
+            except Exception as e:
+                logger.warning(f"Enhanced QA stream failed or timed out: {e!r}")
+                first = None
+            if first is not None:
+                self._publish(computation, first)
+
+                async def rest():
+                    async for event in events:
+                        self._publish(computation, event)
+
+                await asyncio.wait_for(rest(), max(0.0, deadline - time.monotonic()))
+                return
+
+        result = await self._fallback_answer(question, research_topic, paper_limit, deadline, agent is not None)
+        if result.get('answer'):
+            self._publish(computation, {'type': 'token', 'text': result['answer']})
+        self._publish(computation, {'type': 'result', 'result': result})
+
+    def _drain_stream(self, computation: _StreamComputation, reader: queue.Queue) -> Iterator[Dict[str, Any]]:
+        got_result = False
+        try:
+            while True:
+                item = reader.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, TimeoutError):
+                    self._count('timeouts')
+                    if not got_result:
+                        yield {'type': 'result', 'result': _failed_response(
+                            "The question could not be answered in time. Please try again.", 'timeout')}
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                got_result = got_result or item.get('type') == 'result'
+                # Readers share events; give each its own copies to modify
+                event = dict(item)
+                if 'result' in event:
+                    event['result'] = dict(event['result'])
+                yield event
+        finally:
+            with self._lock:
+                computation.readers.remove(reader)
+                abandoned = not computation.readers and not computation.future.done()
+                if abandoned:
+                    if self._inflight_streams.get(computation.key) is computation:
+                        del self._inflight_streams[computation.key]
+                    self.stats['cancelled'] += 1
+            if abandoned:
+                computation.future.cancel()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, 'pending': len(self._inflight), 'streams': len(self._inflight_streams),
+                    'max_workers': self.max_workers, 'max_pending': self.max_pending}
+
+    def shutdown(self):
+        """Cancel outstanding questions and stop the worker loop"""
+        with self._lock:
+            for computation in list(self._inflight.values()):
+                computation.future.cancel()
+            self._inflight.clear()
+            loop, thread, executor = self._loop, self._thread, self._executor
+            self._loop = self._thread = self._slots = self._executor = None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+            loop.close()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_qa_service: Optional[QAService] = None
+_qa_service_lock = threading.Lock()
+
+
+def get_qa_service() -> QAService:
+    """The process-wide QA service"""
+    global _qa_service
+    with _qa_service_lock:
+        if _qa_service is None:
+            _qa_service = QAService(
+                max_workers=config.get('qa.service.max_workers', 4),
+                max_pending=config.get('qa.service.max_pending', 16),
+                timeout=config.get('qa.service.timeout', 60),
+                enhanced_timeout=config.get('qa.service.enhanced_timeout', 30),
+            )
+        return _qa_service
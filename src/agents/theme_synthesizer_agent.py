@@ -1,12 +1,17 @@
 from crewai import Agent
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from collections import Counter, defaultdict
 from uuid import uuid4
+import json
 import re
+import numpy as np
 from ..storage.models import ResearchNote, ResearchTheme
 from ..storage.database import db
+from ..storage.theme_index import ThemeCentroid, ThemeIndex
 from ..llm.llm_factory import LLMFactory
+from ..tools.note_clustering import NoteClusteringEngine, hashed_note_vectors
 from ..utils.app_logging import logger
+from ..utils.config import config
 
 class ThemeSynthesizerAgent:
     def __init__(self):
@@ -21,6 +26,18 @@ class ThemeSynthesizerAgent:
             verbose=True,
             llm=self.llm.generate
         )
+        
+        # Theme centroids persisted next to research_themes for incremental synthesis
+        self.theme_index = None
+        if config.get('research.themes.incremental', True) and NoteClusteringEngine.is_available():
+            try:
+                self.theme_index = ThemeIndex(db.db_path)
+            except Exception as e:
+                logger.warning(f"Incremental theme index unavailable: {e}")
+        self.assign_threshold = config.get('research.themes.assign_threshold', 0.25)
+        self.retitle_growth = config.get('research.themes.retitle_growth', 0.5)
+        self.batch_naming = config.get('research.themes.batch_naming', True)
+        self.naming_batch_chars = config.get('research.themes.naming_batch_chars', 12000)
     
     def extract_keywords(self, text: str, min_length: int = 4, max_keywords: int = 15) -> List[str]:
         """Extract meaningful keywords from text"""
@@ -78,24 +95,42 @@ class ThemeSynthesizerAgent:
         if not notes:
             return {}
         
+        if NoteClusteringEngine.is_available():
+            try:
+                engine = NoteClusteringEngine(
+                    distance_threshold=1.0 - similarity_threshold,
+                    agglomerative_limit=config.get('research.clustering.agglomerative_limit', 2500),
+                    random_state=config.get('research.clustering.random_state', 42)
+                )
+                return {cluster.name: cluster.notes for cluster in engine.cluster(notes)}
+            except Exception as e:
+                logger.warning(f"Vectorized clustering failed, using greedy clustering: {e}")
+        
+        return self._cluster_notes_greedy(notes, similarity_threshold)
+    
+    def _cluster_notes_greedy(self, notes: List[ResearchNote],
+                              similarity_threshold: float = 0.2) -> Dict[str, List[ResearchNote]]:
+        """Single-pass keyword-overlap clustering used when scikit-learn is unavailable"""
         clusters = {}
         note_keywords = {}
         
-        # Extract keywords for each note
+        # Extract keywords for each note once
         for note in notes:
-            note_keywords[note.id] = self.extract_keywords(note.content)
+            note_keywords[note.id] = set(self.extract_keywords(note.content, max_keywords=20))
         
         for note in notes:
             best_cluster = None
             max_similarity = 0
+            keywords = note_keywords[note.id]
             
             # Try to find best matching cluster
             for cluster_name, cluster_notes in clusters.items():
                 # Calculate average similarity with cluster
                 similarities = []
                 for cluster_note in cluster_notes[:5]:  # Check against first 5 notes in cluster
-                    sim = self.calculate_text_similarity(note.content, cluster_note.content)
-                    similarities.append(sim)
+                    other = note_keywords[cluster_note.id]
+                    union = len(keywords | other)
+                    similarities.append(len(keywords & other) / union if keywords and other else 0.0)
                 
                 avg_similarity = sum(similarities) / len(similarities) if similarities else 0
                 
@@ -107,7 +142,9 @@ class ThemeSynthesizerAgent:
                 clusters[best_cluster].append(note)
             else:
                 # Create new cluster
-                cluster_name = self.generate_cluster_name(note_keywords.get(note.id, []), note.note_type)
+                cluster_name = self.generate_cluster_name(
+                    self.extract_keywords(note.content), note.note_type
+                )
                 clusters[cluster_name] = [note]
         
         return clusters
@@ -132,26 +169,118 @@ class ThemeSynthesizerAgent:
                          min_cluster_size: int = 3) -> List[ResearchTheme]:
         """Synthesize research themes from note clusters"""
         themes = []
+        qualifying = {}
         
         for cluster_name, cluster_notes in note_clusters.items():
             if len(cluster_notes) < min_cluster_size:
                 logger.debug(f"Skipping cluster '{cluster_name}' with {len(cluster_notes)} notes (below minimum)")
                 continue
-            
+            qualifying[cluster_name] = cluster_notes
+        
+        for cluster_name, theme in self.create_themes_for_clusters(qualifying).items():
+            themes.append(theme)
+            logger.info(f"Created theme: {theme.title}")
+        
+        # If no themes created from clusters, create fallback themes
+        if not themes and note_clusters:
+            logger.warning("No themes created from clusters, creating fallback themes")
+            themes = self.create_fallback_themes(note_clusters)
+        
+        return themes
+    
+    def create_themes_for_clusters(self, clusters: Dict[str, List[ResearchNote]]) -> Dict[str, ResearchTheme]:
+        """Create one theme per cluster, naming clusters in batches when enabled"""
+        if not clusters:
+            return {}
+        if self.batch_naming and len(clusters) > 1:
+            return self.name_clusters_batched(clusters)
+        
+        themes = {}
+        for cluster_name, cluster_notes in clusters.items():
             try:
                 theme = self.create_theme_from_cluster(cluster_name, cluster_notes)
                 if theme:
-                    themes.append(theme)
-                    logger.info(f"Created theme: {theme.title}")
+                    themes[cluster_name] = theme
             except Exception as e:
                 logger.error(f"Error creating theme from cluster '{cluster_name}': {e}")
-                continue
+        return themes
+    
+    def name_clusters_batched(self, clusters: Dict[str, List[ResearchNote]]) -> Dict[str, ResearchTheme]:
+        """Title and describe many clusters with a few JSON-returning LLM calls
         
-        # If no themes created from clusters, create fallback themes
-        if not themes and note_clusters:
-            logger.warning("No themes created from clusters, creating fallback themes")
-            themes = self.create_fallback_themes(note_clusters)
+        Cluster samples are packed into prompts of at most ``naming_batch_chars``
+        characters. Clusters missing from a response get a fallback theme.
+        """
+        blocks = []
+        for index, (cluster_name, cluster_notes) in enumerate(clusters.items(), 1):
+            lines = [f"CLUSTER {index} ({cluster_name.replace('-', ' ').replace('_', ' ')}, "
+                     f"{len(cluster_notes)} notes):"]
+            for note in cluster_notes[:5]:
+                preview = note.content[:150] + "..." if len(note.content) > 150 else note.content
+                lines.append(f"- [{note.note_type}] {preview}")
+            blocks.append((index, cluster_name, "\n".join(lines)))
+        
+        batches, current, size = [], [], 0
+        for block in blocks:
+            if current and size + len(block[2]) > self.naming_batch_chars:
+                batches.append(current)
+                current, size = [], 0
+            current.append(block)
+            size += len(block[2])
+        if current:
+            batches.append(current)
+        
+        system_prompt = """You are an expert research analyst. For each cluster of research notes, identify 
+        the main concept and its research significance. Output JSON only."""
+        
+        named: Dict[str, Dict[str, str]] = {}
+        for batch in batches:
+            by_index = {index: cluster_name for index, cluster_name, _ in batch}
+            prompt = f"""
+        Research note clusters:
+        
+        {chr(10).join(text for _, _, text in batch)}
+        
+        Create one research theme per cluster. Respond with only a JSON array of objects
+        {{"cluster_id": <cluster number>, "title": "<max 80 characters>", "description": "<max 150 words>"}}
+        covering all {len(batch)} clusters.
+        """
+            try:
+                response = self.llm.generate(prompt, system_prompt)
+                entries = json.loads(re.search(r'\[.*\]', response, re.DOTALL).group(0))
+                for entry in entries if isinstance(entries, list) else []:
+                    if not isinstance(entry, dict):
+                        continue
+                    try:
+                        cluster_name = by_index.get(int(entry.get('cluster_id')))
+                    except (TypeError, ValueError):
+                        continue
+                    if cluster_name and str(entry.get('title') or '').strip():
+                        named[cluster_name] = entry
+            except Exception as e:
+                logger.warning(f"Batched theme naming failed for {len(batch)} clusters: {e}")
+        
+        themes = {}
+        for cluster_name, cluster_notes in clusters.items():
+            entry = named.get(cluster_name)
+            if entry is None:
+                themes[cluster_name] = self.create_fallback_theme(cluster_name, cluster_notes)
+                continue
+            title = str(entry['title']).strip()
+            description = str(entry.get('description') or '').strip() or (
+                f"Research theme focusing on {title.lower()}. Based on analysis of {len(cluster_notes)} "
+                f"related research notes covering various aspects of this topic."
+            )
+            themes[cluster_name] = ResearchTheme(
+                id=str(uuid4()),
+                title=title[:100],
+                description=description[:500],
+                papers=list(set([note.paper_id for note in cluster_notes if note.paper_id])),
+                frequency=len(cluster_notes),
+                confidence=min(0.9, 0.4 + (len(cluster_notes) * 0.05))
+            )
         
+        logger.info(f"Named {len(named)}/{len(clusters)} clusters in {len(batches)} LLM call(s)")
         return themes
     
     def create_theme_from_cluster(self, cluster_name: str, 
@@ -396,6 +525,125 @@ class ThemeSynthesizerAgent:
         
         return gaps[:7]  # Limit to 7 gaps
     
+    def update_themes_incrementally(self, notes: List[ResearchNote]
+                                    ) -> Tuple[List[ResearchTheme], Dict[str, List[ResearchNote]]]:
+        """Place notes into stored themes and cluster only the ones that fit none
+
+        Notes already assigned by an earlier run are skipped. Unassigned notes join
+        the nearest stored centroid when similar enough; the rest are clustered
+        into new themes. Titles and descriptions are regenerated only for new
+        themes and for themes whose note count grew by ``retitle_growth``.
+        Returns the themes touched by ``notes`` and their notes for this run.
+        """
+        centroids = self.theme_index.load_centroids()
+        stored = {theme.id: theme for theme in db.get_themes_by_ids(list(centroids))}
+        centroids = {theme_id: c for theme_id, c in centroids.items() if theme_id in stored}
+        
+        owners = self.theme_index.assignments([note.id for note in notes])
+        members: Dict[str, List[ResearchNote]] = defaultdict(list)
+        pending = []
+        for note in notes:
+            if owners.get(note.id) in centroids:
+                members[owners[note.id]].append(note)
+            else:
+                pending.append(note)
+        
+        assignments = []
+        grown: Dict[str, List[ResearchNote]] = defaultdict(list)
+        outliers = pending
+        if pending and centroids:
+            vectors = hashed_note_vectors(pending)
+            theme_ids = list(centroids)
+            matrix = np.vstack([centroids[t].centroid for t in theme_ids])
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            similarities = np.asarray(vectors @ (matrix / np.where(norms > 0, norms, 1.0)).T)
+            best = similarities.argmax(axis=1)
+            best_similarity = similarities[np.arange(len(pending)), best]
+            
+            outliers = []
+            rows = defaultdict(list)
+            for i, note in enumerate(pending):
+                if best_similarity[i] >= self.assign_threshold:
+                    theme_id = theme_ids[best[i]]
+                    rows[theme_id].append(i)
+                    grown[theme_id].append(note)
+                    assignments.append((note.id, theme_id, float(best_similarity[i])))
+                else:
+                    outliers.append(note)
+            for theme_id, indices in rows.items():
+                centroids[theme_id].absorb(vectors[indices])
+        
+        touched = []
+        stale = {}
+        for theme_id, added in grown.items():
+            theme = stored[theme_id]
+            centroid = centroids[theme_id]
+            members[theme_id].extend(added)
+            theme.papers = sorted(set(theme.papers) | {note.paper_id for note in added if note.paper_id})
+            theme.frequency = centroid.note_count
+            theme.confidence = max(theme.confidence, min(0.9, 0.4 + (theme.frequency * 0.05)))
+            if centroid.note_count >= centroid.titled_count * (1 + self.retitle_growth):
+                stale[theme_id] = members[theme_id]
+            touched.append(centroid)
+        
+        # Re-describe materially grown themes, keeping their identity
+        names = {}
+        for theme_id in stale:
+            name = stored[theme_id].title
+            names[name if name not in names else f"{name} ({theme_id[:8]})"] = theme_id
+        refreshed = self.create_themes_for_clusters({name: stale[theme_id] for name, theme_id in names.items()})
+        for name, theme_id in names.items():
+            update = refreshed.get(name)
+            if update:
+                stored[theme_id].title, stored[theme_id].description = update.title, update.description
+                centroids[theme_id].titled_count = centroids[theme_id].note_count
+                logger.info(f"Refreshed theme after growth: {update.title}")
+        
+        # Only notes that fit no stored theme are clustered from scratch
+        new_themes = []
+        if outliers:
+            note_clusters = self.cluster_notes_by_similarity(outliers) or {"general_research": outliers}
+            qualifying = {name: cluster_notes for name, cluster_notes in note_clusters.items()
+                          if len(cluster_notes) >= 3}
+            new_themes = [(theme, qualifying[name])
+                          for name, theme in self.create_themes_for_clusters(qualifying).items()]
+            
+            if not new_themes and not centroids:
+                logger.warning("No themes created from clusters, creating fallback themes")
+                new_themes = self._pair_fallback_themes(self.create_fallback_themes(note_clusters), outliers)
+        
+        new_themes = [(theme, cluster_notes) for theme, cluster_notes in new_themes if cluster_notes]
+        for theme, cluster_notes in new_themes:
+            vectors = hashed_note_vectors(cluster_notes)
+            centroid = ThemeCentroid(theme.id, np.zeros(vectors.shape[1], dtype=np.float32), 0, 0)
+            centroid.absorb(vectors)
+            centroid.titled_count = centroid.note_count
+            touched.append(centroid)
+            assignments.extend((note.id, theme.id, None) for note in cluster_notes)
+            stored[theme.id] = theme
+            members[theme.id] = list(cluster_notes)
+            logger.info(f"Created theme: {theme.title}")
+        
+        for centroid in touched:
+            try:
+                db.save_theme(stored[centroid.theme_id])
+            except Exception as e:
+                logger.error(f"Error saving theme {centroid.theme_id}: {e}")
+        self.theme_index.save(touched, assignments)
+        
+        assigned = {note_id for note_id, _, _ in assignments}
+        logger.info(f"Incremental theme update: {len(assigned)} notes assigned, "
+                    f"{len(grown)} themes extended, {len(new_themes)} themes created, "
+                    f"{sum(note.id not in assigned for note in outliers)} notes left unassigned")
+        
+        themes = sorted((stored[theme_id] for theme_id in members), key=lambda t: t.frequency, reverse=True)
+        return themes, {theme.id: members[theme.id] for theme in themes}
+    
+    def _pair_fallback_themes(self, themes: List[ResearchTheme], notes: List[ResearchNote]
+                              ) -> List[Tuple[ResearchTheme, List[ResearchNote]]]:
+        """Pair fallback themes with the notes of the papers they cover"""
+        return [(theme, [note for note in notes if note.paper_id in set(theme.papers)]) for theme in themes]
+    
     def synthesize_research_landscape(self, notes: List[ResearchNote]) -> Dict[str, Any]:
         """Main method to synthesize research landscape with improved error handling"""
         logger.info(f"Synthesizing themes from {len(notes)} research notes")
@@ -409,24 +657,27 @@ class ThemeSynthesizerAgent:
             }
         
         try:
-            # Cluster notes by similarity
-            note_clusters = self.cluster_notes_by_similarity(notes)
-            logger.info(f"Created {len(note_clusters)} note clusters")
-            
-            if not note_clusters:
-                logger.warning("No clusters created, creating single cluster")
-                note_clusters = {"general_research": notes}
-            
-            # Synthesize themes
-            themes = self.synthesize_themes(note_clusters)
-            
-            # Save themes to database
-            for theme in themes:
-                try:
-                    db.save_theme(theme)
-                    logger.debug(f"Saved theme: {theme.title}")
-                except Exception as e:
-                    logger.error(f"Error saving theme {theme.title}: {e}")
+            if self.theme_index is not None:
+                themes, note_clusters = self.update_themes_incrementally(notes)
+            else:
+                # Cluster notes by similarity
+                note_clusters = self.cluster_notes_by_similarity(notes)
+                logger.info(f"Created {len(note_clusters)} note clusters")
+                
+                if not note_clusters:
+                    logger.warning("No clusters created, creating single cluster")
+                    note_clusters = {"general_research": notes}
+                
+                # Synthesize themes
+                themes = self.synthesize_themes(note_clusters)
+                
+                # Save themes to database
+                for theme in themes:
+                    try:
+                        db.save_theme(theme)
+                        logger.debug(f"Saved theme: {theme.title}")
+                    except Exception as e:
+                        logger.error(f"Error saving theme {theme.title}: {e}")
             
             # Identify research gaps
             gaps = self.identify_research_gaps(themes, notes)
@@ -1,23 +1,28 @@
 from crewai import Crew, Task, Process
-from typing import List, Dict, Any, Optional, Callable
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Callable, Iterator, Tuple
+from datetime import datetime
 import time
 import asyncio
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from ..agents.literature_survey_agent import OptimizedLiteratureSurveyAgent
 from ..agents.note_taking_agent import NoteTakingAgent
 from ..agents.theme_synthesizer_agent import ThemeSynthesizerAgent
 from ..agents.draft_writer_agent import DraftWriterAgent
 from ..agents.citation_generator_agent import CitationGeneratorAgent
 from ..agents.qa_agent import QuestionAnsweringAgent
+from ..agents.qa_service import QAService, QAServiceBusy, get_qa_service
 from ..storage.database import db
+from ..storage.stage_cache import StageCache, fingerprint
+from .workflow import Stage, StageEvent, StageFailed, WorkflowDAG
 from ..utils.app_logging import logger
 from ..utils.config import config
+from ..utils.rate_control import RateLimitedError, is_rate_limited, llm_admission
 
 # Safe performance optimization (can be disabled if needed)
 try:
     from ..utils.performance_patch import (
-        get_optimized_batch_delay, 
         get_optimized_arxiv_delay, 
         get_smart_api_cooldown
     )
@@ -30,9 +35,25 @@ from ..utils.export_manager import export_manager
 from ..utils.performance_optimizer import optimizer, ultra_cache, turbo_batch_processor
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
+class _NoPapersFound(Exception):
+    pass
+
+
 class UltraFastResearchCrew:
     """Ultra-fast research crew with comprehensive performance optimizations"""
     
+    # Progress step reported for each workflow stage
+    WORKFLOW_STEPS = {
+        'literature_survey': 1,
+        'note_taking': 2,
+        'theme_synthesis': 3,
+        'citations': 4,
+        'draft_writing': 5,
+        'insert_citations': 5,
+    }
+    # Times a paper is requeued after the provider rejects it for rate limits
+    RATE_LIMIT_RETRIES = 2
+    
     def __init__(self):
         # Initialize all agents with error handling and performance optimization
         try:
@@ -43,9 +64,8 @@ class UltraFastResearchCrew:
                 self.theme_agent = ThemeSynthesizerAgent()
                 self.draft_agent = DraftWriterAgent()
                 self.citation_agent = CitationGeneratorAgent()
-                self.qa_agent = QuestionAnsweringAgent(config.__dict__ if config else None)
-                
-            logger.info("Enhanced QA Agent features integrated into main QA Agent")
+                # The QA agent is built on first use so research-only runs skip it
+                self._qa_agent = None
             
             # Performance-optimized configuration
             system_profile = optimizer.profile
@@ -54,6 +74,9 @@ class UltraFastResearchCrew:
             self.api_cooldown_time = config.get('research.api_cooldown', 60)  # 1 minute cooldown
             self.parallel_processing = config.get('research.parallel_processing', True)
             self.checkpoint_enabled = config.get('research.checkpoint_enabled', True)
+            self.max_parallel_stages = config.get('research.max_parallel_stages', 2)
+            # Stage outputs are cached in the research database, keyed by their inputs
+            self.stage_cache = StageCache(db.db_path)
             
             # Adaptive batch processing based on system capabilities
             self.optimal_batch_size = min(system_profile.batch_size, 5)  # Conservative for stability
@@ -75,6 +98,22 @@ class UltraFastResearchCrew:
             logger.error(f"Failed to initialize research crew: {e}")
             raise
     
+    @property
+    def qa_service(self) -> QAService:
+        return get_qa_service()
+    
+    @property
+    def qa_agent(self) -> QuestionAnsweringAgent:
+        if self._qa_agent is None:
+            # The agent behind the shared QA service, so caches and connections are reused
+            self._qa_agent = self.qa_service.agent
+            logger.info("Enhanced QA Agent features integrated into main QA Agent")
+        return self._qa_agent
+    
+    @qa_agent.setter
+    def qa_agent(self, agent):
+        self._qa_agent = agent
+    
     def get_supported_export_formats(self) -> Dict[str, bool]:
         """Get dictionary of supported export formats and their availability"""
         return export_manager.get_supported_formats()
@@ -84,79 +123,61 @@ class UltraFastResearchCrew:
         formats = export_manager.get_supported_formats()
         return [fmt for fmt, available in formats.items() if available]
     
-    def _save_checkpoint(self, step_name: str, data: Dict[str, Any], research_topic: str):
-        """Save workflow checkpoint for recovery"""
+    def _cached_stage(self, stage: str, key: str, compute: Callable[[], Any], topic: str,
+                      use_cache: bool, max_age_hours: Optional[float] = None) -> Any:
+        """Return the cached output for ``key`` or compute and cache it"""
         if not self.checkpoint_enabled:
-            return
-        
-        try:
-            checkpoint_path = config.get('storage.cache_dir', 'data/cache')
-            checkpoint_file = f"{checkpoint_path}/checkpoint_{research_topic}_{step_name}.json"
-            
-            import json
-            from pathlib import Path
-            Path(checkpoint_path).mkdir(parents=True, exist_ok=True)
-            
-            checkpoint_data = {
-                'timestamp': datetime.now().isoformat(),
-                'step': step_name,
-                'topic': research_topic,
-                'data': data
-            }
-            
-            with open(checkpoint_file, 'w') as f:
-                json.dump(checkpoint_data, f, indent=2, default=str)
-            
-            logger.debug(f"Checkpoint saved for step: {step_name}")
-            
-        except Exception as e:
-            logger.warning(f"Failed to save checkpoint for {step_name}: {e}")
+            return compute()
+        if use_cache:
+            cached = self.stage_cache.get(key, max_age_hours)
+            if cached is not None:
+                logger.info(f"Reusing cached {stage} output")
+                return cached
+        result = compute()
+        self.stage_cache.put(key, stage, result, topic)
+        return result
     
-    def _load_checkpoint(self, step_name: str, research_topic: str) -> Optional[Dict[str, Any]]:
-        """Load workflow checkpoint for recovery"""
+    def _extract_notes_incrementally(self, papers: List, research_topic: str, clean_topic: str,
+                                     use_cache: bool) -> List:
+        """Extract notes only for papers whose cached notes are missing or stale"""
+        def extract_all(pending, on_notes: Optional[Callable] = None, contents: Optional[Dict] = None):
+            def extract(paper, topic):
+                report = {}
+                notes = self.note_agent.extract_notes_from_paper(
+                    paper, topic, report=report, content=contents.get(paper.id) if contents else None)
+                if on_notes:
+                    on_notes(paper, topic, notes, report)
+                if report.get('rate_limited'):
+                    # Requeued by _process_papers_concurrently; the fallback notes are kept if retries run out
+                    raise RateLimitedError(f"Rate limited while extracting notes for "
+                                           f"{getattr(paper, 'title', 'Unknown')}", result=notes)
+                return notes
+            return self._process_papers_concurrently(pending, extract, research_topic)
+        
         if not self.checkpoint_enabled:
-            return None
+            return extract_all(papers)
         
-        try:
-            checkpoint_path = config.get('storage.cache_dir', 'data/cache')
-            checkpoint_file = f"{checkpoint_path}/checkpoint_{research_topic}_{step_name}.json"
-            
-            from pathlib import Path
-            if not Path(checkpoint_file).exists():
-                return None
-            
-            import json
-            with open(checkpoint_file, 'r') as f:
-                checkpoint_data = json.load(f)
-            
-            # Check if checkpoint is recent (within 24 hours)
-            checkpoint_time = datetime.fromisoformat(checkpoint_data['timestamp'])
-            if datetime.now() - checkpoint_time > timedelta(hours=24):
-                logger.info(f"Checkpoint for {step_name} is too old, ignoring")
-                return None
-            
-            logger.info(f"Loaded checkpoint for step: {step_name}")
-            return checkpoint_data['data']
-            
-        except Exception as e:
-            logger.warning(f"Failed to load checkpoint for {step_name}: {e}")
-            return None
-    
-    def _clear_checkpoints(self, research_topic: str):
-        """Clear all checkpoints for a research topic"""
-        try:
-            checkpoint_path = config.get('storage.cache_dir', 'data/cache')
-            from pathlib import Path
-            import glob
-            
-            pattern = f"{checkpoint_path}/checkpoint_{research_topic}_*.json"
-            for file_path in glob.glob(pattern):
-                Path(file_path).unlink(missing_ok=True)
-            
-            logger.debug(f"Cleared checkpoints for topic: {research_topic}")
-            
-        except Exception as e:
-            logger.warning(f"Failed to clear checkpoints: {e}")
+        prompt_version = f"{getattr(self.note_agent, 'PROMPT_VERSION', 'unversioned')}-" \
+                         f"{fingerprint(config.llm_config)[:12]}"
+        # Key the cache on the text notes are extracted from, which usually lives in the content store.
+        # It is selected once per paper, in parallel, and handed on to extraction for cache misses.
+        with ThreadPoolExecutor(thread_name_prefix='note-sources') as executor:
+            contents = dict(zip([paper.id for paper in papers], executor.map(self.note_agent.select_content, papers)))
+        texts = {paper_id: content[0] for paper_id, content in contents.items()}
+        by_paper = self.stage_cache.get_notes(papers, research_topic, prompt_version, texts) if use_cache else {}
+        missing = [paper for paper in papers if paper.id not in by_paper]
+        logger.info(f"Notes cached for {len(by_paper)} papers, extracting {len(missing)}")
+        
+        def cache_notes(paper, topic, notes, report):
+            # Only real extractions are cached; papers that fell back to template notes are retried next run
+            if notes and not report.get('degraded'):
+                self.stage_cache.put_notes(paper, topic, prompt_version, notes, texts[paper.id])
+            by_paper[paper.id] = notes or []
+        
+        extract_all(missing, cache_notes, contents)
+        notes = [note for paper in papers for note in by_paper.get(paper.id, [])]
+        self.stage_cache.put(fingerprint('note_taking', papers, prompt_version), 'note_taking', notes, clean_topic)
+        return notes
     
     @retry(
         stop=stop_after_attempt(3),
@@ -194,73 +215,68 @@ class UltraFastResearchCrew:
             
             raise
     
-    def _process_papers_in_batches(self, papers: List, batch_size: int = 3, 
-                                 process_func: Callable = None, research_topic: str = "") -> List:
-        """Process papers in batches to avoid overwhelming the API"""
+    def _process_papers_concurrently(self, papers: List, process_func: Callable = None,
+                                     research_topic: str = "") -> List:
+        """Process papers from a shared work queue as the LLM quota allows
+        
+        Workers take the next paper as soon as the admission controller lets
+        another one start; there are no fixed pauses between groups of papers.
+        Papers rejected by a rate limit (an exception, or ``RateLimitedError``
+        carrying a fallback result) are put back on the queue up to
+        ``RATE_LIMIT_RETRIES`` times. Results are returned in paper order.
+        """
         if not process_func or not papers:
             return []
         
-        results = []
-        total_batches = len(papers) // batch_size + (1 if len(papers) % batch_size else 0)
+        admission = llm_admission()
+        pending = deque((index, paper, 0) for index, paper in enumerate(papers))
+        results: Dict[int, Any] = {}
+        lock = threading.Lock()
         
-        for i in range(0, len(papers), batch_size):
-            batch = papers[i:i + batch_size]
-            batch_num = i // batch_size + 1
-            
-            logger.info(f"Processing batch {batch_num}/{total_batches} ({len(batch)} papers)")
-            
-            try:
-                if self.parallel_processing and len(batch) > 1:
-                    # Process batch in parallel with reduced concurrency
-                    with ThreadPoolExecutor(max_workers=min(2, len(batch))) as executor:
-                        future_to_paper = {
-                            executor.submit(process_func, paper, research_topic): paper 
-                            for paper in batch
-                        }
-                        
-                        for future in as_completed(future_to_paper, timeout=self.step_timeout):
-                            try:
-                                result = future.result(timeout=300)  # 5 minute timeout per paper
-                                if result:
-                                    if isinstance(result, list):
-                                        results.extend(result)
-                                    else:
-                                        results.append(result)
-                            except Exception as e:
-                                paper = future_to_paper[future]
-                                logger.warning(f"Failed to process paper {getattr(paper, 'title', 'Unknown')}: {e}")
-                else:
-                    # Sequential processing for small batches or when parallel is disabled
-                    for paper in batch:
-                        try:
-                            result = process_func(paper, research_topic)
-                            if result:
-                                if isinstance(result, list):
-                                    results.extend(result)
-                                else:
-                                    results.append(result)
-                        except Exception as e:
-                            logger.warning(f"Failed to process paper {getattr(paper, 'title', 'Unknown')}: {e}")
-                            continue
-                
-                # Add delay between batches to respect rate limits
-                if batch_num < total_batches:
-                    # Use optimized delays if available, otherwise fall back to original
-                    if PERFORMANCE_OPTIMIZATIONS_ENABLED:
-                        delay = get_optimized_batch_delay(batch_num, total_batches)
-                        logger.debug(f">> Optimized delay: {delay} seconds before next batch")
+        def work():
+            while True:
+                with lock:
+                    if not pending:
+                        return
+                    index, paper, attempts = pending.popleft()
+                admission.admit()
+                rate_limited = False
+                try:
+                    results[index] = process_func(paper, research_topic)
+                except Exception as e:
+                    rate_limited = is_rate_limited(e)
+                    if rate_limited and attempts < self.RATE_LIMIT_RETRIES:
+                        with lock:
+                            pending.append((index, paper, attempts + 1))
+                    elif isinstance(e, RateLimitedError):
+                        logger.warning(f"Still rate limited after {attempts + 1} attempts, keeping fallback "
+                                       f"result for {getattr(paper, 'title', 'Unknown')}")
+                        results[index] = e.result
                     else:
-                        delay = min(30, 10 * batch_num)  # Original progressive delay
-                        logger.debug(f"Waiting {delay} seconds before next batch")
-                    
-                    time.sleep(delay)
-                
-            except Exception as e:
-                logger.error(f"Error processing batch {batch_num}: {e}")
-                # Continue with next batch rather than failing completely
-                continue
+                        logger.warning(f"Failed to process paper {getattr(paper, 'title', 'Unknown')}: {e}")
+                finally:
+                    admission.release(rate_limited)
         
-        return results
+        workers = int(admission.limiter.maximum) if self.parallel_processing else 1
+        workers = max(1, min(workers, len(papers)))
+        logger.info(f"Processing {len(papers)} papers with up to {workers} workers "
+                    f"(admission limit {admission.limiter.limit})")
+        if workers == 1:
+            work()
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='papers') as executor:
+                for future in [executor.submit(work) for _ in range(workers)]:
+                    future.result()
+        
+        flattened = []
+        for index in sorted(results):
+            result = results[index]
+            if result:
+                if isinstance(result, list):
+                    flattened.extend(result)
+                else:
+                    flattened.append(result)
+        return flattened
     
     def create_tasks(self, research_topic: str, specific_aspects: List[str] = None,
                     max_papers: int = 100, paper_type: str = "survey") -> List[Task]:
@@ -402,6 +418,10 @@ class UltraFastResearchCrew:
                                  resume_from_checkpoint: bool = True) -> Dict[str, Any]:
         """Execute the complete research workflow with enhanced error handling and recovery
         
+        Stages run as a dependency graph: citations need only the papers, so they
+        are generated while notes, themes and the draft are being produced.
+        Per-stage wall times are returned under ``stage_timings``.
+        
         Args:
             research_topic: The main research topic
             specific_aspects: Specific aspects to focus on
@@ -409,7 +429,7 @@ class UltraFastResearchCrew:
             paper_type: Type of paper to generate (survey, review, analysis)
             date_from: Optional date filter for papers
             progress_callback: Optional callback function for progress updates
-            resume_from_checkpoint: Whether to resume from saved checkpoints
+            resume_from_checkpoint: Whether to reuse cached outputs of stages whose inputs are unchanged
         """
         
         logger.info(f"Starting research workflow for: {research_topic}")
@@ -426,247 +446,213 @@ class UltraFastResearchCrew:
                 except Exception as e:
                     logger.warning(f"Progress callback error: {e}")
         
-        # Track progress through workflow
-        workflow_state = {
-            'papers': None,
-            'notes': None,
-            'themes': None,
-            'gaps': None,
-            'citations': None,
-            'draft': None
-        }
+        llm_settings = config.llm_config
         
-        try:
-            # Step 1: Literature Survey with checkpoint recovery
-            logger.info("Step 1: Conducting literature survey...")
-            update_progress(1, "Searching academic databases (ArXiv, OpenAlex, CrossRef)...")
-            
-            if resume_from_checkpoint:
-                checkpoint_papers = self._load_checkpoint('literature_survey', clean_topic)
-                if checkpoint_papers:
-                    logger.info("Resuming from literature survey checkpoint")
-                    workflow_state['papers'] = checkpoint_papers
-                    update_progress(1, f"Resumed from checkpoint: {len(checkpoint_papers)} papers")
-            
-            if not workflow_state['papers']:
+        def cached(stage: str, key_parts: tuple, compute: Callable[[], Any], max_age_hours: Optional[float] = None):
+            """Reuse a stage output computed from identical inputs and settings"""
+            key = fingerprint(stage, key_parts, llm_settings)
+            return self._cached_stage(stage, key, compute, clean_topic, resume_from_checkpoint, max_age_hours)
+        
+        def survey_stage(_):
+            def search():
                 papers = self._execute_step_with_retry(
                     self.literature_agent.conduct_comprehensive_literature_survey,
                     "literature_survey",
                     research_topic, specific_aspects, max_papers, paper_type, date_from, True, True  # enable_ranking=True, parallel_search=True
                 )
-                
                 if not papers:
-                    error_msg = 'No papers found for the given topic'
-                    logger.error(error_msg)
-                    return {
-                        'success': False,
-                        'error': error_msg,
-                        'research_topic': research_topic,
-                        'execution_time': str(datetime.now() - start_time)
-                    }
-                
-                workflow_state['papers'] = papers
-                self._save_checkpoint('literature_survey', papers, clean_topic)
-            
-            papers = workflow_state['papers']
-            update_progress(1, f"Found {len(papers)} relevant papers")
-            
-            # Step 2: Note Taking with batch processing and checkpoint recovery
-            logger.info("Step 2: Extracting research notes...")
-            update_progress(2, "Extracting key insights from papers...")
-            
-            if resume_from_checkpoint:
-                checkpoint_notes = self._load_checkpoint('note_taking', clean_topic)
-                if checkpoint_notes:
-                    logger.info("Resuming from note taking checkpoint")
-                    workflow_state['notes'] = checkpoint_notes
-                    update_progress(2, f"Resumed from checkpoint: {len(checkpoint_notes)} notes")
-            
-            if not workflow_state['notes']:
-                # Process papers in smaller batches for better resilience
-                notes = self._process_papers_in_batches(
-                    papers, 
-                    batch_size=2,  # Smaller batches for better stability
-                    process_func=lambda paper, topic: self.note_agent.extract_notes_from_paper(paper, topic),
-                    research_topic=research_topic
-                )
-                
-                workflow_state['notes'] = notes
-                self._save_checkpoint('note_taking', notes, clean_topic)
-            
-            notes = workflow_state['notes']
-            update_progress(2, f"Extracted {len(notes)} research notes")
-            
-            # Step 3: Theme Synthesis with checkpoint recovery
-            logger.info("Step 3: Synthesizing research themes...")
-            update_progress(3, "Identifying research themes and patterns...")
-            
-            if resume_from_checkpoint:
-                checkpoint_synthesis = self._load_checkpoint('theme_synthesis', clean_topic)
-                if checkpoint_synthesis:
-                    logger.info("Resuming from theme synthesis checkpoint")
-                    workflow_state['themes'] = checkpoint_synthesis['themes']
-                    workflow_state['gaps'] = checkpoint_synthesis['gaps']
-                    update_progress(3, f"Resumed from checkpoint: {len(checkpoint_synthesis['themes'])} themes")
-            
-            if not workflow_state['themes']:
-                synthesis_result = self._execute_step_with_retry(
-                    self.theme_agent.synthesize_research_landscape,
-                    "theme_synthesis",
-                    notes
-                )
-                
-                workflow_state['themes'] = synthesis_result['themes']
-                workflow_state['gaps'] = synthesis_result['gaps']
-                self._save_checkpoint('theme_synthesis', synthesis_result, clean_topic)
-            
-            themes = workflow_state['themes']
-            gaps = workflow_state['gaps']
-            update_progress(3, f"Identified {len(themes)} research themes")
-            
-            # Step 4: Citation Generation with checkpoint recovery
-            logger.info("Step 4: Generating citations...")
-            update_progress(4, "Generating formatted citations with CrossRef enhancement...")
-            
-            if resume_from_checkpoint:
-                checkpoint_citations = self._load_checkpoint('citations', clean_topic)
-                if checkpoint_citations:
-                    logger.info("Resuming from citations checkpoint")
-                    workflow_state['citations'] = checkpoint_citations
-                    update_progress(4, f"Resumed from checkpoint: {len(checkpoint_citations)} citations")
-            
-            if not workflow_state['citations']:
-                citations = self._execute_step_with_retry(
-                    self.citation_agent.generate_citations_for_papers,
-                    "citations",
-                    papers
-                )
-                
-                workflow_state['citations'] = citations
-                self._save_checkpoint('citations', citations, clean_topic)
-            
-            citations = workflow_state['citations']
-            update_progress(4, f"Generated {len(citations)} citations")
-            
-            # Step 5: Draft Writing with enhanced safety measures
-            logger.info("Step 5: Writing paper draft...")
-            update_progress(5, "Composing academic paper draft...")
-            
-            if resume_from_checkpoint:
-                checkpoint_draft = self._load_checkpoint('draft_writing', clean_topic)
-                if checkpoint_draft:
-                    logger.info("Resuming from draft writing checkpoint")
-                    workflow_state['draft'] = checkpoint_draft
-                    update_progress(5, "Resumed from draft checkpoint")
-            
-            if not workflow_state['draft']:
-                draft = self._execute_step_with_retry(
-                    self.draft_agent.compile_full_draft,
-                    "draft_writing",
-                    research_topic, themes, papers, notes, gaps
-                )
-                
-                workflow_state['draft'] = draft
-                self._save_checkpoint('draft_writing', draft, clean_topic)
-            
-            draft = workflow_state['draft']
-            
-            # Step 6: Insert citations with error handling
-            logger.info("Step 6: Inserting citations...")
-            update_progress(5, "Inserting citations into draft...")
-            
-            try:
-                # Enhanced citation insertion with retry logic
-                for section_key, section_content in draft['sections'].items():
-                    try:
-                        if isinstance(section_content, dict) and 'content' in section_content:
-                            draft['sections'][section_key]['content'] = \
-                                self.citation_agent.insert_inline_citations(
-                                    section_content['content'], citations
-                                )
-                        elif isinstance(section_content, str):
-                            draft['sections'][section_key] = \
-                                self.citation_agent.insert_inline_citations(section_content, citations)
-                    except Exception as e:
-                        logger.warning(f"Failed to insert citations in section {section_key}: {e}")
-                        # Continue with other sections
-                        continue
-                
-                # Generate bibliography with error handling
-                try:
-                    bibliography = self.citation_agent.create_bibliography(citations, 'apa')
-                    draft['bibliography'] = bibliography
-                except Exception as e:
-                    logger.warning(f"Failed to generate bibliography: {e}")
-                    draft['bibliography'] = "Bibliography generation failed due to API limitations."
-                
-                # Generate citation quality report
-                try:
-                    citation_report = self.citation_agent.generate_citation_report(citations)
-                except Exception as e:
-                    logger.warning(f"Failed to generate citation report: {e}")
-                    citation_report = "Citation report generation failed."
-                
-            except Exception as e:
-                logger.error(f"Error during citation processing: {e}")
-                # Continue without citations rather than failing completely
-                citation_report = "Citation processing encountered errors."
-                bibliography = "Bibliography generation failed."
-            
-            # Calculate execution time
-            execution_time = datetime.now() - start_time
-            
-            # Final progress update
-            update_progress(5, "Research workflow completed successfully!")
-            
-            # Clear checkpoints on successful completion
-            if resume_from_checkpoint:
-                self._clear_checkpoints(clean_topic)
-            
-            # Compile final results
-            results = {
-                'success': True,
-                'research_topic': research_topic,
-                'execution_time': str(execution_time),
-                'statistics': {
-                    'papers_found': len(papers),
-                    'notes_extracted': len(notes),
-                    'themes_identified': len(themes),
-                    'gaps_identified': len(gaps),
-                    'citations_generated': len(citations)
-                },
-                'papers': papers,
-                'notes': notes,
-                'themes': themes,
-                'gaps': gaps,
-                'citations': citations,
-                'draft': draft,
-                'bibliography': bibliography if 'bibliography' in locals() else "Not available",
-                'citation_report': citation_report if 'citation_report' in locals() else "Not available"
-            }
-            
-            logger.info(f"Research workflow completed successfully in {execution_time}")
-            return results
+                    raise _NoPapersFound('No papers found for the given topic')
+                return papers
+            # Search results drift as sources add papers, so survey outputs expire
+            return cached('literature_survey',
+                          (research_topic, specific_aspects, max_papers, paper_type, date_from),
+                          search, config.get('research.survey_cache_hours', 24))
+        
+        def notes_stage(inputs):
+            return self._extract_notes_incrementally(inputs['literature_survey'], research_topic, clean_topic,
+                                                     resume_from_checkpoint)
+        
+        def themes_stage(inputs):
+            return cached('theme_synthesis', (inputs['note_taking'],), lambda: self._execute_step_with_retry(
+                self.theme_agent.synthesize_research_landscape,
+                "theme_synthesis",
+                inputs['note_taking']
+            ))
+        
+        def citations_stage(inputs):
+            return cached('citations', (inputs['literature_survey'],), lambda: self._execute_step_with_retry(
+                self.citation_agent.generate_citations_for_papers,
+                "citations",
+                inputs['literature_survey']
+            ))
+        
+        def draft_stage(inputs):
+            synthesis = inputs['theme_synthesis']
+            key_parts = (research_topic, synthesis, inputs['literature_survey'], inputs['note_taking'])
+            return cached('draft_writing', key_parts, lambda: self._execute_step_with_retry(
+                self.draft_agent.compile_full_draft,
+                "draft_writing",
+                research_topic, synthesis['themes'], inputs['literature_survey'], inputs['note_taking'],
+                synthesis['gaps']
+            ))
+        
+        def insert_citations_stage(inputs):
+            return self._insert_citations(inputs['draft_writing'], inputs['citations'],
+                                          inputs['literature_survey'])
+        
+        # Citations need only the papers, so they overlap notes, themes and drafting
+        stages = [
+            Stage('literature_survey', survey_stage),
+            Stage('citations', citations_stage, ('literature_survey',)),
+            Stage('note_taking', notes_stage, ('literature_survey',)),
+            Stage('theme_synthesis', themes_stage, ('note_taking',)),
+            Stage('draft_writing', draft_stage, ('theme_synthesis', 'literature_survey', 'note_taking')),
+            Stage('insert_citations', insert_citations_stage, ('draft_writing', 'citations', 'literature_survey')),
+        ]
+        
+        started_messages = {
+            'literature_survey': "Searching academic databases (ArXiv, OpenAlex, CrossRef)...",
+            'note_taking': "Extracting key insights from papers...",
+            'theme_synthesis': "Identifying research themes and patterns...",
+            'citations': "Generating formatted citations with CrossRef enhancement...",
+            'draft_writing': "Composing academic paper draft...",
+            'insert_citations': "Inserting citations into draft...",
+        }
+        completed_messages = {
+            'literature_survey': lambda papers: f"Found {len(papers)} relevant papers",
+            'note_taking': lambda notes: f"Extracted {len(notes)} research notes",
+            'theme_synthesis': lambda synthesis: f"Identified {len(synthesis['themes'])} research themes",
+            'citations': lambda citations: f"Generated {len(citations)} citations",
+            'draft_writing': lambda draft: "Draft composed",
+            'insert_citations': lambda inserted: "Citations inserted",
+        }
+        
+        def on_stage_event(event: StageEvent):
+            step = self.WORKFLOW_STEPS[event.stage]
+            if event.status == 'started':
+                update_progress(step, started_messages[event.stage])
+            elif event.status == 'completed':
+                update_progress(step, completed_messages[event.stage](event.result))
+        
+        workflow = WorkflowDAG(stages, max_concurrency=self.max_parallel_stages, on_event=on_stage_event)
+        
+        try:
+            stage_results = workflow.run()
+        except StageFailed as failure:
+            execution_time = str(datetime.now() - start_time)
+            if isinstance(failure.error, _NoPapersFound):
+                logger.error(str(failure.error))
+                return {
+                    'success': False,
+                    'error': str(failure.error),
+                    'research_topic': research_topic,
+                    'execution_time': execution_time
+                }
             
-        except Exception as e:
-            logger.error(f"Error in research workflow: {e}")
-            update_progress(0, f"Error occurred: {str(e)}")
+            logger.error(f"Error in research workflow: {failure.error}")
+            update_progress(0, f"Error occurred: {str(failure.error)}")
             
             # Return partial results if available
-            partial_results = {
+            done = failure.results
+            synthesis = done.get('theme_synthesis') or {}
+            return {
                 'success': False,
-                'error': str(e),
+                'error': str(failure.error),
                 'research_topic': research_topic,
-                'execution_time': str(datetime.now() - start_time),
+                'execution_time': execution_time,
+                'stage_timings': dict(workflow.timings),
                 'partial_data': {
-                    'papers': workflow_state.get('papers'),
-                    'notes': workflow_state.get('notes'),
-                    'themes': workflow_state.get('themes'),
-                    'gaps': workflow_state.get('gaps')
+                    'papers': done.get('literature_survey'),
+                    'notes': done.get('note_taking'),
+                    'themes': synthesis.get('themes'),
+                    'gaps': synthesis.get('gaps')
                 }
             }
+        
+        papers = stage_results['literature_survey']
+        notes = stage_results['note_taking']
+        themes = stage_results['theme_synthesis']['themes']
+        gaps = stage_results['theme_synthesis']['gaps']
+        citations = stage_results['citations']
+        draft, bibliography, citation_report = stage_results['insert_citations']
+        
+        # Calculate execution time
+        execution_time = datetime.now() - start_time
+        
+        # Final progress update
+        update_progress(5, "Research workflow completed successfully!")
+        
+        # Compile final results
+        results = {
+            'success': True,
+            'research_topic': research_topic,
+            'execution_time': str(execution_time),
+            'stage_timings': dict(workflow.timings),
+            'statistics': {
+                'papers_found': len(papers),
+                'notes_extracted': len(notes),
+                'themes_identified': len(themes),
+                'gaps_identified': len(gaps),
+                'citations_generated': len(citations)
+            },
+            'papers': papers,
+            'notes': notes,
+            'themes': themes,
+            'gaps': gaps,
+            'citations': citations,
+            'draft': draft,
+            'bibliography': bibliography,
+            'citation_report': citation_report
+        }
+        
+        logger.info(f"Research workflow completed successfully in {execution_time}")
+        return results
+    
+    def _insert_citations(self, draft: Dict[str, Any], citations: List, papers: List) -> Tuple[Dict[str, Any], str, str]:
+        """Insert inline citations into the draft; returns (draft, bibliography, citation report)"""
+        try:
+            # Local citation matching; the index is built once for all sections
+            citation_matcher = self.citation_agent.build_citation_matcher(citations, papers)
+            for section_key, section_content in draft['sections'].items():
+                try:
+                    if isinstance(section_content, dict) and 'content' in section_content:
+                        draft['sections'][section_key]['content'] = \
+                            self.citation_agent.insert_inline_citations(
+                                section_content['content'], citations, matcher=citation_matcher
+                            )
+                    elif isinstance(section_content, str):
+                        draft['sections'][section_key] = \
+                            self.citation_agent.insert_inline_citations(
+                                section_content, citations, matcher=citation_matcher
+                            )
+                except Exception as e:
+                    logger.warning(f"Failed to insert citations in section {section_key}: {e}")
+                    # Continue with other sections
+                    continue
             
-            return partial_results
+            # Generate bibliography with error handling
+            try:
+                bibliography = self.citation_agent.create_bibliography(citations, 'apa')
+                draft['bibliography'] = bibliography
+            except Exception as e:
+                logger.warning(f"Failed to generate bibliography: {e}")
+                bibliography = "Bibliography generation failed due to API limitations."
+                draft['bibliography'] = bibliography
+            
+            # Generate citation quality report
+            try:
+                citation_report = self.citation_agent.generate_citation_report(citations)
+            except Exception as e:
+                logger.warning(f"Failed to generate citation report: {e}")
+                citation_report = "Citation report generation failed."
+            
+        except Exception as e:
+            logger.error(f"Error during citation processing: {e}")
+            # Continue without citations rather than failing completely
+            citation_report = "Citation processing encountered errors."
+            bibliography = "Bibliography generation failed."
+        
+        return draft, bibliography, citation_report
     
     def save_results(self, results: Dict[str, Any], output_dir: str = None, 
                     export_formats: List[str] = None) -> str:
@@ -852,18 +838,19 @@ class UltraFastResearchCrew:
             return f"# Research Paper Draft\n\nError formatting content: {e}\n\nRaw data available in JSON format."
     
     def get_workflow_status(self, research_topic: str) -> Dict[str, Any]:
-        """Get the current status of a workflow from checkpoints"""
+        """Get the current status of a workflow from its cached stage outputs"""
         clean_topic = "".join(c for c in research_topic if c.isalnum() or c in (' ', '-', '_')).strip()
         
         steps = ['literature_survey', 'note_taking', 'theme_synthesis', 'citations', 'draft_writing']
+        cached = self.stage_cache.latest_for_topic(clean_topic)
         status = {}
         
         for step in steps:
-            checkpoint = self._load_checkpoint(step, clean_topic)
+            entry = cached.get(step)
             status[step] = {
-                'completed': checkpoint is not None,
-                'timestamp': checkpoint.get('timestamp') if checkpoint else None,
-                'data_size': len(checkpoint.get('data', [])) if checkpoint and isinstance(checkpoint.get('data'), list) else 0
+                'completed': entry is not None,
+                'timestamp': entry['timestamp'] if entry else None,
+                'data_size': entry['data_size'] if entry else 0
             }
         
         return {
@@ -873,10 +860,10 @@ class UltraFastResearchCrew:
         }
     
     def cleanup_failed_workflow(self, research_topic: str) -> bool:
-        """Clean up checkpoints and temporary files from a failed workflow"""
+        """Clean up cached stage outputs and temporary files from a failed workflow"""
         try:
             clean_topic = "".join(c for c in research_topic if c.isalnum() or c in (' ', '-', '_')).strip()
-            self._clear_checkpoints(clean_topic)
+            self.stage_cache.clear_topic(clean_topic)
             
             # Also clean up any temporary cache files
             cache_path = config.get('storage.cache_dir', 'data/cache')
@@ -972,7 +959,8 @@ class UltraFastResearchCrew:
             question: The research question to answer
             research_topic: Optional topic to filter papers (if None, searches all papers)
             paper_limit: Maximum number of papers to consider for the answer
-            use_enhanced: Whether to use enhanced QA agent (if available)
+            use_enhanced: False answers with the simplified agent directly; otherwise the
+                enhanced agent is used, falling back to the simplified one if it is too slow
             
         Returns:
             Dictionary containing the answer, sources, confidence score, and metadata
@@ -982,88 +970,28 @@ class UltraFastResearchCrew:
             
             start_time = time.time()
             
-            # Try enhanced QA first, with timeout protection
-            try:
-                logger.info("Using Enhanced QA Agent with all advanced features")
-                
-                # Use the QA agent to answer the question with timeout
-                import threading
-                import queue
-                
-                def qa_worker(q):
-                    try:
-                        result = self.qa_agent.answer_question(
-                            question=question,
-                            research_topic=research_topic,
-                            paper_limit=paper_limit
-                        )
-                        q.put(('success', result))
-                    except Exception as e:
-                        q.put(('error', e))
-                
-                # Create queue and thread for timeout handling
-                q = queue.Queue()
-                thread = threading.Thread(target=qa_worker, args=(q,))
-                thread.daemon = True
-                thread.start()
-                thread.join(timeout=30)  # 30 second timeout
-                
-                if thread.is_alive():
-                    # Thread is still running, timeout occurred
-                    raise TimeoutError("Enhanced QA processing timed out after 30 seconds")
-                
-                # Get result from queue
-                try:
-                    status, answer_result = q.get_nowait()
-                    if status == 'error':
-                        raise answer_result
-                except queue.Empty:
-                    raise TimeoutError("Enhanced QA failed to produce result")
-                    
-            except (TimeoutError, Exception) as e:
-                logger.warning(f"Enhanced QA failed or timed out: {e}")
-                logger.info("Falling back to simplified QA agent")
-                
-                # Fallback to simplified QA agent
-                from ..agents.simplified_qa import SimplifiedQAAgent
-                simplified_qa = SimplifiedQAAgent()
-                answer_result = simplified_qa.answer_question(
-                    question=question,
-                    research_topic=research_topic,
-                    paper_limit=paper_limit
-                )
-                answer_result['qa_agent_used'] = 'simplified_fallback'
-            
-            # Generate follow-up questions
-            follow_up_questions = []
+            # The shared service bounds concurrency, merges identical in-flight
+            # questions, enforces the deadline and falls back to the simplified agent
             try:
-                if hasattr(self.qa_agent, 'get_enhanced_follow_up_questions'):
-                    follow_up_questions = self.qa_agent.get_enhanced_follow_up_questions(question, answer_result)
-                elif hasattr(self.qa_agent, 'get_follow_up_questions'):
-                    follow_up_questions = self.qa_agent.get_follow_up_questions(question, answer_result)
-                elif 'follow_up_questions' not in answer_result:
-                    # Generate simple follow-ups if none exist
-                    follow_up_questions = [
-                        f"What are the main challenges related to {question.lower().replace('what is', '').replace('?', '').strip()}?",
-                        f"What are the latest developments in this area?"
-                    ]
-            except Exception as e:
-                logger.warning(f"Could not generate follow-up questions: {e}")
+                answer_result = self.qa_service.ask(question, research_topic, paper_limit,
+                                                    enhanced=use_enhanced is not False)
+            except QAServiceBusy as e:
+                logger.warning(f"QA service saturated: {e}")
+                return {
+                    'answer': "The system is busy answering other questions. Please try again shortly.",
+                    'sources': [],
+                    'confidence': 0.0,
+                    'paper_count': 0,
+                    'follow_up_questions': [],
+                    'error': 'busy'
+                }
             
-            if 'follow_up_questions' not in answer_result:
-                answer_result['follow_up_questions'] = follow_up_questions
+            execution_time = self._finalize_qa_result(
+                question, answer_result, research_topic, paper_limit, start_time
+            )
             
-            # Add timing and metadata
-            execution_time = time.time() - start_time
-            answer_result.update({
-                'execution_time': f"{execution_time:.2f} seconds",
-                'question': question,
-                'research_topic_filter': research_topic,
-                'paper_limit': paper_limit,
-                'qa_agent_used': 'enhanced'
-            })
-            
-            logger.info(f"Question answered successfully in {execution_time:.2f} seconds using enhanced QA agent")
+            logger.info(f"Question answered successfully in {execution_time:.2f} seconds "
+                        f"using {answer_result.get('qa_agent_used', 'enhanced')} QA agent")
             logger.info(f"Used {answer_result.get('paper_count', 0)} papers with confidence {answer_result.get('confidence', 0):.3f}")
             
             return answer_result
@@ -1079,6 +1007,87 @@ class UltraFastResearchCrew:
                 'error': str(e)
             }
     
+    def stream_research_question(self, question: str, research_topic: str = None,
+                                 paper_limit: int = 10, use_enhanced: bool = None) -> Iterator[Dict[str, Any]]:
+        """
+        Answer a research question, streaming the answer as it is generated
+        
+        Yields ``{'type': 'token', 'text': ...}`` events followed by a final
+        ``{'type': 'result', 'result': ...}`` event carrying the same dictionary
+        :meth:`answer_research_question` returns. ``use_enhanced`` is as there.
+        """
+        start_time = time.time()
+        logger.info(f"Streaming research question: {question}")
+        
+        answer_result = None
+        streamed_any = False
+        try:
+            for event in self.qa_service.stream(question, research_topic, paper_limit,
+                                                enhanced=use_enhanced is not False):
+                if event.get('type') == 'token':
+                    streamed_any = True
+                    yield event
+                elif event.get('type') == 'result':
+                    answer_result = event['result']
+        except Exception as e:
+            logger.warning(f"Streaming QA failed: {e}")
+        
+        if answer_result is None:
+            if streamed_any:
+                answer_result = {
+                    'answer': '',
+                    'confidence': 0.0,
+                    'error': 'Answer stream was interrupted'
+                }
+            else:
+                # Nothing reached the caller yet, so the blocking path can take over
+                logger.info("Falling back to non-streaming QA")
+                answer_result = self.answer_research_question(question, research_topic, paper_limit, use_enhanced)
+                if answer_result.get('answer'):
+                    yield {'type': 'token', 'text': answer_result['answer']}
+                yield {'type': 'result', 'result': answer_result}
+                return
+        
+        execution_time = self._finalize_qa_result(
+            question, answer_result, research_topic, paper_limit, start_time
+        )
+        logger.info(f"Streamed answer completed in {execution_time:.2f} seconds")
+        yield {'type': 'result', 'result': answer_result}
+    
+    def _finalize_qa_result(self, question: str, answer_result: Dict[str, Any],
+                            research_topic: Optional[str], paper_limit: int,
+                            start_time: float) -> float:
+        """Attach follow-up questions and timing metadata to a QA result"""
+        # Generate follow-up questions
+        follow_up_questions = []
+        try:
+            if hasattr(self.qa_agent, 'get_enhanced_follow_up_questions'):
+                follow_up_questions = self.qa_agent.get_enhanced_follow_up_questions(question, answer_result)
+            elif hasattr(self.qa_agent, 'get_follow_up_questions'):
+                follow_up_questions = self.qa_agent.get_follow_up_questions(question, answer_result)
+            elif 'follow_up_questions' not in answer_result:
+                # Generate simple follow-ups if none exist
+                follow_up_questions = [
+                    f"What are the main challenges related to {question.lower().replace('what is', '').replace('?', '').strip()}?",
+                    f"What are the latest developments in this area?"
+                ]
+        except Exception as e:
+            logger.warning(f"Could not generate follow-up questions: {e}")
+        
+        if 'follow_up_questions' not in answer_result:
+            answer_result['follow_up_questions'] = follow_up_questions
+        
+        # Add timing and metadata
+        execution_time = time.time() - start_time
+        answer_result.update({
+            'execution_time': f"{execution_time:.2f} seconds",
+            'question': question,
+            'research_topic_filter': research_topic,
+            'paper_limit': paper_limit
+        })
+        answer_result.setdefault('qa_agent_used', 'enhanced')
+        return execution_time
+    
     def interactive_qa_session(self, initial_topic: str = None) -> Dict[str, Any]:
         """
         Start an interactive QA session that allows multiple related questions
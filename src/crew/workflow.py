@@ -0,0 +1,122 @@
+"""
+Small DAG executor for research workflow stages.
+
+Stages declare the stages they depend on and receive those stages' results.
+A stage starts as soon as all of its dependencies have finished, with at most
+``max_concurrency`` stages running at once. Progress events are delivered on
+the thread that called :meth:`WorkflowDAG.run`, so callbacks that drive a UI
+never run on a worker thread.
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..utils.app_logging import logger
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[[Dict[str, Any]], Any]
+    depends_on: Tuple[str, ...] = ()
+
+
+@dataclass
+class StageEvent:
+    stage: str
+    status: str  # 'started', 'completed' or 'failed'
+    elapsed: float = 0.0
+    result: Any = None
+    error: Optional[BaseException] = None
+
+
+class StageFailed(Exception):
+    """A stage raised; the remaining stages were not started"""
+
+    def __init__(self, stage: str, error: BaseException, results: Dict[str, Any]):
+        super().__init__(f"Stage {stage} failed: {error}")
+        self.stage = stage
+        self.error = error
+        self.results = results
+
+
+@dataclass
+class WorkflowDAG:
+    stages: List[Stage]
+    max_concurrency: int = 2
+    on_event: Optional[Callable[[StageEvent], None]] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    def __post_init__(self):
+        # Zero or negative would leave every stage waiting for a slot forever
+        self.max_concurrency = max(1, int(self.max_concurrency))
+        names = [stage.name for stage in self.stages]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate stage names in {names}")
+        for stage in self.stages:
+            missing = [dep for dep in stage.depends_on if dep not in names]
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages {missing}")
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        by_name = {stage.name: stage for stage in self.stages}
+        done, visiting = set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Workflow stages form a cycle through {name}")
+            visiting.add(name)
+            for dep in by_name[name].depends_on:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for stage in self.stages:
+            visit(stage.name)
+
+    def _emit(self, event: StageEvent):
+        if self.on_event:
+            try:
+                self.on_event(event)
+            except Exception as e:
+                logger.warning(f"Workflow event callback error: {e}")
+
+    def run(self) -> Dict[str, Any]:
+        """Run every stage; returns results by stage name or raises :class:`StageFailed`"""
+        results: Dict[str, Any] = {}
+        pending = list(self.stages)
+        running: Dict[Future, Tuple[Stage, float]] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                thread_name_prefix='workflow') as executor:
+            while pending or running:
+                # Declaration order breaks ties, so earlier stages get free slots first
+                for stage in [s for s in pending if all(dep in results for dep in s.depends_on)]:
+                    if len(running) >= self.max_concurrency:
+                        break
+                    pending.remove(stage)
+                    inputs = {dep: results[dep] for dep in stage.depends_on}
+                    running[executor.submit(stage.run, inputs)] = (stage, time.time())
+                    self._emit(StageEvent(stage.name, 'started'))
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage, started = running.pop(future)
+                    elapsed = time.time() - started
+                    self.timings[stage.name] = elapsed
+                    error = future.exception()
+                    if error is not None:
+                        self._emit(StageEvent(stage.name, 'failed', elapsed, error=error))
+                        # Let stages already running finish, but start nothing new
+                        for other in running:
+                            other.cancel()
+                        raise StageFailed(stage.name, error, results)
+                    results[stage.name] = future.result()
+                    logger.info(f"Stage {stage.name} completed in {elapsed:.2f} seconds")
+                    self._emit(StageEvent(stage.name, 'completed', elapsed, result=results[stage.name]))
+        return results
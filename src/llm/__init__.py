@@ -7,9 +7,12 @@ This package contains various LLM client implementations and factory patterns.
 from .llm_factory import LLMFactory
 from .gemini_client import GeminiClient
 from .openai_client import OpenAIClient
+from .llm_router import LLMRouter, get_llm_router
 
 __all__ = [
     "LLMFactory",
     "GeminiClient",
     "OpenAIClient",
+    "LLMRouter",
+    "get_llm_router",
 ]
@@ -1,24 +1,33 @@
 import google.generativeai as genai
 import time
+import threading
 import re
 import json
-from typing import Optional, Dict, Any, List
+from contextlib import aclosing
+from typing import Optional, Dict, Any, List, Iterator, AsyncIterator
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 from ..utils.logging import logger
+from ..utils.error_handler import APIError
+from ..utils.rate_control import llm_admission
+from .streaming import aiter_from_sync
 
 class GeminiClient:
     def __init__(self, api_key: str, model: str = "gemini-2.5-flash", 
-                 temperature: float = 0.3, max_tokens: int = 4096):
+                 temperature: float = 0.3, max_tokens: int = 4096, fail_fast: bool = False):
         self.api_key = api_key
         self.model_name = model
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.last_request_time = 0
+        self._rate_lock = threading.Lock()
         self.min_request_interval = 1.0
         self.retry_count = 0
         self.max_retries = 3  # Reduced from 5 for faster processing
         self.consecutive_safety_blocks = 0
         self.max_safety_blocks = 3
+        # When routed alongside other backends, surface quota/service errors
+        # instead of sleeping through them or returning canned fallback text
+        self.fail_fast = fail_fast
         
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel(model)
@@ -35,25 +44,33 @@ class GeminiClient:
         logger.info(f"Initialized Gemini client with model: {model}")
     
     def _wait_for_rate_limit(self):
-        """Enhanced rate limiting with progressive backoff"""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        
-        # Progressive backoff based on retry attempts
-        wait_time = self.min_request_interval
-        if self.retry_count > 0:
-            wait_time = min(30, self.min_request_interval * (1.5 ** self.retry_count))
-        
-        if self.consecutive_safety_blocks > 1:
-            wait_time = max(wait_time, 3.0)  # Extra delay for safety blocks
+        """Enhanced rate limiting with progressive backoff
+
+        Safe to call from several threads: each caller reserves the next request
+        slot under a lock and sleeps outside it, so concurrent callers are spaced
+        out instead of all passing at once.
+        """
+        with self._rate_lock:
+            current_time = time.time()
+            time_since_last_request = current_time - self.last_request_time
+            
+            # Progressive backoff based on retry attempts
+            wait_time = self.min_request_interval
+            if self.retry_count > 0:
+                wait_time = min(30, self.min_request_interval * (1.5 ** self.retry_count))
+            
+            if self.consecutive_safety_blocks > 1:
+                wait_time = max(wait_time, 3.0)  # Extra delay for safety blocks
+            
+            sleep_time = max(0.0, wait_time - time_since_last_request)
+            self.last_request_time = current_time + sleep_time
         
-        if time_since_last_request < wait_time:
-            sleep_time = wait_time - time_since_last_request
+        if sleep_time > 0:
             if sleep_time > 0.1:
                 logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
             time.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
+        # Shared per-minute quota across every client and worker in the process
+        llm_admission().bucket.acquire()
     
     def _sanitize_academic_content(self, text: str, level: int = 1) -> str:
         """Multi-level content sanitization for academic text"""
@@ -492,6 +509,9 @@ Your research progress and data remain intact."""
                         continue
                 
                 elif any(term in error_msg for term in ["quota", "429", "rate limit"]):
+                    llm_admission().record_rate_limited()
+                    if self.fail_fast:
+                        raise APIError(f"Gemini rate limited: {e}", api_name="gemini", status_code=429)
                     if attempt < max_attempts:
                         wait_time = min(60, 10 * attempt)
                         logger.warning(f"Rate limit hit, waiting {wait_time} seconds...")
@@ -499,6 +519,8 @@ Your research progress and data remain intact."""
                         continue
                 
                 elif any(term in error_msg for term in ["503", "502", "500", "timeout", "dns", "getaddrinfo", "handshaker", "socket", "connection"]):
+                    if self.fail_fast:
+                        raise APIError(f"Gemini unavailable: {e}", api_name="gemini", status_code=503)
                     if attempt < max_attempts:
                         wait_time = min(30, 5 * attempt)
                         logger.warning(f"Network/DNS error, retrying in {wait_time} seconds...")
@@ -514,6 +536,10 @@ Your research progress and data remain intact."""
         # All attempts failed - determine best fallback
         logger.error(f"All {max_attempts} attempts failed for prompt generation")
         
+        if self.fail_fast:
+            raise APIError(f"Gemini generation failed after {max_attempts} attempts: {last_error}",
+                           api_name="gemini")
+        
         if self.consecutive_safety_blocks >= 3:
             return self._create_comprehensive_fallback(original_prompt, "safety")
         elif last_error and "quota" in str(last_error).lower():
@@ -522,7 +548,87 @@ Your research progress and data remain intact."""
             return self._create_comprehensive_fallback(original_prompt, "service")
         else:
             return self._create_comprehensive_fallback(original_prompt, "generic")
-    
+
+    def _extract_chunk_text(self, chunk) -> str:
+        """Extract text from a streamed response chunk without trimming whitespace"""
+        try:
+            if hasattr(chunk, 'candidates') and chunk.candidates:
+                candidate = chunk.candidates[0]
+                finish_reason = getattr(candidate, 'finish_reason', None)
+                if finish_reason in (2, 4, 5):  # SAFETY, RECITATION, OTHER
+                    raise ValueError(f"Stream blocked (finish_reason: {finish_reason})")
+
+                content = getattr(candidate, 'content', None)
+                if content and getattr(content, 'parts', None):
+                    return ''.join(part.text for part in content.parts if getattr(part, 'text', None))
+                return ''
+
+            return getattr(chunk, 'text', '') or ''
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.debug(f"Error extracting chunk text: {e}")
+            return ''
+
+    def generate_stream(self, prompt: str, system_prompt: Optional[str] = None) -> Iterator[str]:
+        """Stream generated text chunk by chunk
+
+        Uses the first-attempt safety settings of :meth:`generate`. If the stream fails
+        or is blocked before producing any text, falls back to the full retry ladder of
+        :meth:`generate` and yields its result as a single chunk.
+        """
+        if not prompt or not prompt.strip():
+            yield "Empty prompt provided. Please provide a valid research query."
+            return
+
+        produced = False
+        try:
+            self._wait_for_rate_limit()
+
+            safe_prompt = self._create_academic_prompt(prompt, system_prompt, safety_level=0)
+            if len(safe_prompt) > 15000:
+                safe_prompt = safe_prompt[:15000] + "\n\nPlease provide a comprehensive academic response."
+
+            response = self.model.generate_content(
+                safe_prompt,
+                generation_config=genai.types.GenerationConfig(
+                    temperature=self.temperature,
+                    max_output_tokens=self.max_tokens,
+                    candidate_count=1,
+                    top_p=0.95,
+                    top_k=40
+                ),
+                safety_settings=self._get_safety_settings(0),
+                stream=True
+            )
+
+            for chunk in response:
+                text = self._extract_chunk_text(chunk)
+                if text:
+                    produced = True
+                    yield text
+
+            if produced:
+                self.consecutive_safety_blocks = 0
+                return
+
+            logger.warning("Streaming produced no text, falling back to standard generation")
+
+        except Exception as e:
+            if produced:
+                # Partial output has already reached the caller; stop instead of restarting
+                logger.warning(f"Stream interrupted after partial output: {e}")
+                return
+            logger.warning(f"Streaming generation failed, falling back to standard generation: {e}")
+
+        yield self.generate(prompt, system_prompt)
+
+    async def generate_stream_async(self, prompt: str, system_prompt: Optional[str] = None) -> AsyncIterator[str]:
+        """Async variant of :meth:`generate_stream`"""
+        async with aclosing(aiter_from_sync(lambda: self.generate_stream(prompt, system_prompt))) as chunks:
+            async for text in chunks:
+                yield text
+
     def _enhance_academic_quality(self, text: str) -> str:
         """Enhance text quality when generated with high safety restrictions"""
         if not text or len(text.strip()) < 20:
@@ -1,12 +1,17 @@
 from typing import Union
 from .gemini_client import GeminiClient
 from .openai_client import OpenAIClient
+from .llm_router import LLMRouter, get_llm_router
 from ..utils.config import config
 
 class LLMFactory:
     @staticmethod
-    def create_llm() -> Union[GeminiClient, OpenAIClient]:
+    def create_llm() -> Union[GeminiClient, OpenAIClient, LLMRouter]:
         """Create LLM client based on configuration"""
+        if config.get('llm.router.enabled', False):
+            # One shared router so every agent contributes to the same routing stats
+            return get_llm_router()
+        
         llm_config = config.llm_config
         provider = llm_config.get('provider', 'gemini')
         
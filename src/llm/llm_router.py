@@ -0,0 +1,392 @@
+"""
+LLM router spreading requests over several configured backends.
+
+Backends are ranked per request by observed latency, quota headroom and recent
+error rate. A request that outlives the primary backend's p95 latency is hedged
+to the next-best backend and the first answer wins; failures fail over to the
+remaining backends. Enable with ``llm.router.enabled: true``:
+
+    llm:
+      router:
+        enabled: true
+        hedge_percentile: 0.95
+        backends:
+          - {name: gemini, provider: gemini, model: gemini-2.5-flash, requests_per_minute: 15}
+          - {name: openai, provider: openai, model: gpt-4o-mini, cost_per_1k_tokens: 0.0006}
+          - {name: local, provider: openai_compatible, base_url: "http://localhost:8000/v1"}
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import aclosing
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from tenacity import RetryError
+
+from ..utils.app_logging import logger
+from ..utils.config import config
+from ..utils.error_handler import APIError
+from .streaming import aiter_from_sync
+
+RATE_LIMIT_MARKERS = ("429", "quota", "rate limit", "resource exhausted")
+
+
+class RoutedBackend:
+    """One LLM client plus the live statistics used to route to it"""
+
+    def __init__(self, name: str, client: Any, requests_per_minute: Optional[int] = None,
+                 cost_per_1k_tokens: float = 0.0, window: int = 200):
+        self.name = name
+        self.client = client
+        self.requests_per_minute = requests_per_minute
+        self.cost_per_1k_tokens = cost_per_1k_tokens
+        self.latencies: deque = deque(maxlen=window)
+        self.outcomes: deque = deque(maxlen=50)  # True for success, False for failure
+        self.request_times: deque = deque()
+        self.cooldown_until = 0.0
+        self.in_flight = 0
+        self.counters = {
+            'requests': 0, 'successes': 0, 'errors': 0, 'rate_limited': 0,
+            'hedges_launched': 0, 'hedges_won': 0, 'tokens': 0,
+        }
+        self._lock = threading.Lock()
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        with self._lock:
+            if not self.latencies:
+                return None
+            ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(percentile * (len(ordered) - 1))))
+        return ordered[index]
+
+    def headroom(self, now: Optional[float] = None) -> float:
+        """Fraction of the per-minute quota still available (1.0 when unlimited)"""
+        now = now or time.time()
+        with self._lock:
+            while self.request_times and now - self.request_times[0] > 60:
+                self.request_times.popleft()
+            if now < self.cooldown_until:
+                return 0.0
+            if not self.requests_per_minute:
+                return 1.0
+            return max(0.0, 1.0 - len(self.request_times) / self.requests_per_minute)
+
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self.outcomes:
+                return 0.0
+            return self.outcomes.count(False) / len(self.outcomes)
+
+    def begin(self):
+        with self._lock:
+            self.in_flight += 1
+            self.counters['requests'] += 1
+            self.request_times.append(time.time())
+
+    def count(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def record_success(self, latency: float, tokens: int):
+        with self._lock:
+            self.in_flight -= 1
+            self.latencies.append(latency)
+            self.outcomes.append(True)
+            self.counters['successes'] += 1
+            self.counters['tokens'] += tokens
+
+    def record_failure(self, rate_limited: bool, cooldown: float):
+        with self._lock:
+            self.in_flight -= 1
+            self.outcomes.append(False)
+            self.counters['errors'] += 1
+            if rate_limited:
+                self.counters['rate_limited'] += 1
+                self.cooldown_until = time.time() + cooldown
+
+    def metrics(self) -> Dict[str, Any]:
+        p50 = self.latency_percentile(0.5)
+        p95 = self.latency_percentile(0.95)
+        with self._lock:
+            counters = dict(self.counters)
+            in_flight = self.in_flight
+            cooling = max(0.0, self.cooldown_until - time.time())
+        return {
+            **counters,
+            'in_flight': in_flight,
+            'latency_p50': round(p50, 3) if p50 is not None else None,
+            'latency_p95': round(p95, 3) if p95 is not None else None,
+            'error_rate': round(self.error_rate(), 3),
+            'quota_headroom': round(self.headroom(), 3),
+            'cooldown_remaining': round(cooling, 1),
+            'estimated_cost': round(counters['tokens'] / 1000 * self.cost_per_1k_tokens, 4),
+        }
+
+
+class LLMRouter:
+    """Drop-in LLM client that routes, hedges and fails over across backends"""
+
+    def __init__(self, backends: List[RoutedBackend], hedge_percentile: float = 0.95,
+                 hedge_min_samples: int = 5, hedge_default_delay: float = 20.0,
+                 rate_limit_cooldown: float = 30.0, default_latency: float = 5.0,
+                 max_workers: int = 16):
+        if not backends:
+            raise ValueError("LLMRouter needs at least one backend")
+        self.backends = backends
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_default_delay = hedge_default_delay
+        self.rate_limit_cooldown = rate_limit_cooldown
+        self.default_latency = default_latency
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-router")
+
+        logger.info(f"Initialized LLM router with backends: {[b.name for b in backends]}")
+
+    @classmethod
+    def from_config(cls, router_config: Optional[Dict[str, Any]] = None) -> 'LLMRouter':
+        """Build a router from the ``llm.router`` configuration section"""
+        router_config = router_config or {}
+        specs = router_config.get('backends') or _default_backend_specs()
+
+        backends = []
+        for spec in specs:
+            try:
+                backends.append(RoutedBackend(
+                    name=spec.get('name', spec.get('provider', 'backend')),
+                    client=_build_client(spec),
+                    requests_per_minute=spec.get('requests_per_minute'),
+                    cost_per_1k_tokens=float(spec.get('cost_per_1k_tokens', 0.0)),
+                ))
+            except Exception as e:
+                logger.warning(f"Skipping LLM backend {spec.get('name', spec.get('provider'))}: {e}")
+
+        return cls(
+            backends,
+            hedge_percentile=router_config.get('hedge_percentile', 0.95),
+            hedge_min_samples=router_config.get('hedge_min_samples', 5),
+            hedge_default_delay=router_config.get('hedge_default_delay', 20.0),
+            rate_limit_cooldown=router_config.get('rate_limit_cooldown', 30.0),
+            max_workers=router_config.get('max_workers', 16),
+        )
+
+    def rank_backends(self) -> List[RoutedBackend]:
+        """Order backends by expected time to answer, best first"""
+        now = time.time()
+
+        def expected_cost(indexed):
+            position, backend = indexed
+            headroom = backend.headroom(now)
+            latency = backend.latency_percentile(0.5) or self.default_latency
+            # Queueing and flakiness both stretch the expected completion time
+            score = latency * (1 + 0.25 * backend.in_flight) * (1 + 4 * backend.error_rate())
+            score /= max(headroom, 0.05)
+            return (headroom == 0.0, score, position)
+
+        return [b for _, b in sorted(enumerate(self.backends), key=expected_cost)]
+
+    def _hedge_delay(self, backend: RoutedBackend) -> float:
+        if len(backend.latencies) < self.hedge_min_samples:
+            return self.hedge_default_delay
+        return backend.latency_percentile(self.hedge_percentile) or self.hedge_default_delay
+
+    def _call(self, backend: RoutedBackend, prompt: str, system_prompt: Optional[str]) -> str:
+        backend.begin()
+        start = time.perf_counter()
+        try:
+            text = backend.client.generate(prompt, system_prompt)
+        except Exception as e:
+            error = _unwrap(e)
+            rate_limited = _is_rate_limited(error)
+            backend.record_failure(rate_limited, self.rate_limit_cooldown)
+            logger.warning(f"LLM backend {backend.name} failed: {error}")
+            raise error
+        if not text or not str(text).strip():
+            backend.record_failure(False, 0)
+            raise APIError(f"Empty response from {backend.name}", api_name=backend.name)
+        tokens = (len(prompt) + len(system_prompt or '') + len(text)) // 4
+        backend.record_success(time.perf_counter() - start, tokens)
+        return text
+
+    def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """Generate text on the best backend, hedging and failing over as needed"""
+        candidates = self.rank_backends()
+        pending = {}
+        errors = []
+        next_index = 0
+        hedged = False
+        deadline = 0.0
+
+        def launch(hedge: bool = False):
+            nonlocal next_index, deadline
+            backend = candidates[next_index]
+            next_index += 1
+            if hedge:
+                backend.count('hedges_launched')
+            pending[self._executor.submit(self._call, backend, prompt, system_prompt)] = (backend, hedge)
+            deadline = time.monotonic() + self._hedge_delay(backend)
+
+        launch()
+        while pending:
+            timeout = None
+            if not hedged and next_index < len(candidates):
+                timeout = max(0.0, deadline - time.monotonic())
+
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                logger.info(f"Hedging slow LLM request to {candidates[next_index].name}")
+                launch(hedge=True)
+                continue
+
+            for future in done:
+                backend, was_hedge = pending.pop(future)
+                try:
+                    text = future.result()
+                except Exception as e:
+                    errors.append(f"{backend.name}: {e}")
+                    continue
+                if was_hedge:
+                    backend.count('hedges_won')
+                # Slower duplicates finish in the background and still feed the stats
+                return text
+
+            if not pending and next_index < len(candidates):
+                logger.info(f"Failing over LLM request to {candidates[next_index].name}")
+                launch()
+
+        logger.error(f"All LLM backends failed: {errors}")
+        return self._final_fallback(prompt, errors)
+
+    def _final_fallback(self, prompt: str, errors: List[str]) -> str:
+        """Keep the single-provider contract: canned Gemini text if available, else raise"""
+        for backend in self.backends:
+            if hasattr(backend.client, '_create_comprehensive_fallback'):
+                return backend.client._create_comprehensive_fallback(prompt, "service")
+        raise APIError(f"All LLM backends failed: {'; '.join(errors)}", api_name="llm_router")
+
+    def generate_stream(self, prompt: str, system_prompt: Optional[str] = None) -> Iterator[str]:
+        """Stream from the best streaming-capable backend, failing over before the first chunk"""
+        for backend in self.rank_backends():
+            if not hasattr(backend.client, 'generate_stream'):
+                continue
+            produced = False
+            backend.begin()
+            start = time.perf_counter()
+            length = 0
+            try:
+                for text in backend.client.generate_stream(prompt, system_prompt):
+                    produced = True
+                    length += len(text)
+                    yield text
+            except Exception as e:
+                error = _unwrap(e)
+                backend.record_failure(_is_rate_limited(error), self.rate_limit_cooldown)
+                if produced:
+                    logger.warning(f"Stream from {backend.name} interrupted: {error}")
+                    return
+                logger.warning(f"Streaming backend {backend.name} failed, trying next: {error}")
+                continue
+            if produced:
+                backend.record_success(time.perf_counter() - start, (len(prompt) + length) // 4)
+                return
+            backend.record_failure(False, 0)
+
+        yield self.generate(prompt, system_prompt)
+
+    async def generate_stream_async(self, prompt: str, system_prompt: Optional[str] = None) -> AsyncIterator[str]:
+        """Async variant of :meth:`generate_stream`"""
+        async with aclosing(aiter_from_sync(lambda: self.generate_stream(prompt, system_prompt))) as chunks:
+            async for text in chunks:
+                yield text
+
+    def count_tokens(self, text: str) -> int:
+        """Estimate token count (approximate)"""
+        return len(text.split()) * 1.3
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-backend request, latency, error, quota and cost metrics"""
+        return {backend.name: backend.metrics() for backend in self.backends}
+
+    def export_metrics(self, path: Optional[str] = None) -> str:
+        """Write current metrics as JSON and return the file path"""
+        path = path or os.path.join(config.get('storage.cache_dir', 'data/cache'), 'llm_router_metrics.json')
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({'timestamp': time.time(), 'backends': self.get_metrics()}, f, indent=2)
+        return path
+
+
+def _unwrap(error: BaseException) -> BaseException:
+    """Return the underlying error of a tenacity RetryError"""
+    if isinstance(error, RetryError) and error.last_attempt is not None:
+        return error.last_attempt.exception() or error
+    return error
+
+
+def _is_rate_limited(error: BaseException) -> bool:
+    if getattr(error, 'status_code', None) == 429:
+        return True
+    details = getattr(error, 'error_context', None)
+    if details is not None and details.details.get('status_code') == 429:
+        return True
+    return any(marker in str(error).lower() for marker in RATE_LIMIT_MARKERS)
+
+
+def _build_client(spec: Dict[str, Any]):
+    """Instantiate a backend client from a router backend spec"""
+    from .gemini_client import GeminiClient
+    from .openai_client import OpenAIClient
+    from .local_stub_client import LocalStubClient
+
+    provider = spec.get('provider', 'gemini')
+    llm_config = config.llm_config
+    temperature = spec.get('temperature', llm_config.get('temperature', 0.1))
+    max_tokens = spec.get('max_tokens', llm_config.get('max_tokens', 4096))
+
+    if provider == 'gemini':
+        api_key = os.getenv(spec.get('api_key_env', 'GOOGLE_API_KEY'))
+        if not api_key:
+            raise ValueError("missing Gemini API key")
+        return GeminiClient(api_key=api_key, model=spec.get('model', 'gemini-2.5-flash'),
+                            temperature=temperature, max_tokens=max_tokens, fail_fast=True)
+    if provider in ('openai', 'openai_compatible'):
+        api_key = os.getenv(spec.get('api_key_env', 'OPENAI_API_KEY'))
+        if not api_key and provider == 'openai':
+            raise ValueError("missing OpenAI API key")
+        return OpenAIClient(api_key=api_key or 'not-needed', model=spec.get('model', 'gpt-4-turbo'),
+                            temperature=temperature, max_tokens=max_tokens,
+                            base_url=spec.get('base_url'), timeout=spec.get('timeout'),
+                            fail_fast=True)
+    if provider == 'local_stub':
+        return LocalStubClient(model=spec.get('model', 'local-stub'),
+                               latency=spec.get('latency', 0.0), fail_rate=spec.get('fail_rate', 0.0))
+    raise ValueError(f"Unsupported LLM provider: {provider}")
+
+
+def _default_backend_specs() -> List[Dict[str, Any]]:
+    """Gemini from the environment config, plus OpenAI when a key is present"""
+    llm_config = config.llm_config
+    specs = [{'name': 'gemini', 'provider': 'gemini',
+              'model': llm_config.get('model', 'gemini-2.5-flash')}]
+    if os.getenv('OPENAI_API_KEY'):
+        specs.append({'name': 'openai', 'provider': 'openai', 'model': 'gpt-4o-mini'})
+    return specs
+
+
+_router: Optional[LLMRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_llm_router() -> LLMRouter:
+    """Get the process-wide router so all agents share stats and quota tracking"""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = LLMRouter.from_config(config.get('llm.router', {}))
+    return _router
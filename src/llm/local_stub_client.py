@@ -0,0 +1,47 @@
+import time
+import hashlib
+from typing import Optional, Iterator
+from ..utils.app_logging import logger
+
+
+class LocalStubClient:
+    """Deterministic offline LLM backend for tests and router dry runs
+
+    Returns a fixed-shape academic paragraph derived from the prompt after an
+    optional artificial latency, so routing, hedging and failover can be exercised
+    without network access or API keys.
+    """
+
+    def __init__(self, model: str = "local-stub", latency: float = 0.0,
+                 fail_rate: float = 0.0, **_):
+        self.model = model
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self._calls = 0
+
+        logger.info(f"Initialized local stub LLM client (latency={latency}s)")
+
+    def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """Return a deterministic response for the prompt"""
+        self._calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        # Deterministically fail the requested fraction of calls
+        if self.fail_rate and int(self._calls * self.fail_rate) != int((self._calls - 1) * self.fail_rate):
+            raise RuntimeError("503 local stub simulated failure")
+
+        digest = hashlib.sha1(prompt.encode('utf-8', errors='ignore')).hexdigest()[:8]
+        topic = ' '.join(prompt.split()[:12])
+        return (f"[{self.model}:{digest}] This research overview addresses {topic}. "
+                f"The literature reports several methodological approaches, key findings "
+                f"and open research directions that merit further investigation.")
+
+    def generate_stream(self, prompt: str, system_prompt: Optional[str] = None) -> Iterator[str]:
+        """Stream the deterministic response word by word"""
+        for word in self.generate(prompt, system_prompt).split(' '):
+            yield word + ' '
+
+    def count_tokens(self, text: str) -> int:
+        """Estimate token count (approximate)"""
+        return len(text.split()) * 1.3
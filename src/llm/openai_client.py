@@ -1,19 +1,30 @@
 import openai
-from typing import Optional
-from tenacity import retry, stop_after_attempt, wait_exponential
+from contextlib import aclosing
+from typing import Optional, Iterator, AsyncIterator
+from tenacity import retry, wait_exponential
 from ..utils.app_logging import logger
+from .streaming import aiter_from_sync
 
 class OpenAIClient:
     def __init__(self, api_key: str, model: str = "gpt-4-turbo",
-                 temperature: float = 0.1, max_tokens: int = 4096):
-        self.client = openai.OpenAI(api_key=api_key)
+                 temperature: float = 0.1, max_tokens: int = 4096,
+                 base_url: Optional[str] = None, timeout: Optional[float] = None,
+                 fail_fast: bool = False):
+        # base_url allows any OpenAI-compatible endpoint (vLLM, Ollama, LM Studio)
+        client_kwargs = {'api_key': api_key, 'base_url': base_url}
+        if timeout is not None:
+            client_kwargs['timeout'] = timeout
+        self.client = openai.OpenAI(**client_kwargs)
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
+        # Routed clients skip local retries so the router can fail over instead
+        self.fail_fast = fail_fast
         
         logger.info(f"Initialized OpenAI client with model: {model}")
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+    @retry(stop=lambda state: state.attempt_number >= (1 if state.args[0].fail_fast else 3),
+           wait=wait_exponential(multiplier=1, min=4, max=10))
     def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """Generate text using OpenAI API"""
         try:
@@ -34,6 +45,39 @@ class OpenAIClient:
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
             raise
+
+    def generate_stream(self, prompt: str, system_prompt: Optional[str] = None) -> Iterator[str]:
+        """Stream generated text using OpenAI API"""
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                stream=True
+            )
+
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if text:
+                    yield text
+
+        except Exception as e:
+            logger.error(f"OpenAI streaming error: {e}")
+            raise
+
+    async def generate_stream_async(self, prompt: str, system_prompt: Optional[str] = None) -> AsyncIterator[str]:
+        """Async variant of :meth:`generate_stream`"""
+        async with aclosing(aiter_from_sync(lambda: self.generate_stream(prompt, system_prompt))) as chunks:
+            async for text in chunks:
+                yield text
     
     def count_tokens(self, text: str) -> int:
         """Estimate token count (approximate)"""
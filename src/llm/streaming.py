@@ -0,0 +1,111 @@
+"""
+Streaming helpers shared by the LLM clients and agents.
+
+The LLM SDKs expose blocking chunk iterators; these helpers bridge them to
+asyncio consumers (and back) without buffering the whole response.
+"""
+
+import asyncio
+import queue
+import threading
+from typing import AsyncIterator, Callable, Iterator, TypeVar
+
+from ..utils.app_logging import logger
+
+T = TypeVar('T')
+
+_DONE = object()
+
+
+class _StreamError:
+    """Carries an exception raised on the producer side to the consumer"""
+
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+async def aiter_from_sync(make_iter: Callable[[], Iterator[T]]) -> AsyncIterator[T]:
+    """Consume a blocking iterator on a worker thread and yield its items asynchronously
+
+    Closing or cancelling the async iterator stops the worker before its next
+    item and closes the source iterator, so an abandoned stream does not keep
+    pulling chunks from the LLM. A chunk already being fetched still finishes.
+    """
+    loop = asyncio.get_running_loop()
+    items: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def send(item):
+        try:
+            loop.call_soon_threadsafe(items.put_nowait, item)
+        except RuntimeError:
+            # The consumer's loop is already closed; nobody is left to read
+            stop.set()
+
+    def pump():
+        source = None
+        try:
+            source = make_iter()
+            for item in source:
+                if stop.is_set():
+                    break
+                send(item)
+        except BaseException as e:
+            if not stop.is_set():
+                send(_StreamError(e))
+        finally:
+            close = getattr(source, 'close', None)
+            if close is not None:
+                try:
+                    close()
+                except Exception as e:
+                    logger.debug(f"Error closing stream source: {e}")
+            send(_DONE)
+
+    producer = loop.run_in_executor(None, pump)
+
+    try:
+        while True:
+            item = await items.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _StreamError):
+                raise item.exc
+            yield item
+        await producer
+    finally:
+        stop.set()
+
+
+def iter_from_async(make_aiter: Callable[[], AsyncIterator[T]]) -> Iterator[T]:
+    """Drive an async iterator on a private event loop thread and yield its items synchronously
+
+    Works whether or not the caller already has a running event loop (Streamlit,
+    click commands and notebooks all differ here).
+    """
+    items: queue.Queue = queue.Queue()
+
+    def run():
+        async def drain():
+            async for item in make_aiter():
+                items.put(item)
+
+        try:
+            asyncio.run(drain())
+        except BaseException as e:
+            items.put(_StreamError(e))
+        finally:
+            items.put(_DONE)
+
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+
+    while True:
+        item = items.get()
+        if item is _DONE:
+            break
+        if isinstance(item, _StreamError):
+            raise item.exc
+        yield item
+
+    worker.join()
@@ -5,9 +5,11 @@ This package contains database models and persistence utilities.
 """
 
 from .database import DatabaseManager, db
+from .semantic_cache import SemanticQACache
 from .models import *
 
 __all__ = [
     "DatabaseManager",
     "db",
+    "SemanticQACache",
 ]
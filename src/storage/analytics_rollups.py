@@ -0,0 +1,169 @@
+"""
+Incrementally maintained analytics rollups for the dashboard.
+
+Each paper is tagged with its source type, publication year, citation range
+and topic once, when it is written (``paper_rollup_buckets``). Triggers on
+``papers`` keep per-bucket counts in ``analytics_rollups`` current, so
+dashboard reads touch one row per bucket instead of scanning the papers table.
+"""
+
+import sqlite3
+from typing import Dict, List, Tuple
+
+# Bucket expressions over a papers row; ``{p}`` is the row prefix (``NEW.`` or empty)
+BUCKETS: Dict[str, str] = {
+    'source': """
+        CASE
+            WHEN {p}venue IS NULL OR {p}venue = '' THEN 'Unknown Source'
+            WHEN {p}venue LIKE '%arxiv%' THEN 'ArXiv'
+            WHEN {p}venue LIKE '%conference%' THEN 'Conference'
+            WHEN {p}venue LIKE '%journal%' THEN 'Journal'
+            WHEN {p}venue LIKE '%workshop%' THEN 'Workshop'
+            ELSE SUBSTR({p}venue, 1, 20)
+        END""",
+    'year': """
+        CASE
+            WHEN {p}published_date IS NOT NULL AND {p}published_date != '' THEN
+                CASE
+                    WHEN {p}published_date LIKE '____-%' THEN SUBSTR({p}published_date, 1, 4)
+                    WHEN {p}published_date LIKE '%20__' THEN SUBSTR({p}published_date, -4, 4)
+                    WHEN {p}published_date LIKE '%202_' OR {p}published_date LIKE '%201_'
+                        THEN SUBSTR({p}published_date, -4, 4)
+                    ELSE 'Unknown'
+                END
+            ELSE 'Unknown'
+        END""",
+    'citations': """
+        CASE
+            WHEN {p}citations IS NULL OR {p}citations = 0 THEN '0'
+            WHEN {p}citations <= 10 THEN '1-10'
+            WHEN {p}citations <= 50 THEN '11-50'
+            WHEN {p}citations <= 100 THEN '51-100'
+            ELSE '100+'
+        END""",
+    # LIKE is case-insensitive for ASCII, so no LOWER() is needed
+    'topic': """
+        CASE
+            WHEN {p}title IS NULL THEN NULL
+            WHEN {p}title LIKE '%machine learning%' OR {p}abstract LIKE '%machine learning%' THEN 'Machine Learning'
+            WHEN {p}title LIKE '%deep learning%' OR {p}abstract LIKE '%deep learning%' THEN 'Deep Learning'
+            WHEN {p}title LIKE '%artificial intelligence%' OR {p}title LIKE '%ai%' THEN 'Artificial Intelligence'
+            WHEN {p}title LIKE '%neural network%' OR {p}abstract LIKE '%neural network%' THEN 'Neural Networks'
+            WHEN {p}title LIKE '%computer vision%' OR {p}abstract LIKE '%computer vision%' THEN 'Computer Vision'
+            WHEN {p}title LIKE '%natural language%' OR {p}abstract LIKE '%nlp%' THEN 'Natural Language Processing'
+            WHEN {p}title LIKE '%blockchain%' OR {p}abstract LIKE '%blockchain%' THEN 'Blockchain'
+            WHEN {p}title LIKE '%quantum%' OR {p}abstract LIKE '%quantum%' THEN 'Quantum Computing'
+            WHEN {p}title LIKE '%data mining%' OR {p}abstract LIKE '%data mining%' THEN 'Data Mining'
+            WHEN {p}title LIKE '%reinforcement%' OR {p}abstract LIKE '%reinforcement%' THEN 'Reinforcement Learning'
+            ELSE 'General Research'
+        END""",
+}
+
+CITATION_BUCKET_ORDER = ['0', '1-10', '11-50', '51-100', '100+']
+
+_DIMENSIONS = list(BUCKETS)
+
+_TABLES = f"""
+    CREATE TABLE IF NOT EXISTS analytics_rollups (
+        dimension TEXT NOT NULL,
+        bucket TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (dimension, bucket)
+    );
+    CREATE TABLE IF NOT EXISTS paper_rollup_buckets (
+        paper_id TEXT PRIMARY KEY,
+        {', '.join(f'{dimension} TEXT' for dimension in _DIMENSIONS)}
+    );
+"""
+
+
+def _retire(paper_id: str) -> str:
+    """Uncount the buckets a paper was tagged with, if any, and drop its tags"""
+    return ''.join(
+        f"UPDATE analytics_rollups SET count = count - 1 WHERE dimension = '{dimension}' AND bucket = "
+        f"(SELECT {dimension} FROM paper_rollup_buckets WHERE paper_id = {paper_id});\n"
+        for dimension in _DIMENSIONS
+    ) + f"DELETE FROM paper_rollup_buckets WHERE paper_id = {paper_id};\n"
+
+
+def _tag_and_count() -> str:
+    """Tag NEW with its buckets and count it"""
+    # No OR IGNORE/OR REPLACE here: the firing statement's conflict policy would override them
+    statements = [
+        f"INSERT INTO paper_rollup_buckets (paper_id, {', '.join(_DIMENSIONS)}) "
+        f"VALUES (NEW.id, {', '.join(BUCKETS[d].format(p='NEW.') for d in _DIMENSIONS)});"
+    ]
+    for dimension in _DIMENSIONS:
+        tagged = f"(SELECT {dimension} FROM paper_rollup_buckets WHERE paper_id = NEW.id)"
+        statements.append(
+            f"INSERT INTO analytics_rollups (dimension, bucket, count) "
+            f"SELECT '{dimension}', {tagged}, 0 WHERE {tagged} IS NOT NULL AND NOT EXISTS "
+            f"(SELECT 1 FROM analytics_rollups WHERE dimension = '{dimension}' AND bucket = {tagged});"
+        )
+        statements.append(
+            f"UPDATE analytics_rollups SET count = count + 1 "
+            f"WHERE dimension = '{dimension}' AND bucket = {tagged};"
+        )
+    return '\n'.join(statements)
+
+
+# Retiring by stored tags makes INSERT OR REPLACE correct whether or not the
+# connection has recursive_triggers on (sqlite-utils enables it, so REPLACE
+# also fires the delete trigger there; plain sqlite3 connections do not).
+_TRIGGERS = f"""
+    CREATE TRIGGER IF NOT EXISTS analytics_rollups_insert AFTER INSERT ON papers BEGIN
+        {_retire('NEW.id')}
+        {_tag_and_count()}
+    END;
+    CREATE TRIGGER IF NOT EXISTS analytics_rollups_delete AFTER DELETE ON papers BEGIN
+        {_retire('OLD.id')}
+    END;
+    CREATE TRIGGER IF NOT EXISTS analytics_rollups_update
+    AFTER UPDATE OF id, title, abstract, venue, published_date, citations ON papers BEGIN
+        {_retire('OLD.id')}
+        {_tag_and_count()}
+    END;
+"""
+
+
+def create_rollup_schema(conn: sqlite3.Connection):
+    """Create the rollup tables and the triggers that maintain them"""
+    conn.executescript(f"{_TABLES}\n{_TRIGGERS}")
+
+
+def tag_papers(conn: sqlite3.Connection, first_rowid: int, last_rowid: int):
+    """Tag untagged papers in a rowid range; counts are derived later by :func:`recount_rollups`"""
+    conn.execute(
+        f"INSERT INTO paper_rollup_buckets (paper_id, {', '.join(_DIMENSIONS)}) "
+        f"SELECT id, {', '.join(BUCKETS[d].format(p='') for d in _DIMENSIONS)} FROM papers "
+        f"WHERE rowid BETWEEN ? AND ? "
+        f"AND NOT EXISTS (SELECT 1 FROM paper_rollup_buckets WHERE paper_id = papers.id)",
+        (first_rowid, last_rowid)
+    )
+
+
+def recount_rollups(conn: sqlite3.Connection):
+    """Recompute every bucket count from the paper tags"""
+    conn.execute("DELETE FROM analytics_rollups")
+    for dimension in _DIMENSIONS:
+        conn.execute(
+            f"INSERT INTO analytics_rollups (dimension, bucket, count) "
+            f"SELECT '{dimension}', {dimension}, COUNT(*) FROM paper_rollup_buckets "
+            f"WHERE {dimension} IS NOT NULL GROUP BY {dimension}"
+        )
+
+
+def rebuild_rollups(conn: sqlite3.Connection):
+    """Re-tag every paper and recount all buckets"""
+    with conn:
+        conn.execute("DELETE FROM paper_rollup_buckets")
+        tag_papers(conn, 0, 2 ** 63 - 1)
+        recount_rollups(conn)
+
+
+def rollup_counts(conn: sqlite3.Connection, dimension: str) -> List[Tuple[str, int]]:
+    """Non-empty (bucket, count) pairs for a dimension, largest first"""
+    return [tuple(row) for row in conn.execute(
+        "SELECT bucket, count FROM analytics_rollups WHERE dimension = ? AND count > 0 "
+        "ORDER BY count DESC, bucket", (dimension,)
+    )]
@@ -0,0 +1,229 @@
+"""
+Section-tagged passage index over paper full text.
+
+Full text is split once, when it is stored, into passages of at most
+``max_chars`` characters, each tagged with the section heading it falls
+under. Passages go into ``paper_chunks`` with an FTS5 index, so question
+answering fetches the best passages across papers with one ranked query
+instead of re-splitting and rescanning every paper's text per question.
+Passage embeddings are filled in separately (:func:`embed_pending_chunks`)
+and rerank the FTS candidates once every candidate has one.
+"""
+
+import hashlib
+import re
+import sqlite3
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..utils.app_logging import logger
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS paper_chunks (
+        id INTEGER PRIMARY KEY,
+        paper_id TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        section TEXT NOT NULL,
+        text TEXT NOT NULL,
+        embedding BLOB
+    );
+    CREATE INDEX IF NOT EXISTS idx_paper_chunks_paper ON paper_chunks(paper_id, position);
+    CREATE TABLE IF NOT EXISTS paper_chunk_sources (
+        paper_id TEXT PRIMARY KEY,
+        text_hash TEXT NOT NULL
+    );
+    CREATE VIRTUAL TABLE IF NOT EXISTS paper_chunks_fts USING fts5(
+        section, text, content='paper_chunks', content_rowid='id', tokenize='porter unicode61'
+    );
+"""
+
+# Canonical section names for common heading wordings
+SECTION_ALIASES = {
+    'abstract': 'abstract',
+    'introduction': 'introduction',
+    'background': 'background',
+    'related work': 'related_work',
+    'literature review': 'related_work',
+    'method': 'method', 'methods': 'method', 'methodology': 'method', 'approach': 'method',
+    'materials and methods': 'method', 'proposed method': 'method',
+    'experiments': 'results', 'experimental results': 'results', 'results': 'results',
+    'evaluation': 'results', 'results and discussion': 'results',
+    'discussion': 'discussion',
+    'limitations': 'limitations',
+    'future work': 'future_work',
+    'conclusion': 'conclusion', 'conclusions': 'conclusion', 'concluding remarks': 'conclusion',
+    'references': 'references', 'bibliography': 'references',
+}
+_HEADING = re.compile(
+    r'^[ \t]*(?:\d+(?:\.\d+)*\.?|[IVX]+\.)?[ \t]*(' +
+    '|'.join(sorted((re.escape(alias) for alias in SECTION_ALIASES), key=len, reverse=True)) +
+    r')[ \t]*[:.]?[ \t]*$',
+    re.IGNORECASE | re.MULTILINE
+)
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+_QUERY_TERM = re.compile(r'[a-z0-9]{3,}')
+_STOP_WORDS = frozenset(
+    'the and for with from that this what which who how why when where are was were has have had does did '
+    'can could would should will about into over under between their there these those than then them they '
+    'its also such used using use paper papers study studies'.split()
+)
+
+
+def create_chunk_index_schema(conn: sqlite3.Connection):
+    conn.executescript(_SCHEMA)
+
+
+def _sections(text: str) -> Iterable[Tuple[str, str]]:
+    """(section, body) pairs; text before the first heading is tagged 'body'"""
+    section, start = 'body', 0
+    for match in _HEADING.finditer(text):
+        yield section, text[start:match.start()]
+        section, start = SECTION_ALIASES[' '.join(match.group(1).lower().split())], match.end()
+    yield section, text[start:]
+
+
+def _pack(body: str, max_chars: int) -> List[str]:
+    """Greedily pack paragraphs, then sentences, into passages of at most ``max_chars``"""
+    pieces = []
+    for paragraph in re.split(r'\n\s*\n', body):
+        paragraph = ' '.join(paragraph.split())
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+        else:
+            for sentence in _SENTENCE_END.split(paragraph):
+                pieces.extend(sentence[i:i + max_chars] for i in range(0, len(sentence), max_chars))
+
+    passages, current = [], ''
+    for piece in filter(None, pieces):
+        if current and len(current) + 1 + len(piece) > max_chars:
+            passages.append(current)
+            current = piece
+        else:
+            current = f"{current} {piece}" if current else piece
+    if current:
+        passages.append(current)
+    return passages
+
+
+def chunk_full_text(text: str, max_chars: int = 1200, min_chars: int = 40) -> List[Tuple[str, str]]:
+    """Split full text into ``(section, passage)`` pairs, dropping the reference list"""
+    chunks = []
+    for section, body in _sections(text or ''):
+        if section == 'references':
+            continue
+        chunks.extend((section, passage) for passage in _pack(body, max_chars) if len(passage) >= min_chars)
+    return chunks
+
+
+def index_chunks(conn: sqlite3.Connection, items: Iterable[Tuple[str, str]], max_chars: int = 1200) -> int:
+    """(Re)index ``(paper_id, full_text)`` items; unchanged text is skipped. Returns papers indexed."""
+    indexed = 0
+    for paper_id, text in items:
+        if not text:
+            continue
+        text_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        row = conn.execute("SELECT text_hash FROM paper_chunk_sources WHERE paper_id = ?", (paper_id,)).fetchone()
+        if row and row[0] == text_hash:
+            continue
+        _delete_chunks(conn, paper_id)
+        for position, (section, passage) in enumerate(chunk_full_text(text, max_chars)):
+            cursor = conn.execute("INSERT INTO paper_chunks (paper_id, position, section, text) VALUES (?, ?, ?, ?)",
+                                  (paper_id, position, section, passage))
+            conn.execute("INSERT INTO paper_chunks_fts (rowid, section, text) VALUES (?, ?, ?)",
+                         (cursor.lastrowid, section, passage))
+        conn.execute("INSERT OR REPLACE INTO paper_chunk_sources (paper_id, text_hash) VALUES (?, ?)",
+                     (paper_id, text_hash))
+        indexed += 1
+    return indexed
+
+
+def _delete_chunks(conn: sqlite3.Connection, paper_id: str):
+    # External-content FTS rows are removed with the special 'delete' command
+    conn.execute("INSERT INTO paper_chunks_fts (paper_chunks_fts, rowid, section, text) "
+                 "SELECT 'delete', id, section, text FROM paper_chunks WHERE paper_id = ?", (paper_id,))
+    conn.execute("DELETE FROM paper_chunks WHERE paper_id = ?", (paper_id,))
+
+
+def index_chunks_in_db(db_path: str, items: List[Tuple[str, str]]):
+    """Index passages from a separate connection, e.g. after an async save"""
+    if not items:
+        return
+    try:
+        conn = sqlite3.connect(db_path, timeout=30.0)
+        try:
+            with conn:
+                index_chunks(conn, items)
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Could not index paper passages: {e}")
+
+
+def embed_pending_chunks(conn: sqlite3.Connection, encode: Callable[[List[str]], np.ndarray],
+                         limit: int = 256, batch_size: int = 64) -> int:
+    """Store embeddings for up to ``limit`` passages that have none yet"""
+    rows = conn.execute("SELECT id, text FROM paper_chunks WHERE embedding IS NULL LIMIT ?", (limit,)).fetchall()
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        vectors = np.asarray(encode([text for _, text in batch]), dtype=np.float32)
+        with conn:
+            conn.executemany("UPDATE paper_chunks SET embedding = ? WHERE id = ?",
+                             [(vector.tobytes(), chunk_id) for (chunk_id, _), vector in zip(batch, vectors)])
+    return len(rows)
+
+
+def fts_query(question: str) -> Optional[str]:
+    """OR of the question's content words, quoted so FTS5 syntax in the question is inert"""
+    terms = [term for term in dict.fromkeys(_QUERY_TERM.findall(question.lower())) if term not in _STOP_WORDS]
+    return ' OR '.join(f'"{term}"' for term in terms) or None
+
+
+def fts_phrase(text: str) -> Optional[str]:
+    """The text's words as a single quoted FTS5 phrase"""
+    words = re.findall(r'\w+', text.lower())
+    return '"' + ' '.join(words) + '"' if words else None
+
+
+def search_chunks(conn: sqlite3.Connection, question: str, limit: int = 8,
+                  paper_ids: Optional[Sequence[str]] = None,
+                  query_vector: Optional[np.ndarray] = None) -> List[Dict[str, object]]:
+    """Best passages for a question, ranked by BM25 and, with ``query_vector``, embedding similarity
+
+    Candidates are only reranked when all of them are embedded, so passages
+    still waiting for an embedding are never compared on a different scale.
+    """
+    match = fts_query(question)
+    if not match:
+        return []
+    sql = ("SELECT c.paper_id, c.section, c.text, c.embedding, bm25(paper_chunks_fts) AS rank "
+           "FROM paper_chunks_fts JOIN paper_chunks c ON c.id = paper_chunks_fts.rowid "
+           "WHERE paper_chunks_fts MATCH ?")
+    params: List[object] = [match]
+    if paper_ids:
+        ids = list(paper_ids)[:900]
+        sql += f" AND c.paper_id IN ({','.join('?' * len(ids))})"
+        params.extend(ids)
+    candidates = limit * 4 if query_vector is not None else limit
+    rows = conn.execute(sql + " ORDER BY rank LIMIT ?", params + [candidates]).fetchall()
+    if not rows:
+        return []
+
+    # bm25() is lower-is-better; map to (0, 1] relative to the best hit
+    best = min(row[4] for row in rows)
+    passages = [{'paper_id': paper_id, 'section': section, 'text': text,
+                 'score': (rank / best) if best < 0 else 1.0, '_embedding': embedding}
+                for paper_id, section, text, embedding, rank in rows]
+
+    if query_vector is not None and all(passage['_embedding'] is not None for passage in passages):
+        query = np.asarray(query_vector, dtype=np.float32)
+        query_norm = np.linalg.norm(query) or 1.0
+        for passage in passages:
+            vector = np.frombuffer(passage['_embedding'], dtype=np.float32)
+            similarity = float(vector @ query / ((np.linalg.norm(vector) or 1.0) * query_norm))
+            passage['score'] = 0.5 * passage['score'] + 0.5 * max(0.0, similarity)
+        passages.sort(key=lambda passage: passage['score'], reverse=True)
+
+    for passage in passages:
+        del passage['_embedding']
+    return passages[:limit]
@@ -0,0 +1,153 @@
+"""
+Compressed, content-addressed storage for paper full text and PDF extractions.
+
+Large text lives outside the ``papers`` row so that scans of the papers table
+stay narrow. Each distinct text is stored once in ``content_blobs`` keyed by
+its SHA-256 and compressed with zstd when ``zstandard`` is installed, zlib
+otherwise; ``paper_content`` maps ``(paper_id, kind)`` to a blob and is read
+lazily by paper ID.
+"""
+
+import hashlib
+import json
+import sqlite3
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..utils.app_logging import logger
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+FULL_TEXT = 'full_text'
+PDF_PAGES = 'pdf_pages'
+PDF_TABLES = 'pdf_tables'
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS content_blobs (
+        hash TEXT PRIMARY KEY,
+        codec TEXT NOT NULL,
+        raw_size INTEGER NOT NULL,
+        data BLOB NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS paper_content (
+        paper_id TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        hash TEXT NOT NULL,
+        PRIMARY KEY (paper_id, kind)
+    );
+    CREATE INDEX IF NOT EXISTS idx_paper_content_hash ON paper_content(hash);
+"""
+
+
+def _compress(raw: bytes) -> Tuple[str, bytes]:
+    if zstandard is not None:
+        return 'zstd', zstandard.ZstdCompressor(level=6).compress(raw)
+    return 'zlib', zlib.compress(raw, 6)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("content was stored with zstd but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == 'zlib':
+        return zlib.decompress(data)
+    return data
+
+
+def store_content(conn: sqlite3.Connection, items: Iterable[Tuple[str, str, Optional[str]]]):
+    """Store ``(paper_id, kind, text)`` items; empty text removes the mapping"""
+    blobs, mappings, removed = {}, [], []
+    for paper_id, kind, text in items:
+        if not text:
+            removed.append((paper_id, kind))
+            continue
+        raw = text.encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()
+        if digest not in blobs:
+            blobs[digest] = raw
+        mappings.append((paper_id, kind, digest))
+
+    known = set()
+    digests = list(blobs)
+    for start in range(0, len(digests), 500):
+        chunk = digests[start:start + 500]
+        known.update(row[0] for row in conn.execute(
+            f"SELECT hash FROM content_blobs WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+        ))
+
+    new_blobs = []
+    for digest, raw in blobs.items():
+        if digest not in known:
+            codec, data = _compress(raw)
+            new_blobs.append((digest, codec, len(raw), data))
+
+    conn.executemany("INSERT INTO content_blobs (hash, codec, raw_size, data) VALUES (?, ?, ?, ?) "
+                     "ON CONFLICT(hash) DO NOTHING", new_blobs)
+    conn.executemany("DELETE FROM paper_content WHERE paper_id = ? AND kind = ?", removed)
+    conn.executemany("INSERT INTO paper_content (paper_id, kind, hash) VALUES (?, ?, ?) "
+                     "ON CONFLICT(paper_id, kind) DO UPDATE SET hash = excluded.hash", mappings)
+
+
+def store_content_in_db(db_path: str, items: List[Tuple[str, str, Optional[str]]]):
+    """Store content items from a separate connection, e.g. after an async save"""
+    if not items:
+        return
+    try:
+        conn = sqlite3.connect(db_path, timeout=30.0)
+        try:
+            with conn:
+                store_content(conn, items)
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Could not store paper content: {e}")
+
+
+def load_content(conn: sqlite3.Connection, paper_ids: List[str], kind: str = FULL_TEXT) -> Dict[str, str]:
+    """Decompress stored text of one kind for the given papers"""
+    result = {}
+    for start in range(0, len(paper_ids), 500):
+        chunk = paper_ids[start:start + 500]
+        rows = conn.execute(
+            f"SELECT pc.paper_id, b.codec, b.data FROM paper_content pc "
+            f"JOIN content_blobs b ON b.hash = pc.hash "
+            f"WHERE pc.kind = ? AND pc.paper_id IN ({','.join('?' * len(chunk))})",
+            [kind] + chunk
+        ).fetchall()
+        for paper_id, codec, data in rows:
+            result[paper_id] = _decompress(codec, data).decode('utf-8')
+    return result
+
+
+def pdf_extraction_items(paper_id: str, extraction: Dict[str, Any]) -> List[Tuple[str, str, Optional[str]]]:
+    """Content items for a ``PDFProcessor`` result: full text, page texts and tables"""
+    pages = extraction.get('pages') or []
+    tables = extraction.get('tables') or []
+    return [
+        (paper_id, FULL_TEXT, extraction.get('text')),
+        (paper_id, PDF_PAGES, json.dumps(pages, default=str) if pages else None),
+        (paper_id, PDF_TABLES, json.dumps(tables, default=str) if tables else None),
+    ]
+
+
+def prune_content(conn: sqlite3.Connection) -> int:
+    """Delete blobs no paper refers to any more"""
+    with conn:
+        cursor = conn.execute("DELETE FROM content_blobs WHERE hash NOT IN (SELECT hash FROM paper_content)")
+    return cursor.rowcount
+
+
+def create_content_schema(conn: sqlite3.Connection):
+    conn.executescript(_SCHEMA)
+
+
+def move_inline_full_text(conn: sqlite3.Connection, rows: List[Tuple[str, Optional[str]]]) -> int:
+    """Move ``(paper_id, full_text)`` rows from ``papers.full_text`` into the store"""
+    rows = [row for row in rows if row[1] is not None]
+    store_content(conn, [(paper_id, FULL_TEXT, text) for paper_id, text in rows])
+    conn.executemany("UPDATE papers SET full_text = NULL WHERE id = ?", [(row[0],) for row in rows])
+    return len(rows)
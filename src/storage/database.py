@@ -13,6 +13,13 @@ import weakref
 import json
 
 from .models import Paper, ResearchNote, ResearchTheme, Citation
+from .semantic_cache import invalidate_for_papers, invalidate_semantic_qa_cache
+from .analytics_rollups import CITATION_BUCKET_ORDER, rebuild_rollups, rollup_counts
+from .paper_index import index_papers, index_papers_in_db, normalize_term
+from .chunk_index import embed_pending_chunks, fts_phrase, index_chunks, index_chunks_in_db, search_chunks
+from .content_store import (FULL_TEXT, PDF_PAGES, PDF_TABLES, load_content, pdf_extraction_items,
+                            prune_content, store_content, store_content_in_db)
+from .migrations import run_migrations
 from ..utils.config import config
 from ..utils.app_logging import logger
 from ..utils.database_optimizer import EnhancedDatabaseOptimizer
@@ -44,18 +51,11 @@ class DatabaseManager:
         # Initialize database optimizer
         self.optimizer = EnhancedDatabaseOptimizer(self.db_path)
         
-        # Initialize tables using the main thread connection
+        # Bring the schema up to date; a current database needs no DDL
         self._initialize_tables()
         
         # Apply performance pragmas
         self._apply_performance_optimizations()
-        
-        # Run initial optimization
-        try:
-            self.optimizer.create_indexes()
-            logger.debug("Database indexes initialized successfully")
-        except Exception as e:
-            logger.warning(f"Failed to initialize database indexes: {e}")
     
     def _apply_performance_optimizations(self):
         """Apply SQLite performance optimizations"""
@@ -106,92 +106,16 @@ class DatabaseManager:
             raise
     
     def _initialize_tables(self):
-        """Initialize database tables with thread safety"""
+        """Apply pending schema migrations and cache table columns"""
         try:
-            # Check if database already exists and has proper structure
-            if Path(self.db_path).exists():
-                try:
-                    # Quick check if tables exist
-                    init_db = sqlite_utils.Database(self.db_path)
-                    tables = init_db.table_names()
-                    required_tables = {'papers', 'research_notes', 'research_themes', 'citations'}
-                    
-                    if required_tables.issubset(set(tables)):
-                        # Tables exist, just cache columns and return
-                        self._cache_column_names(init_db)
-                        init_db.close()
-                        logger.debug(f"Database tables already initialized at: {self.db_path}")
-                        return
-                    init_db.close()
-                except Exception:
-                    pass  # If check fails, proceed with full initialization
+            applied = run_migrations(self.db_path, config.get('storage.migration_batch_size', 500))
+            if applied:
+                logger.info(f"Database at {self.db_path} migrated to schema version {applied[-1]}")
             
-            # Use a simple connection for initialization - removed connect_kwargs
             init_db = sqlite_utils.Database(self.db_path)
-            
-            init_db.executescript("""
-                CREATE TABLE IF NOT EXISTS papers (
-                    id TEXT PRIMARY KEY,
-                    title TEXT NOT NULL,
-                    authors TEXT,
-                    abstract TEXT,
-                    url TEXT,
-                    published_date TEXT,
-                    venue TEXT,
-                    citations INTEGER DEFAULT 0,
-                    pdf_path TEXT,
-                    full_text TEXT,
-                    keywords TEXT,
-                    doi TEXT,
-                    arxiv_id TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-                
-                CREATE TABLE IF NOT EXISTS research_notes (
-                    id TEXT PRIMARY KEY,
-                    paper_id TEXT,
-                    content TEXT NOT NULL,
-                    note_type TEXT,
-                    confidence REAL DEFAULT 0.0,
-                    page_number INTEGER,
-                    created_at TEXT,
-                    FOREIGN KEY (paper_id) REFERENCES papers (id)
-                );
-                
-                CREATE TABLE IF NOT EXISTS research_themes (
-                    id TEXT PRIMARY KEY,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    papers TEXT,
-                    frequency INTEGER DEFAULT 0,
-                    confidence REAL DEFAULT 0.0,
-                    related_themes TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-                
-                CREATE TABLE IF NOT EXISTS citations (
-                    id TEXT PRIMARY KEY,
-                    paper_id TEXT,
-                    citation_key TEXT,
-                    apa_format TEXT,
-                    mla_format TEXT,
-                    bibtex TEXT,
-                    FOREIGN KEY (paper_id) REFERENCES papers (id)
-                );
-                
-                CREATE INDEX IF NOT EXISTS idx_papers_title ON papers(title);
-                CREATE INDEX IF NOT EXISTS idx_notes_paper_id ON research_notes(paper_id);
-                CREATE INDEX IF NOT EXISTS idx_themes_frequency ON research_themes(frequency);
-            """)
-            
-            # Cache column names for each table
             self._cache_column_names(init_db)
-            
-            # Close the initialization connection
             init_db.close()
             
-            logger.debug(f"Database initialized at: {self.db_path}")
-            
         except Exception as e:
             logger.error(f"Error initializing database: {e}")
             raise
@@ -281,9 +205,15 @@ class DatabaseManager:
     def save_paper(self, paper: Paper) -> bool:
         """Save a paper to the database with thread safety"""
         try:
-            with self._transaction():
+            with self._transaction() as conn:
                 db = self._get_db()
-                db['papers'].insert(paper.to_dict(), replace=True)
+                db['papers'].insert(self._narrow_row(paper), replace=True)
+                self._save_provenance(conn, [paper])
+                self._forget_minhash(conn, [paper])
+                index_papers(conn, [paper])
+                store_content(conn, self._full_text_items([paper]))
+                index_chunks(conn, self._chunk_items([paper]))
+                invalidate_for_papers(conn, [paper])
                 logger.debug(f"Saved paper: {paper.title[:50]}...")
                 return True
         except Exception as e:
@@ -299,11 +229,11 @@ class DatabaseManager:
         saved_ids = []
         
         try:
-            with self._transaction():
+            with self._transaction() as conn:
                 db = self._get_db()
                 
                 # Prepare batch data
-                paper_dicts = [paper.to_dict() for paper in papers]
+                paper_dicts = [self._narrow_row(paper) for paper in papers]
                 
                 # Batch insert with replace
                 db['papers'].insert_all(paper_dicts, replace=True)
@@ -311,6 +241,15 @@ class DatabaseManager:
                 # Collect saved IDs
                 saved_ids = [paper.id for paper in papers]
                 
+                self._save_provenance(conn, papers)
+                self._forget_minhash(conn, papers)
+                index_papers(conn, papers)
+                store_content(conn, self._full_text_items(papers))
+                index_chunks(conn, self._chunk_items(papers))
+                
+                # Retire semantic QA answers for topics these papers extend
+                invalidate_for_papers(conn, papers)
+                
                 logger.info(f"Batch saved {len(saved_ids)} papers")
                 
         except Exception as e:
@@ -319,6 +258,119 @@ class DatabaseManager:
         
         return saved_ids
     
+    @staticmethod
+    def _narrow_row(paper: Paper) -> Dict[str, Any]:
+        """Paper row without inline full text, which goes to the content store"""
+        row = paper.to_dict()
+        row['full_text'] = None
+        return row
+    
+    @staticmethod
+    def _full_text_items(papers: List[Paper]) -> List[Tuple[str, str, str]]:
+        # Papers loaded without their text must not erase what is already stored
+        return [(paper.id, FULL_TEXT, paper.full_text) for paper in papers if paper.full_text]
+    
+    @staticmethod
+    def _chunk_items(papers: List[Paper]) -> List[Tuple[str, str]]:
+        return [(paper.id, paper.full_text) for paper in papers if paper.full_text]
+    
+    def get_full_text(self, paper_id: str) -> Optional[str]:
+        """Load a paper's full text from the content store"""
+        try:
+            return load_content(self._get_raw_connection(), [paper_id], FULL_TEXT).get(paper_id)
+        except Exception as e:
+            logger.error(f"Error loading full text for paper {paper_id}: {e}")
+            return None
+    
+    def save_pdf_content(self, paper_id: str, extraction: Dict[str, Any]) -> bool:
+        """Store a PDFProcessor extraction (text, page texts, tables) for a paper"""
+        try:
+            with self._transaction() as conn:
+                store_content(conn, pdf_extraction_items(paper_id, extraction))
+                if extraction.get('text'):
+                    index_chunks(conn, [(paper_id, extraction['text'])])
+            return True
+        except Exception as e:
+            logger.error(f"Error saving PDF content for paper {paper_id}: {e}")
+            return False
+    
+    def get_paper_ids_by_pdf_path(self, pdf_paths: List[str]) -> Dict[str, str]:
+        """Map each of ``pdf_paths`` that belongs to a stored paper to that paper's id"""
+        try:
+            rows = self._get_raw_connection().execute(
+                "SELECT id, pdf_path FROM papers WHERE pdf_path IS NOT NULL AND pdf_path != ''"
+            ).fetchall()
+            by_path = {str(Path(row[1]).resolve()): row[0] for row in rows}
+            return {path: by_path[str(Path(path).resolve())] for path in pdf_paths
+                    if str(Path(path).resolve()) in by_path}
+        except Exception as e:
+            logger.error(f"Error looking up papers by PDF path: {e}")
+            return {}
+    
+    def search_passages(self, question: str, limit: int = 8, paper_ids: Optional[List[str]] = None,
+                        query_vector=None) -> List[Dict[str, Any]]:
+        """Best section-tagged full-text passages for a question, in one indexed query"""
+        try:
+            return search_chunks(self._get_raw_connection(), question, limit, paper_ids, query_vector)
+        except Exception as e:
+            logger.error(f"Error searching passages for '{question[:50]}': {e}")
+            return []
+    
+    def embed_pending_passages(self, encode, limit: int = 256) -> int:
+        """Fill in embeddings for up to ``limit`` passages that have none"""
+        try:
+            return embed_pending_chunks(self._get_raw_connection(), encode, limit)
+        except Exception as e:
+            logger.warning(f"Could not embed passages: {e}")
+            return 0
+    
+    def get_pdf_content(self, paper_id: str) -> Dict[str, Any]:
+        """Load stored PDF text, pages and tables for a paper"""
+        try:
+            conn = self._get_raw_connection()
+            pages = load_content(conn, [paper_id], PDF_PAGES).get(paper_id)
+            tables = load_content(conn, [paper_id], PDF_TABLES).get(paper_id)
+            return {
+                'text': load_content(conn, [paper_id], FULL_TEXT).get(paper_id),
+                'pages': json.loads(pages) if pages else [],
+                'tables': json.loads(tables) if tables else []
+            }
+        except Exception as e:
+            logger.error(f"Error loading PDF content for paper {paper_id}: {e}")
+            return {'text': None, 'pages': [], 'tables': []}
+    
+    @staticmethod
+    def _provenance_rows(papers: List[Paper]) -> List[Tuple]:
+        return [
+            (paper.id, entry.get('source'), entry.get('record_id') or paper.id,
+             entry.get('doi'), entry.get('arxiv_id'), entry.get('url'))
+            for paper in papers for entry in (getattr(paper, 'provenance', None) or [])
+        ]
+    
+    def _save_provenance(self, conn: sqlite3.Connection, papers: List[Paper]):
+        """Record which source records were merged into each paper"""
+        rows = self._provenance_rows(papers)
+        if rows:
+            conn.executemany("INSERT OR REPLACE INTO paper_provenance VALUES (?, ?, ?, ?, ?, ?)", rows)
+    
+    @staticmethod
+    def _forget_minhash(conn: sqlite3.Connection, papers: List[Paper]):
+        """Drop cached near-duplicate signatures of re-saved papers; they are rehashed from the new text"""
+        conn.executemany("DELETE FROM paper_minhash WHERE paper_id = ?", [(paper.id,) for paper in papers])
+    
+    def get_paper_provenance(self, paper_id: str) -> List[Dict[str, Any]]:
+        """Get the source records merged into a paper"""
+        try:
+            conn = self._get_raw_connection()
+            cursor = conn.execute(
+                "SELECT source, record_id, doi, arxiv_id, url FROM paper_provenance WHERE paper_id = ?",
+                [paper_id]
+            )
+            return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error getting provenance for paper {paper_id}: {e}")
+            return []
+    
     def get_paper(self, paper_id: str) -> Optional[Paper]:
         """Get a paper by ID with thread safety"""
         try:
@@ -357,7 +409,7 @@ class DatabaseManager:
                 ORDER BY (CASE 
                     WHEN title LIKE ? THEN 20
                     WHEN abstract LIKE ? THEN 10
-                    WHEN authors LIKE ? THEN 5
+                    WHEN id IN (SELECT paper_id FROM paper_authors WHERE name_normalized LIKE ?) THEN 5
                     ELSE 1 END) DESC, citations DESC
                 """
             
@@ -368,24 +420,27 @@ class DatabaseManager:
                            (CASE 
                             WHEN title LIKE ? THEN 20
                             WHEN abstract LIKE ? THEN 10
-                            WHEN authors LIKE ? THEN 5
+                            WHEN id IN (SELECT paper_id FROM paper_authors WHERE name_normalized LIKE ?) THEN 5
                             ELSE 1 END) as relevance_score
                     FROM papers 
-                    WHERE title LIKE ? OR abstract LIKE ? OR authors LIKE ?
+                    WHERE title LIKE ? OR abstract LIKE ?
+                       OR id IN (SELECT paper_id FROM paper_authors WHERE name_normalized LIKE ?)
                     {order_clause}
                     LIMIT ?
                 """
                 search_term = f"%{query}%"
-                params = [search_term] * 9 + [limit]
+                author_term = f"%{normalize_term(query)}%"
+                params = [search_term, search_term, author_term] * 3 + [limit]
             else:
                 sql = f"""
                     SELECT * FROM papers 
-                    WHERE title LIKE ? OR abstract LIKE ? OR authors LIKE ?
+                    WHERE title LIKE ? OR abstract LIKE ?
+                       OR id IN (SELECT paper_id FROM paper_authors WHERE name_normalized LIKE ?)
                     {order_clause}
                     LIMIT ?
                 """
                 search_term = f"%{query}%"
-                params = [search_term, search_term, search_term, limit]
+                params = [search_term, search_term, f"%{normalize_term(query)}%", limit]
             
             conn = self._get_raw_connection()
             cursor = conn.execute(sql, params)
@@ -417,6 +472,62 @@ class DatabaseManager:
             logger.error(f"Error searching papers: {e}")
             return []
     
+    def _papers_from_sql(self, sql: str, params: List[Any]) -> List[Paper]:
+        conn = self._get_raw_connection()
+        papers = []
+        for row in conn.execute(sql, params).fetchall():
+            paper = self._safe_create_paper(self._row_to_dict(row, 'papers'))
+            if paper:
+                papers.append(paper)
+        return papers
+    
+    def search_by_author(self, name: str, limit: int = 50) -> List[Paper]:
+        """Papers by an author, matched on full name or surname via the author index"""
+        normalized = normalize_term(name)
+        if not normalized:
+            return []
+        try:
+            return self._papers_from_sql("""
+                SELECT * FROM papers WHERE id IN (
+                    SELECT paper_id FROM paper_authors WHERE name_normalized = ?
+                    UNION SELECT paper_id FROM paper_authors WHERE surname = ?
+                )
+                ORDER BY citations DESC
+                LIMIT ?
+            """, [normalized, normalized, limit])
+        except Exception as e:
+            logger.error(f"Error searching papers by author '{name}': {e}")
+            return []
+    
+    def papers_with_keyword(self, keyword: str, limit: int = 50) -> List[Paper]:
+        """Papers tagged with a keyword, via the keyword index"""
+        try:
+            return self._papers_from_sql("""
+                SELECT * FROM papers WHERE id IN (
+                    SELECT paper_id FROM paper_keywords WHERE keyword_normalized = ?
+                )
+                ORDER BY citations DESC
+                LIMIT ?
+            """, [normalize_term(keyword), limit])
+        except Exception as e:
+            logger.error(f"Error getting papers with keyword '{keyword}': {e}")
+            return []
+    
+    def papers_in_venue(self, venue: str, limit: int = 50) -> List[Paper]:
+        """Papers published in a venue, via the venue index"""
+        try:
+            return self._papers_from_sql("""
+                SELECT * FROM papers WHERE id IN (
+                    SELECT pv.paper_id FROM paper_venues pv JOIN venues v ON v.id = pv.venue_id
+                    WHERE v.name_normalized = ?
+                )
+                ORDER BY citations DESC
+                LIMIT ?
+            """, [normalize_term(venue), limit])
+        except Exception as e:
+            logger.error(f"Error getting papers in venue '{venue}': {e}")
+            return []
+    
     def get_all_papers(self) -> List[Paper]:
         """Get all papers with thread safety"""
         try:
@@ -582,6 +693,31 @@ class DatabaseManager:
             logger.error(f"Error getting themes: {e}")
             return []
     
+    def get_themes_by_ids(self, theme_ids: List[str]) -> List[ResearchTheme]:
+        """Get specific research themes by ID"""
+        if not theme_ids:
+            return []
+        try:
+            conn = self._get_raw_connection()
+            themes = []
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(theme_ids), 500):
+                chunk = list(theme_ids[start:start + 500])
+                cursor = conn.execute(
+                    f"SELECT * FROM research_themes WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                )
+                for row in cursor.fetchall():
+                    try:
+                        row_dict = self._row_to_dict(row, 'research_themes')
+                        if row_dict:
+                            themes.append(ResearchTheme(**row_dict))
+                    except Exception as e:
+                        logger.warning(f"Error creating theme from row: {e}")
+            return themes
+        except Exception as e:
+            logger.error(f"Error getting themes by id: {e}")
+            return []
+    
     # Citation operations with thread safety
     def save_citation(self, citation: Citation) -> bool:
         """Save a citation with thread safety"""
@@ -637,27 +773,19 @@ class DatabaseManager:
             logger.error(f"Error getting stats: {e}")
             return {}
     
+    def rebuild_analytics_rollups(self) -> bool:
+        """Recount analytics rollups from the papers table"""
+        try:
+            rebuild_rollups(self._get_raw_connection())
+            return True
+        except Exception as e:
+            logger.error(f"Error rebuilding analytics rollups: {e}")
+            return False
+    
     def get_papers_by_source(self) -> Dict[str, int]:
         """Get paper count by venue (journal/conference)"""
         try:
-            conn = self._get_raw_connection()
-            cursor = conn.execute("""
-                SELECT 
-                    CASE 
-                        WHEN venue IS NULL OR venue = '' THEN 'Unknown Source'
-                        WHEN venue LIKE '%arXiv%' OR venue LIKE '%arxiv%' THEN 'ArXiv'
-                        WHEN venue LIKE '%conference%' OR venue LIKE '%Conference%' THEN 'Conference'
-                        WHEN venue LIKE '%journal%' OR venue LIKE '%Journal%' THEN 'Journal'
-                        WHEN venue LIKE '%workshop%' OR venue LIKE '%Workshop%' THEN 'Workshop'
-                        ELSE SUBSTR(venue, 1, 20)
-                    END as source_type,
-                    COUNT(*) as count 
-                FROM papers 
-                GROUP BY source_type
-                ORDER BY count DESC
-                LIMIT 10
-            """)
-            return dict(cursor.fetchall())
+            return dict(rollup_counts(self._get_raw_connection(), 'source')[:10])
         except Exception as e:
             logger.error(f"Error getting papers by source: {e}")
             return {}
@@ -665,27 +793,9 @@ class DatabaseManager:
     def get_papers_by_year(self) -> Dict[str, int]:
         """Get paper count by publication year from published_date"""
         try:
-            conn = self._get_raw_connection()
-            cursor = conn.execute("""
-                SELECT 
-                    CASE 
-                        WHEN published_date IS NOT NULL AND published_date != '' THEN 
-                            CASE 
-                                WHEN published_date LIKE '____-%' THEN SUBSTR(published_date, 1, 4)
-                                WHEN published_date LIKE '%20__' THEN SUBSTR(published_date, -4, 4)
-                                WHEN published_date LIKE '%202_' OR published_date LIKE '%201_' THEN SUBSTR(published_date, -4, 4)
-                                ELSE 'Unknown'
-                            END
-                        ELSE 'Unknown'
-                    END as year_str,
-                    COUNT(*) as count 
-                FROM papers 
-                GROUP BY year_str
-                HAVING year_str != 'Unknown'
-                ORDER BY year_str DESC
-                LIMIT 10
-            """)
-            return dict(cursor.fetchall())
+            years = [(year, count) for year, count in rollup_counts(self._get_raw_connection(), 'year')
+                     if year != 'Unknown']
+            return dict(sorted(years, reverse=True)[:10])
         except Exception as e:
             logger.error(f"Error getting papers by year: {e}")
             return {}
@@ -693,29 +803,8 @@ class DatabaseManager:
     def get_citation_distribution(self) -> Dict[str, int]:
         """Get citation count distribution"""
         try:
-            conn = self._get_raw_connection()
-            cursor = conn.execute("""
-                SELECT 
-                    CASE 
-                        WHEN citations IS NULL OR citations = 0 THEN '0'
-                        WHEN citations <= 10 THEN '1-10'
-                        WHEN citations <= 50 THEN '11-50'
-                        WHEN citations <= 100 THEN '51-100'
-                        ELSE '100+'
-                    END as citation_range,
-                    COUNT(*) as count
-                FROM papers 
-                GROUP BY citation_range
-                ORDER BY 
-                    CASE citation_range
-                        WHEN '0' THEN 1
-                        WHEN '1-10' THEN 2
-                        WHEN '11-50' THEN 3
-                        WHEN '51-100' THEN 4
-                        ELSE 5
-                    END
-            """)
-            return dict(cursor.fetchall())
+            counts = dict(rollup_counts(self._get_raw_connection(), 'citations'))
+            return {bucket: counts[bucket] for bucket in CITATION_BUCKET_ORDER if bucket in counts}
         except Exception as e:
             logger.error(f"Error getting citation distribution: {e}")
             return {}
@@ -723,42 +812,37 @@ class DatabaseManager:
     def get_trending_topics(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get trending research topics from paper titles and abstracts"""
         try:
-            conn = self._get_raw_connection()
-            # Simple keyword extraction from titles
-            cursor = conn.execute("""
-                WITH topic_words AS (
-                    SELECT 
-                        CASE 
-                            WHEN LOWER(title) LIKE '%machine learning%' OR LOWER(abstract) LIKE '%machine learning%' THEN 'Machine Learning'
-                            WHEN LOWER(title) LIKE '%deep learning%' OR LOWER(abstract) LIKE '%deep learning%' THEN 'Deep Learning'
-                            WHEN LOWER(title) LIKE '%artificial intelligence%' OR LOWER(title) LIKE '%ai%' THEN 'Artificial Intelligence'
-                            WHEN LOWER(title) LIKE '%neural network%' OR LOWER(abstract) LIKE '%neural network%' THEN 'Neural Networks'
-                            WHEN LOWER(title) LIKE '%computer vision%' OR LOWER(abstract) LIKE '%computer vision%' THEN 'Computer Vision'
-                            WHEN LOWER(title) LIKE '%natural language%' OR LOWER(abstract) LIKE '%nlp%' THEN 'Natural Language Processing'
-                            WHEN LOWER(title) LIKE '%blockchain%' OR LOWER(abstract) LIKE '%blockchain%' THEN 'Blockchain'
-                            WHEN LOWER(title) LIKE '%quantum%' OR LOWER(abstract) LIKE '%quantum%' THEN 'Quantum Computing'
-                            WHEN LOWER(title) LIKE '%data mining%' OR LOWER(abstract) LIKE '%data mining%' THEN 'Data Mining'
-                            WHEN LOWER(title) LIKE '%reinforcement%' OR LOWER(abstract) LIKE '%reinforcement%' THEN 'Reinforcement Learning'
-                            ELSE 'General Research'
-                        END as topic
-                    FROM papers
-                    WHERE title IS NOT NULL
-                )
-                SELECT topic, COUNT(*) as count
-                FROM topic_words
-                WHERE topic != 'General Research'
-                GROUP BY topic
-                ORDER BY count DESC
-                LIMIT ?
-            """, (limit,))
-            
-            results = cursor.fetchall()
-            return [{'topic': topic, 'count': count} for topic, count in results]
-            
+            topics = [(topic, count) for topic, count in rollup_counts(self._get_raw_connection(), 'topic')
+                      if topic != 'General Research']
+            return [{'topic': topic, 'count': count} for topic, count in topics[:limit]]
         except Exception as e:
             logger.error(f"Error getting trending topics: {e}")
             return []
     
+    def get_author_facets(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Most prolific authors, counted over the author index"""
+        try:
+            cursor = self._get_raw_connection().execute("""
+                SELECT MIN(name), COUNT(*) AS count FROM paper_authors
+                GROUP BY name_normalized ORDER BY count DESC LIMIT ?
+            """, (limit,))
+            return [{'author': name, 'count': count} for name, count in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error getting author facets: {e}")
+            return []
+    
+    def get_keyword_facets(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Most frequent keywords, counted over the keyword index"""
+        try:
+            cursor = self._get_raw_connection().execute("""
+                SELECT MIN(keyword), COUNT(*) AS count FROM paper_keywords
+                GROUP BY keyword_normalized ORDER BY count DESC LIMIT ?
+            """, (limit,))
+            return [{'keyword': keyword, 'count': count} for keyword, count in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error getting keyword facets: {e}")
+            return []
+    
     def get_analytics_data(self) -> Dict[str, Any]:
         """Get comprehensive analytics data for dashboard"""
         try:
@@ -824,6 +908,13 @@ class DatabaseManager:
         result = self.optimize_database()
         
         if result.get('success', False):
+            self.rebuild_analytics_rollups()
+            try:
+                pruned = prune_content(self._get_raw_connection())
+                if pruned:
+                    logger.info(f"Pruned {pruned} unreferenced content blobs")
+            except Exception as e:
+                logger.warning(f"Content store pruning failed: {e}")
             logger.info("Database maintenance completed successfully")
             
             # Log key statistics
@@ -872,76 +963,9 @@ class AsyncDatabaseManager:
         self._initialize_tables_sync()
     
     def _initialize_tables_sync(self):
-        """Initialize database tables synchronously"""
-        # Check if database already exists and has tables
-        if Path(self.db_path).exists():
-            try:
-                with sqlite3.connect(self.db_path) as conn:
-                    cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='papers'")
-                    if cursor.fetchone():
-                        logger.debug("Database tables already exist, skipping async initialization")
-                        return
-            except Exception:
-                pass  # If check fails, proceed with initialization
-        
-        # Initialize tables directly without creating another DatabaseManager
+        """Apply pending schema migrations synchronously"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.executescript("""
-                    CREATE TABLE IF NOT EXISTS papers (
-                        id TEXT PRIMARY KEY,
-                        title TEXT NOT NULL,
-                        authors TEXT,
-                        abstract TEXT,
-                        url TEXT,
-                        published_date TEXT,
-                        venue TEXT,
-                        citations INTEGER DEFAULT 0,
-                        pdf_path TEXT,
-                        full_text TEXT,
-                        keywords TEXT,
-                        doi TEXT,
-                        arxiv_id TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    );
-                    
-                    CREATE TABLE IF NOT EXISTS research_notes (
-                        id TEXT PRIMARY KEY,
-                        paper_id TEXT,
-                        content TEXT NOT NULL,
-                        note_type TEXT,
-                        confidence REAL DEFAULT 0.0,
-                        page_number INTEGER,
-                        created_at TEXT,
-                        FOREIGN KEY (paper_id) REFERENCES papers (id)
-                    );
-                    
-                    CREATE TABLE IF NOT EXISTS research_themes (
-                        id TEXT PRIMARY KEY,
-                        title TEXT NOT NULL,
-                        description TEXT,
-                        papers TEXT,
-                        frequency INTEGER DEFAULT 0,
-                        confidence REAL DEFAULT 0.0,
-                        related_themes TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    );
-                    
-                    CREATE TABLE IF NOT EXISTS citations (
-                        id TEXT PRIMARY KEY,
-                        paper_id TEXT,
-                        citation_key TEXT,
-                        apa_format TEXT,
-                        mla_format TEXT,
-                        bibtex TEXT,
-                        FOREIGN KEY (paper_id) REFERENCES papers (id)
-                    );
-                    
-                    CREATE INDEX IF NOT EXISTS idx_papers_title ON papers(title);
-                    CREATE INDEX IF NOT EXISTS idx_notes_paper_id ON research_notes(paper_id);
-                    CREATE INDEX IF NOT EXISTS idx_themes_frequency ON research_themes(frequency);
-                """)
-                conn.commit()
+            run_migrations(self.db_path, config.get('storage.migration_batch_size', 500))
             logger.debug("Async database schema initialization completed")
         except Exception as e:
             logger.error(f"Failed to initialize async database schema: {e}")
@@ -1014,12 +1038,18 @@ class AsyncDatabaseManager:
                         """, (
                             paper.id, paper.title, paper.authors, paper.abstract,
                             paper.url, paper.published_date, paper.venue, paper.citations,
-                            paper.pdf_path, paper.full_text, paper.keywords,
+                            paper.pdf_path, None, paper.keywords,
                             paper.doi, paper.arxiv_id, paper.created_at
                         ))
                         saved_ids.append(paper.id)
                         logger.debug(f"Saved paper: {paper.title}")
                 
+                provenance = DatabaseManager._provenance_rows(papers)
+                if provenance:
+                    await conn.executemany(
+                        "INSERT OR REPLACE INTO paper_provenance VALUES (?, ?, ?, ?, ?, ?)", provenance
+                    )
+                
                 await conn.commit()
                 
             except Exception as e:
@@ -1027,6 +1057,18 @@ class AsyncDatabaseManager:
                 logger.error(f"Failed to save papers: {e}")
                 raise
         
+        if saved_ids:
+            saved = set(saved_ids)
+            saved_papers = [p for p in papers if p.id in saved]
+            await asyncio.to_thread(index_papers_in_db, self.db_path, saved_papers)
+            await asyncio.to_thread(
+                store_content_in_db, self.db_path, DatabaseManager._full_text_items(saved_papers)
+            )
+            await asyncio.to_thread(
+                index_chunks_in_db, self.db_path, DatabaseManager._chunk_items(saved_papers)
+            )
+            await asyncio.to_thread(invalidate_semantic_qa_cache, self.db_path, saved_papers)
+        
         logger.info(f"Saved {len(saved_ids)} papers asynchronously")
         return saved_ids
     
@@ -1078,10 +1120,11 @@ class AsyncDatabaseManager:
             if search_query:
                 query = """
                     SELECT * FROM papers 
-                    WHERE title LIKE ? OR abstract LIKE ? OR authors LIKE ?
+                    WHERE title LIKE ? OR abstract LIKE ?
+                       OR id IN (SELECT paper_id FROM paper_authors WHERE name_normalized LIKE ?)
                     ORDER BY citations DESC, published_date DESC
                 """
-                params = [f"%{search_query}%"] * 3
+                params = [f"%{search_query}%"] * 2 + [f"%{normalize_term(search_query)}%"]
                 
                 if limit:
                     query += " LIMIT ?"
@@ -1184,23 +1227,33 @@ class AsyncDatabaseManager:
         """Full-text search across papers asynchronously"""
         papers = []
         
-        # Use MATCH for FTS if available, otherwise LIKE
-        search_query = """
+        search_term = f"%{query}%"
+        author_term = f"%{normalize_term(query)}%"
+        params = [search_term, search_term, author_term] * 2
+        # papers.full_text is always NULL now; body text is matched through the passage index
+        body_match = ""
+        phrase = fts_phrase(query)
+        if phrase:
+            body_match = """ OR id IN (
+                SELECT c.paper_id FROM paper_chunks_fts JOIN paper_chunks c ON c.id = paper_chunks_fts.rowid
+                WHERE paper_chunks_fts MATCH ?)"""
+            params.append(phrase)
+        params.append(limit)
+        
+        search_query = f"""
             SELECT *, 
                    (CASE 
                     WHEN title LIKE ? THEN 10
                     WHEN abstract LIKE ? THEN 5
-                    WHEN authors LIKE ? THEN 3
+                    WHEN id IN (SELECT paper_id FROM paper_authors WHERE name_normalized LIKE ?) THEN 3
                     ELSE 1 END) as relevance_score
             FROM papers 
-            WHERE title LIKE ? OR abstract LIKE ? OR authors LIKE ? OR full_text LIKE ?
+            WHERE title LIKE ? OR abstract LIKE ?
+               OR id IN (SELECT paper_id FROM paper_authors WHERE name_normalized LIKE ?){body_match}
             ORDER BY relevance_score DESC, citations DESC
             LIMIT ?
         """
         
-        search_term = f"%{query}%"
-        params = [search_term] * 7 + [limit]
-        
         async with self._get_connection() as conn:
             async with conn.execute(search_query, params) as cursor:
                 rows = await cursor.fetchall()
@@ -1273,7 +1326,22 @@ def get_async_db_manager():
         _async_db_manager = AsyncDatabaseManager()
     return _async_db_manager
 
-# Legacy global instances - use functions above instead
-db_manager = get_db_manager()
-async_db_manager = get_async_db_manager()
-db = get_db_manager()
\ No newline at end of file
+
+class _LazyManager:
+    """Module-level stand-in that creates its manager on first attribute access"""
+    
+    def __init__(self, factory):
+        self._factory = factory
+    
+    def __getattr__(self, name):
+        return getattr(self._factory(), name)
+    
+    def __repr__(self):
+        return f"<lazy {self._factory.__name__}()>"
+
+
+# Legacy global instances - use functions above instead. Importing this
+# module no longer opens the database or starts the manager's thread pool.
+db_manager = _LazyManager(get_db_manager)
+async_db_manager = _LazyManager(get_async_db_manager)
+db = db_manager
@@ -0,0 +1,268 @@
+"""
+Versioned schema migrations tracked by ``PRAGMA user_version``.
+
+Each migration runs once, in order, and bumps ``user_version`` when it
+finishes. Backfills over ``papers`` run in short rowid-ranged transactions so
+other connections can keep writing while a large database is upgraded, and an
+interrupted upgrade resumes at the migration that did not finish. Opening a
+database that is already at :data:`LATEST_VERSION` reads one pragma and does
+no DDL.
+"""
+
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from .analytics_rollups import create_rollup_schema, recount_rollups, tag_papers
+from .chunk_index import create_chunk_index_schema, index_chunks
+from .content_store import FULL_TEXT, create_content_schema, load_content, move_inline_full_text
+from .paper_index import create_paper_index_schema, index_paper_rows
+from .pdf_cache import create_pdf_cache_schema
+from .semantic_cache import create_semantic_cache_schema
+from .stage_cache import create_stage_cache_schema
+from .theme_index import create_theme_index_schema
+from ..utils.app_logging import logger
+from ..utils.database_optimizer import ADVANCED_INDEXES, RETIRED_INDEXES
+
+# progress(migration name, rows done, rows total)
+ProgressCallback = Callable[[str, int, int], None]
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[['MigrationRun'], None]
+
+
+class MigrationRun:
+    """Connection and batching settings handed to each migration"""
+
+    def __init__(self, conn: sqlite3.Connection, name: str, batch_size: int,
+                 progress: Optional[ProgressCallback]):
+        self.conn = conn
+        self.name = name
+        self.batch_size = max(1, batch_size)
+        self.progress = progress or _log_progress
+
+    def backfill(self, columns: str, handle: Callable[[sqlite3.Connection, List[tuple]], None],
+                 where: str = '1') -> int:
+        """Feed ``(rowid, *columns)`` rows of papers to ``handle``, one transaction per batch"""
+        conn = self.conn
+        total = conn.execute(f"SELECT COUNT(*) FROM papers WHERE {where}").fetchone()[0]
+        last_rowid, done = 0, 0
+        while True:
+            # IMMEDIATE takes the write lock before reading, so a batch never
+            # overwrites a row another connection changed in between
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(
+                    f"SELECT rowid, {columns} FROM papers WHERE rowid > ? AND ({where}) "
+                    f"ORDER BY rowid LIMIT ?", (last_rowid, self.batch_size)
+                ).fetchall()
+                if rows:
+                    handle(conn, rows)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            if not rows:
+                return done
+            last_rowid = rows[-1][0]
+            done += len(rows)
+            self.progress(self.name, done, total)
+
+
+def _log_progress(name: str, done: int, total: int):
+    logger.info(f"Migration '{name}': {done}/{total} papers")
+
+
+def _base_schema(run: MigrationRun):
+    run.conn.executescript("""
+        CREATE TABLE IF NOT EXISTS papers (
+            id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            authors TEXT,
+            abstract TEXT,
+            url TEXT,
+            published_date TEXT,
+            venue TEXT,
+            citations INTEGER DEFAULT 0,
+            pdf_path TEXT,
+            full_text TEXT,
+            keywords TEXT,
+            doi TEXT,
+            arxiv_id TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS research_notes (
+            id TEXT PRIMARY KEY,
+            paper_id TEXT,
+            content TEXT NOT NULL,
+            note_type TEXT,
+            confidence REAL DEFAULT 0.0,
+            page_number INTEGER,
+            created_at TEXT,
+            FOREIGN KEY (paper_id) REFERENCES papers (id)
+        );
+
+        CREATE TABLE IF NOT EXISTS research_themes (
+            id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            description TEXT,
+            papers TEXT,
+            frequency INTEGER DEFAULT 0,
+            confidence REAL DEFAULT 0.0,
+            related_themes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS citations (
+            id TEXT PRIMARY KEY,
+            paper_id TEXT,
+            citation_key TEXT,
+            apa_format TEXT,
+            mla_format TEXT,
+            bibtex TEXT,
+            FOREIGN KEY (paper_id) REFERENCES papers (id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_papers_title ON papers(title);
+        CREATE INDEX IF NOT EXISTS idx_notes_paper_id ON research_notes(paper_id);
+        CREATE INDEX IF NOT EXISTS idx_themes_frequency ON research_themes(frequency);
+    """)
+
+
+def _provenance(run: MigrationRun):
+    run.conn.executescript("""
+        CREATE TABLE IF NOT EXISTS paper_provenance (
+            paper_id TEXT NOT NULL,
+            source TEXT,
+            record_id TEXT NOT NULL,
+            doi TEXT,
+            arxiv_id TEXT,
+            url TEXT,
+            PRIMARY KEY (paper_id, record_id)
+        );
+    """)
+
+
+def _query_indexes(run: MigrationRun):
+    for index_name in RETIRED_INDEXES:
+        run.conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+    run.conn.commit()
+    for index_name, index_sql, _ in ADVANCED_INDEXES:
+        try:
+            with run.conn:
+                run.conn.execute(index_sql)
+        except sqlite3.Error as e:
+            # Unique indexes fail on legacy duplicates; the rest of the schema still applies
+            logger.warning(f"Could not create index {index_name}: {e}")
+
+
+def _analytics_rollups(run: MigrationRun):
+    # Triggers go in first so papers written during the backfill are counted as they land
+    create_rollup_schema(run.conn)
+    run.backfill('id', lambda conn, rows: tag_papers(conn, rows[0][0], rows[-1][0]))
+    with run.conn:
+        recount_rollups(run.conn)
+
+
+def _paper_index(run: MigrationRun):
+    create_paper_index_schema(run.conn)
+    run.backfill('id, authors, keywords, venue', lambda conn, rows: index_paper_rows(conn, [row[1:] for row in rows]))
+
+
+def _content_store(run: MigrationRun):
+    create_content_schema(run.conn)
+    run.backfill('id, full_text', lambda conn, rows: move_inline_full_text(conn, [row[1:] for row in rows]),
+                 where='full_text IS NOT NULL')
+
+
+def _stage_cache(run: MigrationRun):
+    create_stage_cache_schema(run.conn)
+
+
+def _pdf_cache(run: MigrationRun):
+    create_pdf_cache_schema(run.conn)
+
+
+def _chunk_index(run: MigrationRun):
+    # Passages only; embeddings are filled in lazily by the QA agent
+    create_chunk_index_schema(run.conn)
+
+    def handle(conn, rows):
+        texts = load_content(conn, [row[1] for row in rows], FULL_TEXT)
+        index_chunks(conn, texts.items())
+
+    run.backfill('id', handle, where=f"id IN (SELECT paper_id FROM paper_content WHERE kind = '{FULL_TEXT}')")
+
+
+def _minhash_signatures(run: MigrationRun):
+    # Cached MinHash signatures used by NearDuplicateIndex.add_existing_papers
+    run.conn.executescript("""
+        CREATE TABLE IF NOT EXISTS paper_minhash (
+            paper_id TEXT NOT NULL,
+            scheme TEXT NOT NULL,
+            title_sig BLOB,
+            abstract_sig BLOB,
+            PRIMARY KEY (paper_id, scheme)
+        );
+    """)
+
+
+def _semantic_qa_cache(run: MigrationRun):
+    create_semantic_cache_schema(run.conn)
+
+
+def _theme_index(run: MigrationRun):
+    create_theme_index_schema(run.conn)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, 'base schema', _base_schema),
+    Migration(2, 'paper provenance', _provenance),
+    Migration(3, 'query indexes', _query_indexes),
+    Migration(4, 'analytics rollups', _analytics_rollups),
+    Migration(5, 'author, keyword and venue tables', _paper_index),
+    Migration(6, 'compressed content store', _content_store),
+    Migration(7, 'workflow stage cache', _stage_cache),
+    Migration(8, 'pdf extraction cache', _pdf_cache),
+    Migration(9, 'full text passage index', _chunk_index),
+    Migration(10, 'near-duplicate signatures', _minhash_signatures),
+    Migration(11, 'semantic QA cache', _semantic_qa_cache),
+    Migration(12, 'theme centroid index', _theme_index),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(db_path: str, batch_size: int = 500,
+                   progress: Optional[ProgressCallback] = None) -> List[int]:
+    """Apply pending migrations to the database; returns the versions applied"""
+    conn = sqlite3.connect(db_path, timeout=30.0)
+    try:
+        current = schema_version(conn)
+        if current >= LATEST_VERSION:
+            return []
+
+        applied = []
+        for migration in MIGRATIONS:
+            if migration.version <= current:
+                continue
+            start_time = time.time()
+            logger.info(f"Applying migration {migration.version}: {migration.name}")
+            migration.apply(MigrationRun(conn, migration.name, batch_size, progress))
+            conn.commit()
+            conn.execute(f"PRAGMA user_version = {migration.version}")
+            applied.append(migration.version)
+            logger.info(f"Migration {migration.version} finished in {time.time() - start_time:.2f}s")
+        return applied
+    finally:
+        conn.close()
@@ -21,6 +21,8 @@ class Paper:
     arxiv_id: Optional[str] = None
     created_at: Optional[datetime] = None  # Add this field to match database schema
     _source: Optional[str] = field(default=None, init=False)  # Private field to store explicit source
+    # Source records merged into this paper (see tools.record_linkage); stored in paper_provenance
+    provenance: List[Dict[str, Any]] = field(default_factory=list, init=False, repr=False, compare=False)
     
     @property
     def source(self) -> str:
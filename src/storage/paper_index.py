@@ -0,0 +1,136 @@
+"""
+Normalized author, keyword and venue tables for papers.
+
+``papers`` keeps authors and keywords as JSON text; these side tables hold one
+row per author, keyword and venue so lookups and facet counts use indexes
+instead of pattern matching over JSON blobs.
+"""
+
+import json
+import sqlite3
+from typing import Any, Iterable, List, Optional, Tuple
+
+from .models import Paper
+from ..utils.app_logging import logger
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS paper_authors (
+        paper_id TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        name_normalized TEXT NOT NULL,
+        surname TEXT NOT NULL,
+        PRIMARY KEY (paper_id, position)
+    );
+    CREATE INDEX IF NOT EXISTS idx_paper_authors_name ON paper_authors(name_normalized, paper_id);
+    CREATE INDEX IF NOT EXISTS idx_paper_authors_surname ON paper_authors(surname, paper_id);
+
+    CREATE TABLE IF NOT EXISTS paper_keywords (
+        paper_id TEXT NOT NULL,
+        keyword TEXT NOT NULL,
+        keyword_normalized TEXT NOT NULL,
+        PRIMARY KEY (paper_id, keyword_normalized)
+    );
+    CREATE INDEX IF NOT EXISTS idx_paper_keywords_keyword ON paper_keywords(keyword_normalized, paper_id);
+
+    CREATE TABLE IF NOT EXISTS venues (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        name_normalized TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS paper_venues (
+        paper_id TEXT PRIMARY KEY,
+        venue_id INTEGER NOT NULL REFERENCES venues (id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_paper_venues_venue ON paper_venues(venue_id, paper_id);
+"""
+
+
+def normalize_term(text: Any) -> str:
+    """Case-folded, whitespace-collapsed form used for every side-table lookup"""
+    return ' '.join(str(text or '').casefold().split())
+
+
+def _json_list(value: Any) -> List[Any]:
+    if isinstance(value, list):
+        return value
+    if not value:
+        return []
+    try:
+        parsed = json.loads(value)
+    except (TypeError, ValueError):
+        return []
+    return parsed if isinstance(parsed, list) else []
+
+
+def _side_rows(paper_id: str, authors: Iterable[Any], keywords: Iterable[Any]) -> Tuple[List[Tuple], List[Tuple]]:
+    author_rows = []
+    for position, author in enumerate(authors or []):
+        normalized = normalize_term(author)
+        if normalized:
+            author_rows.append((paper_id, position, str(author).strip(), normalized, normalized.split()[-1]))
+
+    keyword_rows, seen = [], set()
+    for keyword in keywords or []:
+        normalized = normalize_term(keyword)
+        if normalized and normalized not in seen:
+            seen.add(normalized)
+            keyword_rows.append((paper_id, str(keyword).strip(), normalized))
+    return author_rows, keyword_rows
+
+
+def _write(conn: sqlite3.Connection, entries: List[Tuple[str, Iterable, Iterable, Optional[str]]]):
+    """Replace side-table rows for ``(paper_id, authors, keywords, venue)`` entries"""
+    ids = [(entry[0],) for entry in entries]
+    conn.executemany("DELETE FROM paper_authors WHERE paper_id = ?", ids)
+    conn.executemany("DELETE FROM paper_keywords WHERE paper_id = ?", ids)
+    conn.executemany("DELETE FROM paper_venues WHERE paper_id = ?", ids)
+
+    author_rows, keyword_rows, venue_rows = [], [], []
+    for paper_id, authors, keywords, venue in entries:
+        authors_for_paper, keywords_for_paper = _side_rows(paper_id, authors, keywords)
+        author_rows.extend(authors_for_paper)
+        keyword_rows.extend(keywords_for_paper)
+        if normalize_term(venue):
+            venue_rows.append((paper_id, str(venue).strip(), normalize_term(venue)))
+
+    conn.executemany("INSERT INTO paper_authors VALUES (?, ?, ?, ?, ?)", author_rows)
+    conn.executemany("INSERT INTO paper_keywords VALUES (?, ?, ?)", keyword_rows)
+    conn.executemany(
+        "INSERT INTO venues (name, name_normalized) VALUES (?, ?) ON CONFLICT(name_normalized) DO NOTHING",
+        [(name, normalized) for _, name, normalized in venue_rows]
+    )
+    conn.executemany(
+        "INSERT INTO paper_venues (paper_id, venue_id) "
+        "SELECT ?, id FROM venues WHERE name_normalized = ?",
+        [(paper_id, normalized) for paper_id, _, normalized in venue_rows]
+    )
+
+
+def index_papers(conn: sqlite3.Connection, papers: List[Paper]):
+    """Refresh side-table rows for papers being saved on ``conn``"""
+    _write(conn, [(p.id, _json_list(p.authors), _json_list(p.keywords), p.venue) for p in papers])
+
+
+def index_papers_in_db(db_path: str, papers: List[Paper]):
+    """Refresh side-table rows from a separate connection, e.g. after an async save"""
+    if not papers:
+        return
+    try:
+        conn = sqlite3.connect(db_path, timeout=30.0)
+        try:
+            with conn:
+                index_papers(conn, papers)
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Could not index authors/keywords for saved papers: {e}")
+
+
+def create_paper_index_schema(conn: sqlite3.Connection):
+    conn.executescript(_SCHEMA)
+
+
+def index_paper_rows(conn: sqlite3.Connection, rows: List[Tuple]):
+    """Index stored ``(id, authors_json, keywords_json, venue)`` rows"""
+    _write(conn, [(row[0], _json_list(row[1]), _json_list(row[2]), row[3]) for row in rows])
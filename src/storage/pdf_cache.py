@@ -0,0 +1,114 @@
+"""
+Persistent cache of PDF extraction results.
+
+Results are keyed by the SHA-256 of the PDF bytes plus the extractor version,
+so the same paper downloaded for different topics (or to a different path)
+is parsed once. Page texts, tables, metadata and the quality assessment are
+stored as compressed JSON using the content store's codec.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from .content_store import _compress, _decompress
+from ..utils.app_logging import logger
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS pdf_extraction_cache (
+        file_hash TEXT NOT NULL,
+        extractor_version TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        last_used_at REAL NOT NULL,
+        codec TEXT NOT NULL,
+        raw_size INTEGER NOT NULL,
+        data BLOB NOT NULL,
+        PRIMARY KEY (file_hash, extractor_version)
+    );
+"""
+
+
+def create_pdf_cache_schema(conn: sqlite3.Connection):
+    conn.executescript(_SCHEMA)
+
+
+class PDFExtractionCache:
+    """Extraction results by (file hash, extractor version)"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        if getattr(self._local, 'conn', None) is None:
+            self._local.conn = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False)
+        return self._local.conn
+
+    def get(self, file_hash: str, extractor_version: str) -> Optional[Dict[str, Any]]:
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT codec, data FROM pdf_extraction_cache WHERE file_hash = ? AND extractor_version = ?",
+                (file_hash, extractor_version)
+            ).fetchone()
+            if row is None:
+                return None
+            with conn:
+                conn.execute("UPDATE pdf_extraction_cache SET last_used_at = ? "
+                             "WHERE file_hash = ? AND extractor_version = ?",
+                             (time.time(), file_hash, extractor_version))
+            return json.loads(_decompress(row[0], row[1]).decode('utf-8'))
+        except Exception as e:
+            logger.warning(f"Could not read cached PDF extraction: {e}")
+            return None
+
+    def has(self, file_hashes: Iterable[str], extractor_version: str) -> set:
+        """The subset of ``file_hashes`` with a cached result"""
+        hashes = list(file_hashes)
+        found = set()
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            found.update(row[0] for row in self._connection().execute(
+                f"SELECT file_hash FROM pdf_extraction_cache WHERE extractor_version = ? "
+                f"AND file_hash IN ({','.join('?' * len(chunk))})", [extractor_version] + chunk
+            ))
+        return found
+
+    def put(self, file_hash: str, extractor_version: str, result: Dict[str, Any]):
+        try:
+            raw = json.dumps(result, default=str).encode('utf-8')
+            codec, data = _compress(raw)
+            now = time.time()
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO pdf_extraction_cache "
+                    "(file_hash, extractor_version, created_at, last_used_at, codec, raw_size, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (file_hash, extractor_version, now, now, codec, len(raw), data)
+                )
+        except Exception as e:
+            logger.warning(f"Could not cache PDF extraction {file_hash[:16]}: {e}")
+
+    def prune(self, keep_version: str, unused_days: Optional[float] = None) -> int:
+        """Drop results from other extractor versions, and optionally ones unused for ``unused_days``
+
+        Budgeted reads are stored under ``<version>/budget-...`` and kept with their version.
+        """
+        conn = self._connection()
+        with conn:
+            removed = conn.execute("DELETE FROM pdf_extraction_cache WHERE extractor_version != ? "
+                                   "AND substr(extractor_version, 1, ?) != ?",
+                                   (keep_version, len(keep_version) + 1, keep_version + '/')).rowcount
+            if unused_days is not None:
+                removed += conn.execute("DELETE FROM pdf_extraction_cache WHERE last_used_at < ?",
+                                        (time.time() - unused_days * 86400,)).rowcount
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        count, raw, stored = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM pdf_extraction_cache"
+        ).fetchone()
+        return {'entries': count, 'raw_bytes': raw, 'stored_bytes': stored}
@@ -0,0 +1,288 @@
+"""
+Persistent semantic cache for question answering.
+
+Answers are stored with an embedding of the question, scoped to the research
+topic filter and that topic's corpus version. A new question is served from the
+cache when a stored question in the same scope is similar enough; ingesting
+papers that match a topic bumps its corpus version, which retires its entries.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .models import Paper
+from ..utils.app_logging import logger
+
+ALL_TOPICS = ''
+HASHED_DIMENSIONS = 1024
+
+_STOP_WORDS = {
+    'the', 'a', 'an', 'and', 'or', 'of', 'in', 'on', 'for', 'to', 'with', 'by', 'from', 'about',
+    'is', 'are', 'was', 'were', 'be', 'what', 'which', 'who', 'how', 'why', 'when', 'where',
+    'do', 'does', 'did', 'can', 'could', 'should', 'would', 'main', 'key', 'some', 'this', 'that',
+    'there', 'their', 'its', 'me', 'tell', 'explain', 'describe', 'please',
+}
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS qa_semantic_cache (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        topic_key TEXT NOT NULL,
+        corpus_version INTEGER NOT NULL,
+        embedder TEXT NOT NULL,
+        question TEXT NOT NULL,
+        embedding BLOB NOT NULL,
+        result TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        last_hit REAL NOT NULL,
+        hits INTEGER DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS idx_qa_semantic_scope
+        ON qa_semantic_cache(topic_key, corpus_version, embedder);
+    CREATE TABLE IF NOT EXISTS qa_corpus_versions (
+        topic_key TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    );
+"""
+
+
+def topic_key(research_topic: Optional[str]) -> str:
+    """Normalise a topic filter into a cache scope key"""
+    return ' '.join(_TOKEN.findall((research_topic or '').lower()))
+
+
+def create_semantic_cache_schema(conn: sqlite3.Connection):
+    conn.executescript(_SCHEMA)
+
+
+def _content_terms(text: str) -> List[str]:
+    terms = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in _STOP_WORDS or len(token) < 2:
+            continue
+        # Light stemming keeps "challenges"/"challenge" and "models"/"model" together
+        if len(token) > 4 and token.endswith('es'):
+            token = token[:-2]
+        elif len(token) > 3 and token.endswith('s'):
+            token = token[:-1]
+        terms.append(token)
+    return terms
+
+
+def hashed_embedding(text: str) -> np.ndarray:
+    """Dependency-free question embedding from hashed terms, bigrams and character trigrams"""
+    vector = np.zeros(HASHED_DIMENSIONS, dtype=np.float32)
+    terms = _content_terms(text)
+    features = [(t, 1.0) for t in terms]
+    features += [(f"{a} {b}", 0.5) for a, b in zip(terms, terms[1:])]
+    features += [(f"#{t[i:i + 3]}", 0.25) for t in terms for i in range(max(1, len(t) - 2))]
+    for feature, weight in features:
+        digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=4).digest()
+        vector[int.from_bytes(digest, 'little') % HASHED_DIMENSIONS] += weight
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SemanticQACache:
+    """Bounded, persistent question -> answer cache matched on embedding similarity"""
+
+    def __init__(self, db_path: str, embed: Optional[Callable[[str], np.ndarray]] = None,
+                 embedder_name: str = 'hashed', threshold: float = 0.85,
+                 max_entries: int = 2000, ttl_hours: float = 24 * 7):
+        self.db_path = db_path
+        self.embed = embed or hashed_embedding
+        self.embedder_name = embedder_name
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_hours * 3600
+        self._local = threading.local()
+        # Scope -> (row signature, ids, embedding matrix)
+        self._matrices: Dict[Tuple[str, int], Tuple[Tuple, List[int], np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self.stats = {'lookups': 0, 'hits': 0, 'stores': 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        if getattr(self._local, 'conn', None) is None:
+            self._local.conn = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False)
+        return self._local.conn
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.embed(text), dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def corpus_version(self, research_topic: Optional[str]) -> int:
+        row = self._connection().execute(
+            "SELECT version FROM qa_corpus_versions WHERE topic_key = ?", (topic_key(research_topic),)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _scope_matrix(self, key: str, version: int) -> Tuple[List[int], np.ndarray]:
+        conn = self._connection()
+        signature = conn.execute(
+            "SELECT COUNT(*), MAX(id) FROM qa_semantic_cache "
+            "WHERE topic_key = ? AND corpus_version = ? AND embedder = ?",
+            (key, version, self.embedder_name)
+        ).fetchone()
+
+        with self._lock:
+            cached = self._matrices.get((key, version))
+            if cached and cached[0] == signature:
+                return cached[1], cached[2]
+
+        rows = conn.execute(
+            "SELECT id, embedding FROM qa_semantic_cache "
+            "WHERE topic_key = ? AND corpus_version = ? AND embedder = ?",
+            (key, version, self.embedder_name)
+        ).fetchall()
+        ids = [row[0] for row in rows]
+        matrix = (np.vstack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+                  if rows else np.zeros((0, 0), dtype=np.float32))
+
+        with self._lock:
+            self._matrices = {k: v for k, v in self._matrices.items() if k[0] != key}
+            self._matrices[(key, version)] = (signature, ids, matrix)
+        return ids, matrix
+
+    def lookup(self, question: str, research_topic: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return a cached result for a similar question in the same scope, if any"""
+        self.stats['lookups'] += 1
+        key = topic_key(research_topic)
+        version = self.corpus_version(research_topic)
+        ids, matrix = self._scope_matrix(key, version)
+        if not ids:
+            return None
+
+        query = self._embed(question)
+        if matrix.shape[1] != query.shape[0]:
+            return None
+        similarities = matrix @ query
+        best = int(np.argmax(similarities))
+        similarity = float(similarities[best])
+        if similarity < self.threshold:
+            return None
+
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT question, result, created_at FROM qa_semantic_cache WHERE id = ?", (ids[best],)
+        ).fetchone()
+        if not row or time.time() - row[2] > self.ttl_seconds:
+            return None
+
+        conn.execute("UPDATE qa_semantic_cache SET hits = hits + 1, last_hit = ? WHERE id = ?",
+                     (time.time(), ids[best]))
+        conn.commit()
+        self.stats['hits'] += 1
+
+        result = json.loads(row[1])
+        # Serve the stored answer under the new wording of the question
+        result['question'] = question
+        metadata = dict(result.get('metadata') or {})
+        metadata['semantic_cache'] = {
+            'matched_question': row[0],
+            'similarity': round(similarity, 4),
+            'corpus_version': version,
+        }
+        result['metadata'] = metadata
+        return result
+
+    def store(self, question: str, result: Dict[str, Any], research_topic: Optional[str] = None):
+        """Persist an answer and evict the least recently used entries beyond the bound"""
+        key = topic_key(research_topic)
+        version = self.corpus_version(research_topic)
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            "INSERT INTO qa_semantic_cache (topic_key, corpus_version, embedder, question, embedding, "
+            "result, created_at, last_hit) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, version, self.embedder_name, question, self._embed(question).tobytes(),
+             json.dumps(result, default=str), now, now)
+        )
+        conn.execute(
+            "DELETE FROM qa_semantic_cache WHERE created_at < ? OR id IN ("
+            "SELECT id FROM qa_semantic_cache ORDER BY last_hit DESC LIMIT -1 OFFSET ?)",
+            (now - self.ttl_seconds, self.max_entries)
+        )
+        conn.commit()
+        self.stats['stores'] += 1
+
+    def clear(self):
+        conn = self._connection()
+        conn.execute("DELETE FROM qa_semantic_cache")
+        conn.commit()
+        with self._lock:
+            self._matrices.clear()
+
+
+def _paper_matches_topic(paper_text: str, key: str) -> bool:
+    terms = _content_terms(key)
+    if not terms:
+        return True
+    paper_terms = set(_content_terms(paper_text))
+    return sum(term in paper_terms for term in terms) * 2 >= len(terms)
+
+
+def invalidate_for_papers(conn: sqlite3.Connection, papers: Iterable[Paper]) -> List[str]:
+    """Bump the corpus version of every cached topic the new papers belong to
+
+    Runs on the ingesting connection so it works across processes sharing the
+    database. The unfiltered scope is invalidated by any ingest. Returns the
+    invalidated topic keys.
+    """
+    papers = list(papers)
+    if not papers:
+        return []
+    try:
+        tables = {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN "
+            "('qa_semantic_cache', 'qa_corpus_versions')"
+        )}
+        if 'qa_semantic_cache' not in tables or 'qa_corpus_versions' not in tables:
+            return []
+
+        keys = {row[0] for row in conn.execute("SELECT DISTINCT topic_key FROM qa_semantic_cache")}
+        if not keys:
+            return []
+
+        texts = [
+            f"{p.title} {p.abstract or ''} {' '.join(p.keywords or [])}" for p in papers
+        ]
+        stale = [key for key in keys
+                 if key == ALL_TOPICS or any(_paper_matches_topic(text, key) for text in texts)]
+
+        for key in stale:
+            conn.execute(
+                "INSERT INTO qa_corpus_versions (topic_key, version) VALUES (?, 1) "
+                "ON CONFLICT(topic_key) DO UPDATE SET version = version + 1", (key,)
+            )
+            conn.execute(
+                "DELETE FROM qa_semantic_cache WHERE topic_key = ? AND corpus_version < "
+                "(SELECT version FROM qa_corpus_versions WHERE topic_key = ?)", (key, key)
+            )
+        if stale:
+            logger.info(f"Invalidated semantic QA cache for topics: {stale}")
+        return stale
+    except sqlite3.Error as e:
+        logger.warning(f"Semantic QA cache invalidation failed: {e}")
+        return []
+
+
+def invalidate_semantic_qa_cache(db_path: str, papers: Iterable[Paper]) -> List[str]:
+    """Open a short-lived connection and run :func:`invalidate_for_papers`"""
+    try:
+        conn = sqlite3.connect(db_path, timeout=30.0)
+    except sqlite3.Error as e:
+        logger.warning(f"Semantic QA cache invalidation failed: {e}")
+        return []
+    try:
+        with conn:
+            return invalidate_for_papers(conn, papers)
+    finally:
+        conn.close()
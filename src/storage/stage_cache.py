@@ -0,0 +1,194 @@
+"""
+Content-addressed cache for research workflow stage outputs.
+
+A stage output is stored under a hash of everything that produced it (stage
+name, stage inputs, settings), so a re-run with identical inputs reuses it no
+matter which topic string led there, and any change to the inputs simply
+misses. Notes are cached per paper under ``(paper_id, content_hash,
+prompt_version)``, where the content hash covers the text the notes were
+actually extracted from: adding one paper to a survey only extracts notes for
+that paper. Values are pickled and zlib-compressed; the cache lives in the local
+research database and is only ever read back by this process's own code.
+"""
+
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from .models import Paper, ResearchNote
+from ..utils.app_logging import logger
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS stage_cache (
+        key TEXT PRIMARY KEY,
+        stage TEXT NOT NULL,
+        topic TEXT,
+        created_at REAL NOT NULL,
+        item_count INTEGER,
+        data BLOB NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_stage_cache_topic ON stage_cache(topic, stage, created_at);
+    CREATE TABLE IF NOT EXISTS paper_note_cache (
+        paper_id TEXT NOT NULL,
+        content_hash TEXT NOT NULL,
+        prompt_version TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        data BLOB NOT NULL,
+        PRIMARY KEY (paper_id, content_hash, prompt_version)
+    );
+"""
+
+
+def create_stage_cache_schema(conn: sqlite3.Connection):
+    conn.executescript(_SCHEMA)
+
+
+def _dumps(value: Any) -> bytes:
+    return zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 6)
+
+
+def _loads(blob: bytes) -> Any:
+    return pickle.loads(zlib.decompress(blob))
+
+
+def paper_content_hash(paper: Paper, research_topic: str = '', text: Optional[str] = None) -> str:
+    """Hash of the text notes are extracted from, and the topic they are extracted for
+
+    ``text`` is the source text actually used; full text usually lives in the
+    content store rather than on ``paper``, so it defaults to ``paper.full_text``.
+    """
+    if text is None:
+        text = paper.full_text
+    parts = [paper.title or '', paper.abstract or '', text or '', research_topic or '']
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def _canonical(value: Any) -> Any:
+    """JSON-ready form that ignores fields which change on every run (ids, timestamps)"""
+    if isinstance(value, Paper):
+        return ['paper', value.id, paper_content_hash(value)]
+    if isinstance(value, ResearchNote):
+        return ['note', value.paper_id, value.note_type, value.content, value.confidence]
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_canonical(item) for item in value]
+        return sorted(items, key=repr) if isinstance(value, (set, frozenset)) else items
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, 'to_dict'):
+        data = value.to_dict()
+        data.pop('created_at', None)
+        return [type(value).__name__, _canonical(data)]
+    return value
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable hash of stage inputs"""
+    encoded = json.dumps(_canonical(list(parts)), sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class StageCache:
+    """Stage outputs and per-paper notes keyed by the hash of their inputs"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        if getattr(self._local, 'conn', None) is None:
+            self._local.conn = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False)
+        return self._local.conn
+
+    def get(self, key: str, max_age_hours: Optional[float] = None) -> Optional[Any]:
+        """Cached output for a key, or None on a miss"""
+        try:
+            row = self._connection().execute(
+                "SELECT created_at, data FROM stage_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if max_age_hours is not None and time.time() - row[0] > max_age_hours * 3600:
+                return None
+            return _loads(row[1])
+        except Exception as e:
+            logger.warning(f"Could not read stage cache entry: {e}")
+            return None
+
+    def put(self, key: str, stage: str, value: Any, topic: Optional[str] = None):
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT INTO stage_cache (key, stage, topic, created_at, item_count, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+                    "topic = excluded.topic, created_at = excluded.created_at, "
+                    "item_count = excluded.item_count, data = excluded.data",
+                    (key, stage, topic, time.time(), len(value) if isinstance(value, (list, dict)) else None,
+                     _dumps(value))
+                )
+        except Exception as e:
+            logger.warning(f"Could not write stage cache entry for {stage}: {e}")
+
+    def latest_for_topic(self, topic: str) -> Dict[str, Dict[str, Any]]:
+        """Most recent cached output per stage for a topic: {stage: {'timestamp', 'data_size'}}"""
+        rows = self._connection().execute(
+            "SELECT stage, MAX(created_at), item_count FROM stage_cache WHERE topic = ? GROUP BY stage", (topic,)
+        ).fetchall()
+        return {stage: {'timestamp': datetime.fromtimestamp(created_at).isoformat(), 'data_size': count or 0}
+                for stage, created_at, count in rows}
+
+    def clear_topic(self, topic: str) -> int:
+        conn = self._connection()
+        with conn:
+            return conn.execute("DELETE FROM stage_cache WHERE topic = ?", (topic,)).rowcount
+
+    def get_notes(self, papers: Iterable[Paper], research_topic: str, prompt_version: str,
+                  texts: Optional[Dict[str, Optional[str]]] = None) -> Dict[str, List[ResearchNote]]:
+        """Cached notes for each paper whose text, topic and prompt are unchanged
+
+        ``texts`` maps paper ids to the source text notes would be extracted from.
+        """
+        texts = texts or {}
+        wanted = {(paper.id, paper_content_hash(paper, research_topic, texts.get(paper.id))) for paper in papers}
+        found: Dict[str, List[ResearchNote]] = {}
+        try:
+            conn = self._connection()
+            ids = sorted({paper_id for paper_id, _ in wanted})
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT paper_id, content_hash, data FROM paper_note_cache "
+                    f"WHERE prompt_version = ? AND paper_id IN ({','.join('?' * len(chunk))})",
+                    [prompt_version] + chunk
+                ).fetchall()
+                for paper_id, content_hash, data in rows:
+                    if (paper_id, content_hash) in wanted:
+                        found[paper_id] = _loads(data)
+        except Exception as e:
+            logger.warning(f"Could not read cached notes: {e}")
+        return found
+
+    def put_notes(self, paper: Paper, research_topic: str, prompt_version: str, notes: List[ResearchNote],
+                  text: Optional[str] = None):
+        """Cache notes extracted from ``text``; empty results are never cached"""
+        if not notes:
+            return
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO paper_note_cache "
+                    "(paper_id, content_hash, prompt_version, created_at, data) VALUES (?, ?, ?, ?, ?)",
+                    (paper.id, paper_content_hash(paper, research_topic, text), prompt_version, time.time(),
+                     _dumps(list(notes)))
+                )
+        except Exception as e:
+            logger.warning(f"Could not cache notes for paper {paper.id}: {e}")
@@ -0,0 +1,101 @@
+"""
+Persistent theme centroids and note assignments.
+
+Stored alongside ``research_themes`` so that theme synthesis can place new
+notes into existing themes instead of re-clustering the whole corpus.
+"""
+
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS theme_centroids (
+        theme_id TEXT PRIMARY KEY,
+        centroid BLOB NOT NULL,
+        note_count INTEGER NOT NULL,
+        titled_count INTEGER NOT NULL,
+        updated_at TEXT
+    );
+    CREATE TABLE IF NOT EXISTS theme_note_assignments (
+        note_id TEXT PRIMARY KEY,
+        theme_id TEXT NOT NULL,
+        similarity REAL
+    );
+    CREATE INDEX IF NOT EXISTS idx_theme_assignments_theme ON theme_note_assignments(theme_id);
+"""
+
+
+def create_theme_index_schema(conn: sqlite3.Connection):
+    conn.executescript(_SCHEMA)
+
+
+@dataclass
+class ThemeCentroid:
+    """Running mean of a theme's note vectors"""
+    theme_id: str
+    centroid: np.ndarray
+    note_count: int
+    titled_count: int  # note_count when the title/description were last generated
+
+    def absorb(self, vectors):
+        """Fold new note vectors (dense or sparse rows) into the running mean"""
+        total = self.note_count + vectors.shape[0]
+        added = np.asarray(vectors.sum(axis=0), dtype=np.float32).ravel()
+        self.centroid = (self.centroid * self.note_count + added) / total
+        self.note_count = total
+
+
+class ThemeIndex:
+    """SQLite-backed store of theme centroids and which theme owns each note"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        if getattr(self._local, 'conn', None) is None:
+            self._local.conn = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False)
+        return self._local.conn
+
+    def load_centroids(self) -> Dict[str, ThemeCentroid]:
+        rows = self._connection().execute(
+            "SELECT theme_id, centroid, note_count, titled_count FROM theme_centroids"
+        ).fetchall()
+        return {
+            row[0]: ThemeCentroid(row[0], np.frombuffer(row[1], dtype=np.float32).copy(), row[2], row[3])
+            for row in rows
+        }
+
+    def assignments(self, note_ids: Iterable[str]) -> Dict[str, str]:
+        """Map the given note IDs to their owning theme, where assigned"""
+        note_ids = list(note_ids)
+        conn = self._connection()
+        result = {}
+        for start in range(0, len(note_ids), 500):
+            chunk = note_ids[start:start + 500]
+            result.update(conn.execute(
+                f"SELECT note_id, theme_id FROM theme_note_assignments "
+                f"WHERE note_id IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall())
+        return result
+
+    def save(self, centroids: Iterable[ThemeCentroid], assignments: List[Tuple[str, str, float]]):
+        """Persist updated centroids and new (note_id, theme_id, similarity) assignments"""
+        now = datetime.now().isoformat()
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO theme_centroids (theme_id, centroid, note_count, titled_count, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(c.theme_id, c.centroid.astype(np.float32).tobytes(), c.note_count, c.titled_count, now)
+                 for c in centroids]
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO theme_note_assignments (note_id, theme_id, similarity) VALUES (?, ?, ?)",
+                assignments
+            )
@@ -9,7 +9,12 @@ from .Open_Alex_tool import OpenAlexTool
 from .Cross_Ref_tool import CrossRefTool
 from .semantic_scholar_tool import SemanticScholarTool
 from .citation_formatter import CitationFormatter
+from .citation_matcher import CitationMatcher
+from .note_clustering import NoteClusteringEngine
+from .near_duplicates import NearDuplicateIndex
+from .record_linkage import RecordLinker
 from .pdf_processor import PDFProcessor
+from .pdf_extraction import PDFExtractionService
 
 __all__ = [
     "ArxivTool",
@@ -17,5 +22,10 @@ __all__ = [
     "CrossRefTool",
     "SemanticScholarTool",
     "CitationFormatter",
+    "CitationMatcher",
+    "NoteClusteringEngine",
+    "NearDuplicateIndex",
+    "RecordLinker",
     "PDFProcessor",
+    "PDFExtractionService",
 ]
@@ -0,0 +1,159 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from ..storage.models import Paper, Citation
+from ..utils.app_logging import logger
+
+try:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import linear_kernel
+    HAS_SKLEARN = True
+except ImportError:
+    HAS_SKLEARN = False
+
+PLACEHOLDER_PATTERN = re.compile(r'\s?\[(?:citation|citations|cite|ref)\]', re.IGNORECASE)
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+TOKEN_PATTERN = re.compile(r'[a-z][a-z0-9\-]{2,}')
+
+
+@dataclass
+class CitationMatch:
+    """Best citation candidates for one placeholder"""
+    start: int
+    end: int
+    sentence: str
+    candidates: List[Tuple[Citation, float]]
+
+    @property
+    def best(self) -> Optional[Citation]:
+        return self.candidates[0][0] if self.candidates else None
+
+    @property
+    def confidence(self) -> float:
+        return self.candidates[0][1] if self.candidates else 0.0
+
+
+class CitationMatcher:
+    """Matches [Citation] placeholders to citations by lexical similarity
+
+    Citations are indexed once on their paper's title, abstract and keywords; each
+    placeholder is scored against the sentence that contains it. Scores are TF-IDF
+    cosine similarities (token overlap when scikit-learn is unavailable), so they
+    are comparable across sections and usable as a confidence threshold.
+    """
+
+    def __init__(self, citations: List[Citation], papers: Dict[str, Paper],
+                 reuse_penalty: float = 0.85, top_k: int = 3):
+        self.citations = [c for c in citations if c is not None]
+        self.papers = papers
+        self.reuse_penalty = reuse_penalty
+        self.top_k = top_k
+        self._documents = [self._citation_document(c) for c in self.citations]
+        self._vectorizer = None
+        self._matrix = None
+
+        if HAS_SKLEARN and any(self._documents):
+            try:
+                self._vectorizer = TfidfVectorizer(stop_words='english', ngram_range=(1, 2),
+                                                   sublinear_tf=True, min_df=1)
+                self._matrix = self._vectorizer.fit_transform(self._documents)
+            except ValueError as e:
+                # Raised when every document is empty after stop-word removal
+                logger.warning(f"Citation index fell back to token overlap: {e}")
+                self._vectorizer = None
+
+        self._token_sets = [set(TOKEN_PATTERN.findall(doc.lower())) for doc in self._documents]
+
+    def _citation_document(self, citation: Citation) -> str:
+        paper = self.papers.get(citation.paper_id)
+        if paper is None:
+            return citation.apa_format or ''
+        keywords = ' '.join(paper.keywords or [])
+        # Title is repeated to weight it above the abstract
+        return f"{paper.title} {paper.title} {keywords} {paper.abstract or ''}"
+
+    def inline_reference(self, citation: Citation) -> str:
+        """Format a citation as (Author, Year)"""
+        paper = self.papers.get(citation.paper_id)
+        if paper is None:
+            return f"({citation.citation_key})"
+
+        surnames = [self._surname(a) for a in (paper.authors or []) if a and a.strip()]
+        if not surnames:
+            authors = paper.title.split(':')[0][:40] if paper.title else 'Anonymous'
+        elif len(surnames) == 1:
+            authors = surnames[0]
+        elif len(surnames) == 2:
+            authors = f"{surnames[0]} & {surnames[1]}"
+        else:
+            authors = f"{surnames[0]} et al."
+
+        year = paper.published_date.year if paper.published_date else 'n.d.'
+        return f"({authors}, {year})"
+
+    @staticmethod
+    def _surname(author: str) -> str:
+        author = re.sub(r'\s*\([^)]*\)', '', author).strip()
+        if ',' in author:
+            return author.split(',')[0].strip()
+        return author.split()[-1] if author.split() else author
+
+    def _score(self, sentences: List[str]) -> List[List[float]]:
+        if self._vectorizer is not None:
+            similarities = linear_kernel(self._vectorizer.transform(sentences), self._matrix)
+            return similarities.tolist()
+
+        scores = []
+        for sentence in sentences:
+            tokens = set(TOKEN_PATTERN.findall(sentence.lower()))
+            row = []
+            for doc_tokens in self._token_sets:
+                overlap = len(tokens & doc_tokens)
+                row.append(overlap / ((len(tokens) * len(doc_tokens)) ** 0.5) if overlap else 0.0)
+            scores.append(row)
+        return scores
+
+    def find_placeholders(self, text: str) -> List[CitationMatch]:
+        """Locate placeholders and rank citations for each one"""
+        spans = [(m.start(), m.end()) for m in PLACEHOLDER_PATTERN.finditer(text)]
+        if not spans or not self.citations:
+            return [CitationMatch(start, end, '', []) for start, end in spans]
+
+        sentences = [self._sentence_around(text, start, end) for start, end in spans]
+        scores = self._score(sentences)
+
+        matches = []
+        used: Dict[int, int] = {}
+        for (start, end), sentence, row in zip(spans, sentences, scores):
+            # Spread citations within a section when candidates score similarly
+            adjusted = [score * (self.reuse_penalty ** used.get(i, 0)) for i, score in enumerate(row)]
+            ranked = sorted(range(len(adjusted)), key=lambda i: (-adjusted[i], i))[:self.top_k]
+            candidates = [(self.citations[i], adjusted[i]) for i in ranked if adjusted[i] > 0]
+            if candidates:
+                best_index = ranked[0]
+                used[best_index] = used.get(best_index, 0) + 1
+            matches.append(CitationMatch(start, end, sentence, candidates))
+        return matches
+
+    @staticmethod
+    def _sentence_around(text: str, start: int, end: int) -> str:
+        """Return the sentence containing a placeholder, without any placeholders"""
+        before = text[:start]
+        boundaries = list(SENTENCE_BOUNDARY.finditer(before))
+        sentence_start = boundaries[-1].end() if boundaries else 0
+        following = SENTENCE_BOUNDARY.search(text, end)
+        sentence_end = following.start() if following else len(text)
+        return PLACEHOLDER_PATTERN.sub('', text[sentence_start:sentence_end]).strip()
+
+    @staticmethod
+    def replace(text: str, matches: List[CitationMatch], references: List[Optional[str]]) -> str:
+        """Substitute references for placeholders; ``None`` drops the placeholder"""
+        parts = []
+        cursor = 0
+        for match, reference in zip(matches, references):
+            parts.append(text[cursor:match.start])
+            if reference:
+                parts.append(' ' + reference)
+            cursor = match.end
+        parts.append(text[cursor:])
+        return ''.join(parts)
@@ -0,0 +1,257 @@
+import re
+import sqlite3
+import zlib
+from collections import defaultdict
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ..utils.app_logging import logger
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_TITLE_STOP_WORDS = {'a', 'an', 'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
+_DOI_PREFIX = re.compile(r'^(?:https?://(?:dx\.)?doi\.org/|doi:)', re.IGNORECASE)
+_ARXIV_PREFIX = re.compile(r'^(?:arxiv:|https?://arxiv\.org/abs/)', re.IGNORECASE)
+_ARXIV_VERSION = re.compile(r'v\d+$')
+
+Identifiers = Tuple[Optional[str], Optional[str]]
+
+
+def normalize_doi(doi: Optional[str]) -> Optional[str]:
+    if not doi or not str(doi).strip():
+        return None
+    return _DOI_PREFIX.sub('', str(doi).strip()).lower()
+
+
+def normalize_arxiv_id(arxiv_id: Optional[str]) -> Optional[str]:
+    if not arxiv_id or not str(arxiv_id).strip():
+        return None
+    return _ARXIV_VERSION.sub('', _ARXIV_PREFIX.sub('', str(arxiv_id).strip()).lower())
+
+
+def paper_identifiers(doi: Optional[str], arxiv_id: Optional[str]) -> Identifiers:
+    """Normalized ``(doi, arxiv_id)`` of a record"""
+    return normalize_doi(doi), normalize_arxiv_id(arxiv_id)
+
+
+def identifiers_conflict(first: Optional[Identifiers], second: Optional[Identifiers]) -> bool:
+    """True when both records carry a DOI (or both an arXiv id) and they differ
+
+    Similar titles with different identifiers are different works, e.g.
+    "Part I" and "Part II", or two years of the same proceedings.
+    """
+    if not first or not second:
+        return False
+    return any(a and b and a != b for a, b in zip(first, second))
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase, strip punctuation and stop words"""
+    normalized = re.sub(r'[^\w\s]', '', (title or '').lower())
+    return ' '.join(w for w in normalized.split() if w not in _TITLE_STOP_WORDS)
+
+
+def title_shingles(title: str, k: int = 3) -> Set[str]:
+    """Character k-grams of the normalized title, robust to small spelling edits"""
+    text = normalize_title(title)
+    if len(text) <= k:
+        return {text} if text else set()
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+def abstract_shingles(abstract: str) -> Set[str]:
+    """Lowercased word set, the same unit the previous Jaccard check used"""
+    return set(re.findall(r'\w+', (abstract or '').lower()))
+
+
+def _integrate(f, a: float, b: float, steps: int = 100) -> float:
+    step = (b - a) / steps
+    return sum(f(a + (i + 0.5) * step) for i in range(steps)) * step
+
+
+@lru_cache(maxsize=64)
+def optimal_bands(threshold: float, num_perm: int, false_positive_weight: float = 0.2,
+                  false_negative_weight: float = 0.8) -> Tuple[int, int]:
+    """Choose (bands, rows) minimising weighted LSH false positive/negative mass
+
+    Raising ``false_negative_weight`` favours recall (more candidates to verify);
+    raising ``false_positive_weight`` favours fewer candidates.
+    """
+    best, best_error = (1, num_perm), float('inf')
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        if rows == 0:
+            continue
+        false_positive = _integrate(lambda s: 1 - (1 - s ** rows) ** bands, 0.0, threshold)
+        false_negative = _integrate(lambda s: (1 - s ** rows) ** bands, threshold, 1.0)
+        error = false_positive_weight * false_positive + false_negative_weight * false_negative
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class MinHasher:
+    """Vectorised MinHash signatures over 32-bit shingle hashes"""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        self.num_perm = num_perm
+        rng = np.random.RandomState(seed)
+        # Coefficients below 2**31 keep a * h + b inside uint64 for 32-bit h
+        self._a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingles: Iterable[str]) -> Optional[np.ndarray]:
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64)
+        if hashes.size == 0:
+            return None
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=1).astype(np.uint32)
+
+    @staticmethod
+    def jaccard(first: np.ndarray, second: np.ndarray) -> float:
+        """Estimate Jaccard similarity from two signatures"""
+        return float(np.mean(first == second))
+
+
+class MinHashLSH:
+    """Banded locality-sensitive hash table over MinHash signatures"""
+
+    def __init__(self, threshold: float, num_perm: int = 128, false_positive_weight: float = 0.2,
+                 false_negative_weight: float = 0.8):
+        self.threshold = threshold
+        self.bands, self.rows = optimal_bands(threshold, num_perm, false_positive_weight,
+                                              false_negative_weight)
+        self._tables: List[Dict[bytes, List[str]]] = [defaultdict(list) for _ in range(self.bands)]
+        self.signatures: Dict[str, np.ndarray] = {}
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def insert(self, key: str, signature: np.ndarray):
+        self.signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self._tables[band][band_key].append(key)
+
+    def query(self, signature: np.ndarray,
+              accept: Optional[Callable[[str], bool]] = None) -> Optional[Tuple[str, float]]:
+        """Return the most similar indexed key at or above the threshold that ``accept`` allows"""
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self._tables[band].get(band_key, ()))
+
+        best = None
+        for key in candidates:
+            similarity = MinHasher.jaccard(signature, self.signatures[key])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                if accept is None or accept(key):
+                    best = (key, similarity)
+        return best
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+
+class NearDuplicateIndex:
+    """Near-duplicate paper lookup on normalized titles and abstracts
+
+    Each insert and query costs a constant number of hash-bucket probes, so
+    deduplicating a batch is roughly linear in its size. Signatures for the
+    papers table are cached in ``paper_minhash`` so later runs only hash new rows.
+    Records whose DOIs or arXiv ids conflict never match, however similar.
+    """
+
+    def __init__(self, title_threshold: float = 0.85, abstract_threshold: float = 0.9,
+                 num_perm: int = 128, seed: int = 1, false_positive_weight: float = 0.2,
+                 false_negative_weight: float = 0.8, min_abstract_length: int = 50):
+        self.hasher = MinHasher(num_perm, seed)
+        self.seed = seed
+        self.min_abstract_length = min_abstract_length
+        self.titles = MinHashLSH(title_threshold, num_perm, false_positive_weight, false_negative_weight)
+        self.abstracts = MinHashLSH(abstract_threshold, num_perm, false_positive_weight, false_negative_weight)
+        self.identifiers: Dict[str, Identifiers] = {}
+
+    def signatures(self, title: str, abstract: Optional[str]) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        title_sig = self.hasher.signature(title_shingles(title))
+        abstract_sig = None
+        if abstract and len(abstract) >= self.min_abstract_length:
+            abstract_sig = self.hasher.signature(abstract_shingles(abstract))
+        return title_sig, abstract_sig
+
+    def find(self, title: str, abstract: Optional[str] = None, signatures: Optional[Tuple] = None,
+             identifiers: Optional[Identifiers] = None) -> Optional[Tuple[str, str, float]]:
+        """Return ``(key, 'title' | 'abstract', similarity)`` for a near duplicate, if any"""
+        title_sig, abstract_sig = signatures or self.signatures(title, abstract)
+        accept = None
+        if identifiers and any(identifiers):
+            accept = lambda key: not identifiers_conflict(identifiers, self.identifiers.get(key))
+        if title_sig is not None:
+            match = self.titles.query(title_sig, accept)
+            if match:
+                return match[0], 'title', match[1]
+        if abstract_sig is not None:
+            match = self.abstracts.query(abstract_sig, accept)
+            if match:
+                return match[0], 'abstract', match[1]
+        return None
+
+    def add(self, key: str, title: str = '', abstract: Optional[str] = None,
+            signatures: Optional[Tuple] = None, identifiers: Optional[Identifiers] = None):
+        title_sig, abstract_sig = signatures or self.signatures(title, abstract)
+        if identifiers and any(identifiers):
+            self.identifiers[key] = identifiers
+        if title_sig is not None:
+            self.titles.insert(key, title_sig)
+        if abstract_sig is not None:
+            self.abstracts.insert(key, abstract_sig)
+
+    def add_existing_papers(self, db_path: str) -> int:
+        """Index every paper already stored; only papers without a cached signature are read and hashed"""
+        try:
+            conn = sqlite3.connect(db_path, timeout=30.0)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not open papers database for deduplication: {e}")
+            return 0
+
+        try:
+            scheme = f"{self.hasher.num_perm}:{self.seed}:{self.min_abstract_length}"
+            count = 0
+            for paper_id, title_sig, abstract_sig, doi, arxiv_id in conn.execute("""
+                SELECT m.paper_id, m.title_sig, m.abstract_sig, p.doi, p.arxiv_id
+                FROM paper_minhash m JOIN papers p ON p.id = m.paper_id
+                WHERE m.scheme = ?
+            """, (scheme,)):
+                self.add(paper_id, signatures=(self._decode(title_sig), self._decode(abstract_sig)),
+                         identifiers=paper_identifiers(doi, arxiv_id))
+                count += 1
+
+            computed = []
+            for paper_id, title, abstract, doi, arxiv_id in conn.execute("""
+                SELECT id, title, abstract, doi, arxiv_id FROM papers p
+                WHERE NOT EXISTS (SELECT 1 FROM paper_minhash m WHERE m.paper_id = p.id AND m.scheme = ?)
+            """, (scheme,)):
+                signatures = self.signatures(title, abstract)
+                computed.append((paper_id, scheme, self._encode(signatures[0]), self._encode(signatures[1])))
+                self.add(paper_id, signatures=signatures, identifiers=paper_identifiers(doi, arxiv_id))
+                count += 1
+
+            if computed:
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO paper_minhash VALUES (?, ?, ?, ?)", computed)
+            logger.debug(f"Indexed {count} stored papers for deduplication ({len(computed)} newly hashed)")
+            return count
+        except sqlite3.Error as e:
+            logger.warning(f"Could not index stored papers for deduplication: {e}")
+            return 0
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _encode(signature: Optional[np.ndarray]) -> Optional[bytes]:
+        return signature.tobytes() if signature is not None else None
+
+    @staticmethod
+    def _decode(blob: Optional[bytes]) -> Optional[np.ndarray]:
+        return np.frombuffer(blob, dtype=np.uint32) if blob is not None else None
@@ -0,0 +1,172 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Set
+
+import numpy as np
+
+from ..storage.models import ResearchNote
+from ..utils.app_logging import logger
+
+try:
+    from sklearn.cluster import AgglomerativeClustering
+    from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+    HAS_SKLEARN = True
+except ImportError:
+    HAS_SKLEARN = False
+
+STOP_WORDS = {
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'this', 'that', 'these', 'those', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should',
+    'from', 'they', 'them', 'their', 'there', 'where', 'when', 'what', 'who', 'how',
+    'can', 'may', 'must', 'shall', 'not', 'no', 'yes', 'also', 'such', 'very', 'more',
+    'most', 'much', 'many', 'some', 'any', 'all', 'each', 'every', 'other', 'another',
+    'first', 'second', 'third', 'last', 'next', 'previous', 'new', 'old', 'good', 'bad',
+    'great', 'small', 'large', 'big', 'little', 'high', 'low', 'long', 'short', 'wide',
+    'using', 'used', 'use', 'based', 'approach', 'method', 'technique', 'methods',
+    'results', 'result', 'conclusion', 'conclusions', 'study', 'research', 'paper',
+    'work', 'article', 'analysis', 'review', 'survey', 'overview', 'summary'
+}
+# Alphabetic words of four or more letters, matching ThemeSynthesizerAgent.extract_keywords
+TOKEN_PATTERN = r'(?u)\b[^\W\d_]{4,}\b'
+HASHED_FEATURES = 2 ** 14
+
+
+@dataclass
+class NoteCluster:
+    """A cluster of notes with the terms that characterise its centroid"""
+    name: str
+    notes: List[ResearchNote]
+    top_terms: List[str] = field(default_factory=list)
+
+
+class NoteClusteringEngine:
+    """Clusters research notes from a single featurization pass
+
+    Each note is vectorized once into an L2-normalised TF-IDF matrix and grouped
+    by average-linkage agglomerative clustering on cosine distance, which needs
+    no cluster count. Above ``agglomerative_limit`` notes the quadratic distance
+    matrix is built for a seeded sample only; remaining notes join the nearest
+    sample centroid, or are clustered among themselves when no centroid is
+    within the threshold. Results are deterministic for a given ``random_state``.
+    """
+
+    def __init__(self, distance_threshold: float = 0.8, agglomerative_limit: int = 2500,
+                 max_features: int = 20000, random_state: int = 42, top_terms: int = 3):
+        self.distance_threshold = distance_threshold
+        self.agglomerative_limit = agglomerative_limit
+        self.max_features = max_features
+        self.random_state = random_state
+        self.top_terms = top_terms
+
+    @staticmethod
+    def is_available() -> bool:
+        return HAS_SKLEARN
+
+    def cluster(self, notes: List[ResearchNote]) -> List[NoteCluster]:
+        """Cluster notes and name each cluster after its centroid's top terms"""
+        if not notes:
+            return []
+        if not HAS_SKLEARN:
+            raise RuntimeError("scikit-learn is required for vectorized note clustering")
+
+        vectorizer = TfidfVectorizer(stop_words=sorted(STOP_WORDS), token_pattern=TOKEN_PATTERN,
+                                     lowercase=True, sublinear_tf=True, max_features=self.max_features,
+                                     dtype=np.float32)
+        try:
+            matrix = vectorizer.fit_transform([note.content or '' for note in notes])
+        except ValueError:
+            # Every note is empty after stop-word removal
+            return [NoteCluster(self._name([], notes), list(notes))]
+
+        labels = self._labels(matrix)
+        terms = vectorizer.get_feature_names_out()
+
+        # Order clusters by first appearance so output is stable across runs
+        order: Dict[int, int] = {}
+        for label in labels:
+            order.setdefault(int(label), len(order))
+
+        clusters: List[NoteCluster] = []
+        used_names: Set[str] = set()
+        for label in sorted(order, key=order.get):
+            members = np.flatnonzero(labels == label)
+            centroid = np.asarray(matrix[members].mean(axis=0)).ravel()
+            ranked = [i for i in np.argsort(-centroid, kind='stable') if centroid[i] > 0]
+            top_terms = [terms[i] for i in ranked[:self.top_terms]]
+            cluster_notes = [notes[i] for i in members]
+            name = self._unique(self._name(top_terms, cluster_notes), used_names)
+            clusters.append(NoteCluster(name, cluster_notes, top_terms))
+
+        logger.debug(f"Clustered {len(notes)} notes into {len(clusters)} clusters")
+        return clusters
+
+    def _labels(self, matrix) -> np.ndarray:
+        n_notes = matrix.shape[0]
+        if n_notes <= self.agglomerative_limit:
+            return self._agglomerative(matrix)
+
+        # Cluster a seeded sample exactly, then assign the rest to the nearest centroid
+        rng = np.random.default_rng(self.random_state)
+        sample = np.sort(rng.choice(n_notes, self.agglomerative_limit, replace=False))
+        sample_labels = self._agglomerative(matrix[sample])
+        n_clusters = int(sample_labels.max()) + 1
+
+        centroids = np.vstack([
+            np.asarray(matrix[sample[sample_labels == label]].mean(axis=0)).ravel()
+            for label in range(n_clusters)
+        ])
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        centroids = centroids / np.where(norms > 0, norms, 1.0)
+
+        labels = np.full(n_notes, -1, dtype=int)
+        labels[sample] = sample_labels
+        rest = np.setdiff1d(np.arange(n_notes), sample, assume_unique=True)
+        similarities = np.asarray(matrix[rest] @ centroids.T)
+        labels[rest] = similarities.argmax(axis=1)
+
+        # Notes unlike every sampled cluster form clusters of their own
+        outliers = rest[similarities.max(axis=1) < 1.0 - self.distance_threshold]
+        if len(outliers):
+            labels[outliers] = self._labels(matrix[outliers]) + n_clusters
+        return labels
+
+    def _agglomerative(self, matrix) -> np.ndarray:
+        if matrix.shape[0] == 1:
+            return np.zeros(1, dtype=int)
+        # Rows are L2-normalised, so one sparse product gives every cosine similarity
+        distances = 1.0 - (matrix @ matrix.T).toarray()
+        np.clip(distances, 0.0, None, out=distances)
+        model = AgglomerativeClustering(n_clusters=None, metric='precomputed', linkage='average',
+                                        distance_threshold=self.distance_threshold)
+        return model.fit_predict(distances)
+
+    @staticmethod
+    def _name(top_terms: List[str], notes: List[ResearchNote]) -> str:
+        """Name a cluster the way ThemeSynthesizerAgent.generate_cluster_name does"""
+        note_type = Counter(note.note_type for note in notes).most_common(1)[0][0] if notes else 'general'
+        if not top_terms:
+            return f"{note_type}_research"
+        if note_type and note_type not in ['general', 'key_finding']:
+            return f"{note_type}_{'-'.join(top_terms)}"[:50]
+        return '-'.join(top_terms)[:50]
+
+    @staticmethod
+    def _unique(name: str, used: Set[str]) -> str:
+        candidate, suffix = name, 2
+        while candidate in used:
+            candidate = f"{name}_{suffix}"
+            suffix += 1
+        used.add(candidate)
+        return candidate
+
+
+
+def hashed_note_vectors(notes: List[ResearchNote], n_features: int = HASHED_FEATURES):
+    """Sparse L2-normalised term vectors in a feature space that is stable across runs"""
+    if not HAS_SKLEARN:
+        raise RuntimeError("scikit-learn is required for hashed note vectors")
+    vectorizer = HashingVectorizer(n_features=n_features, stop_words=sorted(STOP_WORDS),
+                                   token_pattern=TOKEN_PATTERN, alternate_sign=False,
+                                   norm='l2', dtype=np.float32)
+    return vectorizer.transform([note.content or '' for note in notes])
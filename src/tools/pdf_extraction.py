@@ -0,0 +1,519 @@
+"""
+Process-pool PDF text extraction.
+
+pdfplumber and PyPDF2 parse pages in pure Python, so running them on threads
+next to LLM calls serialises them on the GIL. :class:`PDFExtractionService`
+runs extraction in worker processes instead: several PDFs are parsed at once
+and large PDFs are split into page ranges, so throughput scales with cores.
+
+Each worker gets an address-space cap (``pdf.worker_memory_mb`` on top of what
+it inherited) and each task a deadline (``pdf.extraction_timeout``), counted
+from when a worker receives it. A task that overruns has its PDF reported as
+failed and its worker is killed, since a stuck parser cannot be interrupted. :meth:`PDFExtractionService.iter_pages`
+yields pages in page order as soon as every earlier range has arrived.
+"""
+
+import multiprocessing
+import multiprocessing.connection
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pdfplumber
+import PyPDF2
+
+from ..utils.app_logging import logger
+from ..utils.config import config
+
+_DONE = object()
+
+
+def extract_page(page, page_number: int, include_tables: bool = True,
+                 include_images: bool = True) -> Dict[str, Any]:
+    """Text, tables and image boxes of one pdfplumber page"""
+    page_text = page.extract_text()
+    # Try alternative extraction if primary fails
+    if not page_text or len(page_text.strip()) < 10:
+        try:
+            page_text = page.extract_text(layout=True)
+        except Exception:
+            pass
+
+    tables = []
+    try:
+        for j, table in enumerate((page.extract_tables() if include_tables else None) or []):
+            if table and len(table) > 0:
+                tables.append({
+                    'page_number': page_number,
+                    'table_number': j + 1,
+                    'table': table,
+                    'rows': len(table),
+                    'columns': len(table[0]) if table[0] else 0
+                })
+    except Exception as table_error:
+        logger.warning(f"Error extracting tables from page {page_number}: {table_error}")
+
+    images = []
+    try:
+        for img in (getattr(page, 'images', None) if include_images else None) or []:
+            images.append({
+                'page_number': page_number,
+                'bbox': img.get('bbox'),
+                'width': img.get('width'),
+                'height': img.get('height')
+            })
+    except Exception as img_error:
+        logger.warning(f"Error extracting images from page {page_number}: {img_error}")
+
+    return {
+        'page_number': page_number,
+        'text': page_text or '',
+        'bbox': page.bbox if hasattr(page, 'bbox') else None,
+        'tables': tables,
+        'images': images,
+    }
+
+
+# Headings that mark the sections note taking needs; matched at the start of a line
+SECTION_HEADINGS = {
+    'abstract': r'abstract',
+    'method': r'(?:materials and )?methods?|methodology|approach|proposed method',
+    'results': r'(?:experimental )?results|experiments|evaluation',
+    'conclusion': r'conclusions?|concluding remarks',
+}
+_HEADING_PATTERN = re.compile(
+    r'^\s*(?:\d+(?:\.\d+)*\.?|[IVX]+\.)?\s*(?:' +
+    '|'.join(f'(?P<{name}>{pattern})' for name, pattern in SECTION_HEADINGS.items()) +
+    r')\b[ \t]*[:.]?[ \t]*$',
+    re.IGNORECASE | re.MULTILINE
+)
+
+
+def find_sections(text: str) -> set:
+    """Names of the SECTION_HEADINGS whose heading line appears in ``text``"""
+    return {name for match in _HEADING_PATTERN.finditer(text or '')
+            for name, value in match.groupdict().items() if value}
+
+
+def iter_pdf_pages(pdf_path: str, include_tables: bool = False,
+                   include_images: bool = False) -> Iterator[Dict[str, Any]]:
+    """Yield page dicts one at a time, releasing each page's parsed objects once it is read
+
+    Pages after the point where the consumer stops iterating are never parsed.
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        for i, page in enumerate(pdf.pages):
+            try:
+                yield extract_page(page, i + 1, include_tables, include_images)
+            except Exception as page_error:
+                logger.warning(f"Error processing page {i + 1}: {page_error}")
+            finally:
+                page.close()
+
+
+def _limit_worker_memory(limit_mb: Optional[int]):
+    if not limit_mb:
+        return
+    try:
+        import resource
+        # The worker inherits the parent's mappings; cap what it may add on top
+        with open('/proc/self/statm') as statm:
+            inherited = int(statm.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        cap = inherited + limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (cap if hard == resource.RLIM_INFINITY else min(cap, hard), hard))
+    except (ImportError, OSError, ValueError) as e:
+        logger.debug(f"PDF worker memory cap unavailable: {e}")
+
+
+def plan_pdf(pdf_path: str) -> Tuple[int, Dict[str, Any]]:
+    """Page count and document metadata"""
+    try:
+        with pdfplumber.open(pdf_path) as pdf:
+            return len(pdf.pages), dict(pdf.metadata or {})
+    except Exception:
+        with open(pdf_path, 'rb') as file:
+            reader = PyPDF2.PdfReader(file)
+            return len(reader.pages), {}
+
+
+def extract_page_range(pdf_path: str, start: int, end: int, include_tables: bool = True,
+                       include_images: bool = True) -> List[Dict[str, Any]]:
+    """Pages ``start``..``end - 1`` (0-based); falls back to PyPDF2 text if pdfplumber cannot open the file"""
+    pages = []
+    try:
+        with pdfplumber.open(pdf_path) as pdf:
+            for i in range(start, min(end, len(pdf.pages))):
+                try:
+                    pages.append(extract_page(pdf.pages[i], i + 1, include_tables, include_images))
+                except Exception as page_error:
+                    logger.warning(f"Error processing page {i + 1}: {page_error}")
+        return pages
+    except Exception as e:
+        logger.warning(f"pdfplumber could not open {pdf_path}, using PyPDF2 for pages {start + 1}-{end}: {e}")
+    with open(pdf_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        if reader.is_encrypted:
+            reader.decrypt("")
+        for i in range(start, min(end, len(reader.pages))):
+            try:
+                text = reader.pages[i].extract_text() or ''
+            except Exception as page_error:
+                logger.warning(f"Error extracting page {i + 1}: {page_error}")
+                continue
+            pages.append({'page_number': i + 1, 'text': text, 'bbox': None, 'tables': [], 'images': []})
+    return pages
+
+
+def assemble_result(pages: Iterable[Dict[str, Any]], metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Combine page dicts into the shape returned by ``PDFProcessor.extract_text_pdfplumber``"""
+    result = {'text': '', 'pages': [], 'tables': [], 'metadata': metadata, 'images': []}
+    texts = []
+    for page in pages:
+        result['tables'].extend(page['tables'])
+        result['images'].extend(page['images'])
+        if page['text']:
+            texts.append(page['text'])
+            result['pages'].append({
+                'page_number': page['page_number'],
+                'text': page['text'],
+                'char_count': len(page['text']),
+                'bbox': page['bbox']
+            })
+    result['text'] = '\n'.join(texts).strip()
+    return result
+
+
+@dataclass
+class _Task:
+    pdf_path: str
+    start: int = -1  # -1 marks the planning task
+    end: int = -1
+    attempts: int = 0
+    include_tables: bool = True
+    include_images: bool = True
+
+
+class _Request:
+    """One caller's PDFs; the dispatcher posts its events to ``events``"""
+
+    def __init__(self):
+        self.events: queue.Queue = queue.Queue()
+        self.failed: set = set()
+        self.outstanding = 0
+        self.cancelled = False
+
+
+def _worker_main(conn, memory_limit_mb: Optional[int]):
+    """Worker process loop: run ``(function, args)`` jobs until the pipe closes"""
+    _limit_worker_memory(memory_limit_mb)
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        function, args = job
+        try:
+            reply = ('ok', function(*args))
+        except Exception as e:
+            reply = ('error', e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # e.g. an exception that cannot be pickled
+            conn.send(('error', RuntimeError(repr(e))))
+
+
+class _Worker:
+    """A worker process and the pipe it takes jobs on"""
+
+    def __init__(self, memory_limit_mb: Optional[int]):
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_worker_main, args=(child, memory_limit_mb), daemon=True)
+        self.process.start()
+        child.close()
+
+    def kill(self):
+        self.process.terminate()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+
+class PDFExtractionService:
+    """Extracts PDFs in worker processes, splitting large documents by page range
+
+    One dispatcher thread feeds every caller's tasks to at most ``max_workers``
+    workers, so a task's deadline counts from when a worker receives it. A task
+    that overruns is failed and only its worker is killed; other callers' tasks
+    keep running.
+    """
+
+    # Module-level functions so they can be sent to worker processes
+    plan_task = staticmethod(plan_pdf)
+    range_task = staticmethod(extract_page_range)
+
+    def __init__(self, max_workers: Optional[int] = None, pages_per_task: int = 16,
+                 memory_limit_mb: Optional[int] = 1024, timeout: float = 120.0):
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self.pages_per_task = max(1, pages_per_task)
+        self.memory_limit_mb = memory_limit_mb
+        self.timeout = timeout
+        self._pending: deque = deque()
+        self._idle: List[_Worker] = []
+        self._dispatcher: Optional[threading.Thread] = None
+        self._closing = False
+        self._lock = threading.Lock()
+        # The dispatcher waits on worker pipes; callers wake it through this one
+        self._wake_reader, self._wake_writer = multiprocessing.Pipe(duplex=False)
+        self._woken = False
+
+    def shutdown(self):
+        """Stop the workers; PDFs still queued or running are reported as failed"""
+        with self._lock:
+            dispatcher, self._dispatcher = self._dispatcher, None
+            self._closing = dispatcher is not None
+            if dispatcher is not None:
+                self._wake()
+        if dispatcher is not None:
+            dispatcher.join()
+        self._closing = False
+
+    def _wake(self):
+        # Called with the lock held; at most one wake-up is ever buffered
+        if not self._woken:
+            self._woken = True
+            self._wake_writer.send(None)
+
+    def _enqueue(self, items: Iterable[Tuple[_Request, _Task]], front: bool = False):
+        with self._lock:
+            if front:
+                self._pending.extendleft(reversed(list(items)))
+            else:
+                self._pending.extend(items)
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch, name='pdf-dispatcher', daemon=True)
+                self._dispatcher.start()
+            self._wake()
+
+    def _job(self, task: _Task) -> tuple:
+        if task.start < 0:
+            return self.plan_task, (task.pdf_path,)
+        return self.range_task, (task.pdf_path, task.start, task.end, task.include_tables, task.include_images)
+
+    def _finish(self, request: _Request, count: int = 1):
+        request.outstanding -= count
+        if request.outstanding <= 0:
+            request.events.put(_DONE)
+
+    def _fail(self, request: _Request, task: _Task, error: BaseException):
+        if task.pdf_path not in request.failed:
+            request.failed.add(task.pdf_path)
+            request.events.put(('failed', task.pdf_path, error))
+        self._finish(request)
+
+    def _dispatch(self):
+        """Assign tasks to workers, collect results and enforce per-task deadlines"""
+        busy: Dict[Any, Tuple[_Worker, _Request, _Task, float]] = {}
+        while True:
+            with self._lock:
+                closing = self._closing
+                while not closing and self._pending and len(busy) < self.max_workers:
+                    request, task = self._pending.popleft()
+                    if request.cancelled or task.pdf_path in request.failed:
+                        self._finish(request)
+                        continue
+                    worker = self._idle.pop() if self._idle else _Worker(self.memory_limit_mb)
+                    try:
+                        worker.conn.send(self._job(task))
+                    except OSError:
+                        # An idle worker that died since its last task
+                        worker.kill()
+                        worker = _Worker(self.memory_limit_mb)
+                        worker.conn.send(self._job(task))
+                    # The deadline starts now, when a worker has the task
+                    busy[worker.conn] = (worker, request, task, time.monotonic() + self.timeout)
+            if closing:
+                self._close(busy)
+                return
+
+            timeout = min((deadline for *_, deadline in busy.values()), default=None)
+            if timeout is not None:
+                timeout = max(0.0, timeout - time.monotonic())
+            ready = multiprocessing.connection.wait([self._wake_reader, *busy], timeout)
+
+            for conn in ready:
+                if conn is self._wake_reader:
+                    with self._lock:
+                        self._woken = False
+                        while self._wake_reader.poll():
+                            self._wake_reader.recv()
+                    continue
+                worker, request, task, _ = busy.pop(conn)
+                try:
+                    status, payload = conn.recv()
+                except (EOFError, OSError):
+                    # The worker died (e.g. killed for memory); retry its task once on a fresh one
+                    exitcode = worker.process.exitcode
+                    worker.kill()
+                    if task.attempts < 1:
+                        task.attempts += 1
+                        self._enqueue([(request, task)], front=True)
+                    else:
+                        self._fail(request, task, ChildProcessError(f"PDF worker exited with code {exitcode}"))
+                    continue
+                self._idle.append(worker)
+                self._handle_reply(request, task, status, payload)
+
+            now = time.monotonic()
+            for conn, (worker, request, task, deadline) in list(busy.items()):
+                if deadline <= now:
+                    # A stuck parser cannot be interrupted; replace only its worker
+                    del busy[conn]
+                    worker.kill()
+                    logger.warning(f"PDF extraction timed out after {self.timeout}s: {task.pdf_path}")
+                    self._fail(request, task, TimeoutError(f"Extraction exceeded {self.timeout}s"))
+
+    def _close(self, busy: Dict[Any, Tuple[_Worker, _Request, _Task, float]]):
+        shutdown_error = RuntimeError("PDF extraction service was shut down")
+        for worker, request, task, _ in busy.values():
+            worker.kill()
+            self._fail(request, task, shutdown_error)
+        for worker in self._idle:
+            worker.stop()
+        self._idle.clear()
+        with self._lock:
+            pending, self._pending = list(self._pending), deque()
+        for request, task in pending:
+            self._fail(request, task, shutdown_error)
+
+    def _handle_reply(self, request: _Request, task: _Task, status: str, payload: Any):
+        if request.cancelled or task.pdf_path in request.failed:
+            self._finish(request)
+            return
+        if status == 'error':
+            logger.warning(f"PDF extraction failed for {task.pdf_path}: {payload}")
+            self._fail(request, task, payload)
+            return
+        if task.start < 0:
+            page_count, metadata = payload
+            request.events.put(('planned', task.pdf_path, page_count, metadata))
+            ranges = [_Task(task.pdf_path, start, min(start + self.pages_per_task, page_count),
+                            include_tables=task.include_tables, include_images=task.include_images)
+                      for start in range(0, page_count, self.pages_per_task)]
+            request.outstanding += len(ranges)
+            # Ranges of a planned PDF go ahead of queued PDFs so documents finish early
+            self._enqueue([(request, task) for task in ranges], front=True)
+        else:
+            request.events.put(('pages', task.pdf_path, task.start, payload))
+        self._finish(request)
+
+    def _events(self, pdf_paths: Iterable[str], include_tables: bool = True,
+                include_images: bool = True) -> Iterator[tuple]:
+        """Yield ('planned', path, page_count, metadata), ('pages', path, start, pages) and
+        ('failed', path, error) events as worker results arrive"""
+        request = _Request()
+        tasks = [(request, _Task(str(path), include_tables=include_tables, include_images=include_images))
+                 for path in pdf_paths]
+        if not tasks:
+            return
+        request.outstanding = len(tasks)
+        self._enqueue(tasks)
+        try:
+            while True:
+                event = request.events.get()
+                if event is _DONE:
+                    return
+                yield event
+        finally:
+            # Queued tasks of a caller that stopped listening are skipped
+            request.cancelled = True
+
+    def iter_pages(self, pdf_path: str, include_tables: bool = True, include_images: bool = True,
+                   errors: Optional[Dict[str, BaseException]] = None) -> Iterator[Dict[str, Any]]:
+        """Page dicts in page order, each yielded once all earlier ranges have arrived
+
+        Ranges still queued when the caller stops iterating are never parsed. If
+        the PDF fails, iteration ends and ``errors`` (when given) receives the error.
+        """
+        ready: Dict[int, List[Dict[str, Any]]] = {}
+        next_start = 0
+        for event in self._events([pdf_path], include_tables, include_images):
+            if event[0] == 'failed':
+                if errors is not None:
+                    errors[event[1]] = event[2]
+                return
+            if event[0] == 'pages':
+                ready[event[2]] = event[3]
+                while next_start in ready:
+                    yield from ready.pop(next_start)
+                    next_start += self.pages_per_task
+
+    def extract(self, pdf_path: str,
+                errors: Optional[Dict[str, BaseException]] = None) -> Optional[Dict[str, Any]]:
+        """Full extraction result for one PDF, or None if it failed or timed out"""
+        for _, result in self.extract_many([pdf_path], errors):
+            return result
+        return None
+
+    def extract_many(self, pdf_paths: Iterable[str], errors: Optional[Dict[str, BaseException]] = None
+                     ) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """(path, result) pairs in completion order; result is None for failed PDFs
+
+        When ``errors`` is given, it receives the error of each failed PDF
+        (a ``TimeoutError`` when extraction overran).
+        """
+        state: Dict[str, dict] = {}
+        for event in self._events(pdf_paths):
+            kind, path = event[0], event[1]
+            if kind == 'failed':
+                state.pop(path, None)
+                if errors is not None:
+                    errors[path] = event[2]
+                yield path, None
+                continue
+            if kind == 'planned':
+                state[path] = {'remaining': -(-event[2] // self.pages_per_task), 'metadata': event[3], 'ranges': {}}
+            else:
+                entry = state[path]
+                entry['ranges'][event[2]] = event[3]
+                entry['remaining'] -= 1
+            entry = state[path]
+            if entry['remaining'] == 0:
+                del state[path]
+                pages = [page for start in sorted(entry['ranges']) for page in entry['ranges'][start]]
+                yield path, assemble_result(pages, entry['metadata'])
+
+
+_service: Optional[PDFExtractionService] = None
+_service_lock = threading.Lock()
+
+
+def get_pdf_extraction_service() -> PDFExtractionService:
+    """The shared extraction pool; worker processes start on first use"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = PDFExtractionService(
+                max_workers=config.get('pdf.extraction_workers'),
+                pages_per_task=config.get('pdf.pages_per_task', 16),
+                memory_limit_mb=config.get('pdf.worker_memory_mb', 1024),
+                timeout=config.get('pdf.extraction_timeout', 120),
+            )
+        return _service
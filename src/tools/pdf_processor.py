@@ -2,11 +2,16 @@ import PyPDF2
 import pdfplumber
 import requests
 from pathlib import Path
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, Callable, Iterable, Iterator, List, Tuple
 import hashlib
 import mimetypes
 from ..utils.config import config
 from ..utils.app_logging import logger
+from .pdf_extraction import SECTION_HEADINGS, extract_page, find_sections, get_pdf_extraction_service, iter_pdf_pages
+from ..storage.pdf_cache import PDFExtractionCache
+
+# Part of the extraction cache key; bump when extraction output changes
+EXTRACTOR_VERSION = f"1-pdfplumber{pdfplumber.__version__}-pypdf2{PyPDF2.__version__}"
 
 class PDFProcessor:
     def __init__(self):
@@ -18,6 +23,12 @@ class PDFProcessor:
         self.chunk_size = config.get('pdf.download_chunk_size', 8192)
         self.timeout = config.get('pdf.download_timeout', 30)
         self.min_content_length = config.get('pdf.min_content_length', 100)
+        # Parse in worker processes so extraction does not contend with LLM threads for the GIL
+        self.use_process_pool = config.get('pdf.use_process_pool', True)
+        # Re-processing a PDF with the same bytes is a cache read
+        self.cache_enabled = config.get('pdf.cache_enabled', True)
+        self.extractor_version = f"{EXTRACTOR_VERSION}-min{self.min_content_length}"
+        self._extraction_cache: Optional[PDFExtractionCache] = None
     
     def _validate_pdf_file(self, filepath: Path) -> Tuple[bool, str]:
         """Validate PDF file integrity and security"""
@@ -157,7 +168,7 @@ class PDFProcessor:
         try:
             with open(pdf_path, 'rb') as file:
                 reader = PyPDF2.PdfReader(file)
-                text = ""
+                text_parts = []
                 
                 # Check if PDF is encrypted
                 if reader.is_encrypted:
@@ -175,7 +186,7 @@ class PDFProcessor:
                     try:
                         page_text = page.extract_text()
                         if page_text:
-                            text += page_text + "\n"
+                            text_parts.append(page_text)
                         
                         # Log progress for large documents
                         if i > 0 and i % 10 == 0:
@@ -185,7 +196,7 @@ class PDFProcessor:
                         logger.warning(f"Error extracting page {i+1}: {page_error}")
                         continue
                 
-                final_text = text.strip()
+                final_text = "\n".join(text_parts).strip()
                 logger.info(f"PyPDF2 extraction complete: {len(final_text)} characters")
                 return final_text if final_text else None
                 
@@ -210,58 +221,22 @@ class PDFProcessor:
                 total_pages = len(pdf.pages)
                 logger.info(f"Extracting content from {total_pages} pages using pdfplumber")
                 
-                total_text = ""
+                text_parts = []
                 
                 for i, page in enumerate(pdf.pages):
                     try:
-                        # Extract text with better error handling
-                        page_text = page.extract_text()
-                        
-                        # Try alternative extraction if primary fails
-                        if not page_text or len(page_text.strip()) < 10:
-                            try:
-                                # Try with different layout parameters
-                                page_text = page.extract_text(layout=True)
-                            except:
-                                pass
-                        
+                        extracted = extract_page(page, i + 1)
+                        page_text = extracted['text']
                         if page_text:
-                            total_text += page_text + "\n"
+                            text_parts.append(page_text)
                             result['pages'].append({
                                 'page_number': i + 1,
                                 'text': page_text,
                                 'char_count': len(page_text),
-                                'bbox': page.bbox if hasattr(page, 'bbox') else None
+                                'bbox': extracted['bbox']
                             })
-                        
-                        # Extract tables with better error handling
-                        try:
-                            tables = page.extract_tables()
-                            if tables:
-                                for j, table in enumerate(tables):
-                                    if table and len(table) > 0:
-                                        result['tables'].append({
-                                            'page_number': i + 1,
-                                            'table_number': j + 1,
-                                            'table': table,
-                                            'rows': len(table),
-                                            'columns': len(table[0]) if table[0] else 0
-                                        })
-                        except Exception as table_error:
-                            logger.warning(f"Error extracting tables from page {i+1}: {table_error}")
-                        
-                        # Extract image information
-                        try:
-                            if hasattr(page, 'images') and page.images:
-                                for img in page.images:
-                                    result['images'].append({
-                                        'page_number': i + 1,
-                                        'bbox': img.get('bbox'),
-                                        'width': img.get('width'),
-                                        'height': img.get('height')
-                                    })
-                        except Exception as img_error:
-                            logger.warning(f"Error extracting images from page {i+1}: {img_error}")
+                        result['tables'].extend(extracted['tables'])
+                        result['images'].extend(extracted['images'])
                         
                         # Log progress for large documents
                         if i > 0 and i % 10 == 0:
@@ -271,7 +246,7 @@ class PDFProcessor:
                         logger.warning(f"Error processing page {i+1}: {page_error}")
                         continue
                 
-                result['text'] = total_text.strip()
+                result['text'] = "\n".join(text_parts).strip()
                 
                 # Assess content quality
                 result['quality_assessment'] = self._assess_content_quality(result['text'])
@@ -285,8 +260,11 @@ class PDFProcessor:
             logger.error(f"Error extracting text with pdfplumber: {e}")
             return None
     
-    def process_pdf(self, pdf_path: str) -> Optional[Dict[str, Any]]:
-        """Process PDF and extract comprehensive information with enhanced validation"""
+    def process_pdf(self, pdf_path: str, extracted: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Process PDF and extract comprehensive information with enhanced validation
+        
+        ``extracted`` is a primary extraction already produced by the process pool.
+        """
         try:
             pdf_file = Path(pdf_path)
             
@@ -303,8 +281,25 @@ class PDFProcessor:
             
             logger.info(f"Processing PDF: {pdf_file.name} ({pdf_file.stat().st_size / (1024*1024):.2f}MB)")
             
+            file_hash = self._calculate_file_hash(pdf_file)
+            cached = self._cached_extraction(file_hash)
+            if cached is not None:
+                cached['processing_info'] = self._processing_info(pdf_file, file_hash, cache_hit=True)
+                logger.info(f"Using cached extraction for {pdf_file.name} ({len(cached.get('text', ''))} characters)")
+                return cached
+            
             # Try pdfplumber first (more comprehensive)
-            result = self.extract_text_pdfplumber(pdf_path)
+            if extracted is not None or self.use_process_pool:
+                errors = {}
+                result = extracted if extracted is not None else get_pdf_extraction_service().extract(str(pdf_path), errors)
+                if isinstance(errors.get(str(pdf_path)), TimeoutError):
+                    # Re-parsing in-process would hang on the same file, without a timeout
+                    logger.error(f"PDF extraction timed out, skipping fallback: {pdf_file.name}")
+                    return None
+                if result:
+                    result['quality_assessment'] = self._assess_content_quality(result['text'])
+            else:
+                result = self.extract_text_pdfplumber(pdf_path)
             
             if not result or not result.get('text') or len(result['text'].strip()) < self.min_content_length:
                 logger.warning("pdfplumber extraction insufficient, trying PyPDF2 fallback")
@@ -327,13 +322,11 @@ class PDFProcessor:
             else:
                 result['extraction_method'] = 'pdfplumber'
             
+            if self.extraction_cache is not None:
+                self.extraction_cache.put(file_hash, self.extractor_version, result)
+            
             # Add processing metadata
-            result['processing_info'] = {
-                'file_path': str(pdf_path),
-                'file_size_mb': pdf_file.stat().st_size / (1024*1024),
-                'file_hash': self._calculate_file_hash(pdf_file),
-                'processing_timestamp': logger.info.__globals__.get('datetime', type('datetime', (), {'now': lambda: 'unknown'})).now() if 'datetime' in logger.info.__globals__ else 'unknown'
-            }
+            result['processing_info'] = self._processing_info(pdf_file, file_hash)
             
             # Final quality check
             quality = result.get('quality_assessment', {})
@@ -349,6 +342,155 @@ class PDFProcessor:
             logger.error(f"Error processing PDF {pdf_path}: {e}")
             return None
     
+    def _processing_info(self, pdf_file: Path, file_hash: str, cache_hit: bool = False) -> Dict[str, Any]:
+        return {
+            'file_path': str(pdf_file),
+            'file_size_mb': pdf_file.stat().st_size / (1024*1024),
+            'file_hash': file_hash,
+            'processing_timestamp': logger.info.__globals__.get('datetime', type('datetime', (), {'now': lambda: 'unknown'})).now() if 'datetime' in logger.info.__globals__ else 'unknown',
+            'cache_hit': cache_hit
+        }
+    
+    @property
+    def extraction_cache(self) -> Optional[PDFExtractionCache]:
+        """Persistent extraction results in the research database (None when disabled)"""
+        if self._extraction_cache is None and self.cache_enabled:
+            from ..storage.database import db
+            self._extraction_cache = PDFExtractionCache(db.db_path)
+        return self._extraction_cache
+    
+    @extraction_cache.setter
+    def extraction_cache(self, cache: Optional[PDFExtractionCache]):
+        self._extraction_cache = cache
+    
+    def _cached_extraction(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        if self.extraction_cache is None:
+            return None
+        return self.extraction_cache.get(file_hash, self.extractor_version)
+    
+    def iter_pages(self, pdf_path: str, include_tables: bool = False) -> Iterator[Dict[str, Any]]:
+        """Yield pages lazily in page order; tables are only extracted when requested"""
+        try:
+            yield from iter_pdf_pages(pdf_path, include_tables=include_tables)
+        except Exception as e:
+            logger.error(f"Error streaming pages from {pdf_path}: {e}")
+    
+    def extract_text_budgeted(self, pdf_path: str, max_chars: Optional[int] = None,
+                              target_sections: Iterable[str] = tuple(SECTION_HEADINGS),
+                              include_tables: bool = False) -> Dict[str, Any]:
+        """Read pages only until ``max_chars`` are collected or every target section has been reached
+        
+        Once the last target heading is seen, one more page is read so its section
+        body is included. Pages are parsed by the process pool when it is enabled,
+        so reading PDFs does not hold the GIL on the caller's thread.
+        
+        Results are cached by file hash and budget, so a later read with the same
+        budget does not parse the file again; a cached full extraction is also used.
+        """
+        targets = set(target_sections)
+        pages, file_hash = None, None
+        errors: Dict[str, BaseException] = {}
+        budget_version = f"{self.extractor_version}/budget-{max_chars}-{'+'.join(sorted(targets))}" \
+                         f"-tables{int(include_tables)}"
+        if self.extraction_cache is not None and Path(pdf_path).exists():
+            file_hash = self._calculate_file_hash(Path(pdf_path))
+            cached = self.extraction_cache.get(file_hash, budget_version)
+            if cached is not None:
+                return cached
+            cached = self._cached_extraction(file_hash)
+            if cached is not None:
+                pages = iter(cached.get('pages') or [{'page_number': 1, 'text': cached.get('text', '')}])
+        if pages is None and self.use_process_pool:
+            pages = get_pdf_extraction_service().iter_pages(str(pdf_path), include_tables=include_tables,
+                                                            include_images=False, errors=errors)
+        elif pages is None:
+            pages = self.iter_pages(pdf_path, include_tables=include_tables)
+        
+        parts, page_texts, tables, found = [], [], [], set()
+        chars, pages_read, stopped = 0, 0, 'end_of_document'
+        pages_after_targets = None
+        for page in pages:
+            text = page.get('text') or ''
+            pages_read += 1
+            if max_chars is not None and chars + len(text) > max_chars:
+                text = text[:max(0, max_chars - chars)]
+            if text:
+                parts.append(text)
+                page_texts.append({'page_number': page.get('page_number', pages_read), 'text': text})
+                chars += len(text) + 1
+            tables.extend(page.get('tables') or [])
+            found |= find_sections(text) & targets
+            
+            if max_chars is not None and chars >= max_chars:
+                stopped = 'char_budget'
+                break
+            if pages_after_targets is not None:
+                pages_after_targets += 1
+            elif targets and found >= targets:
+                pages_after_targets = 0
+            if pages_after_targets is not None and pages_after_targets >= 1:
+                stopped = 'sections_found'
+                break
+        # Stop the page generator now so the PDF is closed
+        close = getattr(pages, 'close', None)
+        if close:
+            close()
+        for error in errors.values():
+            logger.error(f"Error streaming pages from {pdf_path}: {error}")
+            stopped = 'error'
+        
+        result = {
+            'text': "\n".join(parts).strip(),
+            'pages': page_texts,
+            'tables': tables,
+            'pages_read': pages_read,
+            'sections_found': sorted(found),
+            'stopped': stopped
+        }
+        # Reads that failed part-way are not cached, so the next run tries the file again
+        if file_hash is not None and not errors:
+            self.extraction_cache.put(file_hash, budget_version, result)
+        return result
+    
+    def process_pdfs(self, pdf_paths: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Process several PDFs, parsing them in parallel worker processes"""
+        extracted, timed_out = {}, set()
+        if self.use_process_pool and len(pdf_paths) > 1:
+            valid = [str(path) for path in pdf_paths if self._validate_pdf_file(Path(path))[0]]
+            if self.extraction_cache is not None:
+                hashes = {path: self._calculate_file_hash(Path(path)) for path in valid}
+                cached = self.extraction_cache.has(hashes.values(), self.extractor_version)
+                valid = [path for path in valid if hashes[path] not in cached]
+            # Failed files map to {} so process_pdf goes straight to its fallback
+            errors = {}
+            extracted = {path: result or {}
+                         for path, result in get_pdf_extraction_service().extract_many(valid, errors)}
+            # Timed-out files get no in-process fallback; it would hang on the same file
+            timed_out = {path for path, error in errors.items() if isinstance(error, TimeoutError)}
+            for path in timed_out:
+                logger.error(f"PDF extraction timed out, skipping fallback: {path}")
+        return {pdf_path: None if str(pdf_path) in timed_out else self.process_pdf(pdf_path, extracted.get(str(pdf_path)))
+                for pdf_path in pdf_paths}
+    
+    def prefetch(self, pdf_paths: List[str],
+                 on_extracted: Optional[Callable[[str, Dict[str, Any]], Any]] = None) -> Dict[str, int]:
+        """Extract and cache PDFs ahead of time; returns counts of cached, extracted and failed files
+        
+        ``on_extracted`` is called with the path and result of every PDF that was extracted or cached.
+        """
+        counts = {'cached': 0, 'extracted': 0, 'failed': 0}
+        for pdf_path, result in self.process_pdfs(list(pdf_paths)).items():
+            if result is None:
+                counts['failed'] += 1
+                continue
+            if result['processing_info'].get('cache_hit'):
+                counts['cached'] += 1
+            else:
+                counts['extracted'] += 1
+            if on_extracted:
+                on_extracted(pdf_path, result)
+        return counts
+    
     def get_pdf_info(self, pdf_path: str) -> Optional[Dict[str, Any]]:
         """Get basic PDF information without full text extraction"""
         try:
@@ -0,0 +1,148 @@
+import hashlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..storage.models import Paper
+from ..utils.app_logging import logger
+from .near_duplicates import normalize_arxiv_id, normalize_doi, normalize_title
+
+def title_key(title: Optional[str]) -> Optional[str]:
+    normalized = normalize_title(title)
+    # Very short titles ("Introduction", "Editorial") are too ambiguous to block on
+    if len(normalized.split()) < 3:
+        return None
+    return hashlib.md5(normalized.encode()).hexdigest()[:16]
+
+
+class RecordLinker:
+    """Links records of the same work from different sources and merges them
+
+    Records are blocked on normalized DOI, arXiv ID (without version) and
+    normalized title hash; records sharing any key are linked transitively,
+    except that a shared title never links groups with conflicting DOIs or
+    arXiv IDs.
+    Each group is merged field by field into one canonical :class:`Paper`
+    whose ``provenance`` lists the contributing source records.
+    """
+
+    def link(self, papers: List[Paper]) -> List[Paper]:
+        """Return one merged paper per linked group, in first-seen order"""
+        if not papers:
+            return []
+
+        parent = list(range(len(papers)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        # Identifiers per group root, so title links can be vetoed when they conflict
+        identifiers: Dict[int, Tuple[Set[str], Set[str]]] = {}
+
+        def union(a: int, b: int):
+            # Union by first-seen index keeps the earliest record as the root
+            root, child = min(a, b), max(a, b)
+            parent[child] = root
+            for mine, theirs in zip(identifiers[root], identifiers.pop(child)):
+                mine |= theirs
+
+        blocks: Dict[str, int] = {}
+        for i, paper in enumerate(papers):
+            doi = normalize_doi(getattr(paper, 'doi', None))
+            arxiv_id = normalize_arxiv_id(getattr(paper, 'arxiv_id', None))
+            identifiers[i] = ({doi} if doi else set(), {arxiv_id} if arxiv_id else set())
+            keys = [('doi', doi), ('arxiv', arxiv_id), ('title', title_key(getattr(paper, 'title', None)))]
+            for kind, value in keys:
+                if not value:
+                    continue
+                block = f"{kind}:{value}"
+                if block not in blocks:
+                    blocks[block] = i
+                    continue
+                a, b = find(blocks[block]), find(i)
+                if a == b:
+                    continue
+                if kind == 'title' and self._identifiers_conflict(identifiers[a], identifiers[b]):
+                    # Same title, different DOI or arXiv id: e.g. "Part I"/"Part II" or yearly proceedings
+                    continue
+                union(a, b)
+
+        groups: Dict[int, List[Paper]] = defaultdict(list)
+        for i, paper in enumerate(papers):
+            groups[find(i)].append(paper)
+
+        merged = [self.merge(group) if len(group) > 1 else self._with_provenance(group[0])
+                  for _, group in sorted(groups.items())]
+        linked = len(papers) - len(merged)
+        if linked:
+            logger.info(f"Record linkage merged {len(papers)} records into {len(merged)} papers")
+        return merged
+
+    @staticmethod
+    def _identifiers_conflict(first: Tuple[Set[str], Set[str]], second: Tuple[Set[str], Set[str]]) -> bool:
+        return any(a and b and not a & b for a, b in zip(first, second))
+
+    @staticmethod
+    def _provenance_entry(paper: Paper) -> Dict[str, Optional[str]]:
+        return {
+            'source': paper.source,
+            'record_id': paper.id,
+            'doi': normalize_doi(paper.doi),
+            'arxiv_id': paper.arxiv_id,
+            'url': paper.url or None,
+        }
+
+    def _with_provenance(self, paper: Paper) -> Paper:
+        if not paper.provenance:
+            paper.provenance = [self._provenance_entry(paper)]
+        return paper
+
+    def merge(self, records: List[Paper]) -> Paper:
+        """Merge records of one work into a canonical paper"""
+        first = records[0]
+
+        # Prefer titles that are not shouted in all caps, then the most complete
+        titles = [r.title for r in records if r.title]
+        title = max(titles, key=lambda t: (not t.isupper(), len(t))) if titles else first.title
+
+        venues = [r.venue for r in records if r.venue]
+        venue = next((v for v in venues if 'arxiv' not in v.lower()), venues[0] if venues else None)
+
+        keywords, seen = [], set()
+        for record in records:
+            for keyword in record.keywords or []:
+                if keyword and keyword.lower() not in seen:
+                    seen.add(keyword.lower())
+                    keywords.append(keyword)
+
+        dates = [r.published_date for r in records if r.published_date]
+        try:
+            published_date = min(dates) if dates else None
+        except TypeError:
+            # Mixed naive and timezone-aware dates
+            published_date = dates[0]
+        full_texts = [r.full_text for r in records if r.full_text]
+
+        merged = Paper(
+            id=first.id,
+            title=title,
+            authors=max((r.authors or [] for r in records), key=len),
+            abstract=max((r.abstract or '' for r in records), key=len),
+            url=next((r.url for r in records if r.url), ''),
+            published_date=published_date,
+            venue=venue,
+            citations=max((r.citations or 0) for r in records),
+            pdf_path=next((r.pdf_path for r in records if r.pdf_path), None),
+            full_text=max(full_texts, key=len) if full_texts else None,
+            keywords=keywords,
+            doi=next((normalize_doi(r.doi) for r in records if r.doi), None),
+            arxiv_id=next((r.arxiv_id for r in records if r.arxiv_id), None),
+            created_at=first.created_at
+        )
+        merged.source = first.source
+        merged.provenance = []
+        for record in records:
+            merged.provenance.extend(record.provenance or [self._provenance_entry(record)])
+        return merged
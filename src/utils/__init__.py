@@ -9,7 +9,6 @@ from .config import Config
 from .logging import setup_logging
 from .validators import *
 from .error_handler import ErrorHandler
-from .export_manager import ExportManager
 from .performance_optimizer import PerformanceOptimizer
 
 __all__ = [
@@ -19,3 +18,11 @@ __all__ = [
     "ExportManager",
     "PerformanceOptimizer",
 ]
+
+
+def __getattr__(name):
+    # The exporter pulls in reportlab and python-docx, so load it on first use
+    if name == "ExportManager":
+        from .export_manager import ExportManager
+        return ExportManager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -19,6 +19,52 @@ from .performance_optimizer import optimizer
 logger = logging.getLogger(__name__)
 
 
+# Index definitions with performance hints. Expression indexes over whole
+# abstracts and note bodies were dropped: they bloated the file without
+# serving any query (see RETIRED_INDEXES).
+ADVANCED_INDEXES = [
+    # Core performance indexes
+    ("idx_papers_title_hash", "CREATE INDEX IF NOT EXISTS idx_papers_title_hash ON papers(title COLLATE NOCASE)", "High"),
+    ("idx_papers_published_date_desc", "CREATE INDEX IF NOT EXISTS idx_papers_published_date_desc ON papers(published_date DESC)", "High"),
+    ("idx_papers_venue_normalized", "CREATE INDEX IF NOT EXISTS idx_papers_venue_normalized ON papers(LOWER(venue))", "Medium"),
+    ("idx_papers_citations_desc", "CREATE INDEX IF NOT EXISTS idx_papers_citations_desc ON papers(citations DESC)", "High"),
+    ("idx_papers_doi_unique", "CREATE UNIQUE INDEX IF NOT EXISTS idx_papers_doi_unique ON papers(doi) WHERE doi IS NOT NULL", "High"),
+    ("idx_papers_arxiv_unique", "CREATE UNIQUE INDEX IF NOT EXISTS idx_papers_arxiv_unique ON papers(arxiv_id) WHERE arxiv_id IS NOT NULL", "High"),
+
+    # Time-based indexes for performance
+    ("idx_papers_created_at_desc", "CREATE INDEX IF NOT EXISTS idx_papers_created_at_desc ON papers(created_at DESC)", "Medium"),
+    ("idx_papers_recent", "CREATE INDEX IF NOT EXISTS idx_papers_recent ON papers(published_date) WHERE published_date >= '2020-01-01'", "High"),
+
+    # Research notes optimized indexes
+    ("idx_notes_paper_id_type", "CREATE INDEX IF NOT EXISTS idx_notes_paper_id_type ON research_notes(paper_id, note_type)", "High"),
+    ("idx_notes_confidence_desc", "CREATE INDEX IF NOT EXISTS idx_notes_confidence_desc ON research_notes(confidence DESC)", "Medium"),
+
+    # Research themes advanced indexes
+    ("idx_themes_frequency_confidence", "CREATE INDEX IF NOT EXISTS idx_themes_frequency_confidence ON research_themes(frequency DESC, confidence DESC)", "High"),
+    ("idx_themes_title_unique", "CREATE UNIQUE INDEX IF NOT EXISTS idx_themes_title_unique ON research_themes(title COLLATE NOCASE)", "Medium"),
+
+    # Citations performance indexes
+    ("idx_citations_paper_format", "CREATE INDEX IF NOT EXISTS idx_citations_paper_format ON citations(paper_id, citation_key)", "High"),
+
+    # Composite performance indexes for common query patterns
+    ("idx_papers_search_rank", "CREATE INDEX IF NOT EXISTS idx_papers_search_rank ON papers(published_date DESC, citations DESC, venue)", "High"),
+    ("idx_notes_paper_confidence", "CREATE INDEX IF NOT EXISTS idx_notes_paper_confidence ON research_notes(paper_id, confidence DESC, note_type)", "High"),
+
+    # Partial indexes for better performance
+    ("idx_papers_high_citations", "CREATE INDEX IF NOT EXISTS idx_papers_high_citations ON papers(title, authors) WHERE citations >= 10", "Medium"),
+    ("idx_papers_with_doi", "CREATE INDEX IF NOT EXISTS idx_papers_with_doi ON papers(doi, published_date) WHERE doi IS NOT NULL", "High"),
+    ("idx_papers_with_abstract", "CREATE INDEX IF NOT EXISTS idx_papers_with_abstract ON papers(title, authors) WHERE abstract IS NOT NULL AND LENGTH(abstract) > 100", "Medium"),
+]
+
+RETIRED_INDEXES = [
+    'idx_notes_content_length',
+    'idx_papers_abstract_words',
+    'idx_notes_content_words',
+    'idx_papers_quality_score',
+    'idx_papers_authors_normalized',
+]
+
+
 class EnhancedDatabaseOptimizer:
     """Advanced database optimization with performance monitoring and adaptive tuning"""
     
@@ -36,52 +82,10 @@ class EnhancedDatabaseOptimizer:
         """Create comprehensive indexes with performance monitoring"""
         results = {'created': [], 'failed': [], 'skipped': []}
         
-        # Enhanced index definitions with performance hints
-        advanced_indexes = [
-            # Core performance indexes
-            ("idx_papers_title_hash", "CREATE INDEX IF NOT EXISTS idx_papers_title_hash ON papers(title COLLATE NOCASE)", "High"),
-            ("idx_papers_authors_normalized", "CREATE INDEX IF NOT EXISTS idx_papers_authors_normalized ON papers(LOWER(authors))", "High"),
-            ("idx_papers_published_date_desc", "CREATE INDEX IF NOT EXISTS idx_papers_published_date_desc ON papers(published_date DESC)", "High"),
-            ("idx_papers_venue_normalized", "CREATE INDEX IF NOT EXISTS idx_papers_venue_normalized ON papers(LOWER(venue))", "Medium"),
-            ("idx_papers_citations_desc", "CREATE INDEX IF NOT EXISTS idx_papers_citations_desc ON papers(citations DESC)", "High"),
-            ("idx_papers_doi_unique", "CREATE UNIQUE INDEX IF NOT EXISTS idx_papers_doi_unique ON papers(doi) WHERE doi IS NOT NULL", "High"),
-            ("idx_papers_arxiv_unique", "CREATE UNIQUE INDEX IF NOT EXISTS idx_papers_arxiv_unique ON papers(arxiv_id) WHERE arxiv_id IS NOT NULL", "High"),
-            
-            # Time-based indexes for performance
-            ("idx_papers_created_at_desc", "CREATE INDEX IF NOT EXISTS idx_papers_created_at_desc ON papers(created_at DESC)", "Medium"),
-            ("idx_papers_recent", "CREATE INDEX IF NOT EXISTS idx_papers_recent ON papers(published_date) WHERE published_date >= '2020-01-01'", "High"),
-            
-            # Research notes optimized indexes
-            ("idx_notes_paper_id_type", "CREATE INDEX IF NOT EXISTS idx_notes_paper_id_type ON research_notes(paper_id, note_type)", "High"),
-            ("idx_notes_confidence_desc", "CREATE INDEX IF NOT EXISTS idx_notes_confidence_desc ON research_notes(confidence DESC)", "Medium"),
-            ("idx_notes_content_length", "CREATE INDEX IF NOT EXISTS idx_notes_content_length ON research_notes(LENGTH(content) DESC)", "Low"),
-            
-            # Research themes advanced indexes
-            ("idx_themes_frequency_confidence", "CREATE INDEX IF NOT EXISTS idx_themes_frequency_confidence ON research_themes(frequency DESC, confidence DESC)", "High"),
-            ("idx_themes_title_unique", "CREATE UNIQUE INDEX IF NOT EXISTS idx_themes_title_unique ON research_themes(title COLLATE NOCASE)", "Medium"),
-            
-            # Citations performance indexes
-            ("idx_citations_paper_format", "CREATE INDEX IF NOT EXISTS idx_citations_paper_format ON citations(paper_id, citation_key)", "High"),
-            
-            # Full-text search optimizations
-            ("idx_papers_abstract_words", "CREATE INDEX IF NOT EXISTS idx_papers_abstract_words ON papers(abstract) WHERE LENGTH(abstract) > 100", "Medium"),
-            ("idx_notes_content_words", "CREATE INDEX IF NOT EXISTS idx_notes_content_words ON research_notes(content) WHERE LENGTH(content) > 50", "Medium"),
-            
-            # Composite performance indexes for common query patterns
-            ("idx_papers_search_rank", "CREATE INDEX IF NOT EXISTS idx_papers_search_rank ON papers(published_date DESC, citations DESC, venue)", "High"),
-            ("idx_papers_quality_score", "CREATE INDEX IF NOT EXISTS idx_papers_quality_score ON papers(citations DESC, LENGTH(abstract) DESC)", "Medium"),
-            ("idx_notes_paper_confidence", "CREATE INDEX IF NOT EXISTS idx_notes_paper_confidence ON research_notes(paper_id, confidence DESC, note_type)", "High"),
-            
-            # Partial indexes for better performance
-            ("idx_papers_high_citations", "CREATE INDEX IF NOT EXISTS idx_papers_high_citations ON papers(title, authors) WHERE citations >= 10", "Medium"),
-            ("idx_papers_with_doi", "CREATE INDEX IF NOT EXISTS idx_papers_with_doi ON papers(doi, published_date) WHERE doi IS NOT NULL", "High"),
-            ("idx_papers_with_abstract", "CREATE INDEX IF NOT EXISTS idx_papers_with_abstract ON papers(title, authors) WHERE abstract IS NOT NULL AND LENGTH(abstract) > 100", "Medium"),
-        ]
-        
         with sqlite3.connect(self.db_path, timeout=30.0) as conn:
             cursor = conn.cursor()
             
-            for index_name, index_sql, priority in advanced_indexes:
+            for index_name, index_sql, priority in ADVANCED_INDEXES:
                 try:
                     start_time = time.time()
                     cursor.execute(index_sql)
@@ -0,0 +1,188 @@
+"""
+Process-wide sentence embedding service.
+
+The sentence-transformers model is loaded on the first ``encode`` call, not
+when an agent is constructed, and one model per name is shared by every
+caller in the process. Encode requests from any thread or coroutine are
+queued and merged by a single worker into one forward pass: the worker takes
+the first waiting request, then keeps collecting until ``max_batch_size``
+texts are queued or ``max_wait_ms`` has passed.
+
+``embeddings.backend: onnx`` loads the model through ONNX Runtime (with
+``embeddings.onnx_file`` pointing at e.g. a quantized int8 export) on
+sentence-transformers versions that support it, falling back to torch.
+"""
+
+import asyncio
+import importlib.util
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import numpy as np
+
+from .app_logging import logger
+from .config import config
+
+DEFAULT_MODEL = 'all-MiniLM-L6-v2'
+
+
+def _load_sentence_transformer(model_name: str, backend: str = 'torch', onnx_file: Optional[str] = None):
+    from sentence_transformers import SentenceTransformer
+
+    if backend == 'onnx':
+        try:
+            model_kwargs = {'file_name': onnx_file} if onnx_file else None
+            return SentenceTransformer(model_name, device='cpu', backend='onnx', model_kwargs=model_kwargs)
+        except Exception as e:
+            logger.warning(f"ONNX backend unavailable for {model_name}, using torch: {e}")
+
+    # Load on CPU first to avoid meta tensor issues, then move if CUDA is usable
+    model = SentenceTransformer(model_name, device='cpu')
+    try:
+        import torch
+        if torch.cuda.is_available():
+            model = model.to('cuda')
+    except Exception:
+        model = model.to('cpu')
+    if hasattr(model, 'eval'):
+        model.eval()
+    return model
+
+
+class EmbeddingService:
+    """Lazily loaded embedding model with dynamic micro-batching"""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, max_batch_size: int = 64, max_wait_ms: float = 5.0,
+                 loader: Optional[Callable[[], Any]] = None):
+        self.model_name = model_name
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._loader = loader or (lambda: _load_sentence_transformer(
+            model_name, config.get('embeddings.backend', 'torch'), config.get('embeddings.onnx_file')))
+
+        self._model = None
+        self._load_error: Optional[Exception] = None
+        self._queue: 'queue.Queue[tuple]' = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'batches': 0, 'texts': 0}
+
+    @staticmethod
+    def is_installed() -> bool:
+        """Whether sentence-transformers can be imported, without importing it"""
+        return importlib.util.find_spec('sentence_transformers') is not None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def encode(self, texts: Union[str, List[str]]) -> np.ndarray:
+        """Embed one text (1-D result) or a list of texts (one row each)"""
+        single = isinstance(texts, str)
+        embeddings = self.submit([texts] if single else list(texts)).result()
+        return embeddings[0] if single else embeddings
+
+    async def encode_async(self, texts: Union[str, List[str]]) -> np.ndarray:
+        single = isinstance(texts, str)
+        embeddings = await asyncio.wrap_future(self.submit([texts] if single else list(texts)))
+        return embeddings[0] if single else embeddings
+
+    def submit(self, texts: List[str]) -> Future:
+        """Queue texts for the next batch; the future resolves to a 2-D array"""
+        future: Future = Future()
+        if not texts:
+            future.set_result(np.zeros((0, 0), dtype=np.float32))
+            return future
+        if self._load_error is not None:
+            future.set_exception(self._load_error)
+            return future
+        self._ensure_worker()
+        self._queue.put((texts, future))
+        return future
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=f"embeddings-{self.model_name}",
+                                                daemon=True)
+                self._worker.start()
+
+    def _model_or_raise(self):
+        if self._model is None and self._load_error is None:
+            start_time = time.time()
+            try:
+                self._model = self._loader()
+                logger.info(f"Embedding model {self.model_name} loaded in {time.time() - start_time:.2f}s")
+            except Exception as e:
+                # Remember the failure so later requests fail fast instead of retrying the download
+                self._load_error = e
+                logger.warning(f"Failed to load embedding model {self.model_name}: {e}")
+        if self._load_error is not None:
+            raise self._load_error
+        return self._model
+
+    @staticmethod
+    def _claim(request: tuple) -> bool:
+        """Mark a queued request running; False if its caller already cancelled it"""
+        return request[1].set_running_or_notify_cancel()
+
+    def _next_batch(self) -> List[tuple]:
+        request = self._queue.get()
+        while not self._claim(request):
+            request = self._queue.get()
+        batch = [request]
+        queued = len(request[0])
+        deadline = time.monotonic() + self.max_wait
+        while queued < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if self._claim(request):
+                batch.append(request)
+                queued += len(request[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            texts = [text for request_texts, _ in batch for text in request_texts]
+            try:
+                model = self._model_or_raise()
+                embeddings = np.asarray(model.encode(texts, batch_size=self.max_batch_size,
+                                                     show_progress_bar=False), dtype=np.float32)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.stats['requests'] += len(batch)
+            self.stats['batches'] += 1
+            self.stats['texts'] += len(texts)
+            offset = 0
+            for request_texts, future in batch:
+                future.set_result(embeddings[offset:offset + len(request_texts)])
+                offset += len(request_texts)
+
+
+_services: Dict[str, EmbeddingService] = {}
+_services_lock = threading.Lock()
+
+
+def get_embedding_service(model_name: Optional[str] = None) -> EmbeddingService:
+    """The shared service for a model; nothing is loaded until the first encode"""
+    model_name = model_name or config.get('embeddings.model', DEFAULT_MODEL)
+    with _services_lock:
+        service = _services.get(model_name)
+        if service is None:
+            service = EmbeddingService(
+                model_name,
+                max_batch_size=config.get('embeddings.max_batch_size', 64),
+                max_wait_ms=config.get('embeddings.max_wait_ms', 5.0),
+            )
+            _services[model_name] = service
+        return service
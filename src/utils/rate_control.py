@@ -0,0 +1,203 @@
+"""
+Quota-aware admission control for LLM-bound work.
+
+LLM requests draw from a token bucket refilled at the provider's per-minute
+quota. Work items (e.g. papers to take notes on) are admitted by an AIMD
+limit: each completed item raises the number allowed in flight by
+``increase / limit`` (about one per round of work), and each observed rate
+limit error multiplies it by ``decrease``. An item is only admitted while the
+bucket has a token to spend, so throughput follows the quota the provider
+actually grants instead of fixed sleeps.
+
+    llm:
+      requests_per_minute: 60   # token bucket refill rate
+      burst: 5                  # tokens available after an idle period
+      admission:
+        initial: 2
+        max: 8
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .app_logging import logger
+from .config import config
+
+RATE_LIMIT_MARKERS = ("429", "quota", "rate limit", "resource exhausted")
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    status = getattr(error, 'status_code', None)
+    context = getattr(error, 'error_context', None)
+    if status is None and context is not None:
+        status = context.details.get('status_code')
+    return status == 429 or any(marker in str(error).lower() for marker in RATE_LIMIT_MARKERS)
+
+
+class RateLimitedError(Exception):
+    """Work that was rate limited; ``result`` is what it produced anyway (e.g. fallback output)"""
+
+    status_code = 429
+
+    def __init__(self, message: str, result: Any = None):
+        super().__init__(message)
+        self.result = result
+
+
+class TokenBucket:
+    """Requests allowed per minute, with up to ``burst`` saved up while idle"""
+
+    def __init__(self, rate_per_minute: Optional[float], burst: int = 5,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate_per_minute / 60.0 if rate_per_minute else None
+        self.capacity = max(1.0, float(burst))
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        if self.rate is not None:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """Seconds until ``tokens`` are available (0 when they already are)"""
+        if self.rate is None:
+            return 0.0
+        with self._lock:
+            self._refill()
+            return max(0.0, (tokens - self._tokens) / self.rate)
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens if available; otherwise return how long to wait for them"""
+        if self.rate is None:
+            return 0.0
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0):
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def drain(self):
+        """Empty the bucket, e.g. after the provider reports the quota is exhausted"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0)
+
+
+class AIMDLimiter:
+    """Concurrency limit with additive increase and multiplicative decrease"""
+
+    def __init__(self, initial: float = 2, minimum: float = 1, maximum: float = 8,
+                 increase: float = 1.0, decrease: float = 0.5, decrease_interval: float = 2.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.minimum = max(1.0, float(minimum))
+        self.maximum = max(self.minimum, float(maximum))
+        self.increase = increase
+        self.decrease = decrease
+        # 429s from requests already in flight describe the same overload; count them once
+        self.decrease_interval = decrease_interval
+        self._clock = clock
+        self._limit = min(self.maximum, max(self.minimum, float(initial)))
+        self._last_decrease = float('-inf')
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        with self._condition:
+            admitted = self._condition.wait_for(lambda: self.in_flight < self.limit, timeout)
+            if admitted:
+                self.in_flight += 1
+            return admitted
+
+    def release(self, rate_limited: bool = False):
+        with self._condition:
+            self.in_flight -= 1
+            if rate_limited:
+                self._backoff()
+            else:
+                self._limit = min(self.maximum, self._limit + self.increase / self._limit)
+            self._condition.notify_all()
+
+    def record_rate_limited(self):
+        with self._condition:
+            self._backoff()
+
+    def _backoff(self):
+        now = self._clock()
+        if now - self._last_decrease >= self.decrease_interval:
+            self._last_decrease = now
+            self._limit = max(self.minimum, self._limit * self.decrease)
+            logger.info(f"Rate limited; admission limit lowered to {self.limit}")
+
+
+class AdmissionController:
+    """Admits work while the AIMD limit and the LLM token bucket both allow it"""
+
+    def __init__(self, bucket: TokenBucket, limiter: AIMDLimiter):
+        self.bucket = bucket
+        self.limiter = limiter
+        self.stats = {'admitted': 0, 'rate_limited': 0}
+        self._lock = threading.Lock()
+
+    def admit(self):
+        """Block until a work item may start; pair with :meth:`release`"""
+        self.limiter.acquire()
+        # Do not start new work while the quota is exhausted; the item's own
+        # LLM requests spend the tokens
+        wait = self.bucket.wait_time()
+        while wait > 0:
+            time.sleep(wait)
+            wait = self.bucket.wait_time()
+        with self._lock:
+            self.stats['admitted'] += 1
+
+    def release(self, rate_limited: bool = False):
+        self.limiter.release(rate_limited)
+
+    def record_rate_limited(self):
+        """Called by LLM clients when the provider rejects a request for quota"""
+        with self._lock:
+            self.stats['rate_limited'] += 1
+        self.bucket.drain()
+        self.limiter.record_rate_limited()
+
+    def metrics(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self.stats)
+        return {**stats, 'limit': self.limiter.limit, 'in_flight': self.limiter.in_flight}
+
+
+_llm_admission: Optional[AdmissionController] = None
+_llm_admission_lock = threading.Lock()
+
+
+def llm_admission() -> AdmissionController:
+    """The process-wide controller shared by LLM clients and batch workers"""
+    global _llm_admission
+    with _llm_admission_lock:
+        if _llm_admission is None:
+            _llm_admission = AdmissionController(
+                TokenBucket(config.get('llm.requests_per_minute', 60), config.get('llm.burst', 5)),
+                AIMDLimiter(
+                    initial=config.get('llm.admission.initial', 2),
+                    minimum=config.get('llm.admission.min', 1),
+                    maximum=config.get('llm.admission.max', 8),
+                ),
+            )
+        return _llm_admission
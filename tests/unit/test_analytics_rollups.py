@@ -0,0 +1,92 @@
+"""
+Tests for incrementally maintained analytics rollups
+"""
+
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from src.storage.database import DatabaseManager
+from src.storage.models import Paper
+
+
+def make_paper(paper_id, title, venue=None, year=2023, citations=0, abstract='An abstract.'):
+    return Paper(id=paper_id, title=title, authors=['A. Author'], abstract=abstract, url='',
+                 published_date=datetime(year, 1, 1) if year else None, venue=venue, citations=citations)
+
+
+class TestAnalyticsRollups:
+    """Rollups must track inserts, replacements, updates and deletes"""
+
+    @pytest.fixture
+    def temp_db(self, tmp_path):
+        manager = DatabaseManager(str(tmp_path / 'research.db'))
+        yield manager
+        manager.close_connections()
+
+    @pytest.fixture
+    def papers(self):
+        return [
+            make_paper('p1', 'Deep Learning for Vision', 'CVPR Conference', 2023, 120),
+            make_paper('p2', 'Quantum Algorithms', 'arXiv', 2021, 5),
+            make_paper('p3', 'Survey of Machine Learning', 'Journal of ML', 2023, 0),
+            make_paper('p4', 'Graph Theory Notes', None, None, 30),
+        ]
+
+    def save_all(self, manager, papers):
+        for paper in papers:
+            assert manager.save_paper(paper)
+
+    def recounted(self, manager):
+        manager.rebuild_analytics_rollups()
+        return manager.get_analytics_data()
+
+    def test_counts_after_save(self, temp_db, papers):
+        self.save_all(temp_db, papers)
+
+        analytics = temp_db.get_analytics_data()
+
+        assert analytics['papers_by_source'] == {'Conference': 1, 'ArXiv': 1, 'Journal': 1, 'Unknown Source': 1}
+        assert analytics['papers_by_year'] == {'2023': 2, '2021': 1}
+        assert analytics['citation_distribution'] == {'0': 1, '1-10': 1, '11-50': 1, '100+': 1}
+        assert {t['topic']: t['count'] for t in analytics['trending_topics']} == {
+            'Deep Learning': 1, 'Quantum Computing': 1, 'Machine Learning': 1}
+
+    def test_replacing_a_paper_moves_its_buckets(self, temp_db, papers):
+        self.save_all(temp_db, papers)
+        temp_db.save_paper(make_paper('p2', 'Quantum Algorithms', 'Quantum Journal', 2022, 60))
+
+        analytics = temp_db.get_analytics_data()
+
+        assert analytics['papers_by_source'].get('ArXiv') is None
+        assert analytics['papers_by_source']['Journal'] == 2
+        assert analytics['citation_distribution']['51-100'] == 1
+        assert analytics == self.recounted(temp_db)
+
+    def test_updates_and_deletes(self, temp_db, papers):
+        self.save_all(temp_db, papers)
+        conn = temp_db._get_raw_connection()
+        with conn:
+            conn.execute("UPDATE papers SET citations = 75 WHERE id = 'p3'")
+            conn.execute("DELETE FROM papers WHERE id = 'p1'")
+            # Plain sqlite3 connections replace without firing delete triggers
+            conn.execute("INSERT OR REPLACE INTO papers (id, title, citations) VALUES ('p4', 'Reinforcement Notes', 500)")
+
+        analytics = temp_db.get_analytics_data()
+
+        assert analytics['citation_distribution'] == {'1-10': 1, '51-100': 1, '100+': 1}
+        assert {'topic': 'Reinforcement Learning', 'count': 1} in analytics['trending_topics']
+        assert analytics == self.recounted(temp_db)
+
+    def test_existing_database_is_backfilled(self, tmp_path, papers):
+        db_path = str(tmp_path / 'legacy.db')
+        self.save_all(DatabaseManager(db_path), papers)
+        conn = sqlite3.connect(db_path)
+        conn.executescript("DROP TABLE analytics_rollups; DROP TABLE paper_rollup_buckets; "
+                           "DROP TRIGGER analytics_rollups_insert; PRAGMA user_version = 3;")
+        conn.close()
+
+        manager = DatabaseManager(db_path)
+
+        assert sum(manager.get_citation_distribution().values()) == len(papers)
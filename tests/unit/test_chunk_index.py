@@ -0,0 +1,164 @@
+"""
+Tests for the section-tagged full-text passage index
+"""
+
+import asyncio
+import sqlite3
+
+import numpy as np
+import pytest
+
+from src.storage.chunk_index import chunk_full_text, embed_pending_chunks, index_chunks, search_chunks
+from src.storage.content_store import FULL_TEXT, store_content
+from src.storage.database import AsyncDatabaseManager, DatabaseManager
+from src.storage.migrations import LATEST_VERSION, run_migrations
+from src.storage.models import Paper
+
+TRANSFORMER_PAPER = """Attention Is All You Need
+
+Abstract
+We propose the Transformer, a network architecture based solely on attention mechanisms.
+
+1. Introduction
+Recurrent models have long dominated sequence transduction tasks in machine translation.
+
+3 Methods
+The encoder maps an input sequence to continuous representations using multi-head self-attention layers.
+
+4. Results
+On the WMT 2014 English-to-German translation task the model achieves 28.4 BLEU.
+
+References
+[1] Bahdanau et al. Neural machine translation by jointly learning to align and translate.
+"""
+
+PROTEIN_PAPER = """Abstract
+We predict protein structures from amino acid sequences with high accuracy.
+
+Methods
+Evoformer blocks exchange information between the multiple sequence alignment and pair representations.
+
+Results
+Predicted structures reach a median backbone accuracy of 0.96 angstroms on the CASP14 benchmark.
+"""
+
+
+class TestChunking:
+    """Full text is split into passages tagged with their section"""
+
+    def test_sections_are_tagged_and_references_dropped(self):
+        chunks = chunk_full_text(TRANSFORMER_PAPER)
+
+        assert [section for section, _ in chunks] == ['abstract', 'introduction', 'method', 'results']
+        assert chunks[2][1].startswith('The encoder maps')
+        assert not any('Bahdanau' in text for _, text in chunks)
+
+    def test_long_sections_are_packed_on_sentence_boundaries(self):
+        text = "Methods\n" + " ".join(f"Sentence number {i} describes one step." for i in range(60))
+
+        chunks = chunk_full_text(text, max_chars=200)
+
+        assert len(chunks) > 5 and all(section == 'method' for section, _ in chunks)
+        assert all(len(passage) <= 200 and passage.endswith('.') for _, passage in chunks)
+
+
+class TestChunkIndex:
+    """Passages are indexed once and retrieved across papers in one query"""
+
+    @pytest.fixture
+    def conn(self, tmp_path):
+        db_path = str(tmp_path / 'research.db')
+        run_migrations(db_path)
+        conn = sqlite3.connect(db_path)
+        with conn:
+            index_chunks(conn, [('transformer', TRANSFORMER_PAPER), ('protein', PROTEIN_PAPER)])
+        yield conn
+        conn.close()
+
+    def test_top_passages_across_papers(self, conn):
+        passages = search_chunks(conn, 'What BLEU score does the translation model achieve?', limit=3)
+
+        assert passages[0]['paper_id'] == 'transformer' and passages[0]['section'] == 'results'
+        assert '28.4 BLEU' in passages[0]['text']
+
+        passages = search_chunks(conn, 'What backbone accuracy do predicted structures reach?', limit=2,
+                                 paper_ids=['protein'])
+        assert {passage['paper_id'] for passage in passages} == {'protein'}
+        assert passages[0]['section'] == 'results'
+
+    def test_unchanged_text_is_not_reindexed(self, conn):
+        with conn:
+            assert index_chunks(conn, [('transformer', TRANSFORMER_PAPER)]) == 0
+            assert index_chunks(conn, [('transformer', TRANSFORMER_PAPER.replace('28.4', '41.8'))]) == 1
+
+        assert conn.execute("SELECT COUNT(*) FROM paper_chunks WHERE paper_id = 'transformer'").fetchone()[0] == 4
+        assert '41.8' in search_chunks(conn, 'BLEU', limit=1)[0]['text']
+
+    def test_embeddings_rerank_candidates(self, conn):
+        def encode(texts):
+            return np.array([[1.0, 0.0] if 'Evoformer' in text else [0.0, 1.0] for text in texts])
+
+        assert embed_pending_chunks(conn, encode) == 7
+        assert embed_pending_chunks(conn, encode) == 0
+
+        passages = search_chunks(conn, 'sequence representations', limit=1, query_vector=np.array([1.0, 0.0]))
+        assert 'Evoformer' in passages[0]['text']
+
+    def test_partially_embedded_candidates_keep_bm25_order(self, conn):
+        with conn:
+            conn.execute("UPDATE paper_chunks SET embedding = ? WHERE text LIKE 'Evoformer%'",
+                         (np.array([0.0, 1.0], dtype=np.float32).tobytes(),))
+
+        question = 'sequence representations'
+        reranked = search_chunks(conn, question, limit=3, query_vector=np.array([1.0, 0.0]))
+
+        assert reranked == search_chunks(conn, question, limit=3)
+
+    def test_question_syntax_does_not_break_the_query(self, conn):
+        assert search_chunks(conn, 'attention "mechanisms" AND (NEAR*') != []
+        assert search_chunks(conn, 'what is it?') == []
+
+
+class TestChunkIndexStorage:
+    """Stored full text feeds the index on save and on upgrade"""
+
+    def test_saved_papers_are_searchable(self, tmp_path):
+        manager = DatabaseManager(str(tmp_path / 'research.db'))
+        manager.save_paper(Paper(id='transformer', title='Attention Is All You Need', authors=['Vaswani'],
+                                 abstract='Attention', url='', full_text=TRANSFORMER_PAPER))
+
+        passages = manager.search_passages('BLEU translation', paper_ids=['transformer'])
+
+        assert passages[0]['section'] == 'results'
+        manager.close_connections()
+
+    def test_async_fulltext_search_matches_body_passages(self, tmp_path):
+        db_path = str(tmp_path / 'research.db')
+        manager = DatabaseManager(db_path)
+        manager.save_paper(Paper(id='transformer', title='Attention Is All You Need', authors=['Vaswani'],
+                                 abstract='Attention', url='', full_text=TRANSFORMER_PAPER))
+        manager.close_connections()
+
+        async def search(query):
+            async with AsyncDatabaseManager(db_path) as async_manager:
+                return [paper.id for paper in await async_manager.search_papers_fulltext_async(query)]
+
+        assert asyncio.run(search('English-to-German translation')) == ['transformer']
+        assert asyncio.run(search('German English')) == []
+
+    def test_migration_backfills_stored_full_text(self, tmp_path):
+        db_path = str(tmp_path / 'research.db')
+        run_migrations(db_path)
+        conn = sqlite3.connect(db_path)
+        conn.executescript("DROP TABLE paper_chunks_fts; DROP TABLE paper_chunks; DROP TABLE paper_chunk_sources;"
+                           "PRAGMA user_version = 8;")
+        conn.execute("INSERT INTO papers (id, title) VALUES ('protein', 'Protein structure')")
+        with conn:
+            store_content(conn, [('protein', FULL_TEXT, PROTEIN_PAPER)])
+        conn.close()
+
+        assert run_migrations(db_path) == list(range(9, LATEST_VERSION + 1))
+
+        conn = sqlite3.connect(db_path)
+        assert search_chunks(conn, 'Evoformer', limit=1)[0]['section'] == 'method'
+        conn.close()
@@ -0,0 +1,59 @@
+"""
+Import-time regression tests for the CLI entry point
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Cumulative microseconds `import main` may take; measured around 0.5s when this was set
+IMPORT_BUDGET_US = 2_000_000
+
+HEAVY_MODULES = ['crewai', 'src.crew', 'src.agents', 'sentence_transformers', 'torch',
+                 'reportlab', 'docx', 'sklearn']
+
+
+def import_times(statement):
+    """Run ``statement`` under ``-X importtime``; returns {module: cumulative microseconds}"""
+    env = dict(os.environ)
+    env.setdefault('GOOGLE_API_KEY', 'test-key')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line.split('|')
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestCliStartup:
+    """Cheap commands must not pay for agents, models or exporters"""
+
+    @pytest.fixture(scope='class')
+    def main_imports(self):
+        return import_times('import main')
+
+    def test_main_skips_heavy_modules(self, main_imports):
+        loaded = [name for name in HEAVY_MODULES if name in main_imports]
+
+        assert loaded == []
+
+    def test_main_import_budget(self, main_imports):
+        assert main_imports['main'] < IMPORT_BUDGET_US
+
+    def test_database_module_is_lazy(self):
+        import_times(
+            "import src.storage.database as database\n"
+            "assert database._db_manager is None and database._async_db_manager is None\n"
+            "database.db.db_path\n"
+            "assert database._db_manager is not None and database._async_db_manager is None"
+        )
@@ -0,0 +1,111 @@
+"""
+Tests for the compressed full-text content store
+"""
+
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from src.agents import note_taking_agent
+from src.agents.note_taking_agent import NoteTakingAgent
+from src.storage.database import DatabaseManager
+from src.storage.models import Paper
+
+FULL_TEXT = "Introduction. " + "Federated learning trains models across many clients. " * 200
+
+
+def make_paper(paper_id, full_text=FULL_TEXT):
+    return Paper(id=paper_id, title=f'Paper {paper_id}', authors=['A. Author'], abstract='An abstract.',
+                 url='', full_text=full_text)
+
+
+class TestContentStore:
+    """Full text is stored compressed outside the papers row"""
+
+    @pytest.fixture
+    def temp_db(self, tmp_path):
+        manager = DatabaseManager(str(tmp_path / 'research.db'))
+        yield manager
+        manager.close_connections()
+
+    def test_full_text_is_kept_out_of_papers(self, temp_db):
+        temp_db.save_paper(make_paper('p1'))
+        conn = temp_db._get_raw_connection()
+
+        assert conn.execute("SELECT full_text FROM papers WHERE id = 'p1'").fetchone()[0] is None
+        assert temp_db.get_paper('p1').full_text is None
+        assert temp_db.get_full_text('p1') == FULL_TEXT
+        raw_size, stored_size = conn.execute("SELECT raw_size, LENGTH(data) FROM content_blobs").fetchone()
+        assert stored_size < raw_size / 5
+
+    def test_identical_text_is_stored_once(self, temp_db):
+        temp_db.save_paper(make_paper('p1'))
+        temp_db.save_paper(make_paper('p2'))
+
+        assert temp_db._get_raw_connection().execute("SELECT COUNT(*) FROM content_blobs").fetchone()[0] == 1
+        assert temp_db.get_full_text('p2') == FULL_TEXT
+
+    def test_resaving_without_text_keeps_stored_text(self, temp_db):
+        temp_db.save_paper(make_paper('p1'))
+        temp_db.save_paper(temp_db.get_paper('p1'))
+
+        assert temp_db.get_full_text('p1') == FULL_TEXT
+
+    def test_pdf_extraction_round_trip(self, temp_db):
+        extraction = {'text': 'page one\npage two',
+                      'pages': [{'page_number': 1, 'text': 'page one'}, {'page_number': 2, 'text': 'page two'}],
+                      'tables': [{'page_number': 2, 'table': [['a', 'b'], ['1', '2']]}]}
+
+        assert temp_db.save_pdf_content('p1', extraction)
+        content = temp_db.get_pdf_content('p1')
+
+        assert content['text'] == extraction['text']
+        assert content['pages'] == extraction['pages']
+        assert content['tables'] == extraction['tables']
+
+    def test_papers_are_found_by_pdf_path(self, temp_db, tmp_path, monkeypatch):
+        pdf = tmp_path / 'papers' / 'p1.pdf'
+        paper = make_paper('p1')
+        paper.pdf_path = str(pdf)
+        temp_db.save_paper(paper)
+        monkeypatch.chdir(tmp_path)
+
+        assert temp_db.get_paper_ids_by_pdf_path(['papers/p1.pdf', 'papers/other.pdf']) == {'papers/p1.pdf': 'p1'}
+
+    def test_whole_pdf_reads_reach_the_content_store(self, temp_db, tmp_path, monkeypatch):
+        monkeypatch.setattr(note_taking_agent.LLMFactory, 'create_llm',
+                            staticmethod(lambda *args, **kwargs: SimpleNamespace(generate=None)))
+        monkeypatch.setattr(note_taking_agent, 'Agent', lambda **kwargs: None)
+        monkeypatch.setattr(note_taking_agent, 'db', temp_db)
+        pdf = tmp_path / 'paper.pdf'
+        pdf.write_bytes(b'%PDF-1.4')
+        agent = NoteTakingAgent()
+        extraction = {'text': 'page one\npage two', 'pages': [{'page_number': 1, 'text': 'page one'},
+                                                              {'page_number': 2, 'text': 'page two'}],
+                      'tables': [], 'pages_read': 2, 'sections_found': [], 'stopped': 'end_of_document'}
+        monkeypatch.setattr(agent.pdf_processor, 'extract_text_budgeted', lambda path, max_chars=None: dict(extraction))
+        whole, cut = make_paper('whole', None), make_paper('cut', None)
+        whole.pdf_path = cut.pdf_path = str(pdf)
+
+        assert agent._read_pdf_text(whole) == extraction['text']
+        extraction['stopped'] = 'char_budget'
+        assert agent._read_pdf_text(cut) == extraction['text']
+
+        assert temp_db.get_pdf_content('whole')['pages'] == extraction['pages']
+        assert temp_db.get_full_text('cut') is None
+
+    def test_inline_full_text_is_migrated(self, tmp_path):
+        db_path = str(tmp_path / 'legacy.db')
+        DatabaseManager(db_path).close_connections()
+        conn = sqlite3.connect(db_path)
+        conn.executescript("DROP TABLE paper_content; DROP TABLE content_blobs; PRAGMA user_version = 5;")
+        conn.execute("INSERT INTO papers (id, title, full_text) VALUES ('old', 'Old paper', ?)", (FULL_TEXT,))
+        conn.commit()
+        conn.close()
+
+        manager = DatabaseManager(db_path)
+
+        assert manager.get_full_text('old') == FULL_TEXT
+        assert manager._get_raw_connection().execute(
+            "SELECT COUNT(*) FROM papers WHERE full_text IS NOT NULL").fetchone()[0] == 0
@@ -0,0 +1,110 @@
+"""
+Tests for draft writer agent
+"""
+
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+from src.agents.draft_writer_agent import DraftWriterAgent
+from src.storage.models import ResearchTheme
+
+
+class TestDraftWriterAgent:
+    """Test draft compilation"""
+
+    @pytest.fixture
+    def agent(self):
+        """Create a draft writer agent with a slow fake LLM"""
+        llm = Mock()
+        llm.generate.side_effect = lambda prompt, system_prompt=None: (
+            time.sleep(0.05) or "A sufficiently long academic paragraph about the research topic. " * 3
+        )
+        with patch('src.agents.draft_writer_agent.LLMFactory.create_llm', return_value=llm), \
+             patch('src.agents.draft_writer_agent.Agent'):
+            return DraftWriterAgent()
+
+    @pytest.fixture
+    def themes(self):
+        """Create sample themes"""
+        return [
+            ResearchTheme(id=f'theme-{i}', title=f'Theme {i}', description='Description',
+                          papers=[], frequency=1, confidence=0.8)
+            for i in range(3)
+        ]
+
+    def test_section_dag_respects_dependencies(self, agent):
+        """Dependent tasks see the results of their dependencies"""
+        seen = {}
+        tasks = {
+            'a': ((), lambda done: 'A'),
+            'b': ((), lambda done: 'B'),
+            'c': (('a', 'b'), lambda done: seen.setdefault('c', sorted(done)) and 'C'),
+        }
+
+        results, timings = agent._run_section_dag(tasks, max_workers=2)
+
+        assert results == {'a': 'A', 'b': 'B', 'c': 'C'}
+        assert seen['c'] == ['a', 'b']
+        assert set(timings) == {'a', 'b', 'c'}
+
+    def test_section_dag_rejects_cycles(self, agent):
+        """Unsatisfiable dependencies raise instead of hanging"""
+        tasks = {
+            'a': (('b',), lambda done: 'A'),
+            'b': (('a',), lambda done: 'B'),
+        }
+
+        with pytest.raises(ValueError):
+            agent._run_section_dag(tasks, max_workers=2)
+
+    def test_compile_full_draft_runs_sections_concurrently(self, agent, themes):
+        """Independent sections overlap and every section is logged with its timing"""
+        active = {'now': 0, 'peak': 0}
+        lock = threading.Lock()
+        original = agent.safe_llm_generate
+
+        def tracking_generate(*args, **kwargs):
+            with lock:
+                active['now'] += 1
+                active['peak'] = max(active['peak'], active['now'])
+            try:
+                return original(*args, **kwargs)
+            finally:
+                with lock:
+                    active['now'] -= 1
+
+        agent.safe_llm_generate = tracking_generate
+        draft = agent.compile_full_draft('graph learning', themes, [], [], ['gap'])
+
+        assert active['peak'] > 1
+        assert list(draft['sections']) == ['theme_1', 'theme_2', 'theme_3']
+        assert draft['sections']['theme_2']['title'] == 'Theme 1'
+        log = draft['metadata']['generation_log']
+        assert log[0].startswith('abstract: success (')
+        assert any(entry.startswith('total: ') for entry in log)
+
+    def test_abstract_runs_alongside_theme_sections(self, agent, themes):
+        """The abstract summarises every theme without waiting for their sections"""
+        abstract_started = threading.Event()
+        summarised = []
+        text = "A sufficiently long academic paragraph about the research topic. " * 3
+
+        def write_abstract(topic, abstract_themes, gaps, domain):
+            abstract_started.set()
+            summarised.extend(abstract_themes)
+            return text
+
+        def write_theme_section(theme, papers, notes, domain):
+            if not abstract_started.wait(5):
+                raise RuntimeError('theme section ran before the abstract could start')
+            return text
+
+        agent.write_abstract = write_abstract
+        agent.write_theme_section = write_theme_section
+        draft = agent.compile_full_draft('graph learning', themes, [], [], ['gap'])
+
+        assert summarised == themes
+        log = draft['metadata']['generation_log']
+        assert all(': success (' in entry for entry in log if entry.startswith('theme_'))
@@ -0,0 +1,132 @@
+"""
+Tests for the shared, lazily loaded embedding service
+"""
+
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from src.utils.embedding_service import EmbeddingService, get_embedding_service
+
+
+class FakeModel:
+    """Embeds a text as [len(text), number of words] and records each forward pass"""
+
+    def __init__(self, delay=None):
+        self.calls = []
+        self.delay = delay
+
+    def encode(self, texts, **kwargs):
+        if self.delay is not None:
+            self.delay.wait(1)
+        self.calls.append(list(texts))
+        return np.array([[len(text), len(text.split())] for text in texts], dtype=np.float32)
+
+
+class TestEmbeddingService:
+    """Model loading is deferred and concurrent requests share forward passes"""
+
+    @pytest.fixture
+    def model(self):
+        return FakeModel()
+
+    @pytest.fixture
+    def loads(self):
+        return []
+
+    @pytest.fixture
+    def service(self, model, loads):
+        return EmbeddingService('fake', max_batch_size=64, max_wait_ms=50,
+                                loader=lambda: loads.append(1) or model)
+
+    def test_model_loads_on_first_encode_only(self, service, loads):
+        assert loads == [] and not service.is_loaded
+
+        first = service.encode(['deep learning'])
+        service.encode('graph theory')
+
+        assert loads == [1]
+        np.testing.assert_array_equal(first, [[13, 2]])
+
+    def test_single_text_returns_vector(self, service):
+        vector = service.encode('a b c')
+
+        assert vector.shape == (2,) and vector.tolist() == [5, 3]
+
+    def test_concurrent_requests_share_a_batch(self, model, service):
+        gate = threading.Event()
+        model.delay = gate
+        # The first request occupies the worker so the rest queue up behind it
+        warmup = service.submit(['warm up'])
+        futures = [service.submit([f'text {i}', f'more text {i}']) for i in range(10)]
+        gate.set()
+
+        results = [future.result(timeout=5) for future in futures]
+        warmup.result(timeout=5)
+
+        assert len(model.calls) <= 2
+        assert all(result.shape == (2, 2) for result in results)
+        np.testing.assert_array_equal(results[3], [[6, 2], [11, 3]])
+        assert service.stats['requests'] == 11
+
+    def test_async_callers_are_batched(self, model, service):
+        async def ask_all():
+            return await asyncio.gather(*(service.encode_async([f'question {i}']) for i in range(8)))
+
+        results = asyncio.run(ask_all())
+
+        assert len(results) == 8 and len(model.calls) <= 2
+        np.testing.assert_array_equal(results[0], [[10, 2]])
+
+    def test_cancelled_request_does_not_stall_its_batch(self, model, service):
+        gate = threading.Event()
+        model.delay = gate
+        warmup = service.submit(['warm up'])
+        cancelled = service.submit(['abandoned question'])
+        survivor = service.submit(['still wanted'])
+
+        assert cancelled.cancel()
+        gate.set()
+
+        np.testing.assert_array_equal(survivor.result(timeout=5), [[12, 2]])
+        warmup.result(timeout=5)
+        assert ['abandoned question'] not in model.calls
+        np.testing.assert_array_equal(service.encode(['after cancel']), [[12, 2]])
+
+    def test_cancelled_async_caller_does_not_stall_others(self, model, service):
+        gate = threading.Event()
+        model.delay = gate
+        warmup = service.submit(['warm up'])
+
+        async def ask():
+            abandoned = asyncio.ensure_future(service.encode_async(['abandoned question']))
+            kept = asyncio.ensure_future(service.encode_async(['still wanted']))
+            await asyncio.sleep(0)
+            abandoned.cancel()
+            await asyncio.sleep(0)
+            gate.set()
+            return await asyncio.wait_for(kept, 5)
+
+        np.testing.assert_array_equal(asyncio.run(ask()), [[12, 2]])
+        warmup.result(timeout=5)
+        assert service.encode('after cancel').tolist() == [12, 2]
+
+    def test_load_failure_fails_fast(self):
+        attempts = []
+
+        def broken_loader():
+            attempts.append(1)
+            raise OSError("no network")
+
+        service = EmbeddingService('broken', loader=broken_loader)
+
+        for _ in range(3):
+            with pytest.raises(OSError):
+                service.encode(['text'])
+        assert attempts == [1]
+
+    def test_services_are_shared_per_model(self):
+        assert get_embedding_service('shared-model') is get_embedding_service('shared-model')
+        assert get_embedding_service('shared-model') is not get_embedding_service('other-model')
@@ -0,0 +1,85 @@
+"""
+Tests for the multi-backend LLM router
+"""
+
+import time
+import pytest
+
+from src.llm.llm_router import LLMRouter, RoutedBackend
+from src.llm.local_stub_client import LocalStubClient
+from src.utils.error_handler import APIError
+
+
+class FailingClient:
+    """Backend that always fails with the given message"""
+
+    def __init__(self, message: str):
+        self.message = message
+        self.calls = 0
+
+    def generate(self, prompt, system_prompt=None):
+        self.calls += 1
+        raise RuntimeError(self.message)
+
+
+class TestLLMRouter:
+    """Test routing, hedging and failover"""
+
+    def test_fails_over_to_next_backend(self):
+        """A failing primary falls through to the next backend"""
+        router = LLMRouter([
+            RoutedBackend('broken', FailingClient('503 service unavailable')),
+            RoutedBackend('local', LocalStubClient(model='local')),
+        ])
+
+        text = router.generate('Summarise graph neural networks')
+
+        assert text.startswith('[local:')
+        metrics = router.get_metrics()
+        assert metrics['broken']['errors'] == 1
+        assert metrics['local']['successes'] == 1
+
+    def test_rate_limited_backend_is_deprioritised(self):
+        """A 429 puts the backend into cooldown so it is ranked last"""
+        broken = RoutedBackend('quota', FailingClient('429 quota exceeded'))
+        router = LLMRouter([broken, RoutedBackend('local', LocalStubClient())])
+
+        router.generate('first request')
+
+        assert broken.headroom() == 0.0
+        assert router.rank_backends()[0].name == 'local'
+        assert router.get_metrics()['quota']['rate_limited'] == 1
+
+    def test_slow_request_is_hedged(self):
+        """Requests slower than the hedge delay are duplicated and the fastest wins"""
+        router = LLMRouter([
+            RoutedBackend('slow', LocalStubClient(model='slow', latency=1.0)),
+            RoutedBackend('fast', LocalStubClient(model='fast')),
+        ], hedge_default_delay=0.05)
+
+        start = time.perf_counter()
+        text = router.generate('hedge me')
+
+        assert text.startswith('[fast:')
+        assert time.perf_counter() - start < 0.9
+        metrics = router.get_metrics()
+        assert metrics['fast']['hedges_launched'] == 1
+        assert metrics['fast']['hedges_won'] == 1
+
+    def test_all_backends_failing_raises(self):
+        """Without a Gemini fallback the router surfaces an APIError"""
+        router = LLMRouter([RoutedBackend('a', FailingClient('boom')), RoutedBackend('b', FailingClient('boom'))])
+
+        with pytest.raises(APIError):
+            router.generate('nothing works')
+
+    def test_stream_fails_over_before_first_chunk(self):
+        """Streaming moves to the next backend when the first one fails immediately"""
+        class BrokenStream(FailingClient):
+            def generate_stream(self, prompt, system_prompt=None):
+                raise RuntimeError('connection reset')
+                yield  # pragma: no cover
+
+        router = LLMRouter([RoutedBackend('broken', BrokenStream('x')), RoutedBackend('local', LocalStubClient(model='local'))])
+
+        assert ''.join(router.generate_stream('stream please')).startswith('[local:')
@@ -0,0 +1,94 @@
+"""
+Tests for versioned schema migrations
+"""
+
+import sqlite3
+
+import pytest
+
+from src.storage.database import DatabaseManager
+from src.storage.migrations import LATEST_VERSION, run_migrations, schema_version
+
+LEGACY_SCHEMA = """
+    CREATE TABLE papers (
+        id TEXT PRIMARY KEY, title TEXT NOT NULL, authors TEXT, abstract TEXT, url TEXT,
+        published_date TEXT, venue TEXT, citations INTEGER DEFAULT 0, pdf_path TEXT,
+        full_text TEXT, keywords TEXT, doi TEXT, arxiv_id TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX idx_papers_abstract_words ON papers(abstract) WHERE LENGTH(abstract) > 100;
+"""
+
+
+class TestMigrations:
+    """Schema changes are applied once and tracked in user_version"""
+
+    @pytest.fixture
+    def legacy_db(self, tmp_path):
+        db_path = str(tmp_path / 'legacy.db')
+        conn = sqlite3.connect(db_path)
+        conn.executescript(LEGACY_SCHEMA)
+        conn.executemany(
+            "INSERT INTO papers (id, title, authors, venue, citations, full_text) VALUES (?, ?, ?, ?, ?, ?)",
+            [(f'p{i}', f'Quantum paper {i}', '["Ada Lovelace"]', 'arXiv', i, f'Text of paper {i}')
+             for i in range(7)]
+        )
+        conn.commit()
+        conn.close()
+        return db_path
+
+    def test_fresh_database_reaches_latest_version(self, tmp_path):
+        db_path = str(tmp_path / 'research.db')
+
+        DatabaseManager(db_path).close_connections()
+
+        conn = sqlite3.connect(db_path)
+        assert schema_version(conn) == LATEST_VERSION
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        assert {'papers', 'paper_provenance', 'analytics_rollups', 'paper_authors', 'content_blobs',
+                'qa_semantic_cache', 'theme_centroids', 'theme_note_assignments'} <= tables
+
+    def test_up_to_date_database_runs_no_ddl(self, tmp_path):
+        db_path = str(tmp_path / 'research.db')
+        DatabaseManager(db_path).close_connections()
+        statements = []
+        original_connect = sqlite3.connect
+
+        def traced_connect(*args, **kwargs):
+            conn = original_connect(*args, **kwargs)
+            conn.set_trace_callback(statements.append)
+            return conn
+
+        sqlite3.connect = traced_connect
+        try:
+            assert run_migrations(db_path) == []
+        finally:
+            sqlite3.connect = original_connect
+
+        assert statements == ['PRAGMA user_version']
+
+    def test_legacy_database_is_upgraded_in_batches(self, legacy_db):
+        progress = []
+
+        applied = run_migrations(legacy_db, batch_size=3, progress=lambda *args: progress.append(args))
+
+        assert applied == list(range(1, LATEST_VERSION + 1))
+        assert ('analytics rollups', 7, 7) in progress
+        assert [done for name, done, _ in progress if name == 'compressed content store'] == [3, 6, 7]
+
+        manager = DatabaseManager(legacy_db)
+        assert manager.get_citation_distribution()['1-10'] == 6
+        assert len(manager.search_by_author('lovelace')) == 7
+        assert manager.get_full_text('p4') == 'Text of paper 4'
+        conn = manager._get_raw_connection()
+        assert conn.execute("SELECT COUNT(*) FROM papers WHERE full_text IS NOT NULL").fetchone()[0] == 0
+        assert conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name = 'idx_papers_abstract_words'").fetchone()[0] == 0
+
+    def test_interrupted_upgrade_resumes(self, legacy_db):
+        run_migrations(legacy_db)
+        conn = sqlite3.connect(legacy_db)
+        conn.executescript("DROP TABLE paper_content; DROP TABLE content_blobs; PRAGMA user_version = 5;")
+        conn.close()
+
+        assert run_migrations(legacy_db) == list(range(6, LATEST_VERSION + 1))
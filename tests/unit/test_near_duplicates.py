@@ -0,0 +1,156 @@
+"""
+Tests for MinHash/LSH near-duplicate detection
+"""
+
+import pytest
+from unittest.mock import patch
+
+from src.agents.literature_survey_agent import LiteratureSurveyAgent
+from src.storage.database import DatabaseManager
+from src.storage.models import Paper
+from src.tools.near_duplicates import NearDuplicateIndex, optimal_bands
+
+ABSTRACT = ("We propose a federated optimisation method that tolerates heterogeneous clients, "
+            "reduces communication rounds and preserves privacy across a wide range of benchmarks "
+            "including image classification and next word prediction tasks")
+
+
+def make_paper(paper_id, title, abstract=ABSTRACT, doi=None, arxiv_id=None):
+    return Paper(id=paper_id, title=title, authors=['A. Author'], abstract=abstract,
+                 url='http://example.com', doi=doi, arxiv_id=arxiv_id)
+
+
+class TestNearDuplicateIndex:
+    """Test signatures, banding and lookup"""
+
+    def test_finds_edited_title(self):
+        index = NearDuplicateIndex()
+        index.add('p1', 'Federated Learning with Heterogeneous Clients: A Study')
+
+        match = index.find('federated learning with heterogeneous clients - a study.')
+
+        assert match[0] == 'p1' and match[1] == 'title'
+        assert index.find('Graph Neural Networks for Traffic Forecasting') is None
+
+    def test_finds_abstract_duplicate(self):
+        index = NearDuplicateIndex()
+        index.add('p1', 'Original title', ABSTRACT)
+
+        match = index.find('Completely different wording', ABSTRACT.replace('wide', 'broad'))
+
+        assert match[:2] == ('p1', 'abstract')
+
+    def test_conflicting_identifiers_veto_a_match(self):
+        index = NearDuplicateIndex()
+        index.add('part1', 'Deep Learning for Protein Structure Prediction: Part I', identifiers=('10.1/a', None))
+
+        title = 'Deep Learning for Protein Structure Prediction: Part II'
+        assert index.find(title, identifiers=('10.1/b', None)) is None
+        assert index.find(title, identifiers=(None, '2101.00001'))[0] == 'part1'
+        assert index.find(title)[0] == 'part1'
+
+    def test_recall_weight_adds_bands(self):
+        """Weighting false negatives higher lowers the candidate threshold"""
+        precise = optimal_bands(0.9, 128, 0.9, 0.1)
+        recall = optimal_bands(0.9, 128, 0.1, 0.9)
+
+        assert recall[0] >= precise[0]
+
+    def test_existing_papers_are_indexed_and_cached(self, tmp_path):
+        path = str(tmp_path / 'research.db')
+        DatabaseManager(path).save_paper(make_paper('stored', 'Robust Federated Learning at Scale'))
+
+        first, second = NearDuplicateIndex(), NearDuplicateIndex()
+
+        assert first.add_existing_papers(path) == 1
+        assert second.add_existing_papers(path) == 1
+        assert second.find('Robust federated learning at scale!')[0] == 'stored'
+
+    def test_only_unhashed_papers_are_read(self, tmp_path):
+        path = str(tmp_path / 'research.db')
+        manager = DatabaseManager(path)
+        manager.save_paper(make_paper('old', 'Robust Federated Learning at Scale', doi='10.1/old'))
+        NearDuplicateIndex().add_existing_papers(path)
+        manager.save_paper(make_paper('new', 'Graph Neural Networks for Traffic Forecasting'))
+
+        index = NearDuplicateIndex()
+        with patch.object(index, 'signatures', wraps=index.signatures) as hashed:
+            assert index.add_existing_papers(path) == 2
+
+        assert [call.args[0] for call in hashed.call_args_list] == ['Graph Neural Networks for Traffic Forecasting']
+        assert index.identifiers['old'] == ('10.1/old', None)
+
+
+    def test_resaved_paper_is_rehashed_from_its_new_title(self, tmp_path):
+        path = str(tmp_path / 'research.db')
+        manager = DatabaseManager(path)
+        manager.save_paper(make_paper('p1', 'Robust Federated Learning at Scale', abstract=''))
+        NearDuplicateIndex().add_existing_papers(path)
+        manager.save_paper(make_paper('p1', 'Graph Neural Networks for Traffic Forecasting', abstract=''))
+
+        index = NearDuplicateIndex()
+        index.add_existing_papers(path)
+
+        assert index.find('Graph neural networks for traffic forecasting.')[0] == 'p1'
+        assert index.find('Robust federated learning at scale') is None
+
+
+class TestEnhancedDeduplication:
+    """Test the literature survey agent integration"""
+
+    @pytest.fixture
+    def agent(self):
+        with patch('src.agents.literature_survey_agent.LLMFactory.create_llm'), \
+             patch('src.agents.literature_survey_agent.Agent'):
+            return LiteratureSurveyAgent()
+
+    def test_far_apart_duplicates_are_removed(self, agent):
+        """Duplicates are caught regardless of their distance in the stream"""
+        papers = [make_paper('p0', 'Federated Learning with Heterogeneous Clients')]
+        topics = ['protein folding', 'traffic forecasting', 'speech recognition', 'robot grasping',
+                  'image segmentation', 'query optimisation', 'code generation', 'weather prediction']
+        papers += [make_paper(f'x{i}', f'Advances in {topic}', abstract=f'{topic} methods ' * 10)
+                   for i, topic in enumerate(topics)]
+        papers.append(make_paper('p1', 'Federated learning with heterogeneous clients.'))
+        papers.append(make_paper('p2', 'A different title entirely', ABSTRACT + ' today'))
+
+        unique = agent.enhanced_deduplicate_papers(papers, check_existing=False)
+
+        assert [p.id for p in unique if p.id.startswith('p')] == ['p0']
+        assert len(unique) == 9
+
+    def test_similar_titles_with_different_dois_are_kept(self, agent):
+        papers = [make_paper('v1', 'Proceedings of the 2019 Conference on Empirical Methods in NLP',
+                             doi='10.18653/v1/D19-1'),
+                  make_paper('v2', 'Proceedings of the 2020 Conference on Empirical Methods in NLP',
+                             doi='10.18653/v1/2020.emnlp-main'),
+                  make_paper('v3', 'Proceedings of the 2020 Conference on Empirical Methods in NLP',
+                             doi='10.18653/v1/2020.emnlp-demos')]
+
+        unique = agent.enhanced_deduplicate_papers(papers, check_existing=False)
+
+        assert [p.id for p in unique] == ['v1', 'v2', 'v3']
+
+    def test_stored_paper_with_other_doi_keeps_its_row(self, agent, tmp_path):
+        temp_db = DatabaseManager(str(tmp_path / 'research.db'))
+        temp_db.save_paper(make_paper('part1', 'Deep Learning for Protein Structure Prediction: Part I',
+                                      doi='10.1/part1'))
+
+        with patch('src.agents.literature_survey_agent.db', temp_db):
+            unique = agent.enhanced_deduplicate_papers(
+                [make_paper('part2', 'Deep Learning for Protein Structure Prediction: Part II', doi='10.1/part2')],
+                check_existing=True
+            )
+
+        assert [p.id for p in unique] == ['part2']
+
+    def test_refetched_papers_take_stored_ids(self, agent, tmp_path):
+        temp_db = DatabaseManager(str(tmp_path / 'research.db'))
+        temp_db.save_paper(make_paper('openalex_W1', 'Robust Federated Learning at Scale'))
+
+        with patch('src.agents.literature_survey_agent.db', temp_db):
+            unique = agent.enhanced_deduplicate_papers(
+                [make_paper('arxiv_2101', 'Robust federated learning at scale')], check_existing=True
+            )
+
+        assert [p.id for p in unique] == ['openalex_W1']
@@ -0,0 +1,79 @@
+"""
+Tests for vectorized note clustering
+"""
+
+import pytest
+from unittest.mock import patch
+
+from src.agents.theme_synthesizer_agent import ThemeSynthesizerAgent
+from src.storage.models import ResearchNote
+from src.tools.note_clustering import NoteClusteringEngine
+
+
+def make_notes(count):
+    """Create notes alternating between two clearly separated topics"""
+    topics = [
+        'federated clients aggregation privacy heterogeneity communication',
+        'graph neural message passing molecules embeddings',
+    ]
+    return [
+        ResearchNote(id=f'note-{i}', paper_id=f'paper-{i}', note_type='methodology',
+                     content=f"{topics[i % 2]} variant{i}")
+        for i in range(count)
+    ]
+
+
+class TestNoteClusteringEngine:
+    """Test clustering quality, naming and determinism"""
+
+    def test_separates_topics_and_names_from_centroid(self):
+        """Notes on different topics land in different, term-named clusters"""
+        clusters = NoteClusteringEngine().cluster(make_notes(20))
+
+        assert len(clusters) == 2
+        assert all(len(cluster.notes) == 10 for cluster in clusters)
+        assert clusters[0].name.startswith('methodology_')
+        assert set(clusters[0].top_terms) <= set(make_notes(1)[0].content.split())
+        assert len({cluster.name for cluster in clusters}) == 2
+
+    def test_sampled_path_is_deterministic(self):
+        """Inputs above the agglomerative limit cluster identically across runs"""
+        notes = make_notes(60)
+        engine = NoteClusteringEngine(agglomerative_limit=20, random_state=3)
+
+        first = [[n.id for n in c.notes] for c in engine.cluster(notes)]
+        second = [[n.id for n in c.notes] for c in engine.cluster(notes)]
+
+        assert first == second
+        assert len(first) == 2
+        assert sum(len(ids) for ids in first) == 60
+
+    def test_empty_content_is_kept(self):
+        """Notes without usable terms still appear in the output"""
+        notes = [ResearchNote(id='a', paper_id='p', content='the and of', note_type='general')]
+
+        clusters = NoteClusteringEngine().cluster(notes)
+
+        assert [n.id for n in clusters[0].notes] == ['a']
+
+
+class TestThemeSynthesizerClustering:
+    """Test agent integration"""
+
+    @pytest.fixture
+    def agent(self):
+        with patch('src.agents.theme_synthesizer_agent.LLMFactory.create_llm'), \
+             patch('src.agents.theme_synthesizer_agent.Agent'):
+            return ThemeSynthesizerAgent()
+
+    def test_agent_uses_engine(self, agent):
+        clusters = agent.cluster_notes_by_similarity(make_notes(12))
+
+        assert len(clusters) == 2
+        assert sum(len(notes) for notes in clusters.values()) == 12
+
+    def test_greedy_fallback(self, agent):
+        with patch.object(NoteClusteringEngine, 'is_available', return_value=False):
+            clusters = agent.cluster_notes_by_similarity(make_notes(12))
+
+        assert sum(len(notes) for notes in clusters.values()) == 12
@@ -0,0 +1,111 @@
+"""
+Tests for normalized author, keyword and venue tables
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from src.storage.database import AsyncDatabaseManager, DatabaseManager
+from src.storage.models import Paper
+
+
+def make_paper(paper_id, authors, keywords=(), venue=None, citations=0):
+    return Paper(id=paper_id, title=f'Paper {paper_id}', authors=list(authors), abstract='An abstract.',
+                 url='', venue=venue, citations=citations, keywords=list(keywords))
+
+
+class TestPaperIndex:
+    """Author, keyword and venue lookups go through the side tables"""
+
+    @pytest.fixture
+    def temp_db(self, tmp_path):
+        manager = DatabaseManager(str(tmp_path / 'research.db'))
+        yield manager
+        manager.close_connections()
+
+    @pytest.fixture
+    def papers(self):
+        return [
+            make_paper('p1', ['Ada Lovelace', 'Alan Turing'], ['Computation', 'machine learning'], 'NeurIPS', 50),
+            make_paper('p2', ['alan  turing'], ['Machine Learning'], 'neurips', 10),
+            make_paper('p3', ['Grace Hopper'], ['compilers'], 'ACM Journal', 5),
+        ]
+
+    def test_search_by_author_full_name_and_surname(self, temp_db, papers):
+        for paper in papers:
+            temp_db.save_paper(paper)
+
+        assert [p.id for p in temp_db.search_by_author('Alan Turing')] == ['p1', 'p2']
+        assert [p.id for p in temp_db.search_by_author('hopper')] == ['p3']
+        assert temp_db.search_by_author('Nobody') == []
+
+    def test_keyword_and_venue_lookups(self, temp_db, papers):
+        for paper in papers:
+            temp_db.save_paper(paper)
+
+        assert [p.id for p in temp_db.papers_with_keyword('MACHINE learning')] == ['p1', 'p2']
+        assert [p.id for p in temp_db.papers_in_venue('NeurIPS')] == ['p1', 'p2']
+
+    def test_resaving_replaces_side_rows(self, temp_db, papers):
+        temp_db.save_paper(papers[0])
+        temp_db.save_paper(make_paper('p1', ['Ada Lovelace'], ['poetry'], 'Nature'))
+
+        assert temp_db.search_by_author('Turing') == []
+        assert temp_db.papers_with_keyword('computation') == []
+        assert [p.id for p in temp_db.papers_with_keyword('poetry')] == ['p1']
+
+    def test_facets_and_author_search(self, temp_db, papers):
+        for paper in papers:
+            temp_db.save_paper(paper)
+
+        assert temp_db.get_author_facets(1)[0]['count'] == 2
+        assert temp_db.get_keyword_facets(1) == [{'keyword': 'Machine Learning', 'count': 2}]
+        assert {p.id for p in temp_db.search_papers('turing')} == {'p1', 'p2'}
+
+    def test_existing_database_is_migrated(self, tmp_path, papers):
+        db_path = str(tmp_path / 'legacy.db')
+        legacy = DatabaseManager(db_path)
+        for paper in papers:
+            legacy.save_paper(paper)
+        legacy.close_connections()
+        conn = sqlite3.connect(db_path)
+        conn.executescript("DROP TABLE paper_authors; DROP TABLE paper_keywords; "
+                           "DROP TABLE paper_venues; DROP TABLE venues; PRAGMA user_version = 4;")
+        conn.close()
+
+        manager = DatabaseManager(db_path)
+
+        assert [p.id for p in manager.search_by_author('Lovelace')] == ['p1']
+        assert len(manager.papers_with_keyword('machine learning')) == 2
+
+    def test_async_search_matches_authors_through_the_index(self, tmp_path):
+        db_path = str(tmp_path / 'research.db')
+        manager = DatabaseManager(db_path)
+        manager.save_paper(make_paper('p1', ['Alan Turing'], citations=5))
+        manager.save_paper(make_paper('p2', ['Grace Hopper'], citations=1))
+        manager.close_connections()
+
+        async def search():
+            async with AsyncDatabaseManager(db_path) as async_manager:
+                listed = await async_manager.get_papers_async(search_query='ALAN  turing')
+                found = await async_manager.search_papers_fulltext_async('grace   HOPPER')
+                return [p.id for p in listed], [p.id for p in found]
+
+        assert asyncio.run(search()) == (['p1'], ['p2'])
+
+    def test_async_save_indexes_papers(self, tmp_path):
+        db_path = str(tmp_path / 'research.db')
+        DatabaseManager(db_path).close_connections()
+        paper = make_paper('p9', ['Edsger Dijkstra'], ['graphs'])
+        # The async insert binds list columns directly, so store them as JSON like to_dict does
+        paper.authors, paper.keywords = '["Edsger Dijkstra"]', '["graphs"]'
+
+        async def save():
+            async with AsyncDatabaseManager(db_path) as manager:
+                await manager.save_papers_async([paper])
+
+        asyncio.run(save())
+
+        assert [p.id for p in DatabaseManager(db_path).search_by_author('dijkstra')] == ['p9']
@@ -0,0 +1,91 @@
+"""
+Tests for columnar multi-criteria paper ranking
+"""
+
+import random
+from datetime import datetime
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from src.agents.literature_survey_agent import LiteratureSurveyAgent
+from src.storage.models import Paper
+
+WORDS = ('federated learning privacy graph neural networks method results accuracy '
+         'model evaluation clients transformer vision').split()
+VENUES = [None, '', 'NeurIPS', 'arXiv', 'IEEE Transactions on Computers', 'Workshop on Things']
+
+
+def synthetic_papers(count, seed=3):
+    rng = random.Random(seed)
+    papers = []
+    for i in range(count):
+        abstract = ' '.join(rng.choices(WORDS, k=rng.choice([0, 5, 40])))
+        papers.append(Paper(
+            id=f'p{i}',
+            title=' '.join(rng.choices(WORDS, k=rng.randint(0, 6))).title(),
+            authors=['A. Author'],
+            abstract=abstract or rng.choice([None, '']),
+            url='',
+            published_date=rng.choice([None, datetime(rng.randint(1990, 2025), 1, 1)]),
+            venue=rng.choice(VENUES),
+            citations=rng.choice([0, 0, 5, 120, 4000])
+        ))
+    return papers
+
+
+class TestPaperRanking:
+    """Columnar scoring must rank exactly like the per-paper scorer"""
+
+    @pytest.fixture
+    def agent(self):
+        with patch('src.agents.literature_survey_agent.LLMFactory.create_llm'), \
+             patch('src.agents.literature_survey_agent.Agent'):
+            return LiteratureSurveyAgent()
+
+    @pytest.fixture
+    def criteria(self):
+        return {'relevance_score': 0.5, 'citation_count': 0.2, 'publication_year': 0.15,
+                'venue_quality': 0.10, 'abstract_quality': 0.05}
+
+    def test_scores_match_per_paper_path(self, agent, criteria):
+        papers = synthetic_papers(400)
+        topic = 'Federated learning privacy'
+
+        columnar = agent._score_papers_columnar(papers, topic, criteria)
+        individual = agent._score_papers_individually(papers, topic, criteria)
+
+        assert columnar.tolist() == individual
+
+    def test_ordering_matches_per_paper_sort(self, agent, criteria):
+        papers = synthetic_papers(400)
+        topic = 'graph neural networks'
+        totals = agent._score_papers_individually(papers, topic, criteria)
+        expected = [p for _, p in sorted(zip(totals, papers), key=lambda x: x[0], reverse=True)]
+
+        assert agent.intelligent_paper_ranking(papers, topic) == expected
+
+    def test_top_k_keeps_ties_in_input_order(self, agent):
+        totals = np.array([1.0, 3.0, 2.0, 3.0, 2.0, 2.0])
+
+        assert agent._top_k_order(totals, 3).tolist() == [1, 3, 2]
+        assert agent._top_k_order(totals, 4).tolist() == [1, 3, 2, 4]
+        assert agent._top_k_order(totals, 10).tolist() == [1, 3, 2, 4, 5, 0]
+
+    def test_top_k_is_prefix_of_full_ranking(self, agent):
+        papers = synthetic_papers(300)
+
+        full = agent.intelligent_paper_ranking(papers, 'model evaluation')
+        top = agent.intelligent_paper_ranking(papers, 'model evaluation', top_k=25)
+
+        assert top == full[:25]
+
+    def test_unscorable_papers_get_default_score(self, agent, criteria):
+        papers = synthetic_papers(3)
+        papers[1].published_date = '2020-01-01'
+
+        totals = agent._score_papers_columnar(papers, 'federated learning', criteria)
+
+        assert totals[1] == 5.0
+        assert totals.tolist() == agent._score_papers_individually(papers, 'federated learning', criteria)
@@ -0,0 +1,305 @@
+"""
+Tests for process-pool PDF extraction and the extraction cache
+"""
+
+import shutil
+import threading
+import time
+
+import pytest
+
+from src.storage.migrations import run_migrations
+from src.storage.pdf_cache import PDFExtractionCache
+from src.tools import pdf_processor
+from src.tools.pdf_extraction import PDFExtractionService, extract_page_range
+from src.tools.pdf_processor import PDFProcessor
+
+
+def write_pdf(path, page_texts):
+    """Minimal PDF with the given Helvetica text per page, one line per newline"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in page_texts:
+        stream = "BT /F1 12 Tf 72 720 Td " + " 0 -14 Td ".join(f"({line}) Tj" for line in text.split('\n')) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    body, offsets = b"%PDF-1.4\n", []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(body))
+        body += f"{number} 0 obj\n{obj}\nendobj\n".encode('latin-1')
+    xref = len(body)
+    body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('latin-1')
+    body += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode('latin-1')
+    body += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('latin-1')
+    path.write_bytes(body)
+    return str(path)
+
+
+def stalled_range(pdf_path, start, end, *options):
+    if pdf_path.endswith('stuck.pdf'):
+        time.sleep(30)
+    return extract_page_range(pdf_path, start, end, *options)
+
+
+def slow_range(pdf_path, start, end, *options):
+    time.sleep(0.4)
+    return extract_page_range(pdf_path, start, end, *options)
+
+
+class StallingService(PDFExtractionService):
+    range_task = staticmethod(stalled_range)
+
+
+class SlowService(PDFExtractionService):
+    range_task = staticmethod(slow_range)
+
+
+def extract_from_threads(service, paths):
+    results = {}
+    threads = [threading.Thread(target=lambda path=path: results.update({path: service.extract(path)}))
+               for path in paths]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestPDFExtractionService:
+    """PDFs are parsed in worker processes, split into page ranges"""
+
+    @pytest.fixture
+    def service(self):
+        service = PDFExtractionService(max_workers=2, pages_per_task=2, timeout=30)
+        yield service
+        service.shutdown()
+
+    @pytest.fixture
+    def long_pdf(self, tmp_path):
+        return write_pdf(tmp_path / 'long.pdf', [f'Page {i} text' for i in range(1, 8)])
+
+    def test_large_pdf_is_split_and_reassembled(self, service, long_pdf):
+        result = service.extract(long_pdf)
+
+        assert [page['page_number'] for page in result['pages']] == list(range(1, 8))
+        assert result['text'].splitlines() == [f'Page {i} text' for i in range(1, 8)]
+
+    def test_pages_stream_in_order(self, service, long_pdf):
+        assert [page['text'] for page in service.iter_pages(long_pdf)] == [f'Page {i} text' for i in range(1, 8)]
+
+    def test_many_pdfs_and_failures(self, service, tmp_path, long_pdf):
+        short_pdf = write_pdf(tmp_path / 'short.pdf', ['Only page'])
+        broken = tmp_path / 'broken.pdf'
+        broken.write_bytes(b'%PDF-1.4 not really a pdf')
+
+        results = dict(service.extract_many([long_pdf, short_pdf, str(broken)]))
+
+        assert results[short_pdf]['text'] == 'Only page'
+        assert len(results[long_pdf]['pages']) == 7
+        assert results[str(broken)] is None or results[str(broken)]['text'] == ''
+
+    def test_stuck_pdf_times_out_and_pool_recovers(self, tmp_path):
+        stuck = write_pdf(tmp_path / 'stuck.pdf', ['Never parsed'])
+        fine = write_pdf(tmp_path / 'fine.pdf', ['Recovered'])
+        service = StallingService(max_workers=2, timeout=1.0)
+        try:
+            started = time.time()
+            results = dict(service.extract_many([stuck, fine]))
+
+            assert results[stuck] is None and results[fine]['text'] == 'Recovered'
+            assert time.time() - started < 10
+            assert service.extract(fine)['text'] == 'Recovered'
+        finally:
+            service.shutdown()
+
+
+    def test_concurrent_callers_share_the_workers(self, tmp_path):
+        """Deadlines count from when a worker starts a task, not from when a caller queued it"""
+        paths = [write_pdf(tmp_path / f'paper{i}.pdf', [f'Paper {i} page {p}' for p in range(4)])
+                 for i in range(6)]
+        service = SlowService(max_workers=2, pages_per_task=2, timeout=1.5)
+        try:
+            results = extract_from_threads(service, paths)
+        finally:
+            service.shutdown()
+
+        assert all(results[path] and len(results[path]['pages']) == 4 for path in paths)
+
+    def test_timeout_kills_only_the_stuck_task(self, tmp_path):
+        stuck = write_pdf(tmp_path / 'stuck.pdf', ['Never parsed'])
+        healthy = [write_pdf(tmp_path / f'fine{i}.pdf', [f'Fine {i}']) for i in range(3)]
+        service = StallingService(max_workers=2, timeout=1.0)
+        try:
+            errors = {}
+            results = extract_from_threads(service, healthy)
+            assert service.extract(stuck, errors) is None and isinstance(errors[stuck], TimeoutError)
+            results.update(extract_from_threads(service, [stuck] + healthy))
+        finally:
+            service.shutdown()
+
+        assert results[stuck] is None
+        assert [results[path]['text'] for path in healthy] == ['Fine 0', 'Fine 1', 'Fine 2']
+
+
+class CountingService:
+    def __init__(self):
+        self.service = PDFExtractionService(max_workers=1)
+        self.extracted = []
+
+    def extract(self, pdf_path, errors=None):
+        self.extracted.append(pdf_path)
+        return self.service.extract(pdf_path, errors)
+
+    def extract_many(self, pdf_paths, errors=None):
+        pdf_paths = list(pdf_paths)
+        self.extracted.extend(pdf_paths)
+        return self.service.extract_many(pdf_paths, errors)
+
+
+class TestPDFExtractionCache:
+    """Re-processing a PDF with the same bytes is a cache read"""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        counting = CountingService()
+        monkeypatch.setattr(pdf_processor, 'get_pdf_extraction_service', lambda: counting)
+        yield counting
+        counting.service.shutdown()
+
+    @pytest.fixture
+    def processor(self, tmp_path, service):
+        db_path = str(tmp_path / 'cache.db')
+        run_migrations(db_path)
+        processor = PDFProcessor()
+        processor.min_content_length = 5
+        processor.extraction_cache = PDFExtractionCache(db_path)
+        return processor
+
+    def test_same_bytes_are_parsed_once(self, processor, service, tmp_path):
+        original = write_pdf(tmp_path / 'paper.pdf', ['Cached page one', 'Cached page two'])
+        copy = str(tmp_path / 'copy.pdf')
+        shutil.copy(original, copy)
+
+        first = processor.process_pdf(original)
+        second = processor.process_pdf(copy)
+
+        assert service.extracted == [original]
+        assert not first['processing_info']['cache_hit'] and second['processing_info']['cache_hit']
+        assert second['processing_info']['file_path'] == copy
+        assert second['text'] == first['text'] and second['quality_assessment'] == first['quality_assessment']
+        assert [page['page_number'] for page in second['pages']] == [1, 2]
+
+    def test_new_extractor_version_misses(self, processor, service, tmp_path):
+        pdf = write_pdf(tmp_path / 'paper.pdf', ['Versioned text'])
+        processor.process_pdf(pdf)
+
+        processor.extractor_version += '-next'
+        processor.process_pdf(pdf)
+
+        assert service.extracted == [pdf, pdf]
+
+    def test_timed_out_pdf_skips_in_process_fallback(self, processor, tmp_path, monkeypatch):
+        pdf = write_pdf(tmp_path / 'paper.pdf', ['Hangs the parser'])
+        monkeypatch.setattr(processor, 'extract_text_pypdf2',
+                            lambda path: pytest.fail('fallback must not re-parse a timed-out PDF'))
+
+        class TimingOut:
+            def extract(self, pdf_path, errors=None):
+                errors[pdf_path] = TimeoutError('Extraction exceeded 1s')
+
+        monkeypatch.setattr(pdf_processor, 'get_pdf_extraction_service', lambda: TimingOut())
+        assert processor.process_pdf(pdf) is None
+
+    def test_prefetch_extracts_only_uncached_files(self, processor, service, tmp_path):
+        first = write_pdf(tmp_path / 'a.pdf', ['First paper'])
+        second = write_pdf(tmp_path / 'b.pdf', ['Second paper'])
+        processor.process_pdf(first)
+
+        assert processor.prefetch([first, second]) == {'cached': 1, 'extracted': 1, 'failed': 0}
+        extracted = {}
+        assert processor.prefetch([first, second], on_extracted=extracted.__setitem__) == \
+            {'cached': 2, 'extracted': 0, 'failed': 0}
+        assert extracted[second]['text'] == 'Second paper'
+        assert [page['page_number'] for page in extracted[first]['pages']] == [1]
+        assert service.extracted == [first, second]
+        assert processor.extraction_cache.stats()['entries'] == 2
+
+
+class TestBudgetedExtraction:
+    """Pages are read lazily and reading stops once enough has been collected"""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        service = PDFExtractionService(max_workers=2, pages_per_task=4)
+        monkeypatch.setattr(pdf_processor, 'get_pdf_extraction_service', lambda: service)
+        yield service
+        service.shutdown()
+
+    @pytest.fixture
+    def processor(self, service):
+        processor = PDFProcessor()
+        processor.cache_enabled = False
+        return processor
+
+    @pytest.fixture
+    def thesis(self, tmp_path):
+        pages = ['Abstract\nWe study things.', '1. Introduction\nContext.', '2 Methods\nHow we did it.',
+                 '3 Results\nWhat we found.', 'Conclusion\nWhat it means.', 'Details of the conclusion.']
+        pages += [f'Appendix page {i}' for i in range(40)]
+        return write_pdf(tmp_path / 'thesis.pdf', pages)
+
+    def test_stops_after_target_sections(self, processor, thesis):
+        extraction = processor.extract_text_budgeted(thesis)
+
+        assert extraction['stopped'] == 'sections_found'
+        assert extraction['pages_read'] == 6
+        assert extraction['sections_found'] == ['abstract', 'conclusion', 'method', 'results']
+        assert 'Details of the conclusion.' in extraction['text'] and 'Appendix' not in extraction['text']
+
+    def test_stops_at_character_budget(self, processor, thesis):
+        extraction = processor.extract_text_budgeted(thesis, max_chars=40, target_sections=())
+
+        assert extraction['stopped'] == 'char_budget'
+        assert extraction['pages_read'] == 2
+        assert len(extraction['text']) <= 40
+
+    def test_pages_are_parsed_in_the_process_pool(self, processor, thesis, monkeypatch):
+        monkeypatch.setattr(pdf_processor, 'iter_pdf_pages',
+                            lambda *args, **kwargs: pytest.fail('pages must not be parsed on the calling thread'))
+
+        extraction = processor.extract_text_budgeted(thesis)
+
+        assert extraction['stopped'] == 'sections_found' and extraction['pages_read'] == 6
+        assert extraction['text'].startswith('Abstract\nWe study things.')
+
+    def test_budgeted_reads_are_cached(self, processor, service, thesis, tmp_path, monkeypatch):
+        db_path = str(tmp_path / 'cache.db')
+        run_migrations(db_path)
+        processor.extraction_cache = PDFExtractionCache(db_path)
+        first = processor.extract_text_budgeted(thesis)
+
+        monkeypatch.setattr(service, 'iter_pages', lambda *args, **kwargs: pytest.fail('cached read re-parsed the PDF'))
+        assert processor.extract_text_budgeted(thesis) == first
+        with pytest.raises(pytest.fail.Exception):
+            processor.extract_text_budgeted(thesis, max_chars=40)
+
+        processor.extraction_cache.put('other', 'old-version', {'text': ''})
+        assert processor.extraction_cache.prune(processor.extractor_version) == 1
+        assert processor.extract_text_budgeted(thesis) == first
+
+    def test_tables_only_extracted_on_request(self, processor, thesis, monkeypatch):
+        # Counted in this process, so read without the pool
+        processor.use_process_pool = False
+        calls = []
+        monkeypatch.setattr('pdfplumber.page.Page.extract_tables', lambda page, *args, **kwargs: calls.append(1) or [])
+
+        processor.extract_text_budgeted(thesis)
+        assert calls == []
+
+        processor.extract_text_budgeted(thesis, include_tables=True)
+        assert len(calls) == 6
@@ -0,0 +1,205 @@
+"""
+Tests for the shared QA service: coalescing, deadlines, backpressure, fallback
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.agents.qa_service import QAService, QAServiceBusy
+
+
+class FakeAgent:
+    """Async agent whose answers take ``delay`` seconds"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.cancelled = []
+        self.streams = []
+
+    async def answer_question_async(self, question, research_topic=None, paper_limit=None):
+        self.calls.append(question)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(question)
+            raise
+        return {'answer': f'Answer to {question}', 'confidence': 0.9}
+
+    async def answer_question_stream_async(self, question, research_topic=None, paper_limit=None):
+        self.streams.append(question)
+        for word in ('Streamed', 'answer'):
+            await asyncio.sleep(self.delay)
+            yield {'type': 'token', 'text': word}
+        yield {'type': 'result', 'result': {'answer': 'Streamed answer', 'confidence': 0.9}}
+
+
+class BlockingAgent:
+    """Agent whose LLM call blocks an executor thread until ``release`` is set"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = []
+
+    async def answer_question_async(self, question, research_topic=None, paper_limit=None):
+        def generate():
+            self.started.append(question)
+            self.release.wait(10)
+            return {'answer': f'Answer to {question}', 'confidence': 0.9}
+
+        return await asyncio.get_event_loop().run_in_executor(None, generate)
+
+
+class FakeFallback:
+    def __init__(self):
+        self.calls = []
+
+    def answer_question(self, question, research_topic=None, paper_limit=None):
+        self.calls.append(question)
+        return {'answer': 'Simple answer', 'confidence': 0.3}
+
+
+def ask_concurrently(service, questions):
+    results = [None] * len(questions)
+
+    def ask(index, question):
+        results[index] = service.ask(question)
+
+    threads = [threading.Thread(target=ask, args=item) for item in enumerate(questions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestQAService:
+    """Questions share one long-lived agent behind a bounded worker pool"""
+
+    @pytest.fixture
+    def make_service(self):
+        services = []
+
+        def make(agent, **kwargs):
+            kwargs.setdefault('fallback_agent', FakeFallback())
+            service = QAService(agent=agent, **kwargs)
+            services.append(service)
+            return service
+
+        yield make
+        for service in services:
+            service.shutdown()
+
+    def test_identical_concurrent_questions_share_one_computation(self, make_service):
+        agent = FakeAgent(delay=0.3)
+        service = make_service(agent)
+
+        results = ask_concurrently(service, ['What is attention?', 'what is  ATTENTION?', 'What is attention?'])
+
+        assert agent.calls == ['What is attention?']
+        assert all(result['answer'] == 'Answer to What is attention?' for result in results)
+        assert service.metrics()['coalesced'] == 2 and service.metrics()['pending'] == 0
+
+    def test_deadline_cancels_the_computation_and_frees_the_slot(self, make_service):
+        agent = FakeAgent(delay=30)
+        service = make_service(agent, max_workers=1, enhanced_timeout=30)
+
+        started = time.monotonic()
+        result = service.ask('Slow question', timeout=0.3)
+
+        assert result['error'] == 'timeout' and time.monotonic() - started < 2
+        time.sleep(0.1)
+        assert agent.cancelled == ['Slow question']
+
+        agent.delay = 0
+        assert service.ask('Next question')['answer'] == 'Answer to Next question'
+
+    def test_slot_is_held_until_the_abandoned_llm_call_returns(self, make_service):
+        agent = BlockingAgent()
+        service = make_service(agent, max_workers=1, enhanced_timeout=30)
+
+        assert service.ask('Stuck question', timeout=0.2)['error'] == 'timeout'
+        ticket = service.submit('Next question', timeout=5)
+        time.sleep(0.3)
+        # The first LLM call is still running on its thread, so the next question waits
+        assert agent.started == ['Stuck question']
+
+        agent.release.set()
+        assert ticket.result()['answer'] == 'Answer to Next question'
+        assert agent.started == ['Stuck question', 'Next question']
+
+    def test_saturated_service_rejects_new_questions(self, make_service):
+        service = make_service(FakeAgent(delay=30), max_pending=1)
+        ticket = service.submit('First question')
+
+        with pytest.raises(QAServiceBusy):
+            service.submit('Second question')
+        # Joining an in-flight question needs no extra capacity
+        service.submit('First question').cancel()
+
+        ticket.cancel()
+        assert service.metrics()['rejected'] == 1 and service.metrics()['cancelled'] == 1
+
+    def test_slow_agent_falls_back_within_the_deadline(self, make_service):
+        fallback = FakeFallback()
+        service = make_service(FakeAgent(delay=30), fallback_agent=fallback, enhanced_timeout=0.2)
+
+        first = service.ask('Question one')
+        second = service.ask('Question two')
+
+        assert first['qa_agent_used'] == 'simplified_fallback' and second['answer'] == 'Simple answer'
+        assert fallback.calls == ['Question one', 'Question two']
+
+    def test_stream_yields_tokens_then_result(self, make_service):
+        service = make_service(FakeAgent(delay=0.01))
+
+        events = list(service.stream('Stream this'))
+
+        assert [event.get('text') for event in events[:2]] == ['Streamed', 'answer']
+        assert events[-1]['result']['answer'] == 'Streamed answer'
+        assert service.metrics()['streams'] == 0
+
+    def test_identical_streams_share_one_computation(self, make_service):
+        agent = FakeAgent(delay=0.2)
+        service = make_service(agent)
+        results = {}
+
+        def read(name, question):
+            results[name] = list(service.stream(question))
+
+        first = threading.Thread(target=read, args=('first', 'Stream this'))
+        first.start()
+        time.sleep(0.3)
+        # Joins after the first token: that token is replayed, then the rest is shared
+        read('second', 'stream  THIS')
+        first.join()
+
+        assert agent.streams == ['Stream this']
+        assert results['first'] == results['second']
+        assert [event.get('text') for event in results['second'][:2]] == ['Streamed', 'answer']
+        assert service.metrics()['coalesced'] == 1 and service.metrics()['streams'] == 0
+
+    def test_slow_stream_falls_back_within_the_deadline(self, make_service):
+        fallback = FakeFallback()
+        service = make_service(FakeAgent(delay=30), fallback_agent=fallback, enhanced_timeout=0.2)
+
+        events = list(service.stream('Stream this', timeout=5))
+
+        assert events == [{'type': 'token', 'text': 'Simple answer'},
+                          {'type': 'result', 'result': {'answer': 'Simple answer', 'confidence': 0.3,
+                                                        'qa_agent_used': 'simplified_fallback'}}]
+        assert fallback.calls == ['Stream this'] and service.metrics()['fallbacks'] == 1
+
+    def test_standard_mode_skips_the_enhanced_agent(self, make_service):
+        agent = FakeAgent()
+        service = make_service(agent)
+
+        result = service.ask('Plain question', enhanced=False)
+        events = list(service.stream('Plain question', enhanced=False))
+
+        assert result['qa_agent_used'] == 'simplified' and events[-1]['result']['answer'] == 'Simple answer'
+        assert agent.calls == [] and agent.streams == []
+        assert service.metrics()['fallbacks'] == 0
@@ -0,0 +1,174 @@
+"""
+Tests for quota-aware admission of LLM-bound work
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.agents import note_taking_agent
+from src.agents.note_taking_agent import NoteTakingAgent
+from src.crew import research_crew
+from src.crew.research_crew import UltraFastResearchCrew
+from src.storage.models import Paper
+from src.utils.error_handler import APIError
+from src.utils.rate_control import AdmissionController, AIMDLimiter, TokenBucket, is_rate_limited
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket:
+    """Tokens refill at the per-minute rate up to the burst size"""
+
+    def test_refills_at_quota_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(60, burst=2, clock=clock)
+
+        assert bucket.try_acquire() == 0 and bucket.try_acquire() == 0
+        assert bucket.try_acquire() == pytest.approx(1.0)
+        clock.now = 1.0
+        assert bucket.try_acquire() == 0
+
+    def test_drain_empties_saved_tokens(self):
+        clock = FakeClock()
+        bucket = TokenBucket(30, burst=5, clock=clock)
+
+        bucket.drain()
+
+        assert bucket.wait_time() == pytest.approx(2.0)
+
+    def test_unlimited_bucket_never_waits(self):
+        bucket = TokenBucket(None)
+
+        assert all(bucket.try_acquire() == 0 for _ in range(100))
+
+
+class TestAIMDLimiter:
+    """Successes grow the limit slowly, rate limits cut it sharply"""
+
+    def test_additive_increase_and_multiplicative_decrease(self):
+        clock = FakeClock()
+        limiter = AIMDLimiter(initial=2, maximum=8, clock=clock)
+
+        for _ in range(4):
+            limiter.acquire()
+            limiter.release()
+        assert limiter.limit == 3
+
+        limiter.record_rate_limited()
+        assert limiter.limit == 1
+
+    def test_burst_of_rate_limits_counts_once(self):
+        clock = FakeClock()
+        limiter = AIMDLimiter(initial=8, maximum=8, clock=clock)
+
+        limiter.record_rate_limited()
+        limiter.record_rate_limited()
+        assert limiter.limit == 4
+
+        clock.now = 5.0
+        limiter.record_rate_limited()
+        assert limiter.limit == 2
+
+    def test_acquire_blocks_at_limit(self):
+        limiter = AIMDLimiter(initial=1, maximum=1)
+        limiter.acquire()
+
+        assert not limiter.acquire(timeout=0.01)
+        limiter.release()
+        assert limiter.acquire(timeout=0.01)
+
+    def test_rate_limit_detection(self):
+        assert is_rate_limited(APIError("slow down", api_name="gemini", status_code=429))
+        assert is_rate_limited(RuntimeError("Resource exhausted: quota"))
+        assert not is_rate_limited(RuntimeError("connection reset"))
+
+
+class TestPaperProcessing:
+    """Papers flow through a shared queue without fixed pauses"""
+
+    @pytest.fixture
+    def admission(self, monkeypatch):
+        controller = AdmissionController(TokenBucket(None), AIMDLimiter(initial=2, maximum=4))
+        monkeypatch.setattr(research_crew, 'llm_admission', lambda: controller)
+        return controller
+
+    @pytest.fixture
+    def crew(self):
+        crew = UltraFastResearchCrew.__new__(UltraFastResearchCrew)
+        crew.parallel_processing = True
+        return crew
+
+    def test_results_keep_paper_order_without_sleeping(self, crew, admission):
+        papers = [f'p{i}' for i in range(12)]
+
+        started = time.time()
+        results = crew._process_papers_concurrently(papers, lambda paper, topic: [f'{topic}-{paper}'], 'x')
+
+        assert results == [f'x-{paper}' for paper in papers]
+        assert time.time() - started < 1.0
+        assert admission.limiter.limit > 2
+
+    def test_rate_limited_papers_are_requeued(self, crew, admission):
+        attempts = []
+        lock = threading.Lock()
+
+        def process(paper, topic):
+            with lock:
+                attempts.append(paper)
+                first_try = attempts.count(paper) == 1
+            if paper == 'p1' and first_try:
+                raise APIError("429 Too Many Requests", api_name="gemini", status_code=429)
+            if paper == 'p2':
+                raise ValueError("unparseable")
+            return paper
+
+        results = crew._process_papers_concurrently(['p0', 'p1', 'p2', 'p3'], process)
+
+        assert results == ['p0', 'p1', 'p3']
+        assert attempts.count('p1') == 2 and attempts.count('p2') == 1
+        assert admission.limiter.in_flight == 0
+
+    def test_rate_limited_note_extraction_is_requeued(self, crew, admission, monkeypatch):
+        calls = []
+        lock = threading.Lock()
+
+        class QuotaLLM:
+            """Rejects the first request for p1 with a 429, like a fail-fast client"""
+
+            def generate(self, prompt, system_prompt=None):
+                paper = 'p1' if 'Title p1' in prompt else 'p0'
+                with lock:
+                    calls.append(paper)
+                    first_try = calls.count(paper) == 1
+                if paper == 'p1' and first_try:
+                    raise APIError("429 Too Many Requests", api_name="gemini", status_code=429)
+                return "ABSTRACT: A study of graph networks and their training dynamics."
+
+        monkeypatch.setattr(note_taking_agent.LLMFactory, 'create_llm', staticmethod(lambda *args, **kwargs: QuotaLLM()))
+        monkeypatch.setattr(note_taking_agent, 'Agent', lambda **kwargs: None)
+        crew.note_agent = NoteTakingAgent()
+        monkeypatch.setattr(crew.note_agent, '_batch_save_notes', lambda notes: len(notes))
+        crew.checkpoint_enabled = False
+        papers = [Paper(id=f'p{i}', title=f'Title p{i}', authors=[], abstract='', url='',
+                        full_text=f'Full text of paper p{i} about graph networks. ' * 10)
+                  for i in range(2)]
+        released = []
+        original_release = admission.release
+        monkeypatch.setattr(admission, 'release', lambda rate_limited=False: (released.append(rate_limited),
+                                                                               original_release(rate_limited)))
+
+        notes = crew._extract_notes_incrementally(papers, 'graph networks', 'graph_networks', use_cache=False)
+
+        # p1 was extracted again after its 429 instead of keeping template notes
+        assert calls.count('p1') == 3
+        assert {note.paper_id for note in notes} == {'p0', 'p1'}
+        assert released.count(True) == 1
+        assert admission.limiter.in_flight == 0
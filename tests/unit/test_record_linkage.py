@@ -0,0 +1,96 @@
+"""
+Tests for cross-source record linkage
+"""
+
+import pytest
+from datetime import datetime
+
+from src.storage.database import DatabaseManager
+from src.storage.models import Paper
+from src.tools.record_linkage import RecordLinker, normalize_arxiv_id, normalize_doi
+
+
+def make_paper(paper_id, source, **fields):
+    values = dict(title='Robust Federated Learning at Scale', authors=['A. Author'],
+                  abstract='', url=f'http://{source}.example/{paper_id}')
+    values.update(fields)
+    paper = Paper(id=paper_id, **values)
+    paper.source = source
+    return paper
+
+
+class TestRecordLinker:
+    """Test blocking and field-by-field merging"""
+
+    @pytest.fixture
+    def records(self):
+        """The same work as seen by arXiv, OpenAlex and CrossRef"""
+        return [
+            make_paper('arxiv_2101.00001', 'arxiv', arxiv_id='2101.00001v2', venue='arXiv',
+                       abstract='A long abstract describing robust aggregation for federated learning.',
+                       keywords=['federated learning'], published_date=datetime(2021, 1, 1)),
+            make_paper('openalex_W1', 'openalex', doi='https://doi.org/10.1000/FL.1', citations=42,
+                       authors=['A. Author', 'B. Author'], keywords=['Federated Learning', 'robustness']),
+            make_paper('crossref_1', 'crossref', title='ROBUST FEDERATED LEARNING AT SCALE',
+                       doi='10.1000/fl.1', venue='Journal of ML', citations=30,
+                       published_date=datetime(2022, 3, 1)),
+            make_paper('arxiv_other', 'arxiv', title='An unrelated paper on graphs', arxiv_id='2102.1'),
+        ]
+
+    def test_links_across_sources(self, records):
+        merged = RecordLinker().link(records)
+
+        assert [p.id for p in merged] == ['arxiv_2101.00001', 'arxiv_other']
+        paper = merged[0]
+        assert paper.title == 'Robust Federated Learning at Scale'
+        assert paper.abstract.startswith('A long abstract')
+        assert paper.citations == 42
+        assert paper.authors == ['A. Author', 'B. Author']
+        assert paper.keywords == ['federated learning', 'robustness']
+        assert paper.doi == '10.1000/fl.1'
+        assert paper.venue == 'Journal of ML'
+        assert paper.published_date == datetime(2021, 1, 1)
+        assert [e['source'] for e in paper.provenance] == ['arxiv', 'openalex', 'crossref']
+
+    def test_links_transitively(self):
+        """A record sharing a DOI with one and a title with another joins both"""
+        records = [
+            make_paper('a', 'arxiv', title='Graph transformers for molecules', arxiv_id='1'),
+            make_paper('b', 'openalex', title='Graph Transformers for Molecules!', doi='10.1/x'),
+            make_paper('c', 'crossref', title='Different title at publication', doi='10.1/X'),
+        ]
+
+        merged = RecordLinker().link(records)
+
+        assert len(merged) == 1
+        assert len(merged[0].provenance) == 3
+
+    def test_same_title_with_conflicting_identifiers_is_not_linked(self):
+        records = [
+            make_paper('v2019', 'crossref', title='Proceedings of the Conference on Empirical Methods in NLP',
+                       doi='10.18653/v1/D19-1'),
+            make_paper('v2020', 'crossref', title='Proceedings of the Conference on Empirical Methods in NLP',
+                       doi='10.18653/v1/2020.emnlp-main'),
+            make_paper('mirror', 'openalex', title='Proceedings of the Conference on Empirical Methods in NLP'),
+            make_paper('v2020_arxiv', 'arxiv', title='Other title', doi='https://doi.org/10.18653/V1/2020.EMNLP-MAIN',
+                       arxiv_id='2010.1'),
+        ]
+
+        merged = RecordLinker().link(records)
+
+        assert [p.id for p in merged] == ['v2019', 'v2020']
+        assert [e['record_id'] for e in merged[0].provenance] == ['v2019', 'mirror']
+        assert [e['record_id'] for e in merged[1].provenance] == ['v2020', 'v2020_arxiv']
+
+    def test_identifier_normalisation(self):
+        assert normalize_doi('doi:10.1000/ABC') == '10.1000/abc'
+        assert normalize_arxiv_id('arXiv:2101.00001v3') == '2101.00001'
+
+    def test_provenance_is_persisted(self, records, tmp_path):
+        temp_db = DatabaseManager(str(tmp_path / 'research.db'))
+        paper = RecordLinker().link(records)[0]
+
+        temp_db.save_paper(paper)
+
+        stored = temp_db.get_paper_provenance(paper.id)
+        assert {row['record_id'] for row in stored} == {'arxiv_2101.00001', 'openalex_W1', 'crossref_1'}
@@ -0,0 +1,85 @@
+"""
+Tests for the semantic QA answer cache
+"""
+
+import pytest
+
+from src.storage.database import DatabaseManager
+from src.storage.models import Paper
+from src.storage.semantic_cache import SemanticQACache, hashed_embedding
+
+
+class TestSemanticQACache:
+    """Test similarity lookup, scoping, invalidation and bounds"""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        """Create a temporary papers database"""
+        path = str(tmp_path / 'research.db')
+        DatabaseManager(path)
+        return path
+
+    @pytest.fixture
+    def cache(self, db_path):
+        """Create a cache on the temporary database"""
+        return SemanticQACache(db_path, threshold=0.8, max_entries=5)
+
+    @pytest.fixture
+    def result(self):
+        """Create a sample QA result"""
+        return {'question': 'What are the main challenges in federated learning?',
+                'answer': 'Communication cost and heterogeneity.', 'confidence': 0.7,
+                'metadata': {'paper_count': 3}}
+
+    def test_paraphrase_hits(self, cache, result):
+        """A reworded question is served from the cache with match metadata"""
+        cache.store(result['question'], result, 'federated learning')
+
+        hit = cache.lookup('What are the key challenges of federated learning', 'federated learning')
+
+        assert hit is not None
+        assert hit['answer'] == result['answer']
+        assert hit['question'] == 'What are the key challenges of federated learning'
+        assert hit['metadata']['semantic_cache']['matched_question'] == result['question']
+        assert cache.lookup('How is differential privacy evaluated?', 'federated learning') is None
+
+    def test_lookup_is_scoped_by_topic(self, cache, result):
+        """Answers computed under one topic filter are not reused for another"""
+        cache.store(result['question'], result, 'federated learning')
+
+        assert cache.lookup(result['question'], 'graph neural networks') is None
+        assert cache.lookup(result['question'], 'Federated  Learning') is not None
+
+    def test_ingest_invalidates_matching_topics(self, db_path, cache, result):
+        """Saving a paper on a topic retires that topic's answers only"""
+        cache.store(result['question'], result, 'federated learning')
+        cache.store('What datasets are used for graph neural networks?', result, 'graph neural networks')
+        cache.store(result['question'], result, None)
+
+        DatabaseManager(db_path).save_paper(Paper(
+            id='p1', title='Robust Federated Learning under Client Drift', authors=['A. Author'],
+            abstract='We study aggregation under heterogeneous clients.', url='http://example.com'
+        ))
+
+        assert cache.lookup(result['question'], 'federated learning') is None
+        assert cache.lookup(result['question'], None) is None
+        assert cache.lookup('What datasets are used for graph neural networks?',
+                            'graph neural networks') is not None
+        assert cache.corpus_version('federated learning') == 1
+
+    def test_entries_are_bounded(self, cache, result):
+        """The least recently used entries are evicted beyond max_entries"""
+        for i in range(8):
+            cache.store(f'question number {i} about topic{i}', result, 'bounded')
+
+        count = cache._connection().execute('SELECT COUNT(*) FROM qa_semantic_cache').fetchone()[0]
+        assert count == 5
+        assert cache.lookup('question number 0 about topic0', 'bounded') is None
+
+    def test_hashed_embedding_is_normalised(self):
+        """Fallback embeddings are unit vectors and deterministic"""
+        first = hashed_embedding('transformer models for protein folding')
+        second = hashed_embedding('transformer models for protein folding')
+
+        assert abs(float(first @ first) - 1.0) < 1e-5
+        assert (first == second).all()
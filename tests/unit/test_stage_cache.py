@@ -0,0 +1,155 @@
+"""
+Tests for the content-addressed workflow stage cache
+"""
+
+from datetime import datetime
+
+import pytest
+
+from src.crew.research_crew import UltraFastResearchCrew
+from src.storage.migrations import run_migrations
+from src.storage.models import Paper, ResearchNote
+from src.storage.stage_cache import StageCache, fingerprint
+
+
+def make_paper(paper_id, abstract='An abstract'):
+    return Paper(id=paper_id, title=f'Paper {paper_id}', authors=['A. Author'], abstract=abstract,
+                 url=f'https://example.org/{paper_id}')
+
+
+def make_note(paper_id, content='finding'):
+    return ResearchNote(id=f'note-{paper_id}', paper_id=paper_id, content=content, note_type='key_finding',
+                        confidence=0.9)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    db_path = str(tmp_path / 'cache.db')
+    run_migrations(db_path)
+    return StageCache(db_path)
+
+
+class TestStageCache:
+    """Entries are keyed by their inputs and survive only while those inputs match"""
+
+    def test_fingerprint_ignores_timestamps(self):
+        first = make_note('p1')
+        second = make_note('p1')
+        second.created_at = datetime(2001, 1, 1)
+
+        assert fingerprint('themes', [first]) == fingerprint('themes', [second])
+        assert fingerprint('themes', [first]) != fingerprint('themes', [make_note('p1', 'other finding')])
+        assert fingerprint('survey', make_paper('p1')) != fingerprint('survey', make_paper('p1', 'Revised'))
+
+    def test_stage_output_round_trip(self, cache):
+        cache.put('key', 'theme_synthesis', {'themes': ['t1'], 'gaps': []}, topic='topic')
+
+        assert cache.get('key') == {'themes': ['t1'], 'gaps': []}
+        assert cache.get('missing') is None
+        assert cache.get('key', max_age_hours=0) is None
+        assert cache.latest_for_topic('topic')['theme_synthesis']['data_size'] == 2
+
+        cache.clear_topic('topic')
+        assert cache.get('key') is None
+
+    def test_notes_miss_when_paper_or_prompt_changes(self, cache):
+        paper = make_paper('p1')
+        cache.put_notes(paper, 'topic', 'notes-1', [make_note('p1')])
+
+        assert cache.get_notes([paper], 'topic', 'notes-1')['p1'][0].content == 'finding'
+        assert cache.get_notes([make_paper('p1', 'Revised')], 'topic', 'notes-1') == {}
+        assert cache.get_notes([paper], 'other topic', 'notes-1') == {}
+        assert cache.get_notes([paper], 'topic', 'notes-2') == {}
+
+    def test_notes_are_keyed_on_the_source_text(self, cache):
+        paper = make_paper('p1')
+        cache.put_notes(paper, 'topic', 'notes-1', [make_note('p1')], text='Full text v1')
+
+        assert 'p1' in cache.get_notes([paper], 'topic', 'notes-1', {'p1': 'Full text v1'})
+        assert cache.get_notes([paper], 'topic', 'notes-1', {'p1': 'Full text v2'}) == {}
+        assert cache.get_notes([paper], 'topic', 'notes-1') == {}
+
+    def test_empty_notes_are_not_cached(self, cache):
+        cache.put_notes(make_paper('p1'), 'topic', 'notes-1', [])
+
+        assert cache.get_notes([make_paper('p1')], 'topic', 'notes-1') == {}
+
+
+class FakeAgent:
+    def __init__(self, **methods):
+        for name, method in methods.items():
+            setattr(self, name, method)
+
+
+class TestIncrementalNotes:
+    """A re-run only extracts notes for papers without cached notes"""
+
+    @pytest.fixture
+    def crew(self, cache):
+        papers = [make_paper('p1'), make_paper('p2'), make_paper('p3')]
+        extracted = []
+        degraded = set()
+
+        def notes(paper, topic, report=None, content=None):
+            assert content == selected[paper.id]
+            extracted.append(paper.id)
+            if paper.id in degraded:
+                report['degraded'] = True
+            return [make_note(paper.id)]
+
+        crew = UltraFastResearchCrew.__new__(UltraFastResearchCrew)
+        crew.literature_agent = FakeAgent(
+            conduct_comprehensive_literature_survey=lambda topic, aspects, max_papers, *args: papers[:max_papers])
+        selections = []
+        selected = {paper.id: (f'Text of {paper.id}', 'full_text', 'high') for paper in papers}
+
+        def select_content(paper):
+            selections.append(paper.id)
+            return selected[paper.id]
+
+        crew.note_agent = FakeAgent(extract_notes_from_paper=notes, select_content=select_content,
+                                    PROMPT_VERSION='test')
+        crew.theme_agent = FakeAgent(synthesize_research_landscape=lambda notes: {'themes': ['t1'], 'gaps': []})
+        crew.citation_agent = FakeAgent(
+            generate_citations_for_papers=lambda papers: [],
+            build_citation_matcher=lambda citations, papers: None,
+            insert_inline_citations=lambda text, citations, matcher=None: text,
+            create_bibliography=lambda citations, style: 'bib',
+            generate_citation_report=lambda citations: 'report',
+        )
+        crew.draft_agent = FakeAgent(
+            compile_full_draft=lambda topic, themes, papers, notes, gaps: {'sections': {'intro': 'Intro'}})
+        crew.stage_cache = cache
+        crew.checkpoint_enabled = True
+        crew.parallel_processing = False
+        crew.max_parallel_stages = 2
+        crew.extracted = extracted
+        crew.degraded = degraded
+        crew.selections = selections
+        return crew
+
+    def test_rerun_extracts_only_new_papers(self, crew):
+        first = crew.execute_research_workflow('graph learning', max_papers=2)
+        second = crew.execute_research_workflow('graph learning', max_papers=3)
+
+        assert first['success'] and second['success']
+        assert crew.extracted == ['p1', 'p2', 'p3']
+        # Each run selects a paper's source text once and extraction reuses it
+        assert sorted(crew.selections) == ['p1', 'p1', 'p2', 'p2', 'p3']
+        assert [note.paper_id for note in second['notes']] == ['p1', 'p2', 'p3']
+        status = crew.get_workflow_status('graph learning')
+        assert status['steps']['note_taking']['completed']
+
+    def test_cache_is_bypassed_without_resume(self, crew):
+        crew.execute_research_workflow('graph learning', max_papers=2)
+        crew.execute_research_workflow('graph learning', max_papers=2, resume_from_checkpoint=False)
+
+        assert crew.extracted == ['p1', 'p2', 'p1', 'p2']
+
+    def test_degraded_notes_are_not_cached(self, crew):
+        crew.degraded.add('p2')
+        crew.execute_research_workflow('graph learning', max_papers=2)
+        crew.degraded.clear()
+        crew.execute_research_workflow('graph learning', max_papers=2)
+
+        assert crew.extracted == ['p1', 'p2', 'p2']
@@ -0,0 +1,85 @@
+"""
+Tests for LLM streaming helpers
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import aclosing
+
+import pytest
+
+from src.llm.streaming import aiter_from_sync, iter_from_async
+
+
+class TestStreamingBridges:
+    """Test sync/async stream bridging"""
+
+    def test_aiter_from_sync_preserves_order(self):
+        """Items from a blocking iterator arrive in order"""
+        async def collect():
+            return [item async for item in aiter_from_sync(lambda: iter(['a', 'b', 'c']))]
+
+        assert asyncio.run(collect()) == ['a', 'b', 'c']
+
+    def test_aiter_from_sync_propagates_errors(self):
+        """Producer errors surface after the items already produced"""
+        def failing():
+            yield 'partial'
+            raise RuntimeError('stream broke')
+
+        received = []
+
+        async def collect():
+            async for item in aiter_from_sync(failing):
+                received.append(item)
+
+        with pytest.raises(RuntimeError, match='stream broke'):
+            asyncio.run(collect())
+        assert received == ['partial']
+
+    def test_closing_aiter_stops_the_producer(self):
+        """An abandoned stream stops pulling items and closes its source"""
+        pulled = []
+        closed = threading.Event()
+
+        def endless():
+            try:
+                for i in range(1000):
+                    pulled.append(i)
+                    time.sleep(0.01)
+                    yield i
+            finally:
+                closed.set()
+
+        async def first_two():
+            received = []
+            async with aclosing(aiter_from_sync(endless)) as items:
+                async for item in items:
+                    received.append(item)
+                    if len(received) == 2:
+                        break
+            return received
+
+        assert asyncio.run(first_two()) == [0, 1]
+        assert closed.wait(5)
+        assert len(pulled) < 1000
+
+    def test_iter_from_async_preserves_order(self):
+        """Items from an async iterator can be consumed synchronously"""
+        async def produce():
+            for i in range(3):
+                await asyncio.sleep(0)
+                yield i
+
+        assert list(iter_from_async(produce)) == [0, 1, 2]
+
+    def test_iter_from_async_inside_running_loop(self):
+        """Sync consumption works even when the caller already runs a loop"""
+        async def produce():
+            yield 'token'
+
+        async def caller():
+            return list(iter_from_async(produce))
+
+        assert asyncio.run(caller()) == ['token']
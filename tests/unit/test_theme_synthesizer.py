@@ -0,0 +1,144 @@
+"""
+Tests for theme synthesis
+"""
+
+import json
+import re
+import pytest
+from unittest.mock import Mock, patch
+
+from src.agents.theme_synthesizer_agent import ThemeSynthesizerAgent
+from src.storage.database import DatabaseManager
+from src.storage.models import ResearchNote
+
+TOPICS = {
+    'fl': 'federated clients aggregation privacy heterogeneity communication',
+    'gnn': 'graph neural message passing molecules embeddings',
+    'rl': 'robot manipulation grasping reinforcement control policies',
+}
+
+
+def make_notes(topic, start, count):
+    """Create notes on one topic with unique IDs"""
+    return [
+        ResearchNote(id=f'{topic}-{i}', paper_id=f'{topic}-paper-{i}', note_type='key_finding',
+                     content=f"{TOPICS[topic]} detail{i}")
+        for i in range(start, start + count)
+    ]
+
+
+class TestIncrementalThemes:
+    """Test that themes are maintained rather than rebuilt"""
+
+    @pytest.fixture
+    def temp_db(self, tmp_path):
+        """Create a temporary database"""
+        return DatabaseManager(str(tmp_path / 'research.db'))
+
+    @pytest.fixture
+    def agent(self, temp_db):
+        """Create an agent with a counting fake LLM on the temporary database"""
+        llm = Mock()
+        llm.generate.side_effect = lambda prompt, system_prompt=None: (
+            f"TITLE: Theme {llm.generate.call_count}\nDESCRIPTION: A synthesized description."
+        )
+        with patch('src.agents.theme_synthesizer_agent.db', temp_db), \
+             patch('src.agents.theme_synthesizer_agent.LLMFactory.create_llm', return_value=llm), \
+             patch('src.agents.theme_synthesizer_agent.Agent'):
+            agent = ThemeSynthesizerAgent()
+            yield agent
+
+    def test_new_notes_join_existing_themes(self, agent, temp_db):
+        """A second run assigns matching notes without new LLM calls or new themes"""
+        first = agent.synthesize_research_landscape(make_notes('fl', 0, 6) + make_notes('gnn', 0, 6))
+        calls = agent.llm.generate.call_count
+        theme_ids = {theme.id for theme in first['themes']}
+
+        second = agent.synthesize_research_landscape(make_notes('fl', 6, 2))
+
+        assert len(first['themes']) == 2
+        assert agent.llm.generate.call_count == calls
+        assert len(second['themes']) == 1
+        assert second['themes'][0].id in theme_ids
+        assert second['themes'][0].frequency == 8
+        assert {theme.id for theme in temp_db.get_themes()} == theme_ids
+
+    def test_outliers_create_new_themes(self, agent, temp_db):
+        """Only notes that fit no stored theme are clustered into new themes"""
+        agent.synthesize_research_landscape(make_notes('fl', 0, 6))
+        calls = agent.llm.generate.call_count
+
+        result = agent.synthesize_research_landscape(make_notes('fl', 6, 1) + make_notes('rl', 0, 4))
+
+        assert agent.llm.generate.call_count == calls + 1
+        assert len(result['themes']) == 2
+        assert len(temp_db.get_themes()) == 2
+
+    def test_material_growth_refreshes_title(self, agent):
+        """Themes are re-described once they grow past the configured ratio"""
+        first = agent.synthesize_research_landscape(make_notes('fl', 0, 4))
+        calls = agent.llm.generate.call_count
+
+        second = agent.synthesize_research_landscape(make_notes('fl', 4, 2))
+
+        assert agent.llm.generate.call_count == calls + 1
+        assert second['themes'][0].id == first['themes'][0].id
+        assert second['themes'][0].title != first['themes'][0].title
+
+    def test_rerun_with_same_notes_is_free(self, agent):
+        """Already assigned notes are not re-clustered"""
+        notes = make_notes('gnn', 0, 5)
+        first = agent.synthesize_research_landscape(notes)
+        calls = agent.llm.generate.call_count
+
+        second = agent.synthesize_research_landscape(notes)
+
+        assert agent.llm.generate.call_count == calls
+        assert [t.id for t in second['themes']] == [t.id for t in first['themes']]
+
+
+class TestBatchedThemeNaming:
+    """Test naming many clusters in few LLM calls"""
+
+    @pytest.fixture
+    def agent(self):
+        """Create an agent whose LLM names every cluster except cluster 2"""
+        llm = Mock()
+
+        def generate(prompt, system_prompt=None):
+            ids = [int(i) for i in re.findall(r'CLUSTER (\d+) ', prompt)]
+            return json.dumps([{'cluster_id': i, 'title': f'Named {i}', 'description': 'Desc'}
+                               for i in ids if i != 2])
+
+        llm.generate.side_effect = generate
+        with patch('src.agents.theme_synthesizer_agent.LLMFactory.create_llm', return_value=llm), \
+             patch('src.agents.theme_synthesizer_agent.Agent'):
+            yield ThemeSynthesizerAgent()
+
+    @pytest.fixture
+    def clusters(self):
+        return {topic: make_notes(topic, 0, 4) for topic in TOPICS}
+
+    def test_one_call_names_all_clusters(self, agent, clusters):
+        themes = agent.synthesize_themes(clusters)
+
+        assert agent.llm.generate.call_count == 1
+        assert [theme.title for theme in (themes[0], themes[2])] == ['Named 1', 'Named 3']
+        assert themes[1].confidence == 0.6  # fallback for the cluster the LLM skipped
+        assert themes[0].frequency == 4
+
+    def test_prompts_respect_budget(self, agent, clusters):
+        agent.naming_batch_chars = 10
+
+        themes = agent.synthesize_themes(clusters)
+
+        assert agent.llm.generate.call_count == 3
+        assert len(themes) == 3
+
+    def test_invalid_json_falls_back(self, agent, clusters):
+        agent.llm.generate.side_effect = lambda prompt, system_prompt=None: 'not json'
+
+        themes = agent.synthesize_themes(clusters)
+
+        assert len(themes) == 3
+        assert all(theme.confidence == 0.6 for theme in themes)
@@ -0,0 +1,155 @@
+"""
+Tests for the research workflow DAG executor
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.crew.research_crew import UltraFastResearchCrew
+from src.crew.workflow import Stage, StageFailed, WorkflowDAG
+
+
+class TestWorkflowDAG:
+    """Stages run once their dependencies finish, within the concurrency bound"""
+
+    def test_results_flow_along_dependencies(self):
+        dag = WorkflowDAG([
+            Stage('a', lambda _: 2),
+            Stage('b', lambda inputs: inputs['a'] * 10, ('a',)),
+            Stage('c', lambda inputs: inputs['a'] + inputs['b'], ('a', 'b')),
+        ])
+
+        assert dag.run() == {'a': 2, 'b': 20, 'c': 22}
+        assert set(dag.timings) == {'a', 'b', 'c'}
+
+    def test_independent_stages_overlap(self):
+        both_running = threading.Barrier(2, timeout=5)
+
+        def wait_for_sibling(_):
+            both_running.wait()
+            return True
+
+        dag = WorkflowDAG([
+            Stage('root', lambda _: None),
+            Stage('left', wait_for_sibling, ('root',)),
+            Stage('right', wait_for_sibling, ('root',)),
+        ], max_concurrency=2)
+
+        results = dag.run()
+
+        assert results['left'] and results['right']
+
+    def test_concurrency_is_bounded(self):
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def work(_):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+        WorkflowDAG([Stage(f's{i}', work) for i in range(6)], max_concurrency=2).run()
+
+        assert peak[0] == 2
+
+    def test_failure_stops_downstream_stages(self):
+        ran = []
+        events = []
+
+        def fail(_):
+            raise RuntimeError("boom")
+
+        dag = WorkflowDAG([
+            Stage('a', lambda _: 'papers'),
+            Stage('b', fail, ('a',)),
+            Stage('c', lambda _: ran.append('c'), ('b',)),
+        ], on_event=lambda event: events.append((event.stage, event.status, threading.current_thread())))
+
+        with pytest.raises(StageFailed) as failure:
+            dag.run()
+
+        assert failure.value.stage == 'b' and failure.value.results == {'a': 'papers'}
+        assert ran == []
+        assert ('b', 'failed') in [(stage, status) for stage, status, _ in events]
+        assert all(thread is threading.current_thread() for _, _, thread in events)
+
+    def test_invalid_graphs_are_rejected(self):
+        with pytest.raises(ValueError):
+            WorkflowDAG([Stage('a', lambda _: None, ('missing',))])
+        with pytest.raises(ValueError):
+            WorkflowDAG([Stage('a', lambda _: None, ('b',)), Stage('b', lambda _: None, ('a',))])
+
+    def test_zero_concurrency_still_runs_stages(self):
+        dag = WorkflowDAG([Stage('a', lambda _: 1), Stage('b', lambda inputs: inputs['a'] + 1, ('a',))],
+                          max_concurrency=0)
+
+        assert dag.max_concurrency == 1
+        assert dag.run() == {'a': 1, 'b': 2}
+
+
+class FakeAgent:
+    def __init__(self, **methods):
+        for name, method in methods.items():
+            setattr(self, name, method)
+
+
+class TestResearchWorkflow:
+    """execute_research_workflow runs its stages through the DAG"""
+
+    @pytest.fixture
+    def crew(self):
+        notes_started = threading.Event()
+
+        def citations(papers):
+            # Only completes if note taking is running at the same time
+            assert notes_started.wait(5)
+            return [f'cite-{paper}' for paper in papers]
+
+        def notes(paper, topic, report=None, content=None):
+            notes_started.set()
+            return [f'note-{paper}']
+
+        crew = UltraFastResearchCrew.__new__(UltraFastResearchCrew)
+        crew.literature_agent = FakeAgent(conduct_comprehensive_literature_survey=lambda *args: ['p1', 'p2'])
+        crew.note_agent = FakeAgent(extract_notes_from_paper=notes)
+        crew.theme_agent = FakeAgent(synthesize_research_landscape=lambda notes: {'themes': ['t1'], 'gaps': []})
+        crew.citation_agent = FakeAgent(
+            generate_citations_for_papers=citations,
+            build_citation_matcher=lambda citations, papers: None,
+            insert_inline_citations=lambda text, citations, matcher=None: text + ' [1]',
+            create_bibliography=lambda citations, style: 'bib',
+            generate_citation_report=lambda citations: 'report',
+        )
+        crew.draft_agent = FakeAgent(
+            compile_full_draft=lambda topic, themes, papers, notes, gaps: {'sections': {'intro': 'Intro'}})
+        crew.checkpoint_enabled = False
+        crew.parallel_processing = False
+        crew.max_parallel_stages = 2
+        return crew
+
+    def test_workflow_results_and_progress(self, crew):
+        progress = []
+
+        results = crew.execute_research_workflow('federated learning', max_papers=2,
+                                                 progress_callback=lambda step, text: progress.append(step),
+                                                 resume_from_checkpoint=False)
+
+        assert results['success']
+        assert results['notes'] == ['note-p1', 'note-p2']
+        assert results['citations'] == ['cite-p1', 'cite-p2']
+        assert results['draft']['sections']['intro'] == 'Intro [1]'
+        assert results['bibliography'] == 'bib' and results['citation_report'] == 'report'
+        assert set(results['stage_timings']) == set(UltraFastResearchCrew.WORKFLOW_STEPS)
+        assert progress[0] == 1 and progress[-1] == 5
+
+    def test_no_papers_is_reported(self, crew):
+        crew.literature_agent = FakeAgent(conduct_comprehensive_literature_survey=lambda *args: [])
+
+        results = crew.execute_research_workflow('nothing here', resume_from_checkpoint=False)
+
+        assert results == {'success': False, 'error': 'No papers found for the given topic',
+                           'research_topic': 'nothing here', 'execution_time': results['execution_time']}